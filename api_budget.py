@@ -0,0 +1,199 @@
+"""
+Presupuesto de llamadas al API server de Kubernetes en el lado del cliente.
+
+Todas las llamadas kubectl del orquestador pasan por un ApiBudget: un token
+bucket (tasa sostenida + ráfaga) con una cola ordenada por prioridad. El
+escalado hacia arriba y las comprobaciones de readiness (ALTA) adelantan al
+scale-down y a las consultas de descubrimiento (BAJA), que esperan a que quede
+presupuesto libre. Dentro de una prioridad se respeta el orden de llegada.
+
+Las operaciones con la misma clave que aún esperan turno se fusionan: la última
+sustituye a la encolada (p. ej. escalar a 3 y después a 1 el mismo deployment
+solo aplica el 1) y todas las llamadas fusionadas reciben el mismo resultado.
+Quien espera el resultado de una operación que ejecuta otro hilo sigue sujeto
+a su propio deadline.
+"""
+import heapq
+import itertools
+import threading
+import time
+
+import deadlines
+
+ALTA = 0
+BAJA = 1
+PRIORIDADES = {ALTA: 'alta', BAJA: 'baja'}
+
+
+class _Operacion:
+    __slots__ = (
+        'funcion', 'prioridad', 'secuencia', 'clave', 'llegada', 'interesados',
+        'fusionadas', 'estado', 'listo', 'resultado', 'error'
+    )
+
+    def __init__(self, funcion, prioridad, secuencia, clave):
+        self.funcion = funcion
+        self.prioridad = prioridad
+        self.secuencia = secuencia
+        self.clave = clave
+        self.llegada = time.monotonic()
+        self.interesados = 1
+        self.fusionadas = 0
+        self.estado = 'en_cola'
+        self.listo = threading.Event()
+        self.resultado = None
+        self.error = None
+
+
+class ApiBudget:
+    """
+    Token bucket con cola por prioridad y fusión de operaciones redundantes.
+
+    tasa <= 0 desactiva el presupuesto (las operaciones se ejecutan sin esperar).
+    observador(prioridad, espera_segundos, fusionadas) se invoca por cada
+    operación que llega a ejecutarse, para exportar la espera en cola.
+    """
+
+    def __init__(self, tasa=10.0, rafaga=20, observador=None):
+        self.tasa = tasa
+        self.rafaga = max(1, rafaga)
+        self.observador = observador
+        self._tokens = float(self.rafaga)
+        self._actualizado = time.monotonic()
+        self._condicion = threading.Condition()
+        self._cola = []
+        self._por_clave = {}
+        self._secuencia = itertools.count()
+        self.ejecutadas = {prioridad: 0 for prioridad in PRIORIDADES}
+        self.fusionadas = 0
+
+    @property
+    def activo(self):
+        return self.tasa > 0
+
+    def _recargar(self, ahora):
+        self._tokens = min(self.rafaga, self._tokens + (ahora - self._actualizado) * self.tasa)
+        self._actualizado = ahora
+
+    def _cabeza(self):
+        # Entradas obsoletas: operación ya retirada o reencolada con más prioridad
+        while self._cola:
+            prioridad, _, operacion = self._cola[0]
+            if operacion.estado == 'en_cola' and operacion.prioridad == prioridad:
+                return operacion
+            heapq.heappop(self._cola)
+        return None
+
+    def ejecutar(self, funcion, prioridad=ALTA, clave=None):
+        """
+        Ejecuta funcion() cuando haya presupuesto y sea su turno; devuelve su
+        resultado o relanza su excepción. Respeta el deadline de la operación en
+        curso mientras espera en la cola.
+        """
+        if not self.activo:
+            with self._condicion:
+                self.ejecutadas[prioridad] += 1
+            if self.observador:
+                self.observador(prioridad, 0.0, 0)
+            return funcion()
+
+        with self._condicion:
+            operacion = self._por_clave.get(clave) if clave is not None else None
+            if operacion is not None:
+                # Fusión: la última operación encolada sustituye a la anterior
+                operacion.funcion = funcion
+                operacion.interesados += 1
+                operacion.fusionadas += 1
+                self.fusionadas += 1
+                if prioridad < operacion.prioridad:
+                    operacion.prioridad = prioridad
+                    heapq.heappush(self._cola, (prioridad, operacion.secuencia, operacion))
+            else:
+                operacion = _Operacion(funcion, prioridad, next(self._secuencia), clave)
+                heapq.heappush(self._cola, (prioridad, operacion.secuencia, operacion))
+                if clave is not None:
+                    self._por_clave[clave] = operacion
+
+            ejecutar = self._esperar_turno(operacion)
+
+        if ejecutar:
+            self._ejecutar(operacion)
+        else:
+            self._esperar_resultado(operacion)
+        if operacion.error is not None:
+            raise operacion.error
+        return operacion.resultado
+
+    def _esperar_turno(self, operacion):
+        """Con el lock tomado: True si este hilo debe ejecutar la operación, False si ya la ejecuta otro."""
+        try:
+            while operacion.estado == 'en_cola':
+                ahora = time.monotonic()
+                self._recargar(ahora)
+                if self._cabeza() is operacion and self._tokens >= 1:
+                    self._tokens -= 1
+                    heapq.heappop(self._cola)
+                    operacion.estado = 'en_curso'
+                    if self._por_clave.get(operacion.clave) is operacion:
+                        del self._por_clave[operacion.clave]
+                    self.ejecutadas[operacion.prioridad] += 1
+                    self._condicion.notify_all()
+                    return True
+
+                deadlines.comprobar(f"presupuesto del API server ({PRIORIDADES[operacion.prioridad]})")
+                hasta_token = (1 - self._tokens) / self.tasa if self._tokens < 1 else deadlines.INTERVALO_SONDEO
+                self._condicion.wait(min(max(hasta_token, 0.001), deadlines.INTERVALO_SONDEO))
+            return False
+        except BaseException:
+            operacion.interesados -= 1
+            if operacion.interesados == 0 and operacion.estado == 'en_cola':
+                operacion.estado = 'retirada'
+                if self._por_clave.get(operacion.clave) is operacion:
+                    del self._por_clave[operacion.clave]
+                self._condicion.notify_all()
+            raise
+
+    def _esperar_resultado(self, operacion):
+        """Espera a que otro hilo ejecute la operación fusionada, sin pasar del deadline propio."""
+        deadline = deadlines.deadline_actual()
+        if deadline is None:
+            operacion.listo.wait()
+            return
+        while not operacion.listo.wait(min(deadline.restante(), deadlines.INTERVALO_SONDEO)):
+            deadline.comprobar(f"presupuesto del API server ({PRIORIDADES[operacion.prioridad]}, fusionada)")
+
+    def _ejecutar(self, operacion):
+        espera = time.monotonic() - operacion.llegada
+        try:
+            operacion.resultado = operacion.funcion()
+        except BaseException as error:
+            operacion.error = error
+        finally:
+            operacion.listo.set()
+        if self.observador:
+            self.observador(operacion.prioridad, espera, operacion.fusionadas)
+
+    def tokens_disponibles(self):
+        if not self.activo:
+            return float('inf')
+        with self._condicion:
+            self._recargar(time.monotonic())
+            return self._tokens
+
+    def en_cola(self, prioridad=None):
+        with self._condicion:
+            vistas = {id(o): o for _, _, o in self._cola if o.estado == 'en_cola'}
+            return sum(1 for o in vistas.values() if prioridad is None or o.prioridad == prioridad)
+
+    def estado(self):
+        """Resumen para depuración y métricas."""
+        tokens = self.tokens_disponibles()
+        return {
+            'Activo': self.activo,
+            'Tasa': self.tasa,
+            'Rafaga': self.rafaga,
+            'TokensDisponibles': round(tokens, 3) if self.activo else None,
+            'EnCola': {nombre: self.en_cola(prioridad) for prioridad, nombre in PRIORIDADES.items()},
+            'Ejecutadas': {nombre: self.ejecutadas[prioridad] for prioridad, nombre in PRIORIDADES.items()},
+            'Fusionadas': self.fusionadas
+        }
@@ -0,0 +1,228 @@
+import math
+import threading
+import time
+from collections import deque
+
+
+class DigitAutoscaler:
+    """
+    Escalado horizontal por carga de cada deployment suma-digito-{i}.
+
+    Registra las llamadas en curso y las recientes (tasa y latencia) de cada
+    dígito y estima la concurrencia necesaria con la ley de Little
+    (tasa × latencia media). Los pods se escalan entre min_replicas y
+    max_replicas con histéresis: la subida es inmediata y la bajada solo
+    ocurre cuando la carga se mantiene por debajo del umbral durante
+    estabilizacion_bajada segundos.
+
+    Solo actúa sobre dígitos ya calientes: arrancar desde cero es tarea de la
+    operación y apagar a cero es tarea del scale-down automático.
+
+    Con varios workers (estado_compartido), cada uno publica en cada ciclo sus
+    llamadas en curso y las de la ventana, y solo el que tiene el bloqueo
+    'autoscaler' (renovado en cada ciclo) decide, con la carga de todos: así no
+    hay N estimaciones parciales escalando el mismo deployment en sentidos opuestos.
+    """
+
+    CLAVE_PUBLICACION = 'autoscaler'
+
+    def __init__(
+        self,
+        orchestrator,
+        logger,
+        min_replicas=1,
+        max_replicas=3,
+        objetivo_por_replica=2.0,
+        ventana_segundos=30,
+        factor_bajada=0.7,
+        estabilizacion_bajada=30,
+        intervalo_evaluacion=5,
+        estado_compartido=None,
+        propietario=None
+    ):
+        self.orchestrator = orchestrator
+        self.logger = logger
+        self.min_replicas = max(1, min_replicas)
+        self.max_replicas = max(self.min_replicas, max_replicas)
+        self.objetivo_por_replica = objetivo_por_replica
+        self.ventana_segundos = ventana_segundos
+        self.factor_bajada = factor_bajada
+        self.estabilizacion_bajada = estabilizacion_bajada
+        self.intervalo_evaluacion = intervalo_evaluacion
+        self.estado_compartido = estado_compartido
+        self.propietario = propietario or str(id(self))
+
+        self._lock = threading.Lock()
+        self._en_curso = {}
+        self._llamadas = {}
+        self._bajada_desde = {}
+        self._hilo = None
+        self._detener = threading.Event()
+
+    # ── Registro de llamadas ────────────────────────────────────────────────
+
+    def inicio_llamada(self, digito):
+        with self._lock:
+            self._en_curso[digito] = self._en_curso.get(digito, 0) + 1
+        return time.time()
+
+    def fin_llamada(self, digito, inicio, exito=True):
+        """Cierra una llamada y devuelve su duración en segundos."""
+        ahora = time.time()
+        duracion = max(ahora - inicio, 0.0)
+        with self._lock:
+            self._en_curso[digito] = max(self._en_curso.get(digito, 0) - 1, 0)
+            llamadas = self._llamadas.setdefault(digito, deque())
+            llamadas.append((ahora, duracion, exito))
+            self._purgar(llamadas, ahora)
+        return duracion
+
+    def en_curso(self, digito):
+        with self._lock:
+            return self._en_curso.get(digito, 0)
+
+    def estadisticas(self, digito, ahora=None, remotos=()):
+        """
+        Tasa (llamadas/s), latencia media y llamadas en curso de la ventana
+        actual; remotos son las publicaciones de los demás workers (exportar()).
+        """
+        total, suma, en_curso = self._contadores(digito, time.time() if ahora is None else ahora)
+        for publicacion in remotos:
+            remoto = publicacion.get(str(digito), {})
+            total += remoto.get('Llamadas', 0)
+            suma += remoto.get('SumaLatencia', 0.0)
+            en_curso += remoto.get('EnCurso', 0)
+        return {
+            'tasa': total / self.ventana_segundos,
+            'latencia_media': suma / total if total else 0.0,
+            'en_curso': en_curso
+        }
+
+    def exportar(self, num_digitos, ahora=None):
+        """Contadores de este worker por dígito, para sumarlos en el worker que decide."""
+        ahora = time.time() if ahora is None else ahora
+        exportado = {}
+        for digito in range(num_digitos):
+            total, suma, en_curso = self._contadores(digito, ahora)
+            if total or en_curso:
+                exportado[str(digito)] = {'Llamadas': total, 'SumaLatencia': suma, 'EnCurso': en_curso}
+        return exportado
+
+    def publicar(self, num_digitos):
+        if self.estado_compartido is not None:
+            self.estado_compartido.publicar(
+                self.CLAVE_PUBLICACION, self.propietario, self.exportar(num_digitos),
+                ttl=3 * self.intervalo_evaluacion
+            )
+
+    def _remotos(self):
+        if self.estado_compartido is None:
+            return []
+        return list(self.estado_compartido.publicaciones(self.CLAVE_PUBLICACION, excluir=self.propietario).values())
+
+    # ── Decisión de réplicas ────────────────────────────────────────────────
+
+    def concurrencia_estimada(self, digito, ahora=None, remotos=()):
+        stats = self.estadisticas(digito, ahora, remotos)
+        return max(stats['en_curso'], stats['tasa'] * stats['latencia_media'])
+
+    def replicas_deseadas(self, digito, ahora=None, remotos=()):
+        concurrencia = self.concurrencia_estimada(digito, ahora, remotos)
+        deseadas = math.ceil(concurrencia / self.objetivo_por_replica) if concurrencia > 0 else 0
+        return min(max(deseadas, self.min_replicas), self.max_replicas)
+
+    def replicas_para_operacion(self, digito):
+        """Réplicas a pedir desde la operación: nunca reduce un deployment ya escalado."""
+        return min(max(self.orchestrator.replicas_actuales(digito), self.min_replicas), self.max_replicas)
+
+    def evaluar_digito(self, digito, ahora=None, remotos=()):
+        """Aplica la histéresis y escala el dígito si procede. Devuelve las réplicas resultantes."""
+        ahora = time.time() if ahora is None else ahora
+        actuales = self.orchestrator.replicas_actuales(digito)
+        if actuales <= 0:
+            return actuales
+
+        deseadas = self.replicas_deseadas(digito, ahora, remotos)
+
+        if deseadas > actuales:
+            with self._lock:
+                self._bajada_desde.pop(digito, None)
+            return self._escalar(digito, actuales, deseadas)
+
+        # Bajar solo si la carga cabe holgadamente en una réplica menos
+        capacidad_menor = (actuales - 1) * self.objetivo_por_replica * self.factor_bajada
+        puede_bajar = (
+            actuales > self.min_replicas and self.concurrencia_estimada(digito, ahora, remotos) <= capacidad_menor
+        )
+
+        with self._lock:
+            if not puede_bajar:
+                self._bajada_desde.pop(digito, None)
+                return actuales
+            desde = self._bajada_desde.setdefault(digito, ahora)
+            if ahora - desde < self.estabilizacion_bajada:
+                return actuales
+            self._bajada_desde.pop(digito, None)
+
+        return self._escalar(digito, actuales, actuales - 1)
+
+    def evaluar(self, num_digitos, ahora=None):
+        remotos = self._remotos()
+        for digito in range(num_digitos):
+            self.evaluar_digito(digito, ahora, remotos)
+
+    def es_lider(self):
+        """Sin estado compartido decide cada proceso; con él, solo quien renueva el bloqueo 'autoscaler'."""
+        if self.estado_compartido is None:
+            return True
+        return self.estado_compartido.intentar_bloqueo(
+            self.CLAVE_PUBLICACION, self.propietario, ttl=3 * self.intervalo_evaluacion
+        )
+
+    def ciclo(self, num_digitos):
+        """Un ciclo del bucle de fondo: publicar la carga propia y, si es el líder, evaluar."""
+        self.publicar(num_digitos)
+        if self.es_lider():
+            self.evaluar(num_digitos)
+
+    # ── Bucle de fondo ──────────────────────────────────────────────────────
+
+    def iniciar(self, num_digitos):
+        if self._hilo and self._hilo.is_alive():
+            return
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._bucle, args=(num_digitos,), daemon=True)
+        self._hilo.start()
+
+    def detener(self):
+        self._detener.set()
+        if self.estado_compartido is not None:
+            self.estado_compartido.liberar_bloqueo(self.CLAVE_PUBLICACION, self.propietario)
+
+    def _bucle(self, num_digitos):
+        while not self._detener.wait(self.intervalo_evaluacion):
+            try:
+                self.ciclo(num_digitos)
+            except Exception as error:
+                self.logger(f"⚠ Error evaluando autoescalado: {error}", "warning")
+
+    # ── Internos ────────────────────────────────────────────────────────────
+
+    def _contadores(self, digito, ahora):
+        """(llamadas de la ventana, suma de sus latencias, llamadas en curso) de este worker."""
+        with self._lock:
+            llamadas = self._llamadas.get(digito, deque())
+            self._purgar(llamadas, ahora)
+            return len(llamadas), sum(d for _, d, _ in llamadas), self._en_curso.get(digito, 0)
+
+    def _escalar(self, digito, actuales, objetivo):
+        direccion = "⏫" if objetivo > actuales else "⏬"
+        self.logger(f"{direccion} Autoescalado suma-digito-{digito}: {actuales} -> {objetivo} réplica(s)", "info")
+        if self.orchestrator.escalar_pod(digito, objetivo):
+            return objetivo
+        return actuales
+
+    def _purgar(self, llamadas, ahora):
+        limite = ahora - self.ventana_segundos
+        while llamadas and llamadas[0][0] < limite:
+            llamadas.popleft()
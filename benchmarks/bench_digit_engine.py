@@ -0,0 +1,70 @@
+"""
+Micro-benchmarks del motor de suma por dígitos.
+
+Compara, para lotes de distinto tamaño y longitud de operando, la ruta por
+dígito del proxy (get_digitos + normalizar_digitos + concatenación de texto)
+con digit_engine.sumar().
+
+    python benchmarks/bench_digit_engine.py [--repeticiones 5]
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import digit_engine  # noqa: E402
+
+
+def _get_digitos(numero):
+    if numero == 0:
+        return [0]
+    digitos = []
+    while numero > 0:
+        digitos.append(numero % 10)
+        numero //= 10
+    return digitos
+
+
+def suma_por_digitos(numeros_a, numeros_b):
+    """Réplica local del algoritmo de /suma-n-digitos con bucles Python."""
+    resultados = []
+    for a, b in zip(numeros_a, numeros_b):
+        digitos_a, digitos_b = _get_digitos(a), _get_digitos(b)
+        largo = max(len(digitos_a), len(digitos_b))
+        digitos_a += [0] * (largo - len(digitos_a))
+        digitos_b += [0] * (largo - len(digitos_b))
+        carry, texto = 0, ""
+        for x, y in zip(digitos_a, digitos_b):
+            carry, digito = divmod(x + y + carry, 10)
+            texto = str(digito) + texto
+        resultados.append(int((str(carry) if carry else "") + texto))
+    return resultados
+
+
+def medir(funcion, repeticiones):
+    return min(timeit.repeat(funcion, number=1, repeat=repeticiones))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    print(f"Motor: {digit_engine.MOTOR}")
+    print(f"{'operaciones':>12} {'dígitos':>8} {'bucles (ms)':>12} {'motor (ms)':>11} {'speedup':>8}")
+    for operaciones, digitos in ((1, 4), (1000, 4), (100000, 4), (10000, 64), (1000, 1024)):
+        numeros_a = [rng.randrange(10 ** digitos) for _ in range(operaciones)]
+        numeros_b = [rng.randrange(10 ** digitos) for _ in range(operaciones)]
+        assert digit_engine.sumar(numeros_a, numeros_b) == suma_por_digitos(numeros_a, numeros_b)
+
+        bucles = medir(lambda: suma_por_digitos(numeros_a, numeros_b), args.repeticiones)
+        motor = medir(lambda: digit_engine.sumar(numeros_a, numeros_b), args.repeticiones)
+        print(f"{operaciones:>12} {digitos:>8} {bucles * 1000:>12.2f} {motor * 1000:>11.2f} {bucles / motor:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Coste por petición de la instrumentación HTTP de Prometheus.
+
+Mide con el cliente de pruebas de Flask el tiempo por petición de una ruta
+caliente trivial (/suma) sin métricas y con cada configuración que admite el
+proxy, y cuenta las series de la etiqueta path que genera un 10 % de peticiones
+a rutas arbitrarias servidas por la regla comodín /<path:path>:
+
+    - group_by=path      : configuración anterior (una serie por ruta distinta)
+    - rule + limitador   : agrupación por regla de Flask con cubo de desbordamiento
+    - ruta ligera        : además, /suma medida con LightweightRouteMetrics
+
+    python benchmarks/bench_metrics.py [--peticiones 5000] [--repeticiones 5]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from flask import Flask, request  # noqa: E402
+from prometheus_client import CollectorRegistry  # noqa: E402
+from prometheus_flask_exporter import PrometheusMetrics  # noqa: E402
+
+import metrics_config  # noqa: E402
+
+VARIANTES = ('sin métricas', 'group_by=path', 'rule + limitador', 'ruta ligera')
+
+
+def crear_app(variante):
+    app = Flask(__name__)
+
+    @app.route('/suma')
+    def suma():
+        return str(int(request.args['a']) + int(request.args['b']))
+
+    @app.route('/<path:path>')
+    def estatico(path):
+        return path
+
+    registry = CollectorRegistry()
+    if variante == 'group_by=path':
+        PrometheusMetrics(app, path='/metrics', registry=registry, group_by='path')
+    elif variante in ('rule + limitador', 'ruta ligera'):
+        ligeras = ['/suma'] if variante == 'ruta ligera' else []
+        opciones, _ = metrics_config.opciones_metricas('rule', excluidas='^/terminal-stream$', rutas_ligeras=ligeras)
+        PrometheusMetrics(app, path='/metrics', registry=registry, **opciones)
+        if ligeras:
+            metrics_config.LightweightRouteMetrics(ligeras, registry=registry).registrar(app)
+    return app, registry
+
+
+def medir(cliente, rutas, repeticiones):
+    def lote():
+        for ruta in rutas:
+            cliente.get(ruta)
+
+    return min(timeit.repeat(lote, number=1, repeat=repeticiones)) / len(rutas)
+
+
+def series_path(registry):
+    return len({
+        muestra.labels.get('path')
+        for metrica in registry.collect()
+        for muestra in metrica.samples
+        if 'path' in muestra.labels
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--peticiones", type=int, default=5000)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    calientes = [f"/suma?a={i % 97}&b={i % 13}" for i in range(args.peticiones)]
+    mezcla = [f"/assets/fichero-{i}.js" if i % 10 == 0 else ruta for i, ruta in enumerate(calientes)]
+
+    base = None
+    print(f"{'variante':>18} {'µs/petición':>12} {'coste (µs)':>11} {'series path':>12}")
+    for variante in VARIANTES:
+        app, registry = crear_app(variante)
+        cliente = app.test_client()
+        por_peticion = medir(cliente, calientes, args.repeticiones) * 1e6
+        base = por_peticion if base is None else base
+        for ruta in mezcla:
+            cliente.get(ruta)
+        print(f"{variante:>18} {por_peticion:>12.1f} {por_peticion - base:>11.1f} {series_path(registry):>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Latencia de sumar K operandos: cadena secuencial frente a árbol de reducción.
+
+Simula cada llamada a un pod de dígito con una espera fija (--latencia-ms) y
+compara K-1 sumas encadenadas (lo que hace hoy un cliente con /suma-n-digitos)
+con reducir_en_arbol() lanzando las sumas de cada nivel a la vez, como
+POST /suma-multiple:
+
+    python benchmarks/bench_reduction.py [--latencia-ms 2] [--cifras 4]
+"""
+import argparse
+import functools
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from reduction import niveles_necesarios, reducir_en_arbol  # noqa: E402
+
+
+def sumar_simulado(a, b, latencia, cifras):
+    # Cascada de acarreo: una llamada secuencial por posición
+    time.sleep(latencia * cifras)
+    return a + b
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latencia-ms", type=float, default=2.0)
+    parser.add_argument("--cifras", type=int, default=4)
+    parser.add_argument("--paralelismo", type=int, default=16)
+    args = parser.parse_args()
+
+    sumar = functools.partial(sumar_simulado, latencia=args.latencia_ms / 1000, cifras=args.cifras)
+    print(f"{'K':>5} {'niveles':>8} {'cadena (ms)':>12} {'árbol (ms)':>11} {'aceleración':>12}")
+    with ThreadPoolExecutor(max_workers=args.paralelismo) as executor:
+        for k in (2, 4, 8, 16, 32, 64):
+            operandos = list(range(k))
+
+            inicio = time.perf_counter()
+            total = operandos[0]
+            for operando in operandos[1:]:
+                total = sumar(total, operando)
+            cadena = (time.perf_counter() - inicio) * 1000
+
+            inicio = time.perf_counter()
+            reducir_en_arbol(operandos, sumar, executor=executor)
+            arbol = (time.perf_counter() - inicio) * 1000
+
+            print(f"{k:>5} {niveles_necesarios(k):>8} {cadena:>12.1f} {arbol:>11.1f} {cadena / arbol:>11.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Plazo de extremo a extremo de una operación y cancelación al desconectarse el cliente.
+
+El proxy fija un Deadline por petición (cabecera X-Request-Timeout o configuración)
+y lo activa en el contexto con con_deadline(). Cada etapa lo consulta para no
+gastar más que el presupuesto restante: limitar() acota los timeouts de kubectl
+y de las llamadas a los dígitos, dormir() sustituye a time.sleep() en esperas y
+reintentos, y comprobar() corta la operación entre etapas. Sin deadline activo
+las tres funciones se comportan como antes (timeout original, time.sleep, nada).
+
+La desconexión del cliente se detecta sondeando el socket de la petición (sin
+consumir datos) como mucho cada INTERVALO_SONDEO segundos.
+"""
+import contextvars
+import math
+import select
+import socket
+import threading
+import time
+from contextlib import contextmanager
+
+INTERVALO_SONDEO = 0.25
+
+_actual = contextvars.ContextVar('deadline', default=None)
+
+
+class DeadlineExceeded(Exception):
+    """Se agotó el plazo de la operación."""
+
+
+class RequestCancelled(DeadlineExceeded):
+    """El cliente se desconectó: el trabajo pendiente se abandona."""
+
+
+class Deadline:
+    """
+    Presupuesto de tiempo de una operación, cancelable.
+
+    segundos=None no fija plazo (solo cancelación). sonda_cancelacion() devuelve
+    True cuando el cliente ya no espera la respuesta; se consulta de forma
+    perezosa desde cancelado, limitada a una vez por intervalo_sondeo.
+    """
+
+    def __init__(self, segundos=None, sonda_cancelacion=None, intervalo_sondeo=INTERVALO_SONDEO):
+        self.segundos = segundos
+        self.limite = time.monotonic() + segundos if segundos is not None else None
+        self.motivo = None
+        self._sonda = sonda_cancelacion
+        self._intervalo_sondeo = intervalo_sondeo
+        self._ultimo_sondeo = 0.0
+        self._cancelado = threading.Event()
+
+    def restante(self):
+        """Segundos que quedan (inf sin plazo, nunca negativo)."""
+        if self.limite is None:
+            return math.inf
+        return max(0.0, self.limite - time.monotonic())
+
+    def vencido(self):
+        return self.restante() <= 0
+
+    def cancelar(self, motivo="cancelada"):
+        if not self._cancelado.is_set():
+            self.motivo = motivo
+            self._cancelado.set()
+
+    @property
+    def cancelado(self):
+        if not self._cancelado.is_set() and self._sonda is not None:
+            ahora = time.monotonic()
+            if ahora - self._ultimo_sondeo >= self._intervalo_sondeo:
+                self._ultimo_sondeo = ahora
+                if self._sonda():
+                    self.cancelar("cliente desconectado")
+        return self._cancelado.is_set()
+
+    def comprobar(self, etapa="operacion"):
+        """Lanza RequestCancelled o DeadlineExceeded si la operación no debe continuar."""
+        if self.cancelado:
+            raise RequestCancelled(f"Operación cancelada en {etapa}: {self.motivo}")
+        if self.vencido():
+            raise DeadlineExceeded(f"Plazo de {self.segundos:g}s agotado en {etapa}")
+
+    def limitar(self, timeout, etapa="operacion"):
+        """timeout acotado al tiempo restante; lanza si ya no queda presupuesto."""
+        self.comprobar(etapa)
+        return min(timeout, self.restante())
+
+    def dormir(self, segundos, etapa="operacion"):
+        """Espera hasta segundos (acotados al plazo) despertando ante una cancelación."""
+        fin = time.monotonic() + min(segundos, self.restante())
+        while True:
+            self.comprobar(etapa)
+            pendiente = fin - time.monotonic()
+            if pendiente <= 0:
+                return
+            self._cancelado.wait(min(pendiente, self._intervalo_sondeo))
+
+
+def deadline_actual():
+    """Deadline de la operación en curso en este contexto, o None."""
+    return _actual.get()
+
+
+@contextmanager
+def con_deadline(deadline):
+    token = _actual.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _actual.reset(token)
+
+
+def limitar(timeout, etapa="operacion"):
+    deadline = _actual.get()
+    return timeout if deadline is None else deadline.limitar(timeout, etapa)
+
+
+def comprobar(etapa="operacion"):
+    deadline = _actual.get()
+    if deadline is not None:
+        deadline.comprobar(etapa)
+
+
+def dormir(segundos, etapa="operacion"):
+    deadline = _actual.get()
+    if deadline is None:
+        time.sleep(segundos)
+    else:
+        deadline.dormir(segundos, etapa)
+
+
+def sonda_desconexion(environ):
+    """
+    Sonda de desconexión a partir del socket del cliente que exponen gunicorn
+    (gunicorn.socket) y el servidor de desarrollo de Werkzeug (werkzeug.socket).
+    Un socket legible cuyo MSG_PEEK devuelve b'' está cerrado por el cliente; los
+    bytes de una petición siguiente (keep-alive) no se consumen. None si el
+    servidor no expone el socket.
+    """
+    conexion = environ.get('gunicorn.socket') or environ.get('werkzeug.socket')
+    if conexion is None:
+        return None
+
+    def desconectado():
+        try:
+            legibles, _, _ = select.select([conexion], [], [], 0)
+            return bool(legibles) and conexion.recv(1, socket.MSG_PEEK) == b''
+        except OSError:
+            return True
+        except ValueError:
+            # Socket TLS (MSG_PEEK no admitido) o ya cerrado por el servidor: sin información
+            return False
+
+    return desconectado
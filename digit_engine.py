@@ -0,0 +1,137 @@
+"""
+Motor local de suma por dígitos sobre columnas de operandos.
+
+Descompone, rellena, suma con propagación de acarreo y recompone lotes
+completos de números con operaciones vectorizadas de NumPy: cada pasada
+procesa una columna de dígitos de todas las operaciones a la vez. Sin NumPy
+se usa una implementación equivalente en Python puro.
+
+Sirve para verificar los resultados de los servicios de dígito y como ruta de
+cálculo local rápida del proxy (POST /suma-lote).
+"""
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - la imagen de producción incluye numpy
+    np = None
+
+MOTOR = 'numpy' if np is not None else 'python'
+
+# Hasta 18 dígitos (más el acarreo final) los números caben en int64 y se opera en aritmética entera
+_MAX_DIGITOS_INT64 = 18
+
+
+def descomponer(numeros, num_digitos=None):
+    """
+    Matriz (n, d) de dígitos de los números, columna 0 = unidades.
+
+    d es la longitud del mayor número si no se indica. Admite enteros de
+    cualquier longitud; lanza ValueError con negativos o números que no caben.
+    """
+    numeros = list(numeros)
+    if numeros and min(numeros) < 0:
+        raise ValueError("Solo se admiten números no negativos")
+    d = num_digitos or len(str(max(numeros, default=0)))
+    if numeros and max(numeros) >= 10 ** d:
+        raise ValueError(f"Hay números con más de {d} dígitos")
+
+    if np is None:
+        return [[int(c) for c in reversed(str(numero).zfill(d))] for numero in numeros]
+
+    if d <= _MAX_DIGITOS_INT64:
+        valores = np.fromiter(numeros, dtype=np.int64, count=len(numeros))
+        return ((valores[:, None] // 10 ** np.arange(d, dtype=np.int64)) % 10).astype(np.int8)
+
+    # Operandos largos: str(int) y la conversión bytes → array son C; los dígitos salen de restar '0'
+    buffer = "".join(str(numero).zfill(d) for numero in numeros).encode('ascii')
+    digitos = np.frombuffer(buffer, dtype=np.uint8).reshape(len(numeros), d)[:, ::-1] - ord('0')
+    return digitos.astype(np.int8)
+
+
+def sumar_columnas(digitos_a, digitos_b):
+    """
+    Suma con acarreo dos matrices de dígitos de igual forma.
+
+    Devuelve (resultado, acarreos): resultado[i][c] es el dígito de la posición c
+    y acarreos[i][c] el CarryOut de esa posición (el CarryIn de la siguiente).
+    """
+    if np is None:
+        resultado, acarreos = [], []
+        for fila_a, fila_b in zip(digitos_a, digitos_b):
+            carry, fila_r, fila_c = 0, [], []
+            for a, b in zip(fila_a, fila_b):
+                carry, digito = divmod(a + b + carry, 10)
+                fila_r.append(digito)
+                fila_c.append(carry)
+            resultado.append(fila_r)
+            acarreos.append(fila_c)
+        return resultado, acarreos
+
+    suma = digitos_a.astype(np.int8) + digitos_b
+    resultado = np.empty_like(suma)
+    acarreos = np.empty_like(suma)
+    carry = np.zeros(suma.shape[0], dtype=np.int8)
+    for columna in range(suma.shape[1]):
+        parcial = suma[:, columna] + carry
+        carry = (parcial >= 10).astype(np.int8)
+        resultado[:, columna] = parcial - 10 * carry
+        acarreos[:, columna] = carry
+    return resultado, acarreos
+
+
+def recomponer(resultado, carry_final):
+    """Enteros a partir de las matrices de dígitos y el acarreo final de cada fila."""
+    if np is None:
+        return [
+            int(str(carry) + "".join(str(d) for d in reversed(fila)))
+            for fila, carry in zip(resultado, carry_final)
+        ]
+
+    if len(resultado) == 0:
+        return []
+    if resultado.shape[1] <= _MAX_DIGITOS_INT64:
+        potencias = 10 ** np.arange(resultado.shape[1], dtype=np.int64)
+        valores = resultado.astype(np.int64) @ potencias
+        valores += np.asarray(carry_final, dtype=np.int64) * 10 ** resultado.shape[1]
+        return valores.tolist()
+
+    filas = np.concatenate([np.asarray(carry_final, dtype=np.int8)[:, None], resultado[:, ::-1]], axis=1)
+    texto = (filas + ord('0')).astype(np.uint8).tobytes()
+    ancho = filas.shape[1]
+    return [int(texto[i:i + ancho]) for i in range(0, len(texto), ancho)]
+
+
+def sumar(numeros_a, numeros_b):
+    """Suma elemento a elemento dos listas de enteros no negativos mediante columnas de dígitos."""
+    if len(numeros_a) != len(numeros_b):
+        raise ValueError("Las listas de operandos deben tener la misma longitud")
+    if not numeros_a:
+        return []
+
+    d = len(str(max(max(numeros_a), max(numeros_b))))
+    resultado, acarreos = sumar_columnas(descomponer(numeros_a, d), descomponer(numeros_b, d))
+    carry_final = [fila[-1] for fila in acarreos] if np is None else acarreos[:, -1]
+    return recomponer(resultado, carry_final)
+
+
+def verificar_detalles(numero_a, numero_b, detalles):
+    """
+    Compara los resultados por posición devueltos por los servicios de dígito
+    (Details de /suma-n-digitos) con el cálculo local. Devuelve las discrepancias.
+    """
+    d = max(len(detalles), len(str(numero_a)), len(str(numero_b)))
+    fila_a = [int(c) for c in reversed(str(numero_a).zfill(d))]
+    fila_b = [int(c) for c in reversed(str(numero_b).zfill(d))]
+
+    discrepancias = []
+    carry = 0
+    for detalle in detalles:
+        posicion = detalle['Posicion']
+        esperado_carry, esperado = divmod(fila_a[posicion] + fila_b[posicion] + carry, 10)
+        if (detalle['Result'], detalle['CarryOut']) != (esperado, esperado_carry):
+            discrepancias.append({
+                'Posicion': posicion,
+                'Esperado': {'Result': esperado, 'CarryOut': esperado_carry},
+                'Recibido': {'Result': detalle['Result'], 'CarryOut': detalle['CarryOut']}
+            })
+        carry = esperado_carry
+    return discrepancias
@@ -0,0 +1,197 @@
+import queue
+import socket
+import socketserver
+import struct
+import threading
+from urllib.parse import urlsplit
+
+# Trama: longitud (u16) + cuerpo. Cuerpos de petición y respuesta de 7 bytes:
+#   petición  → id (u32), NumberA (u8), NumberB (u8), CarryIn (u8)
+#   respuesta → id (u32), Result (u8), CarryOut (u8), estado (u8; 0 = ok)
+_LONGITUD = struct.Struct('>H')
+_PETICION = struct.Struct('>IBBB')
+_RESPUESTA = struct.Struct('>IBBB')
+
+ESTADO_OK = 0
+ESTADO_ERROR = 1
+
+TRANSPORTES = ('http', 'binary')
+
+
+class BinaryTransportError(Exception):
+    """Fallo de la conexión o respuesta inválida en el transporte binario."""
+
+
+def _recibir_exacto(sock, n):
+    datos = bytearray()
+    while len(datos) < n:
+        trozo = sock.recv(n - len(datos))
+        if not trozo:
+            raise BinaryTransportError("Conexión cerrada por el servidor")
+        datos.extend(trozo)
+    return bytes(datos)
+
+
+def _leer_trama(sock):
+    (longitud,) = _LONGITUD.unpack(_recibir_exacto(sock, _LONGITUD.size))
+    return _recibir_exacto(sock, longitud)
+
+
+def _trama(cuerpo):
+    return _LONGITUD.pack(len(cuerpo)) + cuerpo
+
+
+def validar_transporte(transporte, en_cluster, puerto_binario, directo_a_pods):
+    """
+    Comprueba al arrancar que los servicios de dígito son alcanzables con el
+    transporte elegido; ValueError si no. El binario escucha en un puerto propio
+    que ni el port-forward local (solo el HTTP) ni los Services exponen: exige
+    estar en el clúster, con DIGIT_BINARY_PORT y enrutado directo a las IPs de los pods.
+    """
+    if transporte not in TRANSPORTES:
+        raise ValueError(f"DIGIT_TRANSPORT desconocido: {transporte!r} (se admite {' o '.join(TRANSPORTES)})")
+    if transporte != 'binary':
+        return
+    if not en_cluster:
+        raise ValueError("DIGIT_TRANSPORT=binary no está disponible en modo local: el port-forward solo expone HTTP")
+    if not puerto_binario:
+        raise ValueError("DIGIT_TRANSPORT=binary requiere DIGIT_BINARY_PORT")
+    if not directo_a_pods:
+        raise ValueError(
+            "DIGIT_TRANSPORT=binary requiere ORCHESTRATOR_DIRECT_POD_ROUTING=true: "
+            "los Services de los dígitos solo exponen el puerto HTTP"
+        )
+
+
+class BinaryDigitTransport:
+    """
+    Transporte compacto hacia los servicios de dígito: tramas binarias con
+    prefijo de longitud sobre conexiones TCP persistentes.
+
+    Las conexiones se reutilizan por destino (host, puerto). Si puerto se indica,
+    sustituye al de la URL del servicio (el protocolo binario escucha en un
+    puerto propio).
+    """
+
+    def __init__(self, puerto=None, max_conexiones_por_destino=8, timeout_conexion=2.0):
+        self.puerto = puerto
+        self.max_conexiones_por_destino = max_conexiones_por_destino
+        self.timeout_conexion = timeout_conexion
+        self._lock = threading.Lock()
+        self._libres = {}
+        self._siguiente_id = 0
+
+    def _destino(self, service_url):
+        partes = urlsplit(service_url)
+        return partes.hostname, self.puerto or partes.port
+
+    def _nuevo_id(self):
+        with self._lock:
+            self._siguiente_id = (self._siguiente_id + 1) % 2 ** 32
+            return self._siguiente_id
+
+    def _tomar(self, destino):
+        with self._lock:
+            libres = self._libres.setdefault(destino, queue.LifoQueue())
+        try:
+            return libres.get_nowait()
+        except queue.Empty:
+            try:
+                conexion = socket.create_connection(destino, timeout=self.timeout_conexion)
+            except OSError as error:
+                raise BinaryTransportError(f"No se pudo conectar con {destino[0]}:{destino[1]}: {error}") from error
+            conexion.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            return conexion
+
+    def _devolver(self, destino, conexion):
+        libres = self._libres[destino]
+        if libres.qsize() < self.max_conexiones_por_destino:
+            libres.put(conexion)
+        else:
+            conexion.close()
+
+    def llamar(self, service_url, payload, timeout):
+        """Equivalente binario de POST /suma: devuelve {'Result', 'CarryOut'}."""
+        a, b, carry = payload['NumberA'], payload['NumberB'], payload['CarryIn']
+        if not (0 <= a <= 9 and 0 <= b <= 9 and carry in (0, 1)):
+            raise ValueError(f"Petición fuera de rango para el transporte binario: {payload}")
+        esperado = self._nuevo_id()
+
+        destino = self._destino(service_url)
+        conexion = self._tomar(destino)
+        try:
+            conexion.settimeout(timeout)
+            conexion.sendall(_trama(_PETICION.pack(esperado, a, b, carry)))
+            identificador, resultado, carry_out, estado = _RESPUESTA.unpack(_leer_trama(conexion))
+            if identificador != esperado:
+                raise BinaryTransportError(f"Respuesta fuera de orden: {identificador} != {esperado}")
+            if estado != ESTADO_OK:
+                raise BinaryTransportError(f"El servicio devolvió estado {estado}")
+        except (OSError, struct.error, BinaryTransportError) as error:
+            # Una conexión con tramas a medio leer no se puede reutilizar
+            conexion.close()
+            if isinstance(error, BinaryTransportError):
+                raise
+            raise BinaryTransportError(f"Error en el transporte binario con {destino[0]}:{destino[1]}: {error}") from error
+
+        self._devolver(destino, conexion)
+        return {'Result': resultado, 'CarryOut': carry_out}
+
+    def cerrar(self):
+        with self._lock:
+            destinos, self._libres = self._libres, {}
+        for libres in destinos.values():
+            while not libres.empty():
+                libres.get_nowait().close()
+
+
+class _ManejadorDigito(socketserver.BaseRequestHandler):
+    def handle(self):
+        sock = self.request
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        try:
+            while True:
+                identificador, a, b, carry = _PETICION.unpack(_leer_trama(sock))
+                try:
+                    resultado = self.server.sumar(a, b, carry)
+                    cuerpo = _RESPUESTA.pack(identificador, resultado['Result'], resultado['CarryOut'], ESTADO_OK)
+                except Exception:
+                    cuerpo = _RESPUESTA.pack(identificador, 0, 0, ESTADO_ERROR)
+                sock.sendall(_trama(cuerpo))
+        except (BinaryTransportError, OSError, struct.error):
+            return
+
+
+def _suma_digito(a, b, carry):
+    carry_out, resultado = divmod(a + b + carry, 10)
+    return {'Result': resultado, 'CarryOut': carry_out}
+
+
+class DigitBinaryServer(socketserver.ThreadingTCPServer):
+    """
+    Servidor de referencia del protocolo binario de un servicio de dígito.
+
+    Atiende peticiones en pipeline por conexión y responde en orden. Sirve para
+    los tests y como especificación ejecutable para los servicios de backend.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, direccion=('127.0.0.1', 0), sumar=_suma_digito):
+        super().__init__(direccion, _ManejadorDigito)
+        self.sumar = sumar
+        self._hilo = None
+
+    @property
+    def puerto(self):
+        return self.server_address[1]
+
+    def iniciar(self):
+        self._hilo = threading.Thread(target=self.serve_forever, daemon=True, name='digito-binario')
+        self._hilo.start()
+        return self
+
+    def detener(self):
+        self.shutdown()
+        self.server_close()
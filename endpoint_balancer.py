@@ -0,0 +1,183 @@
+import random
+import threading
+import time
+
+
+class Endpoint:
+    """Réplica lista de un servicio de dígito, con su carga y estado de expulsión."""
+
+    __slots__ = ('ip', 'port', 'url', 'en_curso', 'latencia_ewma', 'fallos_consecutivos',
+                 'expulsiones', 'expulsado_hasta')
+
+    def __init__(self, ip, port):
+        self.ip = ip
+        self.port = port
+        self.url = f"http://{ip}:{port}"
+        self.en_curso = 0
+        self.latencia_ewma = 0.0
+        self.fallos_consecutivos = 0
+        self.expulsiones = 0
+        self.expulsado_hasta = 0.0
+
+    def disponible(self, ahora):
+        return self.expulsado_hasta <= ahora
+
+
+class EndpointBalancer:
+    """
+    Balanceo de carga en cliente sobre las IPs de pod listas de cada dígito.
+
+    La tabla se alimenta con obtener_endpoints(digito) -> [(ip, port), ...]
+    (normalmente leído de las EndpointSlices) y se refresca en segundo plano.
+    Cada llamada elige réplica con power-of-two-choices o least-outstanding
+    y reporta su resultado; las réplicas con fallos consecutivos se expulsan
+    temporalmente (outlier ejection) con backoff exponencial.
+
+    Si no hay réplicas disponibles elegir() devuelve None y el llamante usa el
+    nombre DNS del Service como fallback.
+    """
+
+    ALGORITMOS = ('p2c', 'least')
+
+    def __init__(
+        self,
+        obtener_endpoints,
+        logger,
+        algoritmo='p2c',
+        intervalo_refresco=5,
+        fallos_para_expulsion=3,
+        expulsion_base_segundos=10,
+        expulsion_max_segundos=120,
+        max_expulsados_pct=0.5,
+        alfa_latencia=0.3
+    ):
+        if algoritmo not in self.ALGORITMOS:
+            raise ValueError(f"Algoritmo de balanceo desconocido: {algoritmo}")
+
+        self.obtener_endpoints = obtener_endpoints
+        self.logger = logger
+        self.algoritmo = algoritmo
+        self.intervalo_refresco = intervalo_refresco
+        self.fallos_para_expulsion = fallos_para_expulsion
+        self.expulsion_base_segundos = expulsion_base_segundos
+        self.expulsion_max_segundos = expulsion_max_segundos
+        self.max_expulsados_pct = max_expulsados_pct
+        self.alfa_latencia = alfa_latencia
+
+        self._lock = threading.Lock()
+        self._tabla = {}
+        self._hilo = None
+        self._detener = threading.Event()
+
+    # ── Tabla de endpoints ──────────────────────────────────────────────────
+
+    def refrescar(self, digito):
+        """Relee las réplicas listas del dígito conservando el estado de las ya conocidas."""
+        try:
+            direcciones = self.obtener_endpoints(digito)
+        except Exception as error:
+            self.logger(f"⚠ No se pudieron refrescar endpoints de suma-digito-{digito}: {error}", "warning")
+            return False
+
+        with self._lock:
+            anteriores = self._tabla.get(digito, {})
+            nuevos = {}
+            for ip, port in direcciones:
+                nuevos[(ip, port)] = anteriores.get((ip, port)) or Endpoint(ip, port)
+            self._tabla[digito] = nuevos
+        return True
+
+    def vaciar(self, digito):
+        with self._lock:
+            self._tabla.pop(digito, None)
+
+    def endpoints(self, digito):
+        with self._lock:
+            return list(self._tabla.get(digito, {}).values())
+
+    # ── Selección y reporte ─────────────────────────────────────────────────
+
+    def elegir(self, digito, ahora=None):
+        """Elige una réplica y la marca como ocupada. Devuelve None si no hay ninguna."""
+        ahora = time.time() if ahora is None else ahora
+        with self._lock:
+            candidatos = [ep for ep in self._tabla.get(digito, {}).values() if ep.disponible(ahora)]
+            if not candidatos:
+                return None
+
+            if self.algoritmo == 'least' or len(candidatos) <= 2:
+                elegido = min(candidatos, key=self._carga)
+            else:
+                elegido = min(random.sample(candidatos, 2), key=self._carga)
+
+            elegido.en_curso += 1
+            return elegido
+
+    def reportar(self, digito, url, exito, latencia=None, ahora=None):
+        """
+        Libera la réplica usada por una llamada y actualiza su latencia y su
+        estado de salud. Con exito=None la llamada no llegó a enviarse: solo se libera.
+        """
+        ahora = time.time() if ahora is None else ahora
+        with self._lock:
+            endpoint = next((ep for ep in self._tabla.get(digito, {}).values() if ep.url == url), None)
+            if endpoint is None:
+                return
+
+            endpoint.en_curso = max(endpoint.en_curso - 1, 0)
+            if exito is None:
+                return
+
+            if exito:
+                endpoint.fallos_consecutivos = 0
+                if latencia is not None:
+                    if endpoint.latencia_ewma == 0.0:
+                        endpoint.latencia_ewma = latencia
+                    else:
+                        endpoint.latencia_ewma += self.alfa_latencia * (latencia - endpoint.latencia_ewma)
+                return
+
+            endpoint.fallos_consecutivos += 1
+            if endpoint.fallos_consecutivos < self.fallos_para_expulsion:
+                return
+
+            total = len(self._tabla[digito])
+            expulsados = sum(1 for ep in self._tabla[digito].values() if not ep.disponible(ahora))
+            if expulsados + 1 > total * self.max_expulsados_pct:
+                return
+
+            duracion = min(
+                self.expulsion_base_segundos * (2 ** endpoint.expulsiones),
+                self.expulsion_max_segundos
+            )
+            endpoint.expulsiones += 1
+            endpoint.fallos_consecutivos = 0
+            endpoint.expulsado_hasta = ahora + duracion
+
+        self.logger(
+            f"⚠ Réplica {endpoint.ip} de suma-digito-{digito} expulsada durante {duracion}s por fallos consecutivos",
+            "warning"
+        )
+
+    # ── Bucle de refresco ───────────────────────────────────────────────────
+
+    def iniciar(self):
+        if self._hilo and self._hilo.is_alive():
+            return
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._bucle, daemon=True)
+        self._hilo.start()
+
+    def detener(self):
+        self._detener.set()
+
+    def _bucle(self):
+        while not self._detener.wait(self.intervalo_refresco):
+            with self._lock:
+                digitos = list(self._tabla)
+            for digito in digitos:
+                self.refrescar(digito)
+
+    @staticmethod
+    def _carga(endpoint):
+        return (endpoint.en_curso, endpoint.latencia_ewma)
@@ -0,0 +1,60 @@
+"""
+Configuración de gunicorn para servir proxy.py en producción.
+
+    gunicorn -c gunicorn.conf.py proxy:app
+
+Con varios workers el estado compartido debe ser SQLite (SHARED_STATE_BACKEND=sqlite)
+para que todos vean el mismo historial del terminal, los pods en uso, el bloqueo de
+scale-down y las réplicas aplicadas a cada deployment. También se activa el modo
+multiproceso de las métricas (PROMETHEUS_MULTIPROC_DIR) si no está ya configurado. En modo local (port-forward) se usa un único worker, porque los procesos
+kubectl port-forward pertenecen al worker que los lanzó.
+"""
+import multiprocessing
+import os
+
+_in_cluster = os.getenv("ORCHESTRATOR_IN_CLUSTER", "false").lower() == "true"
+
+bind = f"0.0.0.0:{os.getenv('PROXY_PORT', '8080')}"
+workers = int(os.getenv("PROXY_WORKERS", str(multiprocessing.cpu_count() if _in_cluster else 1)))
+# gthread: las conexiones SSE de /terminal-stream ocupan un hilo, no un worker entero
+worker_class = "gthread"
+threads = int(os.getenv("PROXY_THREADS", "16"))
+# Una operación en frío puede tardar más de un minuto (scale + ready + endpoints)
+timeout = int(os.getenv("PROXY_WORKER_TIMEOUT", "180"))
+# Debe ser menor que terminationGracePeriodSeconds del Deployment
+graceful_timeout = int(os.getenv("PROXY_GRACEFUL_TIMEOUT", "25"))
+keepalive = 5
+accesslog = "-"
+errorlog = "-"
+
+if workers > 1:
+    if os.getenv("SHARED_STATE_BACKEND", "memory") == "memory":
+        os.environ["SHARED_STATE_BACKEND"] = "sqlite"
+
+    # Con varios workers se activa el modo multiproceso de prometheus_client: /metrics agrega los
+    # ficheros de todos los workers. Los gauges calculados se publican con set() (ComputedGauges en
+    # metrics_config.py) y cada uno declara cómo se combinan sus valores (multiprocess_mode)
+    _multiproc_dir = os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/prometheus-multiproc")
+    os.makedirs(_multiproc_dir, exist_ok=True)
+    for _fichero in os.listdir(_multiproc_dir):
+        os.remove(os.path.join(_multiproc_dir, _fichero))
+
+
+# proxy se importa solo dentro de los workers (después del fork) para no heredar
+# conexiones SQLite ni el manejador de SIGTERM del master.
+def post_worker_init(worker):
+    import proxy
+    if worker.age == 1:
+        proxy.mostrar_banner(int(bind.rsplit(":", 1)[1]))
+    proxy.iniciar_servicios_de_fondo()
+
+
+def worker_exit(server, worker):
+    import proxy
+    proxy.detener_servicios_de_fondo()
+
+
+def child_exit(server, worker):
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_flask_exporter.multiprocess import GunicornInternalPrometheusMetrics
+        GunicornInternalPrometheusMetrics.mark_process_dead_on_child_exit(worker.pid)
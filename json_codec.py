@@ -0,0 +1,42 @@
+import json
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional: sin él se usa json de la biblioteca estándar
+    orjson = None
+
+MOTOR = 'orjson' if orjson is not None else 'json'
+
+
+def dumps_bytes(obj, ordenar=False, default=None):
+    """
+    Serializa a JSON (UTF-8, compacto) con orjson si está disponible.
+
+    orjson no admite enteros de más de 64 bits (p. ej. resultados de /suma-lote
+    con operandos largos): en ese caso se recurre a json.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=default, option=orjson.OPT_SORT_KEYS if ordenar else 0)
+        except TypeError:
+            pass
+    return json.dumps(
+        obj, ensure_ascii=False, separators=(',', ':'), sort_keys=ordenar, default=default
+    ).encode('utf-8')
+
+
+def dumps(obj, ordenar=False):
+    return dumps_bytes(obj, ordenar).decode('utf-8')
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Proveedor JSON de Flask que serializa las respuestas de jsonify() con dumps_bytes()."""
+
+    def response(self, *args, **kwargs):
+        if orjson is None or (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        cuerpo = dumps_bytes(obj, self.sort_keys, self.default)
+        return self._app.response_class(cuerpo + b"\n", mimetype=self.mimetype)
@@ -1,7 +1,19 @@
+import http.client
+import json
+import math
 import os
+import re
 import socket
 import subprocess
+import threading
 import time
+from calendar import timegm
+from concurrent.futures import ThreadPoolExecutor
+
+import deadlines
+from api_budget import ALTA, BAJA, ApiBudget
+from deadlines import DeadlineExceeded
+from endpoint_balancer import EndpointBalancer
 
 
 class K8sOrchestrator:
@@ -12,7 +24,12 @@ class K8sOrchestrator:
         max_digitos=4,
         base_port=31000,
         in_cluster=False,
-        service_port=8000
+        service_port=8000,
+        direct_pod_routing=False,
+        balanceo="p2c",
+        kube_context=None,
+        presupuesto=None,
+        estado_compartido=None
     ):
         self.logger = logger
         self.namespace = namespace
@@ -20,8 +37,36 @@ class K8sOrchestrator:
         self.base_port = base_port
         self.in_cluster = in_cluster
         self.service_port = service_port
+        self.kube_context = kube_context
+        # Presupuesto de llamadas al API server compartido por todas las llamadas kubectl (sin límite por defecto)
+        self.presupuesto = presupuesto or ApiBudget(tasa=0)
         self.port_forward_processes = {}
         self.port_forward_ports = {}
+        # Con estado compartido, lo que escala un worker lo ven los demás en su siguiente lectura
+        self.replicas_conocidas = (
+            ReplicasCompartidas(estado_compartido, f"{kube_context or ''}/{namespace}/suma-digito-")
+            if estado_compartido is not None else {}
+        )
+        self.compuertas = ReadinessGates()
+        self.balanceador = None
+        if in_cluster and direct_pod_routing:
+            self.balanceador = EndpointBalancer(self.listar_endpoints_listos, logger, algoritmo=balanceo)
+
+    def _kubectl(self, *argumentos):
+        """Comando kubectl, fijando el contexto del kubeconfig si el orquestador tiene uno."""
+        contexto = ["--context", self.kube_context] if self.kube_context else []
+        return ["kubectl", *contexto, *argumentos]
+
+    def _ejecutar(self, cmd, timeout, prioridad=ALTA):
+        """subprocess.run del comando cuando el presupuesto del API server le da turno."""
+        return self.presupuesto.ejecutar(
+            lambda: subprocess.run(cmd, capture_output=True, text=True, timeout=deadlines.limitar(timeout)),
+            prioridad
+        )
+
+    def kubectl(self, *argumentos, timeout=10, prioridad=BAJA):
+        """Consulta kubectl auxiliar (servicios de documentación, Grafana...) sujeta al mismo presupuesto."""
+        return self._ejecutar(self._kubectl(*argumentos), timeout, prioridad)
 
     def obtener_puerto_local_disponible(self, puerto_preferido):
         with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as socket_local:
@@ -36,37 +81,147 @@ class K8sOrchestrator:
             socket_local.bind(("127.0.0.1", 0))
             return socket_local.getsockname()[1]
 
+    def sincronizar_estado(self):
+        """
+        Reconstruye la vista del clúster al arrancar el proceso: réplicas de cada
+        deployment suma-digito-*, pods listos, endpoints (in-cluster) y puertos
+        locales utilizables (port-forward huérfano que sigue respondiendo o uno
+        nuevo para los dígitos con pods listos).
+
+        Devuelve {digito: {'Replicas', 'Listas', 'Endpoints', 'Puerto'}} o None si
+        no se pudo consultar el clúster (se sigue asumiendo arranque en frío).
+        """
+        cmd = self._kubectl("get", "deployments", "-l", "app=suma-backend", "-n", self.namespace, "-o", "json")
+        try:
+            result = self._ejecutar(cmd, 15, BAJA)
+            if result.returncode != 0:
+                self.logger(f"✗ No se pudo leer el estado de los deployments: {result.stderr}", "error")
+                return None
+            deployments = json.loads(result.stdout).get("items", [])
+        except Exception as error:
+            self.logger(f"✗ Excepción leyendo el estado de los deployments: {error}", "error")
+            return None
+
+        estado = {}
+        for deployment in deployments:
+            try:
+                digito = int(((deployment.get("metadata") or {}).get("labels") or {}).get("digito", -1))
+            except ValueError:
+                continue
+            if not 0 <= digito < self.max_digitos:
+                continue
+            replicas = (deployment.get("spec") or {}).get("replicas") or 0
+            listas = (deployment.get("status") or {}).get("readyReplicas") or 0
+            self.replicas_conocidas[digito] = replicas
+            estado[digito] = {'Replicas': replicas, 'Listas': listas, 'Endpoints': 0, 'Puerto': None}
+
+        calientes = sorted(d for d, e in estado.items() if e['Listas'] > 0)
+
+        def preparar(digito):
+            if self.in_cluster:
+                if self.balanceador:
+                    self.balanceador.refrescar(digito)
+                    return len(self.balanceador.endpoints(digito)), None
+                return len(self.listar_endpoints_listos(digito)), None
+            if self.establecer_port_forward(digito):
+                return 0, self.port_forward_ports.get(digito)
+            return 0, None
+
+        if calientes:
+            with ThreadPoolExecutor(max_workers=len(calientes)) as executor:
+                for digito, (endpoints, puerto) in zip(calientes, executor.map(preparar, calientes)):
+                    estado[digito]['Endpoints'] = endpoints
+                    estado[digito]['Puerto'] = puerto
+
+        for digito in calientes:
+            self.logger(
+                f"↺ suma-digito-{digito} ya estaba en marcha: {estado[digito]['Listas']} pod(s) listo(s)",
+                "info"
+            )
+        self.logger(
+            f"✓ Estado del clúster sincronizado: {len(calientes)} dígito(s) caliente(s) de {len(estado)}",
+            "success"
+        )
+        return estado
+
+    def _adoptar_port_forward(self, digito):
+        """
+        Reutiliza un port-forward que ya escucha en el puerto preferido del dígito
+        (p. ej. huérfano de un proceso anterior) si el servicio responde a través de él.
+        """
+        puerto = self.base_port + digito
+        if self.obtener_puerto_local_disponible(puerto) == puerto or not _servicio_responde(puerto):
+            return False
+        self.port_forward_processes[digito] = _PortForwardAdoptado(puerto)
+        self.port_forward_ports[digito] = puerto
+        self.logger(f"↺ Port-forward existente adoptado para suma-digito-{digito} en puerto {puerto}", "info")
+        return True
+
     def escalar_pod(self, digito, replicas):
         deployment_name = f"suma-digito-{digito}"
-        cmd = ["kubectl", "scale", "deployment", deployment_name, f"--replicas={replicas}", "-n", self.namespace]
+
+        def escalar():
+            # El timeout se calcula al llegar el turno: la espera en cola ya consumió parte del plazo
+            timeout = deadlines.limitar(10, f"escalar {deployment_name}")
+            cmd = self._kubectl("scale", "deployment", deployment_name, f"--replicas={replicas}", "-n", self.namespace)
+            return replicas, subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
 
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
+            # Escalar hacia arriba tiene prioridad sobre el scale-down; un escalado del mismo
+            # deployment y el mismo sentido que aún espera turno se sustituye por este (se aplica
+            # el último). Un scale-down nunca se fusiona con un scale-up pendiente: quien pidió
+            # réplicas recibiría True con el deployment a 0
+            aplicadas, result = self.presupuesto.ejecutar(
+                escalar,
+                ALTA if replicas > 0 else BAJA,
+                clave=("scale", self.kube_context, self.namespace, deployment_name, replicas > 0)
+            )
             if result.returncode == 0:
-                self.logger(f"✓ Deployment {deployment_name} escalado a {replicas} réplica(s)", "success")
+                self.replicas_conocidas[digito] = aplicadas
+                if aplicadas == 0 and self.balanceador:
+                    self.balanceador.vaciar(digito)
+                if aplicadas != replicas:
+                    self.logger(
+                        f"↪ Escalado de {deployment_name} a {replicas} fusionado con uno posterior a {aplicadas}",
+                        "info"
+                    )
+                else:
+                    self.logger(f"✓ Deployment {deployment_name} escalado a {replicas} réplica(s)", "success")
                 return True
 
             self.logger(f"✗ Error escalando {deployment_name}: {result.stderr}", "error")
             return False
         except subprocess.TimeoutExpired:
+            deadlines.comprobar(f"escalar {deployment_name}")
             self.logger(f"✗ Timeout escalando {deployment_name}", "error")
             return False
+        except DeadlineExceeded:
+            raise
         except Exception as error:
             self.logger(f"✗ Excepción escalando {deployment_name}: {error}", "error")
             return False
 
+    def replicas_actuales(self, digito):
+        """Réplicas que el orquestador ha aplicado por última vez al deployment (0 si no se conoce)."""
+        return self.replicas_conocidas.get(digito, 0)
+
+    def es_arranque_en_frio(self, digito):
+        """Indica si escalar el dígito implica arrancar un pod desde cero."""
+        return self.replicas_actuales(digito) == 0
+
     def esperar_pod_ready(self, digito, timeout=60):
-        cmd = [
-            "kubectl", "wait", "--for=condition=ready",
+        timeout = deadlines.limitar(timeout, f"esperar pod suma-digito-{digito}")
+        cmd = self._kubectl(
+            "wait", "--for=condition=ready",
             "pod",
             "-l", f"app=suma-backend,digito={digito}",
             "-n", self.namespace,
-            f"--timeout={timeout}s"
-        ]
+            f"--timeout={math.ceil(timeout)}s"
+        )
 
         try:
             self.logger(f"⏳ Esperando a que el pod suma-digito-{digito} esté listo...", "info")
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout + 5)
+            result = self._ejecutar(cmd, timeout + 5)
             if result.returncode == 0:
                 self.logger(f"✓ Pod suma-digito-{digito} está listo", "success")
                 return True
@@ -74,15 +229,104 @@ class K8sOrchestrator:
             self.logger(f"✗ Pod suma-digito-{digito} no está listo: {result.stderr}", "error")
             return False
         except subprocess.TimeoutExpired:
+            deadlines.comprobar(f"esperar pod suma-digito-{digito}")
             self.logger(f"✗ Timeout esperando pod suma-digito-{digito}", "error")
             return False
+        except DeadlineExceeded:
+            raise
         except Exception as error:
             self.logger(f"✗ Excepción esperando pod suma-digito-{digito}: {error}", "error")
             return False
 
+    def fases_arranque(self, digito):
+        """
+        Desglose del arranque en frío del pod listo más reciente del dígito, en segundos.
+
+        Fases: programacion (creación → PodScheduled), imagen (eventos Pulling → Pulled),
+        contenedor (resto hasta startedAt), sondas (startedAt → Ready; la API no publica
+        por separado cuándo pasa la startupProbe) y total. Las fases que no se puedan
+        determinar se omiten; ante cualquier error devuelve {}.
+        """
+        cmd = self._kubectl(
+            "get", "pods",
+            "-l", f"app=suma-backend,digito={digito}",
+            "-n", self.namespace,
+            "-o", "json"
+        )
+
+        try:
+            result = self._ejecutar(cmd, 10, BAJA)
+            if result.returncode != 0:
+                return {}
+
+            pods = [
+                pod for pod in json.loads(result.stdout or "{}").get("items", [])
+                if (_condicion_pod(pod, "Ready") or {}).get("status") == "True"
+            ]
+            if not pods:
+                return {}
+            pod = max(pods, key=lambda p: p["metadata"].get("creationTimestamp", ""))
+
+            creado = _instante(pod["metadata"].get("creationTimestamp"))
+            programado = _instante((_condicion_pod(pod, "PodScheduled") or {}).get("lastTransitionTime"))
+            listo = _instante(_condicion_pod(pod, "Ready").get("lastTransitionTime"))
+            estados = (pod.get("status") or {}).get("containerStatuses") or [{}]
+            iniciado = _instante((((estados[0].get("state") or {}).get("running")) or {}).get("startedAt"))
+            imagen = self._duracion_descarga_imagen(pod["metadata"].get("name"))
+
+            fases = {}
+            if creado is not None and programado is not None:
+                fases['programacion'] = max(programado - creado, 0.0)
+            if imagen is not None:
+                fases['imagen'] = imagen
+            if programado is not None and iniciado is not None:
+                fases['contenedor'] = max(iniciado - programado - (imagen or 0.0), 0.0)
+            if iniciado is not None and listo is not None:
+                fases['sondas'] = max(listo - iniciado, 0.0)
+            if creado is not None and listo is not None:
+                fases['total'] = max(listo - creado, 0.0)
+            return fases
+        except Exception as error:
+            self.logger(f"⚠ No se pudo obtener el desglose de arranque de suma-digito-{digito}: {error}", "warning")
+            return {}
+
+    def _duracion_descarga_imagen(self, pod_name):
+        """Segundos de descarga de la imagen según los eventos Pulling/Pulled del pod, o None."""
+        cmd = self._kubectl(
+            "get", "events",
+            "-n", self.namespace,
+            "--field-selector", f"involvedObject.kind=Pod,involvedObject.name={pod_name}",
+            "-o", "json"
+        )
+        result = self._ejecutar(cmd, 10, BAJA)
+        if result.returncode != 0:
+            return None
+
+        eventos = {}
+        for evento in json.loads(result.stdout or "{}").get("items", []):
+            eventos.setdefault(evento.get("reason"), evento)
+
+        pulled = eventos.get("Pulled")
+        if pulled is None:
+            return None
+        # "Successfully pulled image ... in 1.234s (1.234s including waiting)": más preciso que los timestamps
+        medida = re.search(r" in (\d+(?:\.\d+)?)(ms|s)\b", pulled.get("message") or "")
+        if medida:
+            return float(medida.group(1)) / (1000 if medida.group(2) == "ms" else 1)
+
+        pulling = eventos.get("Pulling")
+        if pulling is None:
+            return None
+        inicio = _instante(pulling.get("eventTime") or pulling.get("firstTimestamp"))
+        fin = _instante(pulled.get("eventTime") or pulled.get("lastTimestamp"))
+        if inicio is None or fin is None:
+            return None
+        return max(fin - inicio, 0.0)
+
     def esperar_endpoints_servicio(self, digito, timeout=30):
         service_name = f"suma-digito-{digito}"
-        deadline = time.time() + timeout
+        etapa = f"esperar endpoints {service_name}"
+        deadline = time.time() + deadlines.limitar(timeout, etapa)
 
         self.logger(
             f"⏳ Esperando endpoints para servicio {service_name}...",
@@ -90,32 +334,22 @@ class K8sOrchestrator:
         )
 
         while time.time() < deadline:
-            cmd_endpoints = [
-                "kubectl", "get", "endpoints", service_name,
+            cmd_endpoints = self._kubectl(
+                "get", "endpoints", service_name,
                 "-n", self.namespace,
                 "-o", "jsonpath={.subsets[*].addresses[*].ip}"
-            ]
+            )
 
-            cmd_endpoint_slices = [
-                "kubectl", "get", "endpointslices",
+            cmd_endpoint_slices = self._kubectl(
+                "get", "endpointslices",
                 "-n", self.namespace,
                 "-l", f"kubernetes.io/service-name={service_name}",
                 "-o", "jsonpath={.items[*].endpoints[*].addresses[*]}"
-            ]
+            )
 
             try:
-                result_endpoints = subprocess.run(
-                    cmd_endpoints,
-                    capture_output=True,
-                    text=True,
-                    timeout=10
-                )
-                result_endpoint_slices = subprocess.run(
-                    cmd_endpoint_slices,
-                    capture_output=True,
-                    text=True,
-                    timeout=10
-                )
+                result_endpoints = self._ejecutar(cmd_endpoints, deadlines.limitar(10, etapa))
+                result_endpoint_slices = self._ejecutar(cmd_endpoint_slices, deadlines.limitar(10, etapa))
 
                 has_endpoints = result_endpoints.returncode == 0 and result_endpoints.stdout.strip()
                 has_endpoint_slices = (
@@ -128,11 +362,15 @@ class K8sOrchestrator:
                         f"✓ Servicio {service_name} tiene endpoints activos",
                         "success"
                     )
+                    if self.balanceador and not self.balanceador.endpoints(digito):
+                        self.balanceador.refrescar(digito)
                     return True
+            except DeadlineExceeded:
+                raise
             except Exception:
                 pass
 
-            time.sleep(1)
+            deadlines.dormir(1, etapa)
 
         self.logger(
             f"✗ Timeout esperando endpoints para servicio {service_name}",
@@ -140,6 +378,36 @@ class K8sOrchestrator:
         )
         return False
 
+    def listar_endpoints_listos(self, digito):
+        """Devuelve [(ip, puerto), ...] de las réplicas listas del servicio según sus EndpointSlices."""
+        service_name = f"suma-digito-{digito}"
+        cmd = self._kubectl(
+            "get", "endpointslices",
+            "-n", self.namespace,
+            "-l", f"kubernetes.io/service-name={service_name}",
+            "-o", "json"
+        )
+
+        result = self._ejecutar(cmd, 10, BAJA)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip() or f"kubectl devolvió {result.returncode}")
+
+        direcciones = []
+        for slice_ in json.loads(result.stdout or "{}").get("items", []):
+            puertos = slice_.get("ports") or []
+            puerto = next((p.get("port") for p in puertos if p.get("name") == "http"), None)
+            if puerto is None:
+                puerto = puertos[0].get("port") if puertos else self.service_port
+
+            for endpoint in slice_.get("endpoints") or []:
+                # Según la API, ready ausente debe interpretarse como listo
+                if (endpoint.get("conditions") or {}).get("ready") is False:
+                    continue
+                for ip in endpoint.get("addresses") or []:
+                    direcciones.append((ip, puerto))
+
+        return direcciones
+
     def establecer_port_forward(self, digito):
         try:
             if self.in_cluster:
@@ -162,6 +430,9 @@ class K8sOrchestrator:
                 self.port_forward_processes.pop(digito, None)
                 self.port_forward_ports.pop(digito, None)
 
+            if self._adoptar_port_forward(digito):
+                return True
+
             service_name = f"suma-digito-{digito}"
             puerto_preferido = self.base_port + digito
             local_port = self.obtener_puerto_local_disponible(puerto_preferido)
@@ -172,17 +443,21 @@ class K8sOrchestrator:
                     "warning"
                 )
 
-            cmd = ["kubectl", "port-forward", f"svc/{service_name}", f"{local_port}:8000", "-n", self.namespace]
+            cmd = self._kubectl("port-forward", f"svc/{service_name}", f"{local_port}:8000", "-n", self.namespace)
 
-            proceso = subprocess.Popen(
+            proceso = self.presupuesto.ejecutar(lambda: subprocess.Popen(
                 cmd,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
                 text=True,
                 creationflags=subprocess.CREATE_NEW_PROCESS_GROUP if os.name == "nt" else 0
-            )
+            ))
 
-            time.sleep(1.5)
+            try:
+                deadlines.dormir(1.5, f"port-forward {service_name}")
+            except DeadlineExceeded:
+                proceso.terminate()
+                raise
 
             if proceso.poll() is not None:
                 try:
@@ -198,6 +473,8 @@ class K8sOrchestrator:
             self.port_forward_ports[digito] = local_port
             self.logger(f"✓ Port-forward establecido para {service_name} en puerto {local_port}", "success")
             return True
+        except DeadlineExceeded:
+            raise
         except Exception as error:
             self.logger(f"✗ Excepción estableciendo port-forward para digito-{digito}: {error}", "error")
             return False
@@ -223,28 +500,262 @@ class K8sOrchestrator:
 
     def service_url(self, digito):
         if self.in_cluster:
+            if self.balanceador:
+                endpoint = self.balanceador.elegir(digito)
+                if endpoint:
+                    return endpoint.url, endpoint.port
+
             service_name = f"suma-digito-{digito}"
             return f"http://{service_name}.{self.namespace}.svc.cluster.local:{self.service_port}", self.service_port
 
         local_port = self.port_forward_ports.get(digito, self.base_port + digito)
         return f"http://localhost:{local_port}", local_port
 
-    def escalar_a_cero(self, delay_seconds=2):
+    def reportar_llamada(self, digito, url, exito, latencia=None):
+        """Informa del resultado de una llamada para el balanceo directo a pods (no-op sin balanceador)."""
+        if self.balanceador:
+            self.balanceador.reportar(digito, url, exito, latencia)
+
+    def compartir_preparacion(self, digito, funcion):
+        """
+        Ejecuta funcion() (escalar, esperar Ready, endpoints y port-forward del
+        dígito) una sola vez para todas las peticiones concurrentes: la primera la
+        ejecuta y las demás esperan en la misma compuerta y reciben su resultado
+        o su excepción (si la preparación se abandonó por el plazo o la
+        desconexión de su petición, la siguiente en espera la repite).
+        """
+        return self.compuertas.ejecutar(digito, funcion)
+
+    def escalar_deployments(self, objetivos, omitir_sin_cambios=True):
+        """
+        Escala varios deployments en paralelo y devuelve un resultado estructurado.
+
+        objetivos: {digito: replicas}. Con omitir_sin_cambios se saltan los
+        deployments cuyo estado conocido ya coincide con el objetivo (un estado
+        desconocido siempre se escala). Al escalar a 0 en modo local también se
+        detiene el port-forward del dígito, en paralelo con el resto.
+        """
+        inicio = time.time()
+        resultados = {}
+        pendientes = []
+
+        for digito, replicas in sorted(objetivos.items()):
+            if omitir_sin_cambios and self.replicas_conocidas.get(digito) == replicas:
+                resultados[digito] = self._resultado_escalado(digito, replicas, "omitido", 0.0)
+            else:
+                pendientes.append((digito, replicas))
+
+        def escalar(digito, replicas):
+            inicio_digito = time.time()
+            ok = self.escalar_pod(digito, replicas)
+            if replicas == 0 and not self.in_cluster:
+                self.detener_port_forward(digito)
+            return self._resultado_escalado(
+                digito, replicas, "escalado" if ok else "error", time.time() - inicio_digito
+            )
+
+        if pendientes:
+            with ThreadPoolExecutor(max_workers=len(pendientes)) as executor:
+                futuros = {executor.submit(escalar, d, r): d for d, r in pendientes}
+                for futuro, digito in futuros.items():
+                    try:
+                        resultados[digito] = futuro.result()
+                    except Exception as error:
+                        resultado = self._resultado_escalado(digito, objetivos[digito], "error", time.time() - inicio)
+                        resultado['Error'] = str(error)
+                        resultados[digito] = resultado
+
+        deployments = [resultados[d] for d in sorted(resultados)]
+        return {
+            'Ok': all(r['Estado'] != 'error' for r in deployments),
+            'Escalados': sum(1 for r in deployments if r['Estado'] == 'escalado'),
+            'Omitidos': sum(1 for r in deployments if r['Estado'] == 'omitido'),
+            'Errores': sum(1 for r in deployments if r['Estado'] == 'error'),
+            'DuracionSegundos': round(time.time() - inicio, 3),
+            'Deployments': deployments
+        }
+
+    @staticmethod
+    def _resultado_escalado(digito, replicas, estado, duracion):
+        return {
+            'Deployment': f"suma-digito-{digito}",
+            'Digito': digito,
+            'Replicas': replicas,
+            'Estado': estado,
+            'DuracionSegundos': round(duracion, 3)
+        }
+
+    def escalar_a_cero(self, delay_seconds=2, excluir=None):
         if delay_seconds > 0:
             time.sleep(delay_seconds)
 
+        # excluir puede ser un callable para evaluarlo después del retardo
+        if callable(excluir):
+            excluir = excluir()
+        excluir = set(excluir or ())
+
         self.logger(f"\n{'-' * 60}", "info")
         self.logger("Iniciando scale-down automático a 0 réplicas", "info")
 
-        for i in range(self.max_digitos):
-            self.logger(f"⏬ Escalando suma-digito-{i} -> 0", "info")
-            if self.escalar_pod(i, 0):
-                self.logger(f"✓ suma-digito-{i} en 0 réplicas", "success")
-            else:
-                self.logger(f"✗ No se pudo escalar suma-digito-{i} a 0", "error")
+        for i in sorted(excluir):
+            if i < self.max_digitos:
+                self.logger(f"↺ suma-digito-{i} se mantiene caliente", "info")
+
+        objetivos = {i: 0 for i in range(self.max_digitos) if i not in excluir}
+        resultado = self.escalar_deployments(objetivos)
 
-            if not self.in_cluster:
-                self.detener_port_forward(i)
+        for item in resultado['Deployments']:
+            if item['Estado'] == 'error':
+                self.logger(f"✗ No se pudo escalar {item['Deployment']} a 0", "error")
 
-        self.logger("✓ Scale-down completado: pods en zero", "success")
+        self.logger(
+            f"✓ Scale-down completado: {resultado['Escalados']} escalado(s), "
+            f"{resultado['Omitidos']} ya en cero, {resultado['Errores']} error(es) "
+            f"en {resultado['DuracionSegundos']}s",
+            "success" if resultado['Ok'] else "warning"
+        )
         self.logger(f"{'-' * 60}\n", "info")
+        return resultado
+
+
+class ReplicasCompartidas:
+    """
+    Réplicas conocidas de cada dígito guardadas en el estado compartido entre
+    workers (registrar_replicas / replicas), con la interfaz de dict que usa el
+    orquestador. prefijo distingue deployments de distintos namespaces o contextos.
+    """
+
+    def __init__(self, estado, prefijo):
+        self.estado = estado
+        self.prefijo = prefijo
+
+    def get(self, digito, defecto=None):
+        replicas = self.estado.replicas(f"{self.prefijo}{digito}")
+        return defecto if replicas is None else replicas
+
+    def __setitem__(self, digito, replicas):
+        self.estado.registrar_replicas(f"{self.prefijo}{digito}", replicas)
+
+    def update(self, valores):
+        for digito, replicas in dict(valores).items():
+            self[digito] = replicas
+
+
+class _PortForwardAdoptado:
+    """
+    Port-forward que no lanzó este proceso: sigue vivo mientras el servicio
+    responda por el puerto. Al detenerlo solo se olvida (el proceso no es nuestro).
+    """
+
+    def __init__(self, puerto):
+        self.puerto = puerto
+
+    def poll(self):
+        return None if _servicio_responde(self.puerto) else 1
+
+    def terminate(self):
+        pass
+
+    def kill(self):
+        pass
+
+    def wait(self, timeout=None):
+        return 0
+
+
+def _servicio_responde(puerto, timeout=1.0):
+    """Comprueba que en localhost:puerto responde un servicio de dígito (POST /suma)."""
+    conexion = http.client.HTTPConnection("127.0.0.1", puerto, timeout=timeout)
+    try:
+        conexion.request(
+            "POST", "/suma", body=json.dumps({"NumberA": 0, "NumberB": 0, "CarryIn": 0}),
+            headers={"Content-Type": "application/json"}
+        )
+        respuesta = conexion.getresponse()
+        return respuesta.status == 200 and "Result" in json.loads(respuesta.read() or b"{}")
+    except (OSError, ValueError, http.client.HTTPException):
+        return False
+    finally:
+        conexion.close()
+
+
+class _Compuerta:
+    __slots__ = ('listo', 'resultado', 'error', 'esperando')
+
+    def __init__(self):
+        self.listo = threading.Event()
+        self.resultado = None
+        self.error = None
+        self.esperando = 0
+
+
+class ReadinessGates:
+    """
+    Compuertas de preparación por clave (singleflight).
+
+    Mientras una preparación está en curso, las llamadas con la misma clave no
+    la repiten: esperan a que termine y comparten su resultado o su error. Al
+    terminar, la compuerta se retira y la siguiente llamada vuelve a ejecutar la
+    preparación (con el pod ya caliente es rápida). Quien espera lo hace dentro
+    de su propio deadline (deadlines.deadline_actual()).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._compuertas = {}
+
+    def ejecutar(self, clave, funcion):
+        with self._lock:
+            compuerta = self._compuertas.get(clave)
+            lider = compuerta is None
+            if lider:
+                compuerta = self._compuertas[clave] = _Compuerta()
+            else:
+                compuerta.esperando += 1
+
+        if not lider:
+            # Quien espera respeta su propio plazo y su propia cancelación
+            deadline = deadlines.deadline_actual()
+            while not compuerta.listo.wait(deadlines.INTERVALO_SONDEO if deadline else None):
+                deadline.comprobar(f"esperar preparación de {clave}")
+            if isinstance(compuerta.error, DeadlineExceeded):
+                # El plazo agotado era el de la petición que preparaba, no el de esta: se reintenta
+                return self.ejecutar(clave, funcion)
+            if compuerta.error is not None:
+                raise compuerta.error
+            return compuerta.resultado
+
+        try:
+            compuerta.resultado = funcion()
+            return compuerta.resultado
+        except BaseException as error:
+            compuerta.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._compuertas[clave]
+            compuerta.listo.set()
+
+    def en_espera(self, clave):
+        """Llamadas que esperan la preparación en curso de la clave (0 si no hay ninguna)."""
+        with self._lock:
+            compuerta = self._compuertas.get(clave)
+            return compuerta.esperando if compuerta is not None else 0
+
+
+def _condicion_pod(pod, tipo):
+    for condicion in (pod.get("status") or {}).get("conditions") or []:
+        if condicion.get("type") == tipo:
+            return condicion
+    return None
+
+
+def _instante(marca):
+    """Convierte un timestamp RFC 3339 de Kubernetes (UTC) a segundos epoch, o None."""
+    if not marca:
+        return None
+    coincidencia = re.match(r"(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})(\.\d+)?Z$", marca)
+    if not coincidencia:
+        return None
+    segundos = timegm(time.strptime(coincidencia.group(1), "%Y-%m-%dT%H:%M:%S"))
+    return segundos + float(coincidencia.group(2) or 0)
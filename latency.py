@@ -0,0 +1,77 @@
+import math
+import threading
+from collections import deque
+
+
+class LatencyEstimator:
+    """
+    Estimación de latencia por servicio de dígito.
+
+    Mantiene una EWMA y las últimas N muestras de cada clave para calcular
+    percentiles altos. A partir de ellos se derivan el timeout de cada llamada
+    (percentil alto × multiplicador, acotado) y el umbral a partir del cual
+    conviene lanzar una petición de cobertura (hedged request).
+
+    Mientras no haya min_muestras se usa timeout_defecto y no se cubre.
+    """
+
+    def __init__(
+        self,
+        alfa=0.2,
+        max_muestras=256,
+        min_muestras=20,
+        percentil_timeout=0.99,
+        multiplicador_timeout=3.0,
+        timeout_min=0.5,
+        timeout_max=8.0,
+        timeout_defecto=8.0,
+        percentil_hedge=0.95
+    ):
+        self.alfa = alfa
+        self.max_muestras = max_muestras
+        self.min_muestras = min_muestras
+        self.percentil_timeout = percentil_timeout
+        self.multiplicador_timeout = multiplicador_timeout
+        self.timeout_min = timeout_min
+        self.timeout_max = timeout_max
+        self.timeout_defecto = timeout_defecto
+        self.percentil_hedge = percentil_hedge
+
+        self._lock = threading.Lock()
+        self._ewma = {}
+        self._muestras = {}
+
+    def registrar(self, clave, segundos):
+        with self._lock:
+            anterior = self._ewma.get(clave)
+            self._ewma[clave] = segundos if anterior is None else anterior + self.alfa * (segundos - anterior)
+            self._muestras.setdefault(clave, deque(maxlen=self.max_muestras)).append(segundos)
+
+    def ewma(self, clave):
+        with self._lock:
+            return self._ewma.get(clave, 0.0)
+
+    def num_muestras(self, clave):
+        with self._lock:
+            return len(self._muestras.get(clave, ()))
+
+    def percentil(self, clave, p):
+        """Percentil p (0-1) de las muestras recientes, o None si no hay muestras."""
+        with self._lock:
+            muestras = sorted(self._muestras.get(clave, ()))
+        if not muestras:
+            return None
+        indice = min(max(math.ceil(p * len(muestras)) - 1, 0), len(muestras) - 1)
+        return muestras[indice]
+
+    def timeout(self, clave):
+        if self.num_muestras(clave) < self.min_muestras:
+            return self.timeout_defecto
+        estimado = self.percentil(clave, self.percentil_timeout) * self.multiplicador_timeout
+        return min(max(estimado, self.timeout_min), self.timeout_max)
+
+    def umbral_hedge(self, clave):
+        """Segundos tras los que una llamada se considera lenta, o None sin muestras suficientes."""
+        if self.num_muestras(clave) < self.min_muestras:
+            return None
+        return self.percentil(clave, self.percentil_hedge)
@@ -0,0 +1,211 @@
+import re
+import threading
+from time import perf_counter
+
+from flask import request
+from prometheus_client import REGISTRY, Summary
+
+DESBORDAMIENTO = '__otros__'
+SIN_RUTA = '__sin_ruta__'
+
+
+class LabelLimiter:
+    """
+    Acota los valores distintos de una etiqueta de Prometheus.
+
+    Los primeros max_valores valores distintos se conservan tal cual; a partir de
+    ahí cualquier valor nuevo se agrupa en el cubo de desbordamiento, de modo que
+    la cardinalidad de la serie queda limitada aunque lleguen rutas arbitrarias.
+    """
+
+    def __init__(self, max_valores=50, desbordamiento=DESBORDAMIENTO):
+        self.max_valores = max_valores
+        self.desbordamiento = desbordamiento
+        self._lock = threading.Lock()
+        self._valores = set()
+        self.desbordados = 0
+
+    def valor(self, valor):
+        # Camino rápido sin lock: la mayoría de valores ya son conocidos
+        if valor in self._valores:
+            return valor
+        with self._lock:
+            if valor in self._valores:
+                return valor
+            if len(self._valores) < self.max_valores:
+                self._valores.add(valor)
+                return valor
+            self.desbordados += 1
+            return self.desbordamiento
+
+    def valores(self):
+        with self._lock:
+            return sorted(self._valores)
+
+
+def parsear_grupos(especificacion):
+    """
+    Interpreta METRICS_ROUTE_GROUPS: pares regex=grupo separados por ';',
+    p. ej. "^/debug/=/debug;^/script\\.=/assets". Devuelve [(patrón, grupo)].
+    """
+    grupos = []
+    for parte in (especificacion or "").split(";"):
+        if not parte.strip():
+            continue
+        patron, separador, grupo = parte.rpartition("=")
+        if not separador or not patron:
+            raise ValueError(f"Grupo de rutas inválido (se espera regex=grupo): {parte!r}")
+        grupos.append((re.compile(patron.strip()), grupo.strip()))
+    return grupos
+
+
+def parsear_exclusiones(especificacion):
+    """Regex de rutas excluidas de las métricas por defecto, separadas por comas."""
+    return [patron.strip() for patron in (especificacion or "").split(",") if patron.strip()]
+
+
+def crear_agrupador(modo='rule', grupos=(), limitador=None):
+    """
+    Función para group_by de PrometheusMetrics que calcula la etiqueta 'path'.
+
+    modo='rule' usa la regla de Flask (/<path:path> en lugar de cada fichero,
+    SIN_RUTA para 404 sin regla); modo='path' usa la ruta real. Los grupos
+    explícitos tienen prioridad y el resultado pasa por el limitador si se indica.
+    La función se llama 'path' porque su nombre es el de la etiqueta exportada.
+    """
+    if modo not in ('rule', 'path'):
+        raise ValueError(f"Agrupación de métricas desconocida: {modo}")
+    grupos = list(grupos)
+
+    def path(request):
+        for patron, grupo in grupos:
+            if patron.match(request.path):
+                return grupo
+        if modo == 'rule':
+            etiqueta = request.url_rule.rule if request.url_rule is not None else SIN_RUTA
+        else:
+            etiqueta = request.path
+        return limitador.valor(etiqueta) if limitador is not None else etiqueta
+
+    return path
+
+
+def opciones_metricas(modo='rule', grupos='', excluidas='', max_rutas=50, rutas_ligeras=()):
+    """
+    Argumentos para PrometheusMetrics / GunicornInternalPrometheusMetrics y el
+    limitador usado (para exponer cuántos valores se desbordaron). Las rutas
+    ligeras se excluyen de las métricas por defecto: las mide LightweightRouteMetrics.
+    """
+    limitador = LabelLimiter(max_rutas)
+    excluidas = parsear_exclusiones(excluidas) + [f"^{re.escape(ruta)}$" for ruta in rutas_ligeras]
+    opciones = {
+        'group_by': crear_agrupador(modo, parsear_grupos(grupos), limitador),
+        'excluded_paths': excluidas or None
+    }
+    return opciones, limitador
+
+
+class LightweightRouteMetrics:
+    """
+    Instrumentación de bajo coste para rutas calientes.
+
+    Sustituye en esas rutas a las métricas por defecto de prometheus_flask_exporter
+    (varias métricas, etiquetas calculadas y exclusiones por regex en cada
+    petición) por un único Summary cuyo hijo por (método, ruta, estado) se
+    resuelve una vez y se reutiliza: por petición solo queda un perf_counter(),
+    una búsqueda en un dict y un observe().
+    """
+
+    def __init__(self, rutas, nombre='suma_http_ruta_caliente_duration_seconds', registry=REGISTRY):
+        self.rutas = frozenset(rutas)
+        self.duracion = Summary(
+            nombre,
+            'Duración de las peticiones a rutas calientes (instrumentación de bajo coste)',
+            ['method', 'path', 'status'],
+            registry=registry
+        )
+        self._hijos = {}
+
+    def registrar(self, app):
+        app.before_request(self._antes)
+        app.after_request(self._despues)
+        return self
+
+    def _antes(self):
+        if request.path in self.rutas:
+            # prometheus_flask_exporter descarta la petición en su primera comprobación
+            request.prom_do_not_track = True
+            request.environ['suma.metricas.inicio'] = perf_counter()
+
+    def _despues(self, response):
+        inicio = request.environ.get('suma.metricas.inicio')
+        if inicio is not None:
+            clave = (request.method, request.path, response.status_code)
+            hijo = self._hijos.get(clave)
+            if hijo is None:
+                hijo = self._hijos.setdefault(clave, self.duracion.labels(*clave))
+            hijo.observe(perf_counter() - inicio)
+        return response
+
+
+class ComputedGauges:
+    """
+    Gauges calculados a partir del estado del proceso, publicados con set().
+
+    Gauge.set_function() no funciona en el modo multiproceso de prometheus_client
+    (PROMETHEUS_MULTIPROC_DIR, varios workers de gunicorn): el valor que se
+    exporta es el del fichero mmap del proceso, que nunca se escribe, y queda en
+    0. Aquí cada función se evalúa y se escribe con set() periódicamente desde
+    un hilo de fondo y, en el worker que atiende el scrape, justo antes de
+    responder. Cómo se combinan los valores de los workers lo decide el
+    multiprocess_mode de cada Gauge.
+    """
+
+    def __init__(self, intervalo=5.0):
+        self.intervalo = intervalo
+        self._fuentes = []
+        self._lock = threading.Lock()
+        self._detener = threading.Event()
+        self._hilo = None
+
+    def registrar(self, gauge, funcion):
+        """Publica funcion() en gauge (un Gauge sin etiquetas o un hijo ya etiquetado)."""
+        with self._lock:
+            self._fuentes.append((gauge, funcion))
+        self._publicar(gauge, funcion)
+
+    def actualizar(self):
+        with self._lock:
+            fuentes = list(self._fuentes)
+        for gauge, funcion in fuentes:
+            self._publicar(gauge, funcion)
+
+    def _publicar(self, gauge, funcion):
+        try:
+            gauge.set(funcion())
+        except Exception:
+            # Una fuente que falla no impide publicar las demás; el gauge conserva su último valor
+            pass
+
+    def registrar_en(self, app, ruta='/metrics'):
+        """Actualiza los gauges antes de servir ruta en este proceso."""
+        def antes():
+            if request.path == ruta:
+                self.actualizar()
+        app.before_request(antes)
+        return self
+
+    def iniciar(self):
+        if self._hilo and self._hilo.is_alive():
+            return
+        self._detener.clear()
+
+        def bucle():
+            while not self._detener.wait(self.intervalo):
+                self.actualizar()
+
+        self._hilo = threading.Thread(target=bucle, daemon=True, name='metricas-gauges')
+        self._hilo.start()
+
+    def detener(self):
+        self._detener.set()
@@ -0,0 +1,213 @@
+import math
+import threading
+import time
+from collections import deque
+
+
+class Prewarmer:
+    """
+    Mantiene calientes los pods de dígito según la demanda prevista.
+
+    Combina tres señales:
+        - peticiones explícitas (endpoint /prewarm, p. ej. cuando el usuario escribe)
+        - una tasa de peticiones móvil sobre una ventana de tiempo
+        - la distribución de longitudes de operando vista en /suma-n-digitos
+
+    en_uso_compartido() devuelve los dígitos en uso en cualquier worker; un pod
+    sobrante solo se escala a cero si ninguno lo está usando.
+    """
+
+    def __init__(
+        self,
+        orchestrator,
+        logger,
+        max_digitos=4,
+        ventana_segundos=300,
+        umbral_tasa_por_minuto=1.0,
+        percentil_longitud=0.9,
+        ttl_explicito_segundos=30,
+        intervalo_evaluacion=5,
+        al_acumular_pod_segundos=None,
+        en_uso_compartido=None
+    ):
+        self.orchestrator = orchestrator
+        self.logger = logger
+        self.max_digitos = max_digitos
+        self.ventana_segundos = ventana_segundos
+        self.umbral_tasa_por_minuto = umbral_tasa_por_minuto
+        self.percentil_longitud = percentil_longitud
+        self.ttl_explicito_segundos = ttl_explicito_segundos
+        self.intervalo_evaluacion = intervalo_evaluacion
+        self.al_acumular_pod_segundos = al_acumular_pod_segundos
+        self.en_uso_compartido = en_uso_compartido
+
+        self._lock = threading.Lock()
+        self._llegadas = deque()
+        self._reservas_explicitas = {}
+        self._en_uso = {}
+        self._inactivo_desde = {}
+        self._hilo = None
+        self._detener = threading.Event()
+
+        self.arranques_frio = 0
+        self.arranques_caliente = 0
+        self.pod_segundos_extra = 0.0
+
+    # ── Señales de tráfico ──────────────────────────────────────────────────
+
+    def inicio_operacion(self, num_digitos, ahora=None):
+        """Registra la llegada de una operación que usará los primeros num_digitos pods."""
+        ahora = time.time() if ahora is None else ahora
+        with self._lock:
+            self._llegadas.append((ahora, num_digitos))
+            self._purgar(ahora)
+            for digito in range(num_digitos):
+                self._en_uso[digito] = self._en_uso.get(digito, 0) + 1
+                self._cerrar_inactividad(digito, ahora)
+
+    def fin_operacion(self, num_digitos, arranques_en_frio=0):
+        """Libera los pods de una operación y contabiliza arranques en frío/caliente."""
+        with self._lock:
+            for digito in range(num_digitos):
+                restantes = self._en_uso.get(digito, 0) - 1
+                if restantes > 0:
+                    self._en_uso[digito] = restantes
+                else:
+                    self._en_uso.pop(digito, None)
+            self.arranques_frio += arranques_en_frio
+            self.arranques_caliente += max(num_digitos - arranques_en_frio, 0)
+
+    def tasa_por_minuto(self, ahora=None):
+        ahora = time.time() if ahora is None else ahora
+        with self._lock:
+            self._purgar(ahora)
+            return len(self._llegadas) * 60.0 / self.ventana_segundos
+
+    def longitud_objetivo(self, ahora=None):
+        """Número de pods que cubre el percentil configurado de longitudes recientes."""
+        ahora = time.time() if ahora is None else ahora
+        with self._lock:
+            self._purgar(ahora)
+            longitudes = sorted(num for _, num in self._llegadas)
+
+        if not longitudes:
+            return 0
+
+        indice = max(math.ceil(self.percentil_longitud * len(longitudes)) - 1, 0)
+        return min(longitudes[indice], self.max_digitos)
+
+    # ── Decisión de pods calientes ──────────────────────────────────────────
+
+    def digitos_a_mantener(self, ahora=None):
+        """Dígitos que no deben escalarse a cero: en uso, reservados o con demanda prevista."""
+        ahora = time.time() if ahora is None else ahora
+        mantener = set()
+
+        if self.tasa_por_minuto(ahora) >= self.umbral_tasa_por_minuto:
+            mantener.update(range(self.longitud_objetivo(ahora)))
+
+        with self._lock:
+            for digito, hasta in list(self._reservas_explicitas.items()):
+                if hasta > ahora:
+                    mantener.add(digito)
+                else:
+                    self._reservas_explicitas.pop(digito, None)
+            mantener.update(self._en_uso)
+            for digito in mantener:
+                # Un pod caliente retenido sin uso cuenta como pod-segundos extra
+                if digito not in self._en_uso and not self.orchestrator.es_arranque_en_frio(digito):
+                    self._inactivo_desde.setdefault(digito, ahora)
+
+        return mantener
+
+    def precalentar(self, num_digitos=None, ahora=None):
+        """
+        Reserva y escala los pods para una operación inminente.
+
+        Si no se indica num_digitos se usa la longitud objetivo de la distribución
+        reciente (mínimo 1 pod).
+        """
+        ahora = time.time() if ahora is None else ahora
+        if num_digitos is None:
+            num_digitos = self.longitud_objetivo(ahora) or 1
+        num_digitos = max(1, min(int(num_digitos), self.max_digitos))
+
+        with self._lock:
+            for digito in range(num_digitos):
+                hasta = ahora + self.ttl_explicito_segundos
+                self._reservas_explicitas[digito] = max(self._reservas_explicitas.get(digito, 0), hasta)
+
+        digitos = list(range(num_digitos))
+        self._calentar(digitos, ahora)
+        return digitos
+
+    def evaluar(self, ahora=None):
+        """Aplica el modelo: calienta la demanda prevista y libera lo que sobra."""
+        ahora = time.time() if ahora is None else ahora
+        mantener = self.digitos_a_mantener(ahora)
+        self._calentar(sorted(mantener), ahora)
+
+        with self._lock:
+            sobrantes = [
+                digito for digito in self._inactivo_desde
+                if digito not in mantener and digito not in self._en_uso
+            ]
+
+        if sobrantes and self.en_uso_compartido:
+            en_uso = self.en_uso_compartido()
+            sobrantes = [digito for digito in sobrantes if digito not in en_uso]
+
+        for digito in sobrantes:
+            if self.orchestrator.escalar_pod(digito, 0):
+                self.liberar(digito, ahora)
+
+    def liberar(self, digito, ahora=None):
+        """Cierra la contabilidad de un pod precalentado que se ha escalado a cero."""
+        ahora = time.time() if ahora is None else ahora
+        with self._lock:
+            self._cerrar_inactividad(digito, ahora)
+
+    # ── Bucle de fondo ──────────────────────────────────────────────────────
+
+    def iniciar(self):
+        if self._hilo and self._hilo.is_alive():
+            return
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._bucle, daemon=True)
+        self._hilo.start()
+
+    def detener(self):
+        self._detener.set()
+
+    def _bucle(self):
+        while not self._detener.wait(self.intervalo_evaluacion):
+            try:
+                self.evaluar()
+            except Exception as error:
+                self.logger(f"⚠ Error evaluando precalentamiento: {error}", "warning")
+
+    # ── Internos ────────────────────────────────────────────────────────────
+
+    def _calentar(self, digitos, ahora):
+        for digito in digitos:
+            if not self.orchestrator.es_arranque_en_frio(digito):
+                continue
+            self.logger(f"🔥 Precalentando suma-digito-{digito}", "info")
+            if self.orchestrator.escalar_pod(digito, 1):
+                with self._lock:
+                    if digito not in self._en_uso:
+                        self._inactivo_desde.setdefault(digito, ahora)
+
+    def _purgar(self, ahora):
+        limite = ahora - self.ventana_segundos
+        while self._llegadas and self._llegadas[0][0] < limite:
+            self._llegadas.popleft()
+
+    def _cerrar_inactividad(self, digito, ahora):
+        desde = self._inactivo_desde.pop(digito, None)
+        if desde is None:
+            return
+        segundos = max(ahora - desde, 0.0)
+        self.pod_segundos_extra += segundos
+        if self.al_acumular_pod_segundos:
+            self.al_acumular_pod_segundos(segundos)
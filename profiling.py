@@ -0,0 +1,146 @@
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+
+class SamplingProfiler:
+    """
+    Perfilado de CPU por muestreo de todos los hilos del proceso.
+
+    Cada intervalo se leen las pilas de todos los hilos con sys._current_frames()
+    y se acumulan como pilas colapsadas (formato de flamegraph.pl / speedscope):
+
+        hilo;modulo.py:funcion;modulo.py:funcion 42
+
+    Solo hay coste mientras un perfil está en curso: no se instala ningún hook
+    permanente. Con varios workers de gunicorn se perfila el worker que atiende
+    la petición.
+    """
+
+    def __init__(self, intervalo=0.005, max_profundidad=64):
+        self.intervalo = intervalo
+        self.max_profundidad = max_profundidad
+        self._lock = threading.Lock()
+
+    @property
+    def en_curso(self):
+        return self._lock.locked()
+
+    def perfilar(self, segundos, intervalo=None):
+        """
+        Muestrea durante `segundos` y devuelve (Counter pila→muestras, muestras tomadas).
+
+        Bloquea al hilo que llama; lanza RuntimeError si ya hay un perfil en curso.
+        """
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError("Ya hay un perfil de CPU en curso")
+
+        intervalo = intervalo or self.intervalo
+        propio = threading.get_ident()
+        pilas = Counter()
+        muestras = 0
+        try:
+            fin = time.monotonic() + segundos
+            while time.monotonic() < fin:
+                nombres = {hilo.ident: hilo.name for hilo in threading.enumerate()}
+                for ident, frame in sys._current_frames().items():
+                    if ident == propio:
+                        continue
+                    pilas[self._colapsar(nombres.get(ident, f"hilo-{ident}"), frame)] += 1
+                muestras += 1
+                time.sleep(intervalo)
+        finally:
+            self._lock.release()
+        return pilas, muestras
+
+    def _colapsar(self, nombre_hilo, frame):
+        marcos = []
+        while frame is not None and len(marcos) < self.max_profundidad:
+            codigo = frame.f_code
+            marcos.append(f"{os.path.basename(codigo.co_filename)}:{codigo.co_name}")
+            frame = frame.f_back
+        marcos.append(nombre_hilo.replace(";", "_"))
+        return ";".join(reversed(marcos))
+
+
+def formato_colapsado(pilas):
+    """Texto de pilas colapsadas, una por línea, de la más muestreada a la menos."""
+    return "".join(f"{pila} {cuenta}\n" for pila, cuenta in pilas.most_common())
+
+
+class MemoryProfiler:
+    """
+    Instantáneas de memoria con tracemalloc y diferencias entre ellas.
+
+    tracemalloc solo está activo entre iniciar() y detener(); fuera de ese
+    intervalo no añade coste a las asignaciones.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._anterior = None
+        self._iniciado_aqui = False
+
+    @property
+    def activo(self):
+        return tracemalloc.is_tracing()
+
+    def iniciar(self, frames=10):
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(frames)
+                self._iniciado_aqui = True
+            self._anterior = None
+
+    def detener(self):
+        with self._lock:
+            if self._iniciado_aqui and tracemalloc.is_tracing():
+                tracemalloc.stop()
+            self._iniciado_aqui = False
+            self._anterior = None
+
+    def instantanea(self, limite=25, agrupar_por='lineno'):
+        """
+        Toma una instantánea y devuelve las mayores asignaciones y la diferencia
+        con la instantánea anterior (si la hay). Lanza RuntimeError si tracemalloc
+        no está activo.
+        """
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                raise RuntimeError("tracemalloc no está activo")
+
+            actual = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            ))
+            anterior, self._anterior = self._anterior, actual
+
+        estadisticas = actual.statistics(agrupar_por)
+        resultado = {
+            'TotalBytes': sum(stat.size for stat in estadisticas),
+            'Top': [
+                {'Ubicacion': _ubicacion(stat.traceback), 'Bytes': stat.size, 'Bloques': stat.count}
+                for stat in estadisticas[:limite]
+            ],
+            'Diff': None
+        }
+
+        if anterior is not None:
+            resultado['Diff'] = [
+                {
+                    'Ubicacion': _ubicacion(stat.traceback),
+                    'Bytes': stat.size,
+                    'DiffBytes': stat.size_diff,
+                    'DiffBloques': stat.count_diff
+                }
+                for stat in actual.compare_to(anterior, agrupar_por)[:limite]
+            ]
+        return resultado
+
+
+def _ubicacion(traceback):
+    marco = traceback[0]
+    return f"{marco.filename}:{marco.lineno}"
@@ -1,21 +1,71 @@
 from flask import Flask, request, jsonify, make_response, send_from_directory, Response, stream_with_context
 from flask_cors import CORS
 from prometheus_flask_exporter import PrometheusMetrics
-from prometheus_client import Counter
+from prometheus_client import Counter, Gauge, Histogram
 import requests
 import os
 import signal
-import subprocess
 import time
-import json
 import threading
+import contextvars
+import functools
+import hmac
 from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from api_budget import PRIORIDADES, ApiBudget
 from k8s_orchestrator import K8sOrchestrator
+from sharding import ShardedOrchestrator, parsear_shards
+from topology import CONCENTRADA, DISTRIBUIDA, TOPOLOGIAS, TopologyController
+from prewarming import Prewarmer
+from autoscaling import DigitAutoscaler
+import deadlines
+import digit_engine
+import json_codec
+import metrics_config
+from digit_transport import BinaryDigitTransport, validar_transporte
+from latency import LatencyEstimator
+from shared_state import crear_estado_compartido
+from slo import Objetivo, SLOEngine
+from static_assets import StaticAssetCache
+from terminal_log import BatchWriter, LogRecord, StdoutWriter, abrir_segmento_de_worker, buscar_en_directorio
+from profiling import MemoryProfiler, SamplingProfiler, formato_colapsado
+from reduction import niveles_necesarios, reducir_en_arbol
+from runtime_config import Ajuste, ConfigError, RuntimeConfig, VersionConflict
+from traffic_capture import TrafficRecorder
+from tracing import CallbackExporter, InMemoryRingExporter, Tracer, cabeceras_propagacion
 
 app = Flask(__name__)
-CORS(app, resources={r"/*": {"origins": "*", "methods": ["GET", "POST", "OPTIONS"], "allow_headers": ["Content-Type"]}})
-metrics = PrometheusMetrics(app, path='/metrics')
+if os.getenv("JSON_FAST_ENCODER", "true").lower() == "true":
+    app.json = json_codec.FastJSONProvider(app)
+CORS(app, resources={r"/*": {
+    "origins": "*",
+    "methods": ["GET", "POST", "OPTIONS"],
+    "allow_headers": ["Content-Type", "traceparent", "X-Request-Timeout"],
+    "expose_headers": ["X-Trace-Id"]
+}})
+# Métricas HTTP por defecto: etiqueta 'path' agrupada por regla de Flask (o por ruta real acotada),
+# rutas excluidas (SSE de larga duración, depuración) y rutas calientes con instrumentación ligera
+METRICS_GROUP_BY = os.getenv("METRICS_GROUP_BY", "rule")
+METRICS_ROUTE_GROUPS = os.getenv("METRICS_ROUTE_GROUPS", "")
+METRICS_EXCLUDED_PATHS = os.getenv("METRICS_EXCLUDED_PATHS", "^/terminal-stream$,^/debug/")
+METRICS_MAX_PATHS = int(os.getenv("METRICS_MAX_PATHS", "50"))
+METRICS_LOW_OVERHEAD_ROUTES = [r for r in os.getenv("METRICS_LOW_OVERHEAD_ROUTES", "").split(",") if r]
+METRICS_REFRESH_SECONDS = float(os.getenv("METRICS_REFRESH_SECONDS", "5"))
+opciones_metricas, metrics_path_limiter = metrics_config.opciones_metricas(
+    METRICS_GROUP_BY, METRICS_ROUTE_GROUPS, METRICS_EXCLUDED_PATHS, METRICS_MAX_PATHS, METRICS_LOW_OVERHEAD_ROUTES
+)
+if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+    # Varios workers de gunicorn: agregar las métricas de todos los procesos en /metrics
+    from prometheus_flask_exporter.multiprocess import GunicornInternalPrometheusMetrics
+    metrics = GunicornInternalPrometheusMetrics(app, path='/metrics', **opciones_metricas)
+else:
+    metrics = PrometheusMetrics(app, path='/metrics', **opciones_metricas)
 metrics.info('suma_proxy_info', 'SumaBasicaDocker proxy service', version='1.0.0')
+if METRICS_LOW_OVERHEAD_ROUTES:
+    metrics_config.LightweightRouteMetrics(METRICS_LOW_OVERHEAD_ROUTES).registrar(app)
+# Gauges calculados del estado del proceso: se publican con set() para que sobrevivan al modo
+# multiproceso (varios workers); cada Gauge declara cómo se agregan sus valores entre workers
+gauges_calculados = metrics_config.ComputedGauges(intervalo=METRICS_REFRESH_SECONDS).registrar_en(app)
 
 # Counter: nro de operaciones de suma agrupadas por cantidad de pods que requirió la operación
 ops_by_pods = Counter(
@@ -24,117 +74,857 @@ ops_by_pods = Counter(
     ['pods']
 )
 
+# Counter: activaciones de pods de dígito, separando arranques en frío de pods ya calientes
+digit_activations = Counter(
+    'suma_digito_activaciones_total',
+    'Número de veces que una operación necesitó un pod de dígito, según si estaba caliente o arrancó en frío',
+    ['digito', 'arranque']
+)
+
+# Counter: coste del precalentamiento en pod-segundos mantenidos sin tráfico real
+prewarm_pod_seconds = Counter(
+    'suma_precalentamiento_pod_segundos_total',
+    'Pod-segundos que los pods de dígito permanecieron calientes por precalentamiento sin atender operaciones'
+)
+
+# Gauge: llamadas en curso por pod de dígito (carga instantánea usada por el autoescalado)
+digit_inflight = Gauge(
+    'suma_digito_llamadas_en_curso',
+    'Llamadas en curso hacia cada servicio de dígito',
+    ['digito'],
+    multiprocess_mode='livesum'
+)
+
+# Histogram: latencia de cada llamada completa a un servicio de dígito (incluye reintentos)
+digit_call_latency = Histogram(
+    'suma_digito_llamada_duracion_seconds',
+    'Duración de las llamadas del proxy a cada servicio de dígito',
+    ['digito']
+)
+
+# Gauge: réplicas que el autoescalado considera necesarias para cada dígito
+digit_desired_replicas = Gauge(
+    'suma_digito_replicas_deseadas',
+    'Réplicas deseadas por el autoescalado para cada deployment de dígito',
+    ['digito'],
+    multiprocess_mode='livemax'
+)
+
+# Counters: peticiones de cobertura (hedged) lanzadas y cuántas respondieron antes que la original
+digit_hedges = Counter(
+    'suma_digito_hedge_total',
+    'Peticiones de cobertura lanzadas al superar el percentil de latencia esperado',
+    ['digito']
+)
+digit_hedge_wins = Counter(
+    'suma_digito_hedge_ganadas_total',
+    'Peticiones de cobertura que respondieron antes que la petición original',
+    ['digito']
+)
+
+# Gauges: estimación de latencia y timeout adaptativo vigente por dígito
+digit_latency_ewma = Gauge(
+    'suma_digito_latencia_ewma_seconds',
+    'Media móvil exponencial de la latencia de cada servicio de dígito',
+    ['digito'],
+    multiprocess_mode='livemax'
+)
+digit_timeout = Gauge(
+    'suma_digito_timeout_seconds',
+    'Timeout adaptativo aplicado a las llamadas de cada servicio de dígito',
+    ['digito'],
+    multiprocess_mode='livemax'
+)
+
+# Counter: operaciones cuyo resultado por posición no coincide con el cálculo local
+verification_mismatches = Counter(
+    'suma_verificacion_discrepancias_total',
+    'Operaciones en las que algún servicio de dígito devolvió un resultado distinto del calculado localmente'
+)
+
+# Histogram: desglose del arranque en frío de cada pod de dígito (programación, imagen, contenedor, sondas)
+cold_start_phase = Histogram(
+    'suma_arranque_frio_fase_duracion_seconds',
+    'Duración de cada fase del arranque en frío de un pod de dígito',
+    ['digito', 'fase'],
+    buckets=(0.5, 1, 2, 5, 10, 20, 30, 60, 120)
+)
+
+# Histogram: duración de cada etapa de una operación (alimentado por los spans de tracing)
+stage_duration = Histogram(
+    'suma_etapa_duracion_seconds',
+    'Duración de cada etapa de una operación (escalado, esperas, port-forward, llamadas)',
+    ['etapa']
+)
+
+# Counter: peticiones que esperaron la preparación de un pod iniciada por otra petición concurrente
+shared_readiness_waits = Counter(
+    'suma_preparacion_compartida_total',
+    'Peticiones que reutilizaron la preparación en curso de un pod de dígito en lugar de repetirla',
+    ['digito']
+)
+
+# Counter: operaciones abandonadas por plazo agotado o por desconexión del cliente
+requests_abandoned = Counter(
+    'suma_operaciones_abandonadas_total',
+    'Operaciones de /suma-n-digitos abandonadas antes de terminar',
+    ['motivo']
+)
+
+# Topología con la que se sirvió cada operación de /suma-n-digitos (topology.TopologyController)
+topology_operations = Counter(
+    'suma_operaciones_topologia_total',
+    'Operaciones de /suma-n-digitos por topología (concentrada en un pod o distribuida por dígito)',
+    ['topologia']
+)
+topology_active = Gauge(
+    'suma_topologia_activa',
+    'Workers cuyo controlador tiene elegida cada topología (con un solo worker: 1 la activa, 0 la otra)',
+    ['topologia'],
+    multiprocess_mode='livesum'
+)
+
+# Configuración en caliente (runtime_config.RuntimeConfig): versión vigente, cambios y
+# duración de las operaciones por huella de configuración para medir el efecto de cada ajuste
+config_version = Gauge(
+    'suma_config_version',
+    'Versión de la configuración en caliente vigente (la más antigua entre los workers)',
+    multiprocess_mode='livemin'
+)
+config_changes = Counter(
+    'suma_config_cambios_total',
+    'Cambios de configuración en caliente aplicados o rechazados por origen',
+    ['origen', 'resultado']
+)
+operation_duration = Histogram(
+    'suma_operacion_duracion_seconds',
+    'Duración de las operaciones de /suma-n-digitos completadas por huella de configuración y topología',
+    ['config', 'topologia'],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+)
+
+# SLO (slo.SLOEngine, agregados entre workers por el estado compartido): consumo del presupuesto de error por ventana
+slo_burn_rate = Gauge(
+    'suma_slo_consumo',
+    'Tasa de consumo del presupuesto de error de cada SLO (1 = al ritmo permitido)',
+    ['objetivo', 'ventana'],
+    multiprocess_mode='livemax'
+)
+slo_met = Gauge(
+    'suma_slo_cumple',
+    'Indica si cada SLO se cumple en todas sus ventanas (1) o no (0)',
+    ['objetivo'],
+    multiprocess_mode='livemin'
+)
+
+# Presupuesto de llamadas al API server de Kubernetes (api_budget.ApiBudget)
+api_calls = Counter(
+    'suma_api_llamadas_total',
+    'Llamadas kubectl ejecutadas por prioridad',
+    ['prioridad']
+)
+api_calls_merged = Counter(
+    'suma_api_llamadas_fusionadas_total',
+    'Llamadas kubectl redundantes fusionadas con otra aún en cola'
+)
+api_queue_wait = Histogram(
+    'suma_api_espera_seconds',
+    'Espera en la cola del presupuesto del API server antes de ejecutar la llamada',
+    ['prioridad'],
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+api_queued = Gauge(
+    'suma_api_en_cola',
+    'Llamadas kubectl esperando presupuesto por prioridad',
+    ['prioridad'],
+    multiprocess_mode='livesum'
+)
+api_tokens = Gauge(
+    'suma_api_tokens_disponibles',
+    'Tokens disponibles en el presupuesto del API server de cada worker (-1 sin límite)',
+    multiprocess_mode='liveall'
+)
+
+# Gauge: valores de 'path' agrupados en el cubo de desbordamiento por superar METRICS_MAX_PATHS
+metrics_path_overflow = Gauge(
+    'suma_metricas_rutas_desbordadas',
+    'Peticiones cuya ruta se agrupó en el cubo de desbordamiento de la etiqueta path',
+    multiprocess_mode='livesum'
+)
+gauges_calculados.registrar(metrics_path_overflow, lambda: metrics_path_limiter.desbordados)
+
+# Gauges por shard del orquestador (solo con ORCHESTRATOR_SHARDS)
+shard_healthy = Gauge(
+    'suma_shard_sano',
+    'Indica si cada shard del orquestador está sano (1) o degradado (0)',
+    ['shard'],
+    multiprocess_mode='livemin'
+)
+shard_load = Gauge(
+    'suma_shard_carga',
+    'Carga de cada shard: réplicas conocidas más dígitos ubicados en él',
+    ['shard'],
+    multiprocess_mode='livemax'
+)
+
 # Shutdown flag — set by SIGTERM so SSE streams exit cleanly
 _shutdown = threading.Event()
 
+# Bajo gunicorn el worker ya instala su propio manejador de SIGTERM (drenado ordenado): se encadena
+_previous_sigterm = signal.getsignal(signal.SIGTERM)
+
 def _handle_sigterm(signum, frame):
     _shutdown.set()
+    if callable(_previous_sigterm):
+        _previous_sigterm(signum, frame)
 
 signal.signal(signal.SIGTERM, _handle_sigterm)
 
-MAX_DIGITOS = 4  # Soporta hasta 9999
+MAX_DIGITOS = 4  # Soporta hasta 9999 (deployments suma-digito-N desplegados)
+# Valores iniciales; en caliente se leen de runtime_config (ver AJUSTES_RUNTIME)
 AUTO_SCALE_DOWN = True
 SCALE_DOWN_DELAY_SECONDS = 2
 NAMESPACE = os.getenv("K8S_NAMESPACE", "calculadora-suma")
 ORCHESTRATOR_IN_CLUSTER = os.getenv("ORCHESTRATOR_IN_CLUSTER", "false").lower() == "true"
 ORCHESTRATOR_BASE_PORT = int(os.getenv("ORCHESTRATOR_BASE_PORT", "31000"))
 BACKEND_SERVICE_PORT = int(os.getenv("BACKEND_SERVICE_PORT", "8000"))
+ORCHESTRATOR_DIRECT_POD_ROUTING = os.getenv("ORCHESTRATOR_DIRECT_POD_ROUTING", "false").lower() == "true"
+ORCHESTRATOR_LB_ALGORITHM = os.getenv("ORCHESTRATOR_LB_ALGORITHM", "p2c")
+ORCHESTRATOR_SHARDS = os.getenv("ORCHESTRATOR_SHARDS", "")
+ORCHESTRATOR_SHARD_FAILURES = int(os.getenv("ORCHESTRATOR_SHARD_FAILURES", "2"))
+ORCHESTRATOR_SHARD_COOLDOWN_SECONDS = int(os.getenv("ORCHESTRATOR_SHARD_COOLDOWN_SECONDS", "30"))
+PREWARM_ENABLED = os.getenv("PREWARM_ENABLED", "true").lower() == "true"
+PREWARM_WINDOW_SECONDS = int(os.getenv("PREWARM_WINDOW_SECONDS", "300"))
+PREWARM_RATE_THRESHOLD_PER_MIN = float(os.getenv("PREWARM_RATE_THRESHOLD_PER_MIN", "1.0"))
+PREWARM_LENGTH_PERCENTILE = float(os.getenv("PREWARM_LENGTH_PERCENTILE", "0.9"))
+PREWARM_TTL_SECONDS = int(os.getenv("PREWARM_TTL_SECONDS", "30"))
+AUTOSCALE_ENABLED = os.getenv("AUTOSCALE_ENABLED", "true").lower() == "true"
+AUTOSCALE_MIN_REPLICAS = int(os.getenv("AUTOSCALE_MIN_REPLICAS", "1"))
+AUTOSCALE_MAX_REPLICAS = int(os.getenv("AUTOSCALE_MAX_REPLICAS", "3"))
+AUTOSCALE_TARGET_INFLIGHT = float(os.getenv("AUTOSCALE_TARGET_INFLIGHT", "2"))
+AUTOSCALE_WINDOW_SECONDS = int(os.getenv("AUTOSCALE_WINDOW_SECONDS", "30"))
+AUTOSCALE_STABILIZATION_SECONDS = int(os.getenv("AUTOSCALE_STABILIZATION_SECONDS", "30"))
+DIGIT_TIMEOUT_SECONDS = float(os.getenv("DIGIT_TIMEOUT_SECONDS", "8"))
+DIGIT_TIMEOUT_MIN_SECONDS = float(os.getenv("DIGIT_TIMEOUT_MIN_SECONDS", "0.5"))
+DIGIT_TRANSPORT = os.getenv("DIGIT_TRANSPORT", "http")
+DIGIT_BINARY_PORT = int(os.getenv("DIGIT_BINARY_PORT", "0"))
+HEDGING_ENABLED = os.getenv("HEDGING_ENABLED", "true").lower() == "true"
+HEDGING_PERCENTILE = float(os.getenv("HEDGING_PERCENTILE", "0.95"))
+SHARED_STATE_BACKEND = os.getenv("SHARED_STATE_BACKEND", "memory")
+SHARED_STATE_PATH = os.getenv("SHARED_STATE_PATH", "/tmp/suma-proxy-state.db")
+VERIFY_RESULTS = os.getenv("VERIFY_RESULTS", "true").lower() == "true"
+LOCAL_BATCH_MAX = int(os.getenv("LOCAL_BATCH_MAX", "100000"))
+STATIC_CACHE_CONTROL = os.getenv("STATIC_CACHE_CONTROL", "no-cache")
+STATIC_CACHE_CONTROL_VERSIONED = os.getenv("STATIC_CACHE_CONTROL_VERSIONED", "public, max-age=31536000, immutable")
+TERMINAL_LOG_BUFFER = int(os.getenv("TERMINAL_LOG_BUFFER", "1000"))
+TERMINAL_SPILL_DIR = os.getenv("TERMINAL_SPILL_DIR", "")
+TERMINAL_SPILL_RECORDS = int(os.getenv("TERMINAL_SPILL_RECORDS", "100000"))
+TRACING_MAX_TRACES = int(os.getenv("TRACING_MAX_TRACES", "200"))
+DEBUG_TOKEN = os.getenv("DEBUG_TOKEN", "")
+# Configuración en caliente: JSON compartido por los workers (los cambios por API se persisten en él)
+# y, opcionalmente, un ConfigMap montado como directorio; ambos se vigilan cada CONFIG_WATCH_SECONDS
+CONFIG_FILE = os.getenv("CONFIG_FILE", "")
+CONFIG_DIR = os.getenv("CONFIG_DIR", "")
+CONFIG_WATCH_SECONDS = float(os.getenv("CONFIG_WATCH_SECONDS", "5"))
+# Sin CONFIG_ADMIN_TOKEN la configuración solo se puede leer (POST /config responde 403)
+CONFIG_ADMIN_TOKEN = os.getenv("CONFIG_ADMIN_TOKEN", "")
+PROFILING_MAX_SECONDS = int(os.getenv("PROFILING_MAX_SECONDS", "60"))
+PROFILING_MAX_FRAMES = 64  # profundidad máxima de pila para tracemalloc
+PROFILING_MAX_TOP = 500
+TRAFFIC_CAPTURE_DIR = os.getenv("TRAFFIC_CAPTURE_DIR", "")
+STARTUP_SYNC_ENABLED = os.getenv("STARTUP_SYNC_ENABLED", "true").lower() == "true"
+# Plazo de /suma-n-digitos (0 = sin plazo); X-Request-Timeout lo fija por petición hasta el máximo
+REQUEST_DEADLINE_SECONDS = float(os.getenv("REQUEST_DEADLINE_SECONDS", "120"))
+REQUEST_DEADLINE_MAX_SECONDS = float(os.getenv("REQUEST_DEADLINE_MAX_SECONDS", "170"))
+CANCEL_ON_DISCONNECT = os.getenv("CANCEL_ON_DISCONNECT", "true").lower() == "true"
+# Llamadas kubectl por segundo y ráfaga por proceso (0 = sin límite)
+API_BUDGET_QPS = float(os.getenv("API_BUDGET_QPS", "10"))
+API_BUDGET_BURST = int(os.getenv("API_BUDGET_BURST", "20"))
+# Topología adaptativa: un solo pod con poca carga, un pod por dígito al subir la concurrencia
+TOPOLOGY_ADAPTIVE = os.getenv("TOPOLOGY_ADAPTIVE", "true").lower() == "true"
+TOPOLOGY_SINGLE_POD_CAPACITY = float(os.getenv("TOPOLOGY_SINGLE_POD_CAPACITY", "2"))
+TOPOLOGY_HYSTERESIS = float(os.getenv("TOPOLOGY_HYSTERESIS", "0.5"))
+TOPOLOGY_LATENCY_MARGIN = float(os.getenv("TOPOLOGY_LATENCY_MARGIN", "0.2"))
+TOPOLOGY_WINDOW_SECONDS = int(os.getenv("TOPOLOGY_WINDOW_SECONDS", "30"))
+TOPOLOGY_MIN_DWELL_SECONDS = int(os.getenv("TOPOLOGY_MIN_DWELL_SECONDS", "10"))
+# SLO: percentil de la latencia de las operaciones en caliente y fracción máxima con arranque en frío
+SLO_WARM_LATENCY_MS = float(os.getenv("SLO_WARM_LATENCY_MS", "500"))
+SLO_WARM_LATENCY_PERCENTILE = float(os.getenv("SLO_WARM_LATENCY_PERCENTILE", "0.95"))
+SLO_COLD_START_RATE = float(os.getenv("SLO_COLD_START_RATE", "0.2"))
+SLO_WINDOWS_SECONDS = [int(v) for v in os.getenv("SLO_WINDOWS_SECONDS", "300,3600").split(",") if v]
+SLO_BURN_RATE_THRESHOLD = float(os.getenv("SLO_BURN_RATE_THRESHOLD", "2"))
+# Intervalo con el que cada worker publica el resumen de sus ventanas SLO para los demás
+SLO_PUBLISH_SECONDS = float(os.getenv("SLO_PUBLISH_SECONDS", "5"))
+# Con el SLO de arranques en frío en riesgo, el scale-down mantiene calientes los pods de la operación
+SLO_SCALE_DOWN_GUARD = os.getenv("SLO_SCALE_DOWN_GUARD", "true").lower() == "true"
+MULTI_SUM_MAX_OPERANDS = int(os.getenv("MULTI_SUM_MAX_OPERANDS", "256"))
+MULTI_SUM_PARALLELISM = int(os.getenv("MULTI_SUM_PARALLELISM", "16"))
+# Llamadas a dígitos simultáneas por worker: un hilo de petición de gunicorn (PROXY_THREADS) o de
+# /suma-multiple cada una, y con cobertura ocupan dos hilos del pool (principal y duplicado)
+HEDGE_POOL_SIZE = int(os.getenv(
+    "HEDGE_POOL_SIZE", str(2 * (int(os.getenv("PROXY_THREADS", "16")) + MULTI_SUM_PARALLELISM))
+))
 
-# Buffer de logs para terminal embebido en frontend
-terminal_log_buffer = deque(maxlen=1000)
+# Buffer de logs para terminal embebido en frontend (LogRecord compactos)
+terminal_log_buffer = deque(maxlen=TERMINAL_LOG_BUFFER)
 terminal_log_lock = threading.Lock()
 
+# stdout se escribe desde un hilo propio: el hilo de la petición solo encola la línea
+stdout_writer = StdoutWriter()
+
+# Historial largo opcional en un segmento mapeado en memoria (uno por ranura de worker:
+# un worker reiniciado reutiliza el segmento del que sustituye)
+terminal_spill = None
+if TERMINAL_SPILL_DIR:
+    os.makedirs(TERMINAL_SPILL_DIR, exist_ok=True)
+    terminal_spill = abrir_segmento_de_worker(TERMINAL_SPILL_DIR, capacidad=TERMINAL_SPILL_RECORDS)
+
+# Captura opcional del tráfico de /suma-n-digitos para reproducirlo con traffic_capture.py (una por worker)
+traffic_recorder = None
+if TRAFFIC_CAPTURE_DIR:
+    os.makedirs(TRAFFIC_CAPTURE_DIR, exist_ok=True)
+    traffic_recorder = TrafficRecorder(os.path.join(TRAFFIC_CAPTURE_DIR, f"traffic-{os.getpid()}.cap"))
+
+# Estado compartido entre workers: historial del terminal, pods en uso, bloqueo de scale-down y réplicas.
+# Con el backend en memoria comparte el buffer anterior; con SQLite coordina varios procesos.
+estado_compartido = crear_estado_compartido(
+    SHARED_STATE_BACKEND,
+    SHARED_STATE_PATH,
+    max_logs=terminal_log_buffer.maxlen,
+    logs=terminal_log_buffer,
+    lock=terminal_log_lock
+)
+
+# Con SQLite el historial se inserta por lotes desde un hilo propio, no una transacción por línea
+# en el hilo de la petición; el backend en memoria es un append y se mantiene síncrono
+estado_log_writer = None
+if SHARED_STATE_BACKEND == "sqlite":
+    estado_log_writer = BatchWriter(estado_compartido.agregar_logs, max_lote=500, nombre='terminal-estado')
+
 def registrar_terminal(mensaje, nivel='info'):
     """Registra un mensaje en consola y en el stream de terminal del frontend."""
     texto = str(mensaje)
     lineas = texto.splitlines() if texto else [""]
+    ahora = time.time()
 
-    for linea in lineas:
-        entry = {
-            'timestamp': time.strftime('%H:%M:%S'),
-            'level': nivel,
-            'message': linea
-        }
-        with terminal_log_lock:
-            terminal_log_buffer.append(entry)
-        print(linea, flush=True)
+    registros = [LogRecord(ahora, nivel, linea) for linea in lineas]
+    if estado_log_writer is not None:
+        for registro in registros:
+            estado_log_writer.escribir(registro)
+    else:
+        estado_compartido.agregar_logs(registros)
+
+    for registro in registros:
+        if terminal_spill is not None:
+            terminal_spill.agregar(registro)
+        stdout_writer.escribir(registro.mensaje)
+
+def _observar_api(prioridad, espera, fusionadas):
+    nombre = PRIORIDADES[prioridad]
+    api_calls.labels(prioridad=nombre).inc()
+    api_queue_wait.labels(prioridad=nombre).observe(espera)
+    if fusionadas:
+        api_calls_merged.inc(fusionadas)
+
+# Presupuesto de llamadas al API server (por proceso) compartido por todos los shards
+api_budget = ApiBudget(tasa=API_BUDGET_QPS, rafaga=API_BUDGET_BURST, observador=_observar_api)
+for _prioridad, _nombre in PRIORIDADES.items():
+    gauges_calculados.registrar(
+        api_queued.labels(prioridad=_nombre), lambda prioridad=_prioridad: api_budget.en_cola(prioridad)
+    )
+gauges_calculados.registrar(api_tokens, lambda: api_budget.tokens_disponibles() if api_budget.activo else -1)
 
-orchestrator = K8sOrchestrator(
+topology = TopologyController(
+    logger=registrar_terminal,
+    capacidad_concentrada=TOPOLOGY_SINGLE_POD_CAPACITY,
+    histeresis=TOPOLOGY_HYSTERESIS,
+    margen_latencia=TOPOLOGY_LATENCY_MARGIN,
+    ventana_segundos=TOPOLOGY_WINDOW_SECONDS,
+    permanencia_segundos=TOPOLOGY_MIN_DWELL_SECONDS
+)
+for _topologia in TOPOLOGIAS:
+    gauges_calculados.registrar(
+        topology_active.labels(topologia=_topologia),
+        lambda topologia=_topologia: int((topology.actual if TOPOLOGY_ADAPTIVE else DISTRIBUIDA) == topologia)
+    )
+
+def _crear_orquestador(namespace, base_port, kube_context=None):
+    return K8sOrchestrator(
+        logger=registrar_terminal,
+        namespace=namespace,
+        max_digitos=MAX_DIGITOS,
+        base_port=base_port,
+        in_cluster=ORCHESTRATOR_IN_CLUSTER,
+        service_port=BACKEND_SERVICE_PORT,
+        direct_pod_routing=ORCHESTRATOR_DIRECT_POD_ROUTING,
+        balanceo=ORCHESTRATOR_LB_ALGORITHM,
+        kube_context=kube_context,
+        presupuesto=api_budget,
+        estado_compartido=estado_compartido
+    )
+
+# ORCHESTRATOR_SHARDS="ns-a,ns-b@otro-cluster" reparte los dígitos entre varios namespaces/contextos;
+# cada shard usa su propio rango de puertos locales para los port-forward
+shards_configurados = parsear_shards(ORCHESTRATOR_SHARDS)
+if shards_configurados:
+    orchestrator = ShardedOrchestrator(
+        [
+            (nombre, _crear_orquestador(namespace, ORCHESTRATOR_BASE_PORT + 100 * i, contexto))
+            for i, (nombre, namespace, contexto) in enumerate(shards_configurados)
+        ],
+        logger=registrar_terminal,
+        max_digitos=MAX_DIGITOS,
+        fallos_para_degradar=ORCHESTRATOR_SHARD_FAILURES,
+        enfriamiento_segundos=ORCHESTRATOR_SHARD_COOLDOWN_SECONDS
+    )
+    for _shard in orchestrator.shards:
+        gauges_calculados.registrar(
+            shard_healthy.labels(shard=_shard), lambda shard=_shard: int(orchestrator.sano(shard))
+        )
+        gauges_calculados.registrar(shard_load.labels(shard=_shard), lambda shard=_shard: orchestrator.carga(shard))
+else:
+    orchestrator = _crear_orquestador(NAMESPACE, ORCHESTRATOR_BASE_PORT)
+
+prewarmer = Prewarmer(
+    orchestrator=orchestrator,
     logger=registrar_terminal,
-    namespace=NAMESPACE,
     max_digitos=MAX_DIGITOS,
-    base_port=ORCHESTRATOR_BASE_PORT,
-    in_cluster=ORCHESTRATOR_IN_CLUSTER,
-    service_port=BACKEND_SERVICE_PORT
+    ventana_segundos=PREWARM_WINDOW_SECONDS,
+    umbral_tasa_por_minuto=PREWARM_RATE_THRESHOLD_PER_MIN,
+    percentil_longitud=PREWARM_LENGTH_PERCENTILE,
+    ttl_explicito_segundos=PREWARM_TTL_SECONDS,
+    al_acumular_pod_segundos=prewarm_pod_seconds.inc,
+    en_uso_compartido=estado_compartido.digitos_en_uso
+)
+
+autoscaler = DigitAutoscaler(
+    orchestrator=orchestrator,
+    logger=registrar_terminal,
+    min_replicas=AUTOSCALE_MIN_REPLICAS,
+    max_replicas=AUTOSCALE_MAX_REPLICAS,
+    objetivo_por_replica=AUTOSCALE_TARGET_INFLIGHT,
+    ventana_segundos=AUTOSCALE_WINDOW_SECONDS,
+    estabilizacion_bajada=AUTOSCALE_STABILIZATION_SECONDS,
+    # Cada worker publica su carga; decide solo uno, con la de todos
+    estado_compartido=estado_compartido,
+    propietario=str(os.getpid())
+)
+
+latency_estimator = LatencyEstimator(
+    timeout_min=DIGIT_TIMEOUT_MIN_SECONDS,
+    timeout_max=DIGIT_TIMEOUT_SECONDS,
+    timeout_defecto=DIGIT_TIMEOUT_SECONDS,
+    percentil_hedge=HEDGING_PERCENTILE
+)
+
+AJUSTES_RUNTIME = (
+    Ajuste('MAX_DIGITOS', int, MAX_DIGITOS, 'Dígitos máximos por operando', minimo=1, maximo=MAX_DIGITOS),
+    Ajuste('AUTO_SCALE_DOWN', bool, AUTO_SCALE_DOWN, 'Escalar a cero los pods al terminar cada operación'),
+    Ajuste('SCALE_DOWN_DELAY_SECONDS', float, SCALE_DOWN_DELAY_SECONDS,
+           'Espera antes del scale-down automático', minimo=0, maximo=600),
+    Ajuste('DIGIT_RETRIES', int, 8, 'Intentos de cada llamada a un pod de dígito', minimo=1, maximo=20),
+    Ajuste('DIGIT_TIMEOUT_SECONDS', float, DIGIT_TIMEOUT_SECONDS,
+           'Timeout máximo (y sin historial) de cada llamada HTTP a un dígito',
+           minimo=DIGIT_TIMEOUT_MIN_SECONDS, maximo=120),
+    Ajuste('POD_READY_TIMEOUT_SECONDS', float, 60, 'Espera máxima a que un pod de dígito esté Ready',
+           minimo=1, maximo=600),
+    Ajuste('ENDPOINTS_TIMEOUT_SECONDS', float, 45, 'Espera máxima a que el Service de un dígito tenga endpoints',
+           minimo=0, maximo=600),
+)
+
+def _observar_config(entrada, config):
+    config_changes.labels(origen=entrada['Origen'], resultado=entrada['Resultado']).inc()
+    if entrada['Resultado'] == 'aplicado':
+        # El estimador lee estos límites en cada llamada: afecta también a las operaciones en curso
+        latency_estimator.timeout_max = config['DIGIT_TIMEOUT_SECONDS']
+        latency_estimator.timeout_defecto = config['DIGIT_TIMEOUT_SECONDS']
+
+runtime_config = RuntimeConfig(AJUSTES_RUNTIME, logger=registrar_terminal, observador=_observar_config)
+gauges_calculados.registrar(config_version, lambda: runtime_config.actual().version)
+for _ruta in (CONFIG_DIR, CONFIG_FILE):
+    if _ruta:
+        runtime_config.recargar(_ruta)
+
+slo = SLOEngine([
+    Objetivo(
+        'latencia_caliente', SLO_WARM_LATENCY_PERCENTILE, umbral=SLO_WARM_LATENCY_MS / 1000,
+        descripcion=f"p{SLO_WARM_LATENCY_PERCENTILE * 100:g} de /suma-n-digitos sin arranques en frío "
+                    f"< {SLO_WARM_LATENCY_MS:g} ms"
+    ),
+    Objetivo(
+        'arranques_frio', 1 - SLO_COLD_START_RATE,
+        descripcion=f"Operaciones de /suma-n-digitos con algún arranque en frío < {SLO_COLD_START_RATE * 100:g} %"
+    ),
+], ventanas=SLO_WINDOWS_SECONDS, estado_compartido=estado_compartido,
+    propietario=str(os.getpid()), ttl_publicacion=3 * SLO_PUBLISH_SECONDS)
+for _objetivo in slo.objetivos:
+    for _ventana in slo.ventanas:
+        gauges_calculados.registrar(
+            slo_burn_rate.labels(objetivo=_objetivo, ventana=f"{_ventana}s"),
+            lambda objetivo=_objetivo, ventana=_ventana: slo.consumo(objetivo, ventana)
+        )
+    gauges_calculados.registrar(
+        slo_met.labels(objetivo=_objetivo),
+        lambda objetivo=_objetivo: int(all(slo.consumo(objetivo, v) <= 1 for v in slo.ventanas))
+    )
+
+# Tracing: una traza por operación; las últimas se guardan en memoria para /debug/traces
+trace_exporter = InMemoryRingExporter(max_trazas=TRACING_MAX_TRACES)
+tracer = Tracer([
+    trace_exporter,
+    CallbackExporter(lambda span: stage_duration.labels(etapa=span.nombre).observe(span.duracion))
+])
+
+# Perfilado bajo demanda (/debug/profile/*): sin coste mientras no hay un perfil en curso
+cpu_profiler = SamplingProfiler()
+memory_profiler = MemoryProfiler()
+
+# Frontend precomprimido en memoria, con ETag y URLs versionadas por contenido
+static_assets = StaticAssetCache(
+    '.',
+    cache_control=STATIC_CACHE_CONTROL,
+    cache_control_versionado=STATIC_CACHE_CONTROL_VERSIONED
 )
+static_assets.cargar()
+
+# Transporte binario opcional hacia los servicios de dígito (por defecto JSON sobre HTTP); si los
+# pods no son alcanzables por él, el proxy no arranca en lugar de fallar en cada operación
+validar_transporte(
+    DIGIT_TRANSPORT, en_cluster=ORCHESTRATOR_IN_CLUSTER, puerto_binario=DIGIT_BINARY_PORT,
+    directo_a_pods=ORCHESTRATOR_DIRECT_POD_ROUTING
+)
+binary_transport = BinaryDigitTransport(puerto=DIGIT_BINARY_PORT or None)
+
+# Pool compartido para llamadas cubiertas; solo se usa cuando hay estimación de latencia. Dimensionado para
+# que ninguna llamada espere turno con todos los hilos de petición ocupados (los hilos se crean bajo demanda)
+_hedge_executor = ThreadPoolExecutor(max_workers=HEDGE_POOL_SIZE, thread_name_prefix='digito-hedge')
+# Sumas por parejas de un mismo nivel de /suma-multiple y preparación en paralelo de sus pods
+_reduccion_executor = ThreadPoolExecutor(max_workers=MULTI_SUM_PARALLELISM, thread_name_prefix='reduccion')
+
+for _digito in range(MAX_DIGITOS):
+    gauges_calculados.registrar(
+        digit_latency_ewma.labels(digito=str(_digito)), lambda digito=_digito: latency_estimator.ewma(digito)
+    )
+    gauges_calculados.registrar(
+        digit_timeout.labels(digito=str(_digito)), lambda digito=_digito: latency_estimator.timeout(digito)
+    )
+    gauges_calculados.registrar(
+        digit_inflight.labels(digito=str(_digito)), lambda digito=_digito: autoscaler.en_curso(digito)
+    )
+    gauges_calculados.registrar(
+        digit_desired_replicas.labels(digito=str(_digito)), lambda digito=_digito: autoscaler.replicas_deseadas(digito)
+    )
+
+def _post_digito(service_url, payload, timeout):
+    """Una única llamada a un servicio de dígito: POST /suma o, si se configura, el transporte binario."""
+    if DIGIT_TRANSPORT == 'binary':
+        return binary_transport.llamar(service_url, payload, timeout)
+
+    response = requests.post(
+        f"{service_url}/suma",
+        json=payload,
+        headers={'Content-Type': 'application/json', **cabeceras_propagacion()},
+        timeout=timeout
+    )
+
+    if not response.ok:
+        raise Exception(f"HTTP {response.status_code}: {response.text}")
+
+    return response.json()
+
+def _llamada_cronometrada(service_url, payload, digito, timeout, reportar):
+    """POST al dígito que alimenta el estimador de latencia y reporta el resultado de la réplica."""
+    inicio = time.time()
+    try:
+        with tracer.span('peticion_http', digito=digito, url=service_url):
+            data = _post_digito(service_url, payload, timeout)
+    except Exception:
+        if reportar:
+            reportar(service_url, False, time.time() - inicio)
+        raise
+
+    duracion = time.time() - inicio
+    latency_estimator.registrar(digito, duracion)
+    if reportar:
+        reportar(service_url, True, duracion)
+    return data
+
+def _llamada_con_cobertura(service_url, payload, digito, timeout, obtener_url=None, reportar=None):
+    """
+    Intento de llamada con timeout adaptativo y petición de cobertura (hedging).
+
+    Si la llamada supera el percentil esperado para el dígito, se lanza un
+    duplicado a otra réplica (obtener_url) o por una conexión nueva y se
+    devuelve la primera respuesta correcta. El umbral cuenta desde que la
+    llamada empieza a ejecutarse en el pool: esperar turno no provoca duplicados.
+    Una réplica elegida cuya llamada no llega a enviarse se libera con reportar(url, None).
+    """
+    umbral = latency_estimator.umbral_hedge(digito) if HEDGING_ENABLED else None
+    if umbral is None:
+        return _llamada_cronometrada(service_url, payload, digito, timeout, reportar)
+
+    iniciada = threading.Event()
+
+    def llamada_principal():
+        iniciada.set()
+        return _llamada_cronometrada(service_url, payload, digito, timeout, reportar)
+
+    # Cada petición se ejecuta en una copia del contexto para colgar sus spans de la traza actual
+    try:
+        principal = _hedge_executor.submit(contextvars.copy_context().run, llamada_principal)
+    except Exception:
+        if reportar:
+            reportar(service_url, None, None)
+        raise
+    iniciada.wait(timeout)
+    hechas, _ = wait([principal], timeout=umbral)
+    if hechas:
+        return principal.result()
+
+    url_cobertura = obtener_url() if obtener_url else service_url
+    try:
+        cobertura = _hedge_executor.submit(
+            contextvars.copy_context().run, _llamada_cronometrada, url_cobertura, payload, digito, timeout, reportar
+        )
+    except Exception as e:
+        # Sin duplicado (pool cerrado al apagar): se sigue esperando a la llamada principal
+        if reportar and obtener_url:
+            reportar(url_cobertura, None, None)
+        registrar_terminal(f"⚠ No se pudo lanzar la cobertura de digito-{digito}: {e}", 'warning')
+        return principal.result()
+    digit_hedges.labels(digito=str(digito)).inc()
 
-def llamar_servicio_con_reintento(service_url, payload, digito, intentos=3):
+    pendientes = {principal, cobertura}
+    ultimo_error = None
+    while pendientes:
+        hechas, pendientes = wait(pendientes, return_when=FIRST_COMPLETED)
+        for futuro in hechas:
+            if futuro.exception() is None:
+                if futuro is cobertura:
+                    digit_hedge_wins.labels(digito=str(digito)).inc()
+                return futuro.result()
+            ultimo_error = futuro.exception()
+
+    raise ultimo_error
+
+def llamar_servicio_con_reintento(service_url, payload, digito, intentos=3, obtener_url=None, reportar=None):
     """
     Llama al servicio de suma de un dígito con reintentos para manejar
     fallos transitorios durante el arranque del pod.
+
+    Con balanceo directo a pods, obtener_url() elige una réplica nueva para
+    cada reintento y reportar(url, exito, latencia) libera la anterior.
+    Intentos y pausas se acotan al plazo de la operación en curso: el plazo
+    de cada intento se reserva antes de elegir réplica, y si el primero no
+    llega a hacerse se libera la réplica recibida en service_url.
     """
     ultimo_error = None
+    etapa = f"llamada digito-{digito}"
 
     for intento in range(1, intentos + 1):
         try:
-            response = requests.post(
-                f"{service_url}/suma",
-                json=payload,
-                headers={'Content-Type': 'application/json'},
-                timeout=8
-            )
-
-            if not response.ok:
-                raise Exception(f"HTTP {response.status_code}: {response.text}")
+            deadlines.comprobar(etapa)
+            timeout = deadlines.limitar(latency_estimator.timeout(digito), etapa)
+        except deadlines.DeadlineExceeded:
+            if intento == 1 and reportar:
+                reportar(service_url, None, None)
+            raise
+        if intento > 1 and obtener_url:
+            service_url = obtener_url()
 
-            return response.json()
+        try:
+            return _llamada_con_cobertura(service_url, payload, digito, timeout, obtener_url, reportar)
 
+        except deadlines.DeadlineExceeded:
+            raise
         except requests.exceptions.RequestException as e:
             ultimo_error = e
             registrar_terminal(f"⚠ Intento {intento}/{intentos} falló en digito-{digito}: {e}", 'warning')
             if intento < intentos:
-                time.sleep(1)
+                deadlines.dormir(1, etapa)
         except Exception as e:
             ultimo_error = e
             registrar_terminal(f"⚠ Intento {intento}/{intentos} falló en digito-{digito}: {e}", 'warning')
             if intento < intentos:
-                time.sleep(1)
+                deadlines.dormir(1, etapa)
 
+    # Si el último intento agotó el plazo, se informa como tal y no como fallo del dígito
+    deadlines.comprobar(etapa)
     raise Exception(f"Fallo comunicando con digito-{digito} tras {intentos} intentos: {ultimo_error}")
 
+def _preparar_pod(digito, arranque_frio, preparacion_propia):
+    """Escala el pod del dígito y espera Ready, endpoints y port-forward; devuelve las fases del arranque en frío."""
+    preparacion_propia.add(digito)
+    config = runtime_config.actual()
+
+    # Escalar al menos a 1 réplica sin reducir un deployment ya autoescalado
+    with tracer.span('escalar', digito=digito, arranque='frio' if arranque_frio else 'caliente'):
+        if not orchestrator.escalar_pod(digito, autoscaler.replicas_para_operacion(digito)):
+            raise Exception(f"No se pudo escalar el pod suma-digito-{digito}")
+
+    # Esperar a que el pod esté listo (como mucho POD_READY_TIMEOUT_SECONDS y nunca más allá del plazo)
+    with tracer.span('esperar_ready', digito=digito):
+        timeout_ready = config['POD_READY_TIMEOUT_SECONDS']
+        if not orchestrator.esperar_pod_ready(digito, timeout=timeout_ready):
+            deadlines.comprobar(f"esperar pod suma-digito-{digito}")
+            raise Exception(f"El pod suma-digito-{digito} no está listo después de {timeout_ready:g} segundos")
+
+    # Desglose del arranque en frío a partir de las marcas de tiempo del pod
+    fases = orchestrator.fases_arranque(digito) if arranque_frio else {}
+    for fase, segundos in fases.items():
+        cold_start_phase.labels(digito=str(digito), fase=fase).observe(segundos)
+
+    # Esperar a que el Service tenga endpoints propagados (si falla, continuar con reintentos HTTP)
+    with tracer.span('esperar_endpoints', digito=digito) as span_endpoints:
+        endpoints_listos = orchestrator.esperar_endpoints_servicio(
+            digito, timeout=config['ENDPOINTS_TIMEOUT_SECONDS']
+        )
+        span_endpoints.atributo('listos', endpoints_listos)
+    if not endpoints_listos:
+        registrar_terminal(
+            f"⚠ El servicio suma-digito-{digito} aún no expone endpoints; se continuará con reintentos de conexión.",
+            'warning'
+        )
+
+    # Establecer port-forward para este pod
+    with tracer.span('port_forward', digito=digito):
+        if not orchestrator.establecer_port_forward(digito):
+            raise Exception(f"No se pudo establecer port-forward para suma-digito-{digito}")
+    return fases
+
+def activar_pod(digito, arranque_frio):
+    """
+    Prepara el pod (escalar, Ready, endpoints, port-forward) una sola vez para todas las
+    peticiones concurrentes del mismo dígito: las demás esperan en la compuerta del
+    orquestador. Devuelve las fases del arranque en frío ({} si no lo preparó esta petición).
+    """
+    preparacion_propia = set()
+    with tracer.span('preparar', digito=digito) as span_preparar:
+        fases = orchestrator.compartir_preparacion(
+            digito, functools.partial(_preparar_pod, digito, arranque_frio, preparacion_propia)
+        )
+        compartida = digito not in preparacion_propia
+        span_preparar.atributo('compartida', compartida)
+    if compartida:
+        shared_readiness_waits.labels(digito=str(digito)).inc()
+        registrar_terminal(f"↺ suma-digito-{digito} preparado por otra petición en curso", 'info')
+    return fases
+
+def llamar_digito(digito, payload, service_url=None):
+    """Llamada con reintentos al pod del dígito que contabiliza la carga para el autoescalado."""
+    if service_url is None:
+        service_url = orchestrator.service_url(digito)[0]
+    inicio_llamada = autoscaler.inicio_llamada(digito)
+    exito_llamada = False
+    try:
+        with tracer.span('llamada_digito', digito=digito):
+            data_response = llamar_servicio_con_reintento(
+                service_url, payload, digito, intentos=runtime_config['DIGIT_RETRIES'],
+                obtener_url=lambda: orchestrator.service_url(digito)[0],
+                reportar=lambda url, exito, latencia: orchestrator.reportar_llamada(digito, url, exito, latencia)
+            )
+        exito_llamada = True
+        return data_response
+    finally:
+        duracion_llamada = autoscaler.fin_llamada(digito, inicio_llamada, exito_llamada)
+        digit_call_latency.labels(digito=str(digito)).observe(duracion_llamada)
+
 def escalar_a_cero_en_background(num_digitos):
     """Escala a cero los pods al terminar la operación usando el módulo de orquestación."""
-    if not AUTO_SCALE_DOWN:
+    config = runtime_config.actual()
+    if not config['AUTO_SCALE_DOWN']:
+        return
+    retardo = config['SCALE_DOWN_DELAY_SECONDS']
+
+    mantener = set()
+
+    def digitos_a_mantener():
+        # Pods en uso por cualquier worker, además de los que el precalentamiento quiere calientes
+        mantener.update(estado_compartido.digitos_en_uso())
+        if PREWARM_ENABLED:
+            mantener.update(prewarmer.digitos_a_mantener())
+        # Si se están gastando los arranques en frío permitidos, no provocar más en la siguiente operación
+        if SLO_SCALE_DOWN_GUARD and slo.en_riesgo('arranques_frio', SLO_BURN_RATE_THRESHOLD):
+            registrar_terminal(
+                f"↺ SLO de arranques en frío en riesgo (consumo {slo.consumo('arranques_frio'):.1f}×): "
+                f"se mantienen calientes {num_digitos} pod(s)",
+                'warning'
+            )
+            mantener.update(range(num_digitos))
+        return mantener
+
+    # Un único scale-down a la vez en todo el pod; si ya hay uno en marcha, se encarga él
+    propietario = f"{os.getpid()}-{threading.get_ident()}"
+    if not estado_compartido.intentar_bloqueo('scale-down', propietario, ttl=retardo + 120):
         return
 
     try:
-        orchestrator.escalar_a_cero(delay_seconds=SCALE_DOWN_DELAY_SECONDS)
+        with tracer.span('escalar_a_cero', digitos=num_digitos):
+            orchestrator.escalar_a_cero(delay_seconds=retardo, excluir=digitos_a_mantener)
+        for digito in range(MAX_DIGITOS):
+            if digito not in mantener:
+                prewarmer.liberar(digito)
     except Exception as e:
         registrar_terminal(f"✗ Error durante scale-down automático: {e}", 'error')
+    finally:
+        estado_compartido.liberar_bloqueo('scale-down', propietario)
+
+def _servir_asset(ruta):
+    """Respuesta desde la caché de estáticos (con 304 y compresión negociada), o None si no está cacheado."""
+    nombre, versionada = static_assets.resolver(ruta)
+    if nombre is None:
+        return None
+    resultado = static_assets.respuesta(
+        nombre,
+        if_none_match=request.headers.get('If-None-Match'),
+        accept_encoding=request.headers.get('Accept-Encoding', ''),
+        versionada=versionada
+    )
+    if resultado is None:
+        return None
+    estado, cuerpo, cabeceras = resultado
+    return Response(cuerpo, status=estado, headers=cabeceras)
 
 @app.route('/')
 def index():
-    return send_from_directory('.', 'index.html')
+    return _servir_asset('index.html') or send_from_directory('.', 'index.html')
+
+@app.route('/prewarm', methods=['POST', 'OPTIONS'])
+def prewarm():
+    """Precalienta los pods para una operación inminente (p. ej. cuando el usuario empieza a escribir)."""
+    if request.method == 'OPTIONS':
+        response = make_response('', 200)
+        response.headers['Access-Control-Allow-Origin'] = '*'
+        response.headers['Access-Control-Allow-Methods'] = 'POST, OPTIONS'
+        response.headers['Access-Control-Allow-Headers'] = 'Content-Type'
+        return response
+
+    if not PREWARM_ENABLED:
+        return jsonify({'ok': False, 'detail': 'Precalentamiento deshabilitado'})
+
+    data = request.get_json(silent=True) or {}
+    try:
+        num_digitos = data.get('Digitos')
+        num_digitos = int(num_digitos) if num_digitos is not None else None
+    except (TypeError, ValueError):
+        return make_response(jsonify({'error': 'Digitos debe ser un entero'}), 400)
+
+    threading.Thread(target=prewarmer.precalentar, args=(num_digitos,), daemon=True).start()
+    return make_response(jsonify({'ok': True, 'Digitos': num_digitos}), 202)
 
 @app.route('/terminal-stream')
 def terminal_stream():
     def event_stream():
-        last_index = 0
+        cursor = 0
         while not _shutdown.is_set():
             try:
-                with terminal_log_lock:
-                    logs_snapshot = list(terminal_log_buffer)
-
-                # Si el buffer se limpió o rotó (deque maxlen), reajustar cursor
-                if last_index > len(logs_snapshot):
-                    last_index = 0
-
-                if last_index < len(logs_snapshot):
-                    for entry in logs_snapshot[last_index:]:
-                        yield f"data: {json.dumps(entry, ensure_ascii=False)}\n\n"
-                    last_index = len(logs_snapshot)
+                # El cursor es absoluto: sobrevive a la rotación del buffer y a otros workers
+                entradas, cursor = estado_compartido.logs_desde(cursor)
+                for registro in entradas:
+                    yield f"data: {json_codec.dumps(registro.to_dict())}\n\n"
 
-                time.sleep(0.4)
+                if not entradas:
+                    time.sleep(0.4)
             except GeneratorExit:
                 break
             except Exception:
@@ -148,21 +938,30 @@ def terminal_stream():
 
 @app.route('/terminal-clear', methods=['POST'])
 def terminal_clear():
-    with terminal_log_lock:
-        terminal_log_buffer.clear()
+    estado_compartido.limpiar_logs()
     return jsonify({'ok': True})
 
+@app.route('/terminal-history')
+def terminal_history():
+    """Historial largo del terminal entre ?desde= y ?hasta= (epoch en segundos), si hay segmento en disco."""
+    if not TERMINAL_SPILL_DIR:
+        return make_response(jsonify({'error': 'Historial en disco deshabilitado (TERMINAL_SPILL_DIR)'}), 404)
+    desde = request.args.get('desde', type=float)
+    hasta = request.args.get('hasta', type=float)
+    limite = min(max(request.args.get('limite', 1000, type=int), 1), 10000)
+
+    registros = buscar_en_directorio(TERMINAL_SPILL_DIR, desde, hasta, limite)
+    return jsonify({'Lineas': [dict(registro.to_dict(), ts=registro.ts) for registro in registros]})
+
 @app.route('/docs-url')
 def docs_url():
     """Devuelve la URL pública del servicio de documentación (suma-docs LoadBalancer)."""
     try:
-        result = subprocess.run(
-            [
-                "kubectl", "get", "svc", "suma-docs",
-                "-n", NAMESPACE,
-                "-o", "jsonpath={.status.loadBalancer.ingress[0].ip}"
-            ],
-            capture_output=True, text=True, timeout=5
+        result = orchestrator.kubectl(
+            "get", "svc", "suma-docs",
+            "-n", NAMESPACE,
+            "-o", "jsonpath={.status.loadBalancer.ingress[0].ip}",
+            timeout=5
         )
         ip = result.stdout.strip()
         if ip:
@@ -175,13 +974,11 @@ def docs_url():
 def grafana_url():
     """Devuelve la URL pública de Grafana (kube-prometheus-stack LoadBalancer en namespace monitoring)."""
     try:
-        result = subprocess.run(
-            [
-                "kubectl", "get", "svc", "kube-prometheus-stack-grafana",
-                "-n", "monitoring",
-                "-o", "jsonpath={.status.loadBalancer.ingress[0].ip}"
-            ],
-            capture_output=True, text=True, timeout=5
+        result = orchestrator.kubectl(
+            "get", "svc", "kube-prometheus-stack-grafana",
+            "-n", "monitoring",
+            "-o", "jsonpath={.status.loadBalancer.ingress[0].ip}",
+            timeout=5
         )
         ip = result.stdout.strip()
         if ip:
@@ -192,10 +989,39 @@ def grafana_url():
 
 @app.route('/<path:path>')
 def serve_static(path):
+    respuesta = _servir_asset(path)
+    if respuesta is not None:
+        return respuesta
     if os.path.exists(path):
         return send_from_directory('.', path)
     return "Not Found", 404
 
+@app.route('/suma-lote', methods=['POST'])
+def suma_lote():
+    """
+    Ruta de cálculo local: suma lotes de operaciones con el motor vectorizado,
+    sin escalar pods. Acepta {NumbersA: [...], NumbersB: [...]} de igual longitud.
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        numeros_a = [int(n) for n in data.get('NumbersA', [])]
+        numeros_b = [int(n) for n in data.get('NumbersB', [])]
+        if len(numeros_a) > LOCAL_BATCH_MAX:
+            raise ValueError(f"Como máximo {LOCAL_BATCH_MAX} operaciones por lote")
+
+        inicio = time.perf_counter()
+        resultados = digit_engine.sumar(numeros_a, numeros_b)
+        duracion = time.perf_counter() - inicio
+    except (TypeError, ValueError) as e:
+        return make_response(jsonify({'error': str(e)}), 400)
+
+    return jsonify({
+        'Results': resultados,
+        'NumOperaciones': len(resultados),
+        'Motor': digit_engine.MOTOR,
+        'DuracionMs': round(duracion * 1000, 3)
+    })
+
 def get_digitos(numero):
     """Convierte un número en una lista de sus dígitos (de derecha a izquierda)"""
     if numero == 0:
@@ -225,16 +1051,115 @@ def suma_n_digitos():
         response = make_response('', 200)
         response.headers['Access-Control-Allow-Origin'] = '*'
         response.headers['Access-Control-Allow-Methods'] = 'POST, OPTIONS'
-        response.headers['Access-Control-Allow-Headers'] = 'Content-Type'
+        response.headers['Access-Control-Allow-Headers'] = 'Content-Type, traceparent, X-Request-Timeout'
         return response
-    
+
+    try:
+        deadline = deadline_peticion()
+    except ValueError as e:
+        response = make_response(jsonify({"error": str(e)}), 400)
+        response.headers['Access-Control-Allow-Origin'] = '*'
+        return response
+
+    # Span raíz de la operación; continúa la traza del cliente si envía traceparent
+    with tracer.span('operacion', traceparent=request.headers.get('traceparent')) as span:
+        # Plazo y cancelación visibles para el orquestador y las llamadas a los dígitos
+        with deadlines.con_deadline(deadline):
+            response = _procesar_suma_n_digitos(span)
+        if response.status_code >= 400:
+            span.estado = 'error'
+    response.headers['X-Trace-Id'] = span.trace_id
+
+    # Solo se capturan operaciones con operandos válidos: son las que se pueden reproducir
+    if traffic_recorder is not None and 'NumberA' in span.atributos:
+        traffic_recorder.registrar(
+            span.inicio,
+            span.atributos['NumberA'],
+            span.atributos['NumberB'],
+            span.duracion,
+            span.atributos.get('arranques_en_frio', 0),
+            response.status_code
+        )
+    return response
+
+def plazo_solicitado():
+    """
+    Plazo en segundos de la operación: cabecera X-Request-Timeout acotada a
+    REQUEST_DEADLINE_MAX_SECONDS o, sin cabecera, REQUEST_DEADLINE_SECONDS.
+    None si no hay plazo.
+    """
+    cabecera = request.headers.get('X-Request-Timeout')
+    if cabecera is None:
+        return REQUEST_DEADLINE_SECONDS or None
+    try:
+        segundos = float(cabecera)
+    except ValueError:
+        raise ValueError(f"X-Request-Timeout inválido: {cabecera!r}") from None
+    if not 0 < segundos < float('inf'):
+        raise ValueError(f"X-Request-Timeout debe ser un número de segundos positivo: {cabecera!r}")
+    return min(segundos, REQUEST_DEADLINE_MAX_SECONDS) if REQUEST_DEADLINE_MAX_SECONDS else segundos
+
+def deadline_peticion():
+    """Deadline de la petición en curso: plazo_solicitado() y, si procede, la sonda de desconexión."""
+    sonda = deadlines.sonda_desconexion(request.environ) if CANCEL_ON_DISCONNECT else None
+    return deadlines.Deadline(plazo_solicitado(), sonda)
+
+def _respuesta_abandonada(error):
+    """504 si se agotó el plazo; 499 (convención de nginx) si el cliente se desconectó."""
+    cancelada = isinstance(error, deadlines.RequestCancelled)
+    requests_abandoned.labels(motivo='desconexion' if cancelada else 'plazo').inc()
+    registrar_terminal(f"⚠ {error}", 'warning')
+    response = make_response(jsonify({"error": str(error)}), 499 if cancelada else 504)
+    response.headers['Access-Control-Allow-Origin'] = '*'
+    return response
+
+# Secciones de la respuesta de /suma-n-digitos seleccionables con fields / verbose
+CAMPOS_RESPUESTA = ('Result', 'CarryOut', 'NumDigitos', 'ContenedoresUsados', 'Topologia', 'Details', 'EventosEscalado')
+CAMPOS_DETALLADOS = ('Details', 'EventosEscalado')
+
+def campos_solicitados(data):
+    """
+    Secciones pedidas por el cliente: ?fields=Result,CarryOut (o "Fields" en el cuerpo)
+    y ?verbose=false (o "Verbose": false) para omitir Details y EventosEscalado.
+    """
+    campos = request.args.get('fields', data.get('Fields'))
+    if campos:
+        campos = [c.strip() for c in campos.split(',')] if isinstance(campos, str) else list(campos)
+        desconocidos = [c for c in campos if c not in CAMPOS_RESPUESTA]
+        if desconocidos:
+            raise ValueError(f"Campos desconocidos: {', '.join(map(str, desconocidos))}")
+        seleccion = [c for c in CAMPOS_RESPUESTA if c in campos]
+    else:
+        seleccion = list(CAMPOS_RESPUESTA)
+
+    verbose = request.args.get('verbose', data.get('Verbose', True))
+    if str(verbose).lower() in ('false', '0', 'no'):
+        seleccion = [c for c in seleccion if c not in CAMPOS_DETALLADOS]
+    return seleccion
+
+def _procesar_suma_n_digitos(span):
+    num_digitos = 0
+    num_pods = 0
+    topologia = None
+    inicio_topologia = None
+    exito = False
+    arranques_en_frio = 0
+    operacion_registrada = False
+    reserva_digitos = None
+    abandonada = False
+    # Configuración con la que se valida la operación y que etiqueta su duración
+    config = runtime_config.actual()
+    max_digitos = config['MAX_DIGITOS']
+    span.atributo('config', config.huella)
+
     try:
         data = request.json
         numberA = int(data.get('NumberA', 0))
         numberB = int(data.get('NumberB', 0))
+        campos = campos_solicitados(data)
         
         # Validar que los números no excedan el límite
-        max_numero = 10 ** MAX_DIGITOS - 1  # 9999 para 4 dígitos
+        max_numero = 10 ** max_digitos - 1  # 9999 para 4 dígitos
         if numberA < 0 or numberA > max_numero or numberB < 0 or numberB > max_numero:
             raise ValueError(f"Los números deben estar entre 0 y {max_numero}")
         
@@ -245,37 +1170,52 @@ def suma_n_digitos():
         # Normalizar para que tengan el mismo tamaño
         digitos_a, digitos_b = normalizar_digitos(digitos_a, digitos_b)
         num_digitos = len(digitos_a)
+        span.atributo('NumberA', numberA)
+        span.atributo('NumberB', numberB)
+        span.atributo('num_digitos', num_digitos)
         
         # Validar que no excedamos el límite de contenedores
-        if num_digitos > MAX_DIGITOS:
-            raise ValueError(f"Solo soportamos hasta {MAX_DIGITOS} dígitos (0-{max_numero})")
+        if num_digitos > max_digitos:
+            raise ValueError(f"Solo soportamos hasta {max_digitos} dígitos (0-{max_numero})")
         
+        # Con poca carga todas las posiciones van en cascada al pod suma-digito-0
+        inicio_topologia = topology.inicio()
+        topologia = topology.elegir(num_digitos) if TOPOLOGY_ADAPTIVE else DISTRIBUIDA
+        num_pods = 1 if topologia == CONCENTRADA else num_digitos
+        span.atributo('topologia', topologia)
+
+        prewarmer.inicio_operacion(num_pods)
+        operacion_registrada = True
+        reserva_digitos = estado_compartido.adquirir_digitos(range(num_pods))
+
         # Escalar dinámicamente los pods necesarios (escalado horizontal)
         registrar_terminal(f"\n{'='*60}", 'info')
         registrar_terminal(f"Escalando pods para operación: {numberA} + {numberB}", 'info')
-        registrar_terminal(f"Se necesitan {num_digitos} pod(s)", 'info')
+        registrar_terminal(f"Se necesitan {num_pods} pod(s) (topología {topologia})", 'info')
         registrar_terminal(f"{'='*60}", 'info')
         
         # Array para registrar eventos de escalado
         eventos_escalado = []
         
         # Escalar cada pod necesario
-        for i in range(num_digitos):
+        for i in range(num_pods):
+            deadlines.comprobar(f"preparar suma-digito-{i}")
             inicio_escalado = time.time()
+            arranque_frio = orchestrator.es_arranque_en_frio(i)
+            if arranque_frio:
+                arranques_en_frio += 1
+            digit_activations.labels(digito=str(i), arranque='frio' if arranque_frio else 'caliente').inc()
             
             # Registrar inicio de escalado
             eventos_escalado.append({
                 'Tipo': 'escalado',
                 'Pod': f'suma-digito-{i}',
                 'Posicion': get_nombre_posicion(i),
-                'Estado': f'Pod {i+1} de {num_digitos}',
+                'Estado': f'Pod {i+1} de {num_pods}',
+                'Arranque': 'frio' if arranque_frio else 'caliente',
                 'Timestamp': time.strftime('%H:%M:%S')
             })
             
-            # Escalar a 1 réplica
-            if not orchestrator.escalar_pod(i, 1):
-                raise Exception(f"No se pudo escalar el pod suma-digito-{i}")
-            
             # Registrar espera
             eventos_escalado.append({
                 'Tipo': 'espera',
@@ -284,31 +1224,21 @@ def suma_n_digitos():
                 'Estado': 'Esperando pod Ready...',
                 'Timestamp': time.strftime('%H:%M:%S')
             })
-            
-            # Esperar a que el pod esté listo
-            if not orchestrator.esperar_pod_ready(i, timeout=60):
-                raise Exception(f"El pod suma-digito-{i} no está listo después de 60 segundos")
-
-            # Esperar a que el Service tenga endpoints propagados (si falla, continuar con reintentos HTTP)
-            if not orchestrator.esperar_endpoints_servicio(i, timeout=45):
-                registrar_terminal(
-                    f"⚠ El servicio suma-digito-{i} aún no expone endpoints; se continuará con reintentos de conexión.",
-                    'warning'
-                )
-            
-            # Establecer port-forward para este pod
-            if not orchestrator.establecer_port_forward(i):
-                raise Exception(f"No se pudo establecer port-forward para suma-digito-{i}")
-            
+
+            fases_arranque = activar_pod(i, arranque_frio)
+
             # Registrar completado
             tiempo_escalado = round(time.time() - inicio_escalado, 2)
-            eventos_escalado.append({
+            evento_listo = {
                 'Tipo': 'listo',
                 'Pod': f'suma-digito-{i}',
                 'Posicion': get_nombre_posicion(i),
                 'Estado': f'✓ Listo ({tiempo_escalado}s)',
                 'Timestamp': time.strftime('%H:%M:%S')
-            })
+            }
+            if fases_arranque:
+                evento_listo['Fases'] = {fase: round(segundos, 2) for fase, segundos in fases_arranque.items()}
+            eventos_escalado.append(evento_listo)
         
         registrar_terminal(f"✓ Todos los pods necesarios están listos y accesibles\n", 'success')
         
@@ -318,8 +1248,10 @@ def suma_n_digitos():
         carry_in = 0
         
         for i in range(num_digitos):
-            # Llamar al servicio de Kubernetes correspondiente
-            service_url, local_port = orchestrator.service_url(i)
+            deadlines.comprobar(f"llamada digito-{i}")
+            # Llamar al servicio de Kubernetes correspondiente (siempre el 0 en topología concentrada)
+            pod = 0 if topologia == CONCENTRADA else i
+            service_url, local_port = orchestrator.service_url(pod)
 
             payload = {
                 'NumberA': digitos_a[i],
@@ -327,7 +1259,7 @@ def suma_n_digitos():
                 'CarryIn': carry_in
             }
 
-            data_response = llamar_servicio_con_reintento(service_url, payload, i, intentos=8)
+            data_response = llamar_digito(pod, payload, service_url)
             result = data_response['Result']
             carry_out = data_response['CarryOut']
             
@@ -340,7 +1272,7 @@ def suma_n_digitos():
                 'CarryIn': carry_in,
                 'Result': result,
                 'CarryOut': carry_out,
-                'Pod': f'suma-digito-{i}',
+                'Pod': f'suma-digito-{pod}',
                 'Port': local_port
             })
             
@@ -359,31 +1291,50 @@ def suma_n_digitos():
             resultado_str += str(resultados[i])
         
         resultado_final = int(resultado_str)
+
+        # Verificación cruzada con el motor local
+        if VERIFY_RESULTS:
+            discrepancias = digit_engine.verificar_detalles(numberA, numberB, detalles)
+            if discrepancias:
+                verification_mismatches.inc()
+                for discrepancia in discrepancias:
+                    registrar_terminal(
+                        f"⚠ digito-{discrepancia['Posicion']} devolvió {discrepancia['Recibido']}, "
+                        f"se esperaba {discrepancia['Esperado']}",
+                        'warning'
+                    )
         
         response_data = {
             'Result': resultado_final,
             'CarryOut': carry_in,
             'NumDigitos': num_digitos,
-            'ContenedoresUsados': num_digitos,
+            'ContenedoresUsados': num_pods,
+            'Topologia': topologia,
             'Details': detalles,
             'EventosEscalado': eventos_escalado
         }
 
         # Incrementar counter de operaciones según pods usados
-        ops_by_pods.labels(pods=str(num_digitos)).inc()
+        ops_by_pods.labels(pods=str(num_pods)).inc()
+        topology_operations.labels(topologia=topologia).inc()
+        exito = True
 
         # Ejecutar scale-down en background para visualizar transición a zero
-        if AUTO_SCALE_DOWN:
+        if runtime_config['AUTO_SCALE_DOWN']:
             threading.Thread(
                 target=escalar_a_cero_en_background,
-                args=(num_digitos,),
+                args=(num_pods,),
                 daemon=True
             ).start()
         
-        response = make_response(jsonify(response_data), 200)
+        with tracer.span('serializacion'):
+            response = make_response(jsonify({campo: response_data[campo] for campo in campos}), 200)
         response.headers['Access-Control-Allow-Origin'] = '*'
         return response
         
+    except deadlines.DeadlineExceeded as e:
+        abandonada = True
+        return _respuesta_abandonada(e)
     except ValueError as e:
         registrar_terminal(f"Validation Error: {e}", 'error')
         response = make_response(jsonify({"error": str(e)}), 400)
@@ -394,6 +1345,363 @@ def suma_n_digitos():
         response = make_response(jsonify({"error": str(e)}), 500)
         response.headers['Access-Control-Allow-Origin'] = '*'
         return response
+    finally:
+        span.atributo('arranques_en_frio', arranques_en_frio)
+        if inicio_topologia is not None:
+            duracion = topology.fin(topologia, inicio_topologia, exito)
+            if exito:
+                operation_duration.labels(config=config.huella, topologia=topologia).observe(duracion)
+                slo.registrar('arranques_frio', malo=arranques_en_frio > 0)
+                if not arranques_en_frio:
+                    slo.registrar('latencia_caliente', duracion)
+        if operacion_registrada:
+            prewarmer.fin_operacion(num_pods, arranques_en_frio)
+        if reserva_digitos:
+            estado_compartido.liberar_digitos(reserva_digitos)
+        # Los pods de una operación abandonada quedan libres para el scale-down habitual
+        if abandonada and runtime_config['AUTO_SCALE_DOWN'] and num_pods:
+            threading.Thread(
+                target=escalar_a_cero_en_background,
+                args=(num_pods,),
+                daemon=True
+            ).start()
+
+@app.route('/suma-multiple', methods=['POST'])
+def suma_multiple():
+    """
+    Suma de K operandos ({Numbers: [...]}, cada uno entre 0 y 10^MAX_DIGITOS - 1) como
+    árbol de reducción sobre los pods de dígito: los pods se preparan una sola vez para
+    toda la reducción y las sumas por parejas de cada nivel se ejecutan a la vez, así que
+    la latencia crece con log2(K). La respuesta incluye la duración de cada nivel.
+    """
+    try:
+        deadline = deadline_peticion()
+    except ValueError as e:
+        return make_response(jsonify({"error": str(e)}), 400)
+
+    with tracer.span('suma_multiple', traceparent=request.headers.get('traceparent')) as span:
+        with deadlines.con_deadline(deadline):
+            response = _procesar_suma_multiple(span, deadline)
+        if response.status_code >= 400:
+            span.estado = 'error'
+    response.headers['X-Trace-Id'] = span.trace_id
+    return response
+
+def _sumar_con_pods(numero_a, numero_b, num_pods, llamadas):
+    """
+    Suma de dos operandos con la cascada de acarreo sobre los pods de dígito. Los pods
+    son sumadores de una cifra intercambiables: las posiciones de las sumas parciales
+    que superan MAX_DIGITOS cifras reutilizan el pod posicion % num_pods.
+    """
+    digitos_a, digitos_b = normalizar_digitos(get_digitos(numero_a), get_digitos(numero_b))
+    resultado = 0
+    carry = 0
+    with tracer.span('suma_par', posiciones=len(digitos_a)):
+        for posicion, (a, b) in enumerate(zip(digitos_a, digitos_b)):
+            data = llamar_digito(posicion % num_pods, {'NumberA': a, 'NumberB': b, 'CarryIn': carry})
+            resultado += data['Result'] * 10 ** posicion
+            carry = data['CarryOut']
+    llamadas.append(len(digitos_a))
+    return resultado + carry * 10 ** len(digitos_a)
+
+def _procesar_suma_multiple(span, deadline):
+    num_pods = 0
+    arranques_en_frio = 0
+    operacion_registrada = False
+    reserva_digitos = None
+    abandonada = False
+
+    try:
+        data = request.get_json(silent=True) or {}
+        numeros = data.get('Numbers')
+        if not isinstance(numeros, list) or not numeros:
+            raise ValueError("Numbers debe ser una lista no vacía de números")
+        if len(numeros) > MULTI_SUM_MAX_OPERANDS:
+            raise ValueError(f"Como máximo {MULTI_SUM_MAX_OPERANDS} operandos por suma")
+        numeros = [int(n) for n in numeros]
+        max_digitos = runtime_config['MAX_DIGITOS']
+        max_numero = 10 ** max_digitos - 1
+        if any(n < 0 or n > max_numero for n in numeros):
+            raise ValueError(f"Los números deben estar entre 0 y {max_numero}")
+
+        # Ninguna suma parcial supera al total: su longitud acota los pods necesarios
+        total_esperado = sum(numeros)
+        num_pods = min(max_digitos, len(str(total_esperado)))
+        span.atributo('operandos', len(numeros))
+        span.atributo('num_digitos', num_pods)
+
+        prewarmer.inicio_operacion(num_pods)
+        operacion_registrada = True
+        reserva_digitos = estado_compartido.adquirir_digitos(range(num_pods))
+        registrar_terminal(
+            f"Suma de {len(numeros)} operandos: {niveles_necesarios(len(numeros))} nivel(es) sobre {num_pods} pod(s)",
+            'info'
+        )
+
+        # Todos los pods se preparan a la vez y una sola vez para toda la reducción
+        inicio = time.perf_counter()
+        frios = [orchestrator.es_arranque_en_frio(digito) for digito in range(num_pods)]
+        arranques_en_frio = sum(frios)
+        for digito, frio in enumerate(frios):
+            digit_activations.labels(digito=str(digito), arranque='frio' if frio else 'caliente').inc()
+        preparaciones = [
+            _reduccion_executor.submit(contextvars.copy_context().run, activar_pod, digito, frio)
+            for digito, frio in enumerate(frios)
+        ]
+        try:
+            for preparacion in preparaciones:
+                preparacion.result()
+        except Exception:
+            deadline.cancelar("falló la preparación de otro pod")
+            raise
+        preparacion_ms = (time.perf_counter() - inicio) * 1000
+
+        llamadas = []
+        total, niveles = reducir_en_arbol(
+            numeros,
+            functools.partial(_sumar_con_pods, num_pods=num_pods, llamadas=llamadas),
+            executor=_reduccion_executor,
+            al_fallar=lambda error: deadline.cancelar(f"falló otra suma del nivel: {error}")
+        )
+
+        if VERIFY_RESULTS and total != total_esperado:
+            verification_mismatches.inc()
+            registrar_terminal(f"⚠ La reducción devolvió {total}, se esperaba {total_esperado}", 'warning')
+
+        if runtime_config['AUTO_SCALE_DOWN']:
+            threading.Thread(
+                target=escalar_a_cero_en_background,
+                args=(num_pods,),
+                daemon=True
+            ).start()
+
+        return jsonify({
+            'Result': total,
+            'NumOperandos': len(numeros),
+            'ContenedoresUsados': num_pods,
+            'LlamadasDigito': sum(llamadas),
+            'ArranquesFrio': arranques_en_frio,
+            'PreparacionMs': round(preparacion_ms, 3),
+            'Niveles': niveles,
+            'DuracionMs': round((time.perf_counter() - inicio) * 1000, 3)
+        })
+
+    except deadlines.DeadlineExceeded as e:
+        abandonada = True
+        return _respuesta_abandonada(e)
+    except (TypeError, ValueError) as e:
+        registrar_terminal(f"Validation Error: {e}", 'error')
+        return make_response(jsonify({"error": str(e)}), 400)
+    except Exception as e:
+        registrar_terminal(f"Error: {e}", 'error')
+        return make_response(jsonify({"error": str(e)}), 500)
+    finally:
+        if operacion_registrada:
+            prewarmer.fin_operacion(num_pods, arranques_en_frio)
+        if reserva_digitos:
+            estado_compartido.liberar_digitos(reserva_digitos)
+        if abandonada and runtime_config['AUTO_SCALE_DOWN'] and num_pods:
+            threading.Thread(
+                target=escalar_a_cero_en_background,
+                args=(num_pods,),
+                daemon=True
+            ).start()
+
+def _token_valido(esperado, recibido):
+    """Comparación en tiempo constante; sin token configurado nunca es válido."""
+    return bool(esperado) and recibido is not None and hmac.compare_digest(recibido.encode(), esperado.encode())
+
+def _rechazo_debug():
+    """
+    None si la petición puede usar los endpoints de depuración. Sin DEBUG_TOKEN
+    no existen (404); con él exigen la cabecera X-Debug-Token (403).
+    """
+    if not DEBUG_TOKEN:
+        return make_response(jsonify({'error': 'No encontrado'}), 404)
+    if not _token_valido(DEBUG_TOKEN, request.headers.get('X-Debug-Token')):
+        return make_response(jsonify({'error': 'No autorizado'}), 403)
+    return None
+
+@app.route('/readyz')
+def readyz():
+    """Readiness: listo cuando terminó la sincronización inicial con el clúster y no se está drenando."""
+    listo = _sincronizacion_completada.is_set() and not _shutdown.is_set()
+    return jsonify({
+        'Listo': listo,
+        'Sincronizado': _sincronizacion_completada.is_set(),
+        'Drenando': _shutdown.is_set(),
+        'DigitosCalientes': sorted(d for d, e in estado_sincronizacion['Digitos'].items() if e['Listas'] > 0),
+        'DuracionSincronizacionSegundos': estado_sincronizacion['DuracionSegundos'],
+        'Error': estado_sincronizacion['Error']
+    }), 200 if listo else 503
+
+def _admin_autorizado():
+    """Los cambios de configuración exigen CONFIG_ADMIN_TOKEN configurado y la cabecera X-Admin-Token."""
+    return _token_valido(CONFIG_ADMIN_TOKEN, request.headers.get('X-Admin-Token'))
+
+@app.route('/config', methods=['GET', 'POST'])
+def configuracion():
+    """
+    GET: ajustes en caliente vigentes, su versión y sus rangos.
+    POST: aplica {"AJUSTE": valor, ...} de una vez. Con la cabecera If-Match: <Version>
+    se rechaza (409) si mientras tanto se aplicó otro cambio. Con CONFIG_FILE el
+    cambio se persiste con su versión para que lo recojan los demás workers, y la
+    comparación se hace con la última versión persistida. Exige X-Admin-Token
+    y se rechaza siempre (403) si no hay CONFIG_ADMIN_TOKEN configurado.
+    """
+    if request.method == 'GET':
+        return jsonify({**runtime_config.describir(), 'Ficheros': [r for r in (CONFIG_DIR, CONFIG_FILE) if r]})
+    if not _admin_autorizado():
+        return make_response(jsonify({'error': 'No autorizado'}), 403)
+
+    try:
+        version_esperada = request.headers.get('If-Match')
+        version_esperada = int(version_esperada.strip('"')) if version_esperada else None
+    except ValueError:
+        return make_response(jsonify({'error': 'If-Match debe ser un número de versión'}), 400)
+
+    persistido = False
+    # Bajo el flock de CONFIG_FILE, If-Match se compara con la última versión persistida por cualquier worker
+    with runtime_config.exclusivo(CONFIG_FILE):
+        if CONFIG_FILE:
+            runtime_config.recargar(CONFIG_FILE)
+        try:
+            entrada = runtime_config.aplicar(
+                request.get_json(silent=True), origen='api',
+                autor=request.headers.get('X-Config-Author') or request.remote_addr,
+                version_esperada=version_esperada
+            )
+        except VersionConflict as e:
+            return make_response(jsonify({'error': str(e), 'Errores': e.errores}), 409)
+        except ConfigError as e:
+            return make_response(jsonify({'error': str(e), 'Errores': e.errores}), 400)
+
+        if entrada and CONFIG_FILE:
+            try:
+                runtime_config.persistir(CONFIG_FILE)
+                persistido = True
+            except OSError as e:
+                registrar_terminal(f"⚠ No se pudo persistir la configuración en {CONFIG_FILE}: {e}", 'warning')
+        config = runtime_config.actual()
+
+    return jsonify({
+        'Version': config.version,
+        'Huella': config.huella,
+        'Valores': dict(config.valores),
+        'Cambios': entrada['Cambios'] if entrada else {},
+        'Persistido': persistido
+    })
+
+@app.route('/config/auditoria')
+def configuracion_auditoria():
+    """Cambios de configuración aplicados y rechazados, del más reciente al más antiguo."""
+    limite = request.args.get('limit', type=int)
+    return jsonify({'Auditoria': runtime_config.auditoria(limite)})
+
+@app.route('/slo')
+def slo_estado():
+    """
+    Cumplimiento y consumo del presupuesto de error de cada SLO por ventana, con
+    el tráfico de todos los workers (Workers: procesos incluidos en el cálculo).
+    """
+    objetivos = slo.estado()
+    return jsonify({
+        'Objetivos': objetivos,
+        'Workers': slo.workers(),
+        'UmbralConsumo': SLO_BURN_RATE_THRESHOLD,
+        'EnRiesgo': sorted(n for n in objetivos if slo.en_riesgo(n, SLO_BURN_RATE_THRESHOLD))
+    })
+
+@app.route('/topologia')
+def topologia_estado():
+    """Topología activa de /suma-n-digitos y las medidas con las que se eligió."""
+    estado = topology.estado()
+    estado['Adaptativa'] = TOPOLOGY_ADAPTIVE
+    return jsonify(estado)
+
+@app.route('/shards')
+def shards():
+    """Estado de los shards del orquestador (vacío si no se configuró ORCHESTRATOR_SHARDS)."""
+    if not isinstance(orchestrator, ShardedOrchestrator):
+        return jsonify({'Sharding': False, 'Shards': []})
+    return jsonify({'Sharding': True, 'Shards': orchestrator.estado()})
+
+@app.route('/debug/traces')
+def debug_traces():
+    """Resumen de las últimas trazas guardadas en memoria."""
+    rechazo = _rechazo_debug()
+    if rechazo is not None:
+        return rechazo
+    return jsonify({'Trazas': trace_exporter.trazas()})
+
+@app.route('/debug/traces/<trace_id>')
+def debug_traza(trace_id):
+    """Spans de una traza y su ruta crítica."""
+    rechazo = _rechazo_debug()
+    if rechazo is not None:
+        return rechazo
+    traza = trace_exporter.traza(trace_id)
+    if traza is None:
+        return make_response(jsonify({'error': 'Traza no encontrada'}), 404)
+    return jsonify(traza)
+
+@app.route('/debug/profile/cpu')
+def debug_profile_cpu():
+    """Perfil de CPU por muestreo de todos los hilos durante ?seconds=N, en pilas colapsadas."""
+    rechazo = _rechazo_debug()
+    if rechazo is not None:
+        return rechazo
+    try:
+        segundos = float(request.args.get('seconds', '10'))
+        intervalo = float(request.args.get('interval_ms', '5')) / 1000
+    except ValueError:
+        return make_response(jsonify({'error': 'seconds e interval_ms deben ser numéricos'}), 400)
+    if not 0 < segundos <= PROFILING_MAX_SECONDS or intervalo <= 0:
+        return make_response(jsonify({'error': f'seconds debe estar entre 0 y {PROFILING_MAX_SECONDS}'}), 400)
+
+    try:
+        pilas, muestras = cpu_profiler.perfilar(segundos, intervalo)
+    except RuntimeError as e:
+        return make_response(jsonify({'error': str(e)}), 409)
+
+    response = make_response(formato_colapsado(pilas), 200)
+    response.mimetype = 'text/plain'
+    response.headers['X-Profile-Samples'] = str(muestras)
+    return response
+
+def _entero_acotado(valor, minimo, maximo):
+    """Entero de la petición acotado a [minimo, maximo]; ValueError si no es un entero."""
+    if isinstance(valor, bool) or not isinstance(valor, (int, str)):
+        raise ValueError(valor)
+    return max(minimo, min(int(valor), maximo))
+
+@app.route('/debug/profile/memory/<accion>', methods=['POST'])
+def debug_profile_memory(accion):
+    """Control de tracemalloc: start, snapshot (top y diff con la anterior) y stop."""
+    rechazo = _rechazo_debug()
+    if rechazo is not None:
+        return rechazo
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        data = {}
+    try:
+        frames = _entero_acotado(data.get('Frames', 10), 1, PROFILING_MAX_FRAMES)
+        limite = _entero_acotado(data.get('Limite', 25), 1, PROFILING_MAX_TOP)
+    except ValueError:
+        return make_response(jsonify({'error': 'Frames y Limite deben ser números enteros'}), 400)
+
+    if accion == 'start':
+        memory_profiler.iniciar(frames=frames)
+        return jsonify({'ok': True, 'Activo': True})
+    if accion == 'stop':
+        memory_profiler.detener()
+        return jsonify({'ok': True, 'Activo': False})
+    if accion == 'snapshot':
+        try:
+            return jsonify(memory_profiler.instantanea(limite=limite))
+        except RuntimeError as e:
+            return make_response(jsonify({'error': str(e)}), 409)
+    return make_response(jsonify({'error': f'Acción desconocida: {accion}'}), 404)
 
 def get_nombre_posicion(pos):
     """Retorna el nombre de la posición del dígito"""
@@ -405,7 +1713,67 @@ def get_nombre_posicion(pos):
     }
     return nombres.get(pos, f"Posicion-{pos}")
 
-if __name__ == '__main__':
+# Vista del clúster reconstruida al arrancar; /readyz responde 503 hasta que termina
+_sincronizacion_completada = threading.Event()
+estado_sincronizacion = {'Digitos': {}, 'DuracionSegundos': None, 'Error': None}
+
+def sincronizar_estado_cluster():
+    """
+    Adopta el estado existente del clúster (réplicas, pods listos, endpoints y
+    port-forward) para que los pods que siguen calientes tras un reinicio sirvan
+    sin volver a escalar. Si el clúster no responde se continúa asumiendo frío.
+    """
+    inicio = time.time()
+    try:
+        digitos = orchestrator.sincronizar_estado()
+        if digitos is None:
+            estado_sincronizacion['Error'] = "No se pudo leer el estado del clúster; se asume arranque en frío"
+        else:
+            estado_sincronizacion['Digitos'] = digitos
+    except Exception as e:
+        estado_sincronizacion['Error'] = str(e)
+        registrar_terminal(f"✗ Error sincronizando el estado del clúster: {e}", 'error')
+    finally:
+        estado_sincronizacion['DuracionSegundos'] = round(time.time() - inicio, 3)
+        _sincronizacion_completada.set()
+
+def iniciar_servicios_de_fondo():
+    """Arranca los bucles de fondo del proceso (precalentamiento, autoescalado, refresco de endpoints)."""
+    if STARTUP_SYNC_ENABLED:
+        threading.Thread(target=sincronizar_estado_cluster, daemon=True, name='sincronizacion-inicial').start()
+    else:
+        _sincronizacion_completada.set()
+    if PREWARM_ENABLED:
+        prewarmer.iniciar()
+    if AUTOSCALE_ENABLED:
+        autoscaler.iniciar(MAX_DIGITOS)
+    if orchestrator.balanceador:
+        orchestrator.balanceador.iniciar()
+    runtime_config.vigilar([CONFIG_DIR, CONFIG_FILE], intervalo=CONFIG_WATCH_SECONDS)
+    gauges_calculados.iniciar()
+    slo.iniciar(SLO_PUBLISH_SECONDS)
+
+def detener_servicios_de_fondo():
+    """Detiene los bucles de fondo y los port-forward del proceso (drenado ante SIGTERM)."""
+    _shutdown.set()
+    prewarmer.detener()
+    autoscaler.detener()
+    runtime_config.detener()
+    gauges_calculados.detener()
+    slo.detener()
+    binary_transport.cerrar()
+    if traffic_recorder is not None:
+        traffic_recorder.cerrar()
+    if orchestrator.balanceador:
+        orchestrator.balanceador.detener()
+    for digito in list(orchestrator.port_forward_processes):
+        orchestrator.detener_port_forward(digito)
+    # Últimos: vaciar las líneas pendientes en el estado compartido y en stdout
+    if estado_log_writer is not None:
+        estado_log_writer.detener()
+    stdout_writer.detener()
+
+def mostrar_banner(puerto=8080):
     registrar_terminal("=" * 60, 'info')
     registrar_terminal("Proxy de Calculadora con N Dígitos - Kubernetes", 'info')
     registrar_terminal("MODO: Escalado Dinámico (Scale-to-Zero)", 'info')
@@ -419,6 +1787,11 @@ if __name__ == '__main__':
             'info'
         )
     registrar_terminal("=" * 60, 'info')
-    registrar_terminal("Servidor corriendo en http://localhost:8080", 'success')
+    registrar_terminal(f"Servidor corriendo en http://localhost:{puerto}", 'success')
     registrar_terminal("=" * 60, 'info')
+
+if __name__ == '__main__':
+    # Servidor de desarrollo; en producción se usa gunicorn (ver gunicorn.conf.py)
+    mostrar_banner()
+    iniciar_servicios_de_fondo()
     app.run(host='0.0.0.0', port=8080, debug=False, use_reloader=False, threaded=True)
@@ -0,0 +1,62 @@
+"""
+Suma de K operandos como árbol de reducción equilibrado.
+
+Cada nivel suma por parejas los valores del nivel anterior (un valor impar pasa
+sin sumar al siguiente), así que hay ceil(log2 K) niveles y las sumas de un
+mismo nivel son independientes entre sí: se ejecutan a la vez en el executor
+indicado. La latencia crece con el número de niveles y no con K.
+"""
+import contextvars
+import math
+import time
+
+
+def niveles_necesarios(num_operandos):
+    """Niveles del árbol para num_operandos (0 con uno solo)."""
+    return math.ceil(math.log2(num_operandos)) if num_operandos > 1 else 0
+
+
+def reducir_en_arbol(operandos, sumar_par, executor=None, al_fallar=None):
+    """
+    Reduce operandos con sumar_par(a, b) y devuelve (total, niveles).
+
+    niveles es una lista de {Nivel, Sumas, DuracionMs}. Con executor, las sumas
+    de cada nivel se lanzan a la vez, cada una en una copia del contexto actual
+    (trazas y plazo de la operación). Si una falla, se cancelan las que aún no
+    han empezado, se llama a al_fallar(error) para que las ramas en curso
+    abandonen y se propaga el primer error.
+    """
+    valores = list(operandos)
+    if not valores:
+        raise ValueError("Se necesita al menos un operando")
+
+    niveles = []
+    while len(valores) > 1:
+        inicio = time.perf_counter()
+        pares = list(zip(valores[0::2], valores[1::2]))
+
+        if executor is None:
+            sumas = [sumar_par(a, b) for a, b in pares]
+        else:
+            futuros = [executor.submit(contextvars.copy_context().run, sumar_par, a, b) for a, b in pares]
+            sumas = []
+            try:
+                for futuro in futuros:
+                    sumas.append(futuro.result())
+            except Exception as error:
+                for pendiente in futuros:
+                    pendiente.cancel()
+                if al_fallar is not None:
+                    al_fallar(error)
+                raise
+
+        if len(valores) % 2:
+            sumas.append(valores[-1])
+        niveles.append({
+            'Nivel': len(niveles) + 1,
+            'Sumas': len(pares),
+            'DuracionMs': round((time.perf_counter() - inicio) * 1000, 3)
+        })
+        valores = sumas
+
+    return valores[0], niveles
@@ -0,0 +1,342 @@
+"""
+Ajustes de rendimiento del proxy modificables en caliente, validados y auditados.
+
+Cada ajuste declara tipo, rango y valor inicial. La configuración vigente es una
+instantánea inmutable (Configuracion) que se sustituye de una vez al aplicar un
+cambio: quien la lee obtiene siempre todos los valores de la misma versión, y
+las operaciones en curso ven el cambio en su siguiente lectura (siguiente
+reintento, siguiente espera) sin mezclar valores de dos versiones.
+
+Los cambios llegan por el endpoint de administración o desde ficheros vigilados:
+un JSON ({"AUTO_SCALE_DOWN": false, ...}) o un directorio con un fichero por
+ajuste, como monta Kubernetes un ConfigMap. Un cambio con cualquier valor
+inválido se rechaza entero. Aplicados y rechazados quedan en la auditoría.
+
+Version cuenta los cambios aplicados. Con un fichero compartido entre workers
+la versión viaja en él (clave _version): quien lo recarga adopta la versión
+persistida, y los cambios por API se hacen bajo un flock sobre el fichero
+(exclusivo()), recargando antes lo que otro worker haya escrito, así que
+If-Match compara siempre con la última versión persistida. Huella resume los
+valores y coincide entre workers con la misma configuración, así que es la que
+se usa como etiqueta de métricas.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from types import MappingProxyType
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin flock; en desarrollo hay un único proceso
+    fcntl = None
+
+VERDADEROS = ('true', '1', 'yes', 'si', 'on')
+FALSOS = ('false', '0', 'no', 'off')
+# Clave del fichero persistido con la versión de la configuración que contiene
+CLAVE_VERSION = '_version'
+
+
+class ConfigError(ValueError):
+    """Cambio de configuración rechazado; errores tiene un mensaje por ajuste."""
+
+    def __init__(self, errores):
+        self.errores = errores
+        super().__init__("; ".join(f"{nombre}: {mensaje}" for nombre, mensaje in errores.items()))
+
+
+class VersionConflict(ConfigError):
+    """El cambio se preparó sobre una versión que ya no es la vigente."""
+
+
+class Ajuste:
+    """Un ajuste de la configuración: tipo (bool, int o float), rango y valor inicial."""
+
+    def __init__(self, nombre, tipo, defecto, descripcion, minimo=None, maximo=None):
+        self.nombre = nombre
+        self.tipo = tipo
+        self.minimo = minimo
+        self.maximo = maximo
+        self.descripcion = descripcion
+        self.defecto = self.convertir(defecto)
+
+    def convertir(self, valor):
+        """Valor normalizado al tipo del ajuste; ValueError si no es válido o está fuera de rango."""
+        if self.tipo is bool:
+            if isinstance(valor, bool):
+                return valor
+            if isinstance(valor, str) and valor.strip().lower() in VERDADEROS + FALSOS:
+                return valor.strip().lower() in VERDADEROS
+            raise ValueError(f"se esperaba un booleano, no {valor!r}")
+
+        if isinstance(valor, bool):
+            raise ValueError(f"se esperaba un número, no {valor!r}")
+        try:
+            numero = float(valor.strip() if isinstance(valor, str) else valor)
+        except (TypeError, ValueError):
+            raise ValueError(f"se esperaba un número, no {valor!r}") from None
+        if self.tipo is int:
+            if not numero.is_integer():
+                raise ValueError(f"se esperaba un entero, no {valor!r}")
+            numero = int(numero)
+
+        if self.minimo is not None and numero < self.minimo:
+            raise ValueError(f"{numero:g} es menor que el mínimo {self.minimo:g}")
+        if self.maximo is not None and numero > self.maximo:
+            raise ValueError(f"{numero:g} es mayor que el máximo {self.maximo:g}")
+        return numero
+
+    def describir(self):
+        return {
+            'Tipo': self.tipo.__name__,
+            'Defecto': self.defecto,
+            'Minimo': self.minimo,
+            'Maximo': self.maximo,
+            'Descripcion': self.descripcion
+        }
+
+
+class Configuracion:
+    """Instantánea inmutable de los ajustes; config['NOMBRE'] devuelve su valor."""
+
+    __slots__ = ('version', 'huella', 'valores')
+
+    def __init__(self, version, valores):
+        self.version = version
+        self.valores = MappingProxyType(dict(valores))
+        contenido = json.dumps(dict(valores), sort_keys=True, separators=(',', ':'))
+        self.huella = hashlib.sha256(contenido.encode()).hexdigest()[:8]
+
+    def __getitem__(self, nombre):
+        return self.valores[nombre]
+
+
+def leer_fuente(ruta):
+    """
+    Lee los ajustes de un fichero JSON o de un directorio con un fichero por
+    ajuste (ConfigMap montado; se ignoran las entradas ocultas como ..data).
+    """
+    return _leer_con_version(ruta)[0]
+
+
+def _leer_con_version(ruta):
+    """(ajustes, versión) de ruta; la versión es None salvo en un fichero escrito por persistir()."""
+    if os.path.isdir(ruta):
+        valores = {}
+        for nombre in sorted(os.listdir(ruta)):
+            fichero = os.path.join(ruta, nombre)
+            if nombre.startswith('.') or not os.path.isfile(fichero):
+                continue
+            with open(fichero, encoding='utf-8') as entrada:
+                valores[nombre] = entrada.read().strip()
+        return valores, None
+
+    with open(ruta, encoding='utf-8') as entrada:
+        valores = json.load(entrada)
+    if not isinstance(valores, dict):
+        raise ValueError("el fichero debe contener un objeto JSON")
+    version = valores.pop(CLAVE_VERSION, None)
+    if version is not None and (isinstance(version, bool) or not isinstance(version, int)):
+        raise ValueError(f"{CLAVE_VERSION} debe ser un entero, no {version!r}")
+    return valores, version
+
+
+class RuntimeConfig:
+    """
+    Configuración vigente, cambios validados y su auditoría.
+
+    observador(entrada, config) se invoca tras cada cambio aplicado o rechazado
+    con la entrada de auditoría y la configuración vigente.
+    """
+
+    def __init__(self, ajustes, logger=None, observador=None, max_auditoria=200):
+        self.ajustes = {ajuste.nombre: ajuste for ajuste in ajustes}
+        self.logger = logger
+        self.observador = observador
+        self._lock = threading.Lock()
+        self._actual = Configuracion(1, {nombre: a.defecto for nombre, a in self.ajustes.items()})
+        self._auditoria = deque(maxlen=max_auditoria)
+        # Último contenido leído de cada fichero vigilado: solo se aplica lo que cambia en él
+        self._leido = {}
+        self._parar = threading.Event()
+        self._hilo = None
+
+    def actual(self):
+        return self._actual
+
+    def __getitem__(self, nombre):
+        return self._actual[nombre]
+
+    def validar(self, cambios):
+        """Cambios normalizados a su tipo; ConfigError con todos los errores si alguno no es válido."""
+        if not isinstance(cambios, dict):
+            raise ConfigError({'Cambios': "se esperaba un objeto con los ajustes a cambiar"})
+        errores = {}
+        normalizados = {}
+        for nombre, valor in cambios.items():
+            ajuste = self.ajustes.get(nombre)
+            if ajuste is None:
+                errores[nombre] = "ajuste desconocido"
+                continue
+            try:
+                normalizados[nombre] = ajuste.convertir(valor)
+            except ValueError as error:
+                errores[nombre] = str(error)
+        if errores:
+            raise ConfigError(errores)
+        return normalizados
+
+    def aplicar(self, cambios, origen, autor=None, version_esperada=None, version=None):
+        """
+        Valida y aplica cambios de una vez; devuelve la entrada de auditoría (None
+        si no cambia ningún valor). Con version_esperada, rechaza el cambio si
+        mientras tanto se aplicó otro (VersionConflict). version fija la versión
+        resultante (la de un fichero persistido); por defecto, la vigente + 1.
+        """
+        with self._lock:
+            anterior = self._actual
+            try:
+                if version_esperada is not None and version_esperada != anterior.version:
+                    raise VersionConflict({
+                        'Version': f"se esperaba la versión {version_esperada} y la vigente es {anterior.version}"
+                    })
+                normalizados = self.validar(cambios)
+            except ConfigError as error:
+                entrada = self._auditar(anterior, origen, autor, 'rechazado', errores=error.errores)
+                rechazo = error
+            else:
+                rechazo = None
+                diferencias = {
+                    nombre: {'Antes': anterior[nombre], 'Despues': valor}
+                    for nombre, valor in normalizados.items() if anterior[nombre] != valor
+                }
+                if not diferencias:
+                    if version is not None and version != anterior.version:
+                        self._actual = Configuracion(version, anterior.valores)
+                    return None
+                siguiente = anterior.version + 1 if version is None else version
+                self._actual = Configuracion(siguiente, {**anterior.valores, **normalizados})
+                entrada = self._auditar(self._actual, origen, autor, 'aplicado', cambios=diferencias)
+            vigente = self._actual
+
+        if rechazo is not None:
+            self._registrar(f"✗ Configuración rechazada ({origen}): {rechazo}", 'error')
+        else:
+            resumen = ", ".join(f"{n}={d['Despues']}" for n, d in entrada['Cambios'].items())
+            self._registrar(f"✓ Configuración v{vigente.version} ({origen}): {resumen}", 'success')
+        if self.observador:
+            self.observador(entrada, vigente)
+        if rechazo is not None:
+            raise rechazo
+        return entrada
+
+    def _auditar(self, config, origen, autor, resultado, cambios=None, errores=None):
+        entrada = {
+            'Version': config.version,
+            'Huella': config.huella,
+            'Timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'Origen': origen,
+            'Autor': autor,
+            'Resultado': resultado,
+            'Cambios': cambios or {},
+            'Errores': errores or {}
+        }
+        self._auditoria.append(entrada)
+        return entrada
+
+    def _registrar(self, mensaje, nivel):
+        if self.logger:
+            self.logger(mensaje, nivel)
+
+    def auditoria(self, limite=None):
+        """Entradas de auditoría de la más reciente a la más antigua."""
+        with self._lock:
+            entradas = list(reversed(self._auditoria))
+        return entradas[:limite] if limite else entradas
+
+    def describir(self):
+        config = self._actual
+        return {
+            'Version': config.version,
+            'Huella': config.huella,
+            'Valores': dict(config.valores),
+            'Ajustes': {nombre: ajuste.describir() for nombre, ajuste in self.ajustes.items()}
+        }
+
+    # ── Ficheros vigilados ──────────────────────────────────────────────────
+
+    def recargar(self, ruta):
+        """
+        Aplica el contenido de ruta si cambió desde la última lectura. Un fichero
+        ausente o ilegible se registra y se ignora; la configuración vigente se mantiene.
+        """
+        if not os.path.exists(ruta):
+            return None
+        try:
+            valores, version = _leer_con_version(ruta)
+        except (OSError, ValueError) as error:
+            if self._leido.get(ruta) != 'error':
+                self._registrar(f"✗ No se pudo leer la configuración de {ruta}: {error}", 'error')
+            self._leido[ruta] = 'error'
+            return None
+        if self._leido.get(ruta) == (valores, version):
+            return None
+        self._leido[ruta] = (valores, version)
+        try:
+            return self.aplicar(valores, origen='fichero', autor=ruta, version=version)
+        except ConfigError:
+            return None
+
+    def persistir(self, ruta):
+        """
+        Escribe los valores vigentes y su versión en ruta (JSON, reemplazo
+        atómico) para los demás workers. Entre workers, llamar dentro de exclusivo(ruta).
+        """
+        config = self._actual
+        valores = dict(config.valores)
+        temporal = f"{ruta}.{os.getpid()}.tmp"
+        with open(temporal, 'w', encoding='utf-8') as salida:
+            json.dump({**valores, CLAVE_VERSION: config.version}, salida, indent=2, sort_keys=True)
+        os.replace(temporal, ruta)
+        # El propio proceso ya tiene estos valores: no volver a aplicarlos al vigilar
+        self._leido[ruta] = (valores, config.version)
+
+    @contextmanager
+    def exclusivo(self, ruta):
+        """
+        Serializa entre workers (y entre hilos) recargar + aplicar + persistir
+        sobre ruta con un flock sobre ruta.lock. Sin ruta o sin flock no bloquea.
+        """
+        if not ruta or fcntl is None:
+            yield
+            return
+        try:
+            bloqueo = open(f"{ruta}.lock", 'a')
+        except OSError as error:
+            self._registrar(f"⚠ Sin bloqueo para la configuración en {ruta}: {error}", 'warning')
+            yield
+            return
+        with bloqueo:
+            fcntl.flock(bloqueo, fcntl.LOCK_EX)
+            yield
+
+    def vigilar(self, rutas, intervalo=5.0):
+        """Recarga periódicamente los ficheros indicados en un hilo de fondo."""
+        rutas = [ruta for ruta in rutas if ruta]
+        if not rutas or (self._hilo and self._hilo.is_alive()):
+            return
+        self._parar.clear()
+
+        def bucle():
+            while not self._parar.wait(intervalo):
+                for ruta in rutas:
+                    self.recargar(ruta)
+
+        self._hilo = threading.Thread(target=bucle, daemon=True, name='config-vigilancia')
+        self._hilo.start()
+
+    def detener(self):
+        self._parar.set()
@@ -407,6 +407,12 @@ function renderScalingEvents(eventos) {
             } else if (evento.Tipo === 'listo') {
                 prefix = '[OK]';
                 message = `${evento.Pod} listo ${evento.Estado}`;
+                if (evento.Fases) {
+                    const fases = Object.entries(evento.Fases)
+                        .map(([fase, segundos]) => `${fase}=${segundos}s`)
+                        .join(' ');
+                    message += ` [${fases}]`;
+                }
             }
 
             eventItem.textContent = `[${evento.Timestamp}] ${prefix} ${message}`;
@@ -453,6 +459,35 @@ function toggleAutoScroll() {
     }
 }
 
+// ── Precalentamiento de pods mientras el usuario escribe ────
+let prewarmTimer = null;
+let lastPrewarmAt = 0;
+let lastPrewarmDigits = 0;
+const PREWARM_DEBOUNCE_MS = 300;
+const PREWARM_MIN_INTERVAL_MS = 10000;
+
+function schedulePrewarm() {
+    clearTimeout(prewarmTimer);
+    prewarmTimer = setTimeout(() => {
+        const valores = ['numeroA', 'numeroB'].map(id => String(Math.abs(parseInt(document.getElementById(id).value) || 0)));
+        const digitos = Math.max(...valores.map(v => v.length));
+
+        // Solo repetir si se necesitan más pods o ha caducado la reserva anterior
+        const now = Date.now();
+        if (digitos <= lastPrewarmDigits && now - lastPrewarmAt < PREWARM_MIN_INTERVAL_MS) {
+            return;
+        }
+        lastPrewarmAt = now;
+        lastPrewarmDigits = digitos;
+
+        fetch('/prewarm', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ Digitos: digitos })
+        }).catch(() => {});
+    }, PREWARM_DEBOUNCE_MS);
+}
+
 // Permitir usar Enter para ejecutar la suma
 document.addEventListener('DOMContentLoaded', function() {
     connectTerminalStream();
@@ -464,5 +499,6 @@ document.addEventListener('DOMContentLoaded', function() {
                 sumar();
             }
         });
+        input.addEventListener('input', schedulePrewarm);
     });
 });
@@ -0,0 +1,329 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from k8s_orchestrator import ReadinessGates
+
+
+class ShardedOrchestrator:
+    """
+    Orquestador que reparte los deployments de dígito entre varios shards.
+
+    Cada shard es un orquestador con la interfaz de K8sOrchestrator (normalmente
+    uno por namespace o por contexto del kubeconfig). Cada dígito se ubica en un
+    shard al arrancarlo en frío: el de menor carga (réplicas conocidas más
+    dígitos ubicados) entre los sanos. Mientras tenga réplicas se mantiene allí y
+    el resto de llamadas del dígito (esperas, port-forward, service_url...) se
+    dirigen a ese shard.
+
+    Un shard que acumula fallos_para_degradar fallos seguidos queda degradado
+    durante enfriamiento_segundos: sus dígitos se reubican en el siguiente
+    arranque y escalar_pod prueba otro shard antes de fallar.
+    """
+
+    def __init__(self, shards, logger, max_digitos=4, fallos_para_degradar=2, enfriamiento_segundos=30):
+        self.shards = dict(shards)
+        if not self.shards:
+            raise ValueError("Se necesita al menos un shard")
+        self.logger = logger
+        self.max_digitos = max_digitos
+        self.fallos_para_degradar = fallos_para_degradar
+        self.enfriamiento_segundos = enfriamiento_segundos
+
+        self._lock = threading.Lock()
+        self._ubicacion = {}
+        self.compuertas = ReadinessGates()
+        self._estado = {nombre: {'fallos': 0, 'errores': 0, 'degradado_hasta': 0.0} for nombre in self.shards}
+
+        balanceadores = [o.balanceador for o in self.shards.values() if getattr(o, 'balanceador', None)]
+        self.balanceador = _BalanceadoresShards(balanceadores) if balanceadores else None
+
+    # ── Salud y carga por shard ─────────────────────────────────────────────
+
+    def sano(self, nombre, ahora=None):
+        ahora = time.time() if ahora is None else ahora
+        with self._lock:
+            return self._estado[nombre]['degradado_hasta'] <= ahora
+
+    def carga(self, nombre):
+        orquestador = self.shards[nombre]
+        with self._lock:
+            ubicados = sum(1 for shard in self._ubicacion.values() if shard == nombre)
+        return ubicados + sum(orquestador.replicas_actuales(d) for d in range(self.max_digitos))
+
+    def _registrar(self, nombre, exito):
+        with self._lock:
+            estado = self._estado[nombre]
+            if exito:
+                estado['fallos'] = 0
+                return
+            estado['fallos'] += 1
+            estado['errores'] += 1
+            degradar = estado['fallos'] >= self.fallos_para_degradar
+            if degradar:
+                estado['fallos'] = 0
+                estado['degradado_hasta'] = time.time() + self.enfriamiento_segundos
+        if degradar:
+            self.logger(
+                f"⚠ Shard {nombre} degradado durante {self.enfriamiento_segundos}s tras fallos consecutivos",
+                "warning"
+            )
+
+    def _candidatos(self, digito):
+        """Shards en orden de preferencia para el dígito: su shard actual si está sano y después por carga."""
+        with self._lock:
+            actual = self._ubicacion.get(digito)
+        sanos = [nombre for nombre in self.shards if self.sano(nombre)]
+        orden = sorted(sanos or self.shards, key=self.carga)
+        if actual in sanos:
+            orden.remove(actual)
+            orden.insert(0, actual)
+        return orden
+
+    def shard_de(self, digito):
+        """Shard en el que está ubicado el dígito (o el preferido si aún no tiene ubicación)."""
+        with self._lock:
+            actual = self._ubicacion.get(digito)
+        return actual if actual is not None else self._candidatos(digito)[0]
+
+    def _orquestador(self, digito):
+        return self.shards[self.shard_de(digito)]
+
+    def _shards_con_replicas(self, digito):
+        """Shards donde apagar el dígito: el suyo y los que aún le conocen réplicas (caché compartida)."""
+        with self._lock:
+            actual = self._ubicacion.get(digito)
+        return [n for n, o in self.shards.items() if n == actual or o.replicas_actuales(digito) > 0]
+
+    def estado(self):
+        with self._lock:
+            ubicacion = dict(self._ubicacion)
+            estados = {nombre: dict(estado) for nombre, estado in self._estado.items()}
+        ahora = time.time()
+        return [
+            {
+                'Shard': nombre,
+                'Sano': estados[nombre]['degradado_hasta'] <= ahora,
+                'FallosConsecutivos': estados[nombre]['fallos'],
+                'Errores': estados[nombre]['errores'],
+                'Carga': self.carga(nombre),
+                'Digitos': sorted(d for d, shard in ubicacion.items() if shard == nombre)
+            }
+            for nombre in self.shards
+        ]
+
+    # ── Interfaz de K8sOrchestrator ─────────────────────────────────────────
+
+    def escalar_pod(self, digito, replicas):
+        if replicas == 0:
+            destinos = self._shards_con_replicas(digito) or [self.shard_de(digito)]
+            ok = True
+            for nombre in destinos:
+                exito = self.shards[nombre].escalar_pod(digito, 0)
+                self._registrar(nombre, exito)
+                ok = ok and exito
+            if ok:
+                with self._lock:
+                    self._ubicacion.pop(digito, None)
+            return ok
+
+        for nombre in self._candidatos(digito):
+            exito = self.shards[nombre].escalar_pod(digito, replicas)
+            self._registrar(nombre, exito)
+            if exito:
+                with self._lock:
+                    anterior = self._ubicacion.get(digito)
+                    self._ubicacion[digito] = nombre
+                if anterior not in (None, nombre):
+                    self.logger(f"↪ suma-digito-{digito} reubicado del shard {anterior} al shard {nombre}", "warning")
+                return True
+        return False
+
+    def compartir_preparacion(self, digito, funcion):
+        # La compuerta es del orquestador compuesto: la preparación puede acabar en cualquier shard
+        return self.compuertas.ejecutar(digito, funcion)
+
+    def sincronizar_estado(self):
+        """
+        Sincroniza cada shard y ubica cada dígito caliente en el shard con más pods
+        listos. Devuelve la vista combinada por dígito (con 'Shard') o None si
+        ningún shard respondió.
+        """
+        combinado = None
+        for nombre, orquestador in self.shards.items():
+            estado = orquestador.sincronizar_estado()
+            self._registrar(nombre, estado is not None)
+            if estado is None:
+                continue
+            combinado = combinado or {}
+            for digito, datos in estado.items():
+                actual = combinado.get(digito)
+                if actual is None or datos['Listas'] > actual['Listas']:
+                    combinado[digito] = dict(datos, Shard=nombre)
+
+        with self._lock:
+            for digito, datos in (combinado or {}).items():
+                if datos['Listas'] > 0:
+                    self._ubicacion[digito] = datos['Shard']
+        return combinado
+
+    def replicas_actuales(self, digito):
+        with self._lock:
+            actual = self._ubicacion.get(digito)
+        return self.shards[actual].replicas_actuales(digito) if actual is not None else 0
+
+    def es_arranque_en_frio(self, digito):
+        with self._lock:
+            actual = self._ubicacion.get(digito)
+        if actual is None or not self.sano(actual):
+            return True
+        return self.shards[actual].es_arranque_en_frio(digito)
+
+    def esperar_pod_ready(self, digito, timeout=60):
+        nombre = self.shard_de(digito)
+        listo = self.shards[nombre].esperar_pod_ready(digito, timeout=timeout)
+        self._registrar(nombre, listo)
+        return listo
+
+    def esperar_endpoints_servicio(self, digito, timeout=30):
+        return self._orquestador(digito).esperar_endpoints_servicio(digito, timeout=timeout)
+
+    def establecer_port_forward(self, digito):
+        nombre = self.shard_de(digito)
+        ok = self.shards[nombre].establecer_port_forward(digito)
+        self._registrar(nombre, ok)
+        return ok
+
+    def fases_arranque(self, digito):
+        return self._orquestador(digito).fases_arranque(digito)
+
+    def listar_endpoints_listos(self, digito):
+        return self._orquestador(digito).listar_endpoints_listos(digito)
+
+    def service_url(self, digito):
+        return self._orquestador(digito).service_url(digito)
+
+    def kubectl(self, *argumentos, **opciones):
+        # Consultas auxiliares (documentación, Grafana): al clúster del primer shard
+        return next(iter(self.shards.values())).kubectl(*argumentos, **opciones)
+
+    def reportar_llamada(self, digito, url, exito, latencia=None):
+        return self._orquestador(digito).reportar_llamada(digito, url, exito, latencia)
+
+    @property
+    def port_forward_processes(self):
+        procesos = {}
+        for orquestador in self.shards.values():
+            procesos.update(orquestador.port_forward_processes)
+        return procesos
+
+    def detener_port_forward(self, digito):
+        for orquestador in self.shards.values():
+            if digito in orquestador.port_forward_processes:
+                orquestador.detener_port_forward(digito)
+
+    def escalar_deployments(self, objetivos, omitir_sin_cambios=True):
+        """
+        Escalado en bloque repartido por shard: los objetivos a 0 se aplican en
+        el shard del dígito y en los que aún le conocen réplicas (un dígito sin
+        ninguno ya está a 0 y no genera llamadas) y el resto en el shard de cada
+        dígito. Devuelve el resultado combinado con 'Shard' por deployment.
+        """
+        por_shard = {nombre: {} for nombre in self.shards}
+        for digito, replicas in objetivos.items():
+            if replicas == 0:
+                for nombre in self._shards_con_replicas(digito):
+                    por_shard[nombre][digito] = 0
+            else:
+                por_shard[self.shard_de(digito)][digito] = replicas
+
+        resultado = self._en_paralelo(
+            {n: o for n, o in por_shard.items() if o},
+            lambda nombre, objetivos_shard: self.shards[nombre].escalar_deployments(
+                objetivos_shard, omitir_sin_cambios=omitir_sin_cambios
+            )
+        )
+        with self._lock:
+            for digito, replicas in objetivos.items():
+                if replicas == 0:
+                    self._ubicacion.pop(digito, None)
+        return resultado
+
+    def escalar_a_cero(self, delay_seconds=2, excluir=None):
+        if delay_seconds > 0:
+            time.sleep(delay_seconds)
+        if callable(excluir):
+            excluir = excluir()
+        excluir = set(excluir or ())
+
+        for digito in sorted(excluir):
+            if digito < self.max_digitos:
+                self.logger(f"↺ suma-digito-{digito} se mantiene caliente", "info")
+        # Cada dígito solo en su shard y en los que aún le conocen réplicas: no una llamada por shard y dígito
+        resultado = self.escalar_deployments({d: 0 for d in range(self.max_digitos) if d not in excluir})
+        self.logger(
+            f"✓ Scale-down completado: {resultado['Escalados']} escalado(s), "
+            f"{resultado['Omitidos']} ya en cero, {resultado['Errores']} error(es) "
+            f"en {resultado['DuracionSegundos']}s",
+            "success" if resultado['Ok'] else "warning"
+        )
+        return resultado
+
+    def _en_paralelo(self, trabajos, funcion):
+        """Ejecuta funcion(nombre, argumento) en cada shard y combina los resultados de escalado."""
+        inicio = time.time()
+        deployments = []
+        if trabajos:
+            with ThreadPoolExecutor(max_workers=len(trabajos)) as executor:
+                futuros = {nombre: executor.submit(funcion, nombre, argumento) for nombre, argumento in trabajos.items()}
+                for nombre, futuro in futuros.items():
+                    try:
+                        resultado = futuro.result() or {}
+                        self._registrar(nombre, resultado.get('Ok', True))
+                        for item in resultado.get('Deployments', []):
+                            deployments.append(dict(item, Shard=nombre))
+                    except Exception as error:
+                        self._registrar(nombre, False)
+                        self.logger(f"✗ Error en el shard {nombre}: {error}", "error")
+                        deployments.append({'Shard': nombre, 'Estado': 'error', 'Error': str(error)})
+
+        return {
+            'Ok': all(d['Estado'] != 'error' for d in deployments),
+            'Escalados': sum(1 for d in deployments if d['Estado'] == 'escalado'),
+            'Omitidos': sum(1 for d in deployments if d['Estado'] == 'omitido'),
+            'Errores': sum(1 for d in deployments if d['Estado'] == 'error'),
+            'DuracionSegundos': round(time.time() - inicio, 3),
+            'Deployments': deployments
+        }
+
+
+class _BalanceadoresShards:
+    """Arranca y detiene a la vez los balanceadores de endpoints de todos los shards."""
+
+    def __init__(self, balanceadores):
+        self.balanceadores = balanceadores
+
+    def iniciar(self):
+        for balanceador in self.balanceadores:
+            balanceador.iniciar()
+
+    def detener(self):
+        for balanceador in self.balanceadores:
+            balanceador.detener()
+
+
+def parsear_shards(especificacion):
+    """
+    Interpreta ORCHESTRATOR_SHARDS: lista separada por comas de namespace[@contexto].
+    Devuelve [(nombre, namespace, contexto)] con nombre = [contexto/]namespace.
+    """
+    shards = []
+    for parte in (especificacion or "").split(","):
+        parte = parte.strip()
+        if not parte:
+            continue
+        namespace, _, contexto = parte.partition("@")
+        contexto = contexto or None
+        nombre = f"{contexto}/{namespace}" if contexto else namespace
+        shards.append((nombre, namespace, contexto))
+    return shards
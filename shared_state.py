@@ -0,0 +1,321 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+
+from terminal_log import LogRecord
+
+
+class MemoryStateBackend:
+    """
+    Estado compartido en memoria: válido para un único proceso (varios hilos).
+
+    Guarda el historial del terminal (LogRecord) en un deque acotado. Los cursores son
+    posiciones absolutas (total de líneas registradas), de modo que un lector
+    detecta la rotación del buffer y nunca reenvía ni pierde líneas en silencio.
+    """
+
+    def __init__(self, max_logs=1000, logs=None, lock=None):
+        self.logs = logs if logs is not None else deque(maxlen=max_logs)
+        self.lock = lock or threading.Lock()
+        self._total = len(self.logs)
+        self._reservas = {}
+        self._bloqueos = {}
+        self._replicas = {}
+        self._publicaciones = {}
+
+    # ── Historial del terminal ──────────────────────────────────────────────
+
+    def agregar_log(self, registro):
+        self.agregar_logs([registro])
+
+    def agregar_logs(self, registros):
+        with self.lock:
+            self.logs.extend(registros)
+            self._total += len(registros)
+
+    def logs_desde(self, cursor, limite=500):
+        """Devuelve (entradas posteriores a cursor, nuevo cursor)."""
+        with self.lock:
+            inicio = self._total - len(self.logs)
+            desde = max(cursor, inicio) if cursor <= self._total else inicio
+            entradas = list(self.logs)[desde - inicio:desde - inicio + limite]
+            return entradas, desde + len(entradas)
+
+    def limpiar_logs(self):
+        with self.lock:
+            self.logs.clear()
+
+    # ── Pods en uso ─────────────────────────────────────────────────────────
+
+    def adquirir_digitos(self, digitos, ttl=600):
+        token = uuid.uuid4().hex
+        with self.lock:
+            self._reservas[token] = (set(digitos), time.time() + ttl)
+        return token
+
+    def liberar_digitos(self, token):
+        with self.lock:
+            self._reservas.pop(token, None)
+
+    def digitos_en_uso(self):
+        ahora = time.time()
+        with self.lock:
+            en_uso = set()
+            for token, (digitos, expira) in list(self._reservas.items()):
+                if expira <= ahora:
+                    self._reservas.pop(token, None)
+                else:
+                    en_uso.update(digitos)
+            return en_uso
+
+    # ── Bloqueos con caducidad ──────────────────────────────────────────────
+
+    def intentar_bloqueo(self, nombre, propietario, ttl=60):
+        ahora = time.time()
+        with self.lock:
+            actual = self._bloqueos.get(nombre)
+            if actual and actual[1] > ahora and actual[0] != propietario:
+                return False
+            self._bloqueos[nombre] = (propietario, ahora + ttl)
+            return True
+
+    def liberar_bloqueo(self, nombre, propietario):
+        with self.lock:
+            actual = self._bloqueos.get(nombre)
+            if actual and actual[0] == propietario:
+                self._bloqueos.pop(nombre, None)
+
+    # ── Réplicas conocidas ──────────────────────────────────────────────────
+
+    def registrar_replicas(self, deployment, replicas):
+        with self.lock:
+            self._replicas[deployment] = replicas
+
+    def replicas(self, deployment):
+        """Últimas réplicas aplicadas al deployment por cualquier hilo, o None si no se conocen."""
+        with self.lock:
+            return self._replicas.get(deployment)
+
+    # ── Publicaciones por worker ────────────────────────────────────────────
+
+    def publicar(self, clave, propietario, valor, ttl=30):
+        """Sustituye el valor que propietario publica bajo clave; caduca si no se renueva en ttl."""
+        with self.lock:
+            self._publicaciones.setdefault(clave, {})[propietario] = (valor, time.time() + ttl)
+
+    def publicaciones(self, clave, excluir=None):
+        """{propietario: valor} de las publicaciones vigentes bajo clave, salvo la de excluir."""
+        ahora = time.time()
+        with self.lock:
+            vigentes = self._publicaciones.get(clave, {})
+            for propietario, (_, expira) in list(vigentes.items()):
+                if expira <= ahora:
+                    del vigentes[propietario]
+            return {p: valor for p, (valor, _) in vigentes.items() if p != excluir}
+
+
+class SQLiteStateBackend:
+    """
+    Estado compartido en un fichero SQLite local, para coordinar varios procesos
+    worker del mismo pod (historial del terminal, pods en uso, bloqueos,
+    réplicas conocidas de cada deployment y publicaciones por worker).
+
+    Cada hilo abre su propia conexión; el fichero usa WAL para que lectores y
+    escritores no se bloqueen entre sí.
+    """
+
+    def __init__(self, ruta, max_logs=1000):
+        self.ruta = ruta
+        self.max_logs = max_logs
+        self._local = threading.local()
+        self._inserciones = 0
+        self._lock_inserciones = threading.Lock()
+
+        self._conn().executescript(
+            """
+            CREATE TABLE IF NOT EXISTS logs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp REAL NOT NULL,
+                level TEXT NOT NULL,
+                message TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS reservas (
+                token TEXT NOT NULL,
+                digito INTEGER NOT NULL,
+                expira REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS reservas_token ON reservas (token);
+            CREATE TABLE IF NOT EXISTS bloqueos (
+                nombre TEXT PRIMARY KEY,
+                propietario TEXT NOT NULL,
+                expira REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS replicas (
+                deployment TEXT PRIMARY KEY,
+                replicas INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS publicaciones (
+                clave TEXT NOT NULL,
+                propietario TEXT NOT NULL,
+                valor TEXT NOT NULL,
+                expira REAL NOT NULL,
+                PRIMARY KEY (clave, propietario)
+            );
+            """
+        )
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.ruta, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _conexion(self):
+        return _Transaccion(self._conn())
+
+    # ── Historial del terminal ──────────────────────────────────────────────
+
+    def agregar_log(self, registro):
+        self.agregar_logs([registro])
+
+    def agregar_logs(self, registros):
+        """Inserta varias líneas en una sola transacción (una escritura al disco por lote)."""
+        with self._lock_inserciones:
+            antes = self._inserciones
+            self._inserciones += len(registros)
+            # Se recorta el historial cada 100 inserciones, aunque lleguen por lotes
+            recortar = antes // 100 != self._inserciones // 100
+        with self._conexion() as conn:
+            conn.executemany(
+                "INSERT INTO logs (timestamp, level, message) VALUES (?, ?, ?)",
+                [(registro.ts, registro.nivel, registro.mensaje) for registro in registros]
+            )
+            if recortar:
+                conn.execute(
+                    "DELETE FROM logs WHERE id <= (SELECT MAX(id) FROM logs) - ?",
+                    (self.max_logs,)
+                )
+
+    def logs_desde(self, cursor, limite=500):
+        with self._conexion() as conn:
+            if cursor <= 0:
+                # Primera lectura: últimas max_logs líneas, igual que el buffer en memoria
+                fila = conn.execute("SELECT COALESCE(MAX(id), 0) FROM logs").fetchone()
+                cursor = max(fila[0] - self.max_logs, 0)
+            filas = conn.execute(
+                "SELECT id, timestamp, level, message FROM logs WHERE id > ? ORDER BY id LIMIT ?",
+                (cursor, limite)
+            ).fetchall()
+
+        entradas = [LogRecord(float(ts), nivel, msg) for _, ts, nivel, msg in filas]
+        return entradas, (filas[-1][0] if filas else cursor)
+
+    def limpiar_logs(self):
+        with self._conexion() as conn:
+            conn.execute("DELETE FROM logs")
+
+    # ── Pods en uso ─────────────────────────────────────────────────────────
+
+    def adquirir_digitos(self, digitos, ttl=600):
+        token = uuid.uuid4().hex
+        expira = time.time() + ttl
+        with self._conexion() as conn:
+            conn.executemany(
+                "INSERT INTO reservas (token, digito, expira) VALUES (?, ?, ?)",
+                [(token, digito, expira) for digito in digitos]
+            )
+        return token
+
+    def liberar_digitos(self, token):
+        with self._conexion() as conn:
+            conn.execute("DELETE FROM reservas WHERE token = ?", (token,))
+
+    def digitos_en_uso(self):
+        with self._conexion() as conn:
+            conn.execute("DELETE FROM reservas WHERE expira <= ?", (time.time(),))
+            return {fila[0] for fila in conn.execute("SELECT DISTINCT digito FROM reservas")}
+
+    # ── Bloqueos con caducidad ──────────────────────────────────────────────
+
+    def intentar_bloqueo(self, nombre, propietario, ttl=60):
+        ahora = time.time()
+        with self._conexion() as conn:
+            cursor = conn.execute(
+                """
+                INSERT INTO bloqueos (nombre, propietario, expira) VALUES (?, ?, ?)
+                ON CONFLICT(nombre) DO UPDATE SET propietario = excluded.propietario, expira = excluded.expira
+                WHERE bloqueos.expira <= ? OR bloqueos.propietario = excluded.propietario
+                """,
+                (nombre, propietario, ahora + ttl, ahora)
+            )
+            return cursor.rowcount > 0
+
+    def liberar_bloqueo(self, nombre, propietario):
+        with self._conexion() as conn:
+            conn.execute("DELETE FROM bloqueos WHERE nombre = ? AND propietario = ?", (nombre, propietario))
+
+    # ── Réplicas conocidas ──────────────────────────────────────────────────
+
+    def registrar_replicas(self, deployment, replicas):
+        with self._conexion() as conn:
+            conn.execute(
+                "INSERT INTO replicas (deployment, replicas) VALUES (?, ?) "
+                "ON CONFLICT(deployment) DO UPDATE SET replicas = excluded.replicas",
+                (deployment, replicas)
+            )
+
+    def replicas(self, deployment):
+        # Lectura sin BEGIN IMMEDIATE: en WAL no espera a los escritores
+        fila = self._conn().execute("SELECT replicas FROM replicas WHERE deployment = ?", (deployment,)).fetchone()
+        return fila[0] if fila else None
+
+    # ── Publicaciones por worker ────────────────────────────────────────────
+
+    def publicar(self, clave, propietario, valor, ttl=30):
+        ahora = time.time()
+        with self._conexion() as conn:
+            conn.execute("DELETE FROM publicaciones WHERE expira <= ?", (ahora,))
+            conn.execute(
+                "INSERT INTO publicaciones (clave, propietario, valor, expira) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(clave, propietario) DO UPDATE SET valor = excluded.valor, expira = excluded.expira",
+                (clave, propietario, json.dumps(valor, separators=(',', ':')), ahora + ttl)
+            )
+
+    def publicaciones(self, clave, excluir=None):
+        filas = self._conn().execute(
+            "SELECT propietario, valor FROM publicaciones WHERE clave = ? AND expira > ? AND propietario != ?",
+            (clave, time.time(), excluir if excluir is not None else "")
+        ).fetchall()
+        return {propietario: json.loads(valor) for propietario, valor in filas}
+
+
+class _Transaccion:
+    """Context manager que envuelve una conexión SQLite en BEGIN IMMEDIATE / COMMIT."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
+
+
+def crear_estado_compartido(backend="memory", ruta=None, max_logs=1000, logs=None, lock=None):
+    """Construye el backend de estado compartido indicado ('memory' o 'sqlite')."""
+    if backend == "memory":
+        return MemoryStateBackend(max_logs=max_logs, logs=logs, lock=lock)
+    if backend == "sqlite":
+        ruta = ruta or os.path.join("/tmp", "suma-proxy-state.db")
+        return SQLiteStateBackend(ruta, max_logs=max_logs)
+    raise ValueError(f"Backend de estado compartido desconocido: {backend}")
@@ -0,0 +1,314 @@
+"""
+Objetivos de nivel de servicio (SLO) medidos dentro del proceso.
+
+Cada objetivo fija la fracción de eventos buenos exigida: "p95 de la latencia en
+caliente < 500 ms" es que al menos el 95 % de las operaciones en caliente tarden
+menos de 500 ms, y "arranques en frío < 20 %" que al menos el 80 % de las
+operaciones no necesiten ninguno. El resto (1 - objetivo) es el presupuesto de
+error; la tasa de consumo es la fracción de eventos malos dividida por ese
+presupuesto (1 = se consume justo al ritmo permitido).
+
+Los eventos se acumulan en ventanas deslizantes de memoria fija: cada ventana
+es un anillo de ranuras y, para los objetivos de latencia, cada ranura lleva un
+histograma de cubetas logarítmicas (estilo HDR, error relativo acotado) del que
+se obtienen los percentiles. Con varias ventanas (corta y larga) en_riesgo()
+exige que todas superen el umbral de consumo: la larga evita reaccionar a un
+pico aislado y la corta deja de avisar en cuanto el problema se corrige.
+
+Con varios workers cada uno mide su propio tráfico: publica periódicamente el
+resumen de sus ventanas en el estado compartido y, al consultar, suma los
+resúmenes vigentes de los demás a los suyos, de modo que consumo, en_riesgo()
+y estado() ven el tráfico de todo el pod (con el retraso del intervalo de
+publicación para la parte de los otros workers).
+"""
+import math
+import threading
+import time
+
+
+class HistogramaLog:
+    """
+    Histograma de cubetas logarítmicas entre minimo y maximo (segundos): el
+    percentil devuelto sobreestima el real como mucho en un factor (1 + precision).
+    """
+
+    def __init__(self, minimo=0.001, maximo=600.0, precision=0.02):
+        self.minimo = minimo
+        self.maximo = maximo
+        self._base = math.log1p(precision)
+        # Cubeta 0: valores <= minimo; la última recoge también los que superan maximo
+        self.cubetas = [0] * (math.ceil(math.log(maximo / minimo) / self._base) + 2)
+        self.total = 0
+
+    def _indice(self, valor):
+        if valor <= self.minimo:
+            return 0
+        return min(int(math.log(valor / self.minimo) / self._base) + 1, len(self.cubetas) - 1)
+
+    def _limite_superior(self, indice):
+        return min(self.minimo * math.exp(self._base * indice), self.maximo)
+
+    def registrar(self, valor):
+        self.cubetas[self._indice(valor)] += 1
+        self.total += 1
+
+    def combinar(self, otro):
+        for i, cuenta in enumerate(otro.cubetas):
+            if cuenta:
+                self.cubetas[i] += cuenta
+        self.total += otro.total
+
+    def sumar_exportado(self, cubetas):
+        """Suma las cubetas de exportar() de otro histograma con la misma configuración."""
+        for indice, cuenta in cubetas.items():
+            self.cubetas[min(int(indice), len(self.cubetas) - 1)] += cuenta
+            self.total += cuenta
+
+    def exportar(self):
+        """Cubetas no vacías como {índice (texto): cuenta}, serializable en JSON."""
+        return {str(indice): cuenta for indice, cuenta in enumerate(self.cubetas) if cuenta}
+
+    def limpiar(self):
+        self.cubetas = [0] * len(self.cubetas)
+        self.total = 0
+
+    def percentil(self, p):
+        """Valor por debajo del cual queda la fracción p de las muestras (None sin muestras)."""
+        if not self.total:
+            return None
+        rango = max(1, math.ceil(p * self.total))
+        acumulado = 0
+        for indice, cuenta in enumerate(self.cubetas):
+            acumulado += cuenta
+            if acumulado >= rango:
+                return self._limite_superior(indice)
+        return self.maximo
+
+
+class _Ranura:
+    __slots__ = ('periodo', 'eventos', 'malos', 'histograma')
+
+    def __init__(self, histograma):
+        self.periodo = None
+        self.eventos = 0
+        self.malos = 0
+        self.histograma = histograma
+
+
+class VentanaDeslizante:
+    """Eventos y eventos malos de los últimos segundos, en un anillo de ranuras de igual duración."""
+
+    def __init__(self, segundos, ranuras=10, histograma=None):
+        self.segundos = segundos
+        self._ancho = segundos / ranuras
+        self._ranuras = [_Ranura(histograma() if histograma else None) for _ in range(ranuras)]
+        self._plantilla = histograma
+
+    def _ranura(self, ahora):
+        periodo = int(ahora // self._ancho)
+        ranura = self._ranuras[periodo % len(self._ranuras)]
+        if ranura.periodo != periodo:
+            ranura.periodo = periodo
+            ranura.eventos = ranura.malos = 0
+            if ranura.histograma is not None:
+                ranura.histograma.limpiar()
+        return ranura
+
+    def registrar(self, ahora, malo, valor=None):
+        ranura = self._ranura(ahora)
+        ranura.eventos += 1
+        if malo:
+            ranura.malos += 1
+        if valor is not None and ranura.histograma is not None:
+            ranura.histograma.registrar(valor)
+
+    def resumen(self, ahora, con_histograma=False):
+        """(eventos, malos, histograma combinado o None) de las ranuras aún dentro de la ventana."""
+        actual = int(ahora // self._ancho)
+        eventos = malos = 0
+        histograma = self._plantilla() if con_histograma and self._plantilla else None
+        for ranura in self._ranuras:
+            if ranura.periodo is None or actual - ranura.periodo >= len(self._ranuras):
+                continue
+            eventos += ranura.eventos
+            malos += ranura.malos
+            if histograma is not None:
+                histograma.combinar(ranura.histograma)
+        return eventos, malos, histograma
+
+
+class Objetivo:
+    """
+    Un SLO: fracción objetivo de eventos buenos. Con umbral (segundos) es de
+    latencia: un evento es malo si su valor supera el umbral, y se informa el
+    percentil objetivo de la ventana.
+    """
+
+    def __init__(self, nombre, objetivo, umbral=None, descripcion=''):
+        if not 0 < objetivo < 1:
+            raise ValueError(f"El objetivo de {nombre} debe estar entre 0 y 1")
+        self.nombre = nombre
+        self.objetivo = objetivo
+        self.umbral = umbral
+        self.descripcion = descripcion
+
+    @property
+    def presupuesto(self):
+        return 1 - self.objetivo
+
+
+class SLOEngine:
+    """
+    Registro de eventos por objetivo y consulta de su tasa de consumo.
+
+    ventanas son los segundos de cada ventana deslizante (la primera es la que
+    se usa por defecto). Con menos de min_eventos en una ventana no se considera
+    que el objetivo esté en riesgo. Con estado_compartido, publicar() deja el
+    resumen de este proceso bajo propietario y las consultas suman los de los
+    demás workers.
+    """
+
+    CLAVE_PUBLICACION = 'slo'
+
+    def __init__(self, objetivos, ventanas=(300, 3600), ranuras=10, min_eventos=10, reloj=time.monotonic,
+                 estado_compartido=None, propietario=None, ttl_publicacion=30):
+        self.objetivos = {objetivo.nombre: objetivo for objetivo in objetivos}
+        self.ventanas = tuple(ventanas)
+        self.min_eventos = min_eventos
+        self._reloj = reloj
+        self.estado_compartido = estado_compartido
+        self.propietario = propietario
+        self.ttl_publicacion = ttl_publicacion
+        self._lock = threading.Lock()
+        self._detener = threading.Event()
+        self._hilo = None
+        self._ventanas = {
+            nombre: {
+                segundos: VentanaDeslizante(segundos, ranuras, HistogramaLog if objetivo.umbral is not None else None)
+                for segundos in self.ventanas
+            }
+            for nombre, objetivo in self.objetivos.items()
+        }
+
+    def registrar(self, nombre, valor=None, malo=None):
+        """Registra un evento: con valor (latencia en segundos) o indicando directamente si es malo."""
+        objetivo = self.objetivos[nombre]
+        if malo is None:
+            malo = objetivo.umbral is not None and valor is not None and valor > objetivo.umbral
+        ahora = self._reloj()
+        with self._lock:
+            for ventana in self._ventanas[nombre].values():
+                ventana.registrar(ahora, malo, valor)
+
+    def _resumen(self, nombre, segundos, con_histograma=False, remotos=()):
+        with self._lock:
+            eventos, malos, histograma = self._ventanas[nombre][segundos].resumen(self._reloj(), con_histograma)
+        for remoto in remotos:
+            ventana = remoto.get(nombre, {}).get(f"{segundos:g}")
+            if not ventana:
+                continue
+            eventos += ventana['Eventos']
+            malos += ventana['Malos']
+            if histograma is not None and ventana.get('Cubetas'):
+                histograma.sumar_exportado(ventana['Cubetas'])
+        return eventos, malos, histograma
+
+    def _remotos(self):
+        """Resúmenes vigentes publicados por los demás workers (ninguno sin estado compartido)."""
+        if self.estado_compartido is None:
+            return []
+        try:
+            return list(self.estado_compartido.publicaciones(self.CLAVE_PUBLICACION, excluir=self.propietario).values())
+        except Exception:
+            # Sin acceso al estado compartido se sigue con el tráfico de este proceso
+            return []
+
+    def exportar(self):
+        """Resumen de las ventanas de este proceso (eventos, malos y cubetas), serializable en JSON."""
+        ahora = self._reloj()
+        resumen = {}
+        with self._lock:
+            for nombre, ventanas in self._ventanas.items():
+                resumen[nombre] = {}
+                for segundos, ventana in ventanas.items():
+                    eventos, malos, histograma = ventana.resumen(ahora, con_histograma=True)
+                    resumen[nombre][f"{segundos:g}"] = {
+                        'Eventos': eventos,
+                        'Malos': malos,
+                        'Cubetas': histograma.exportar() if histograma is not None else None
+                    }
+        return resumen
+
+    def publicar(self):
+        if self.estado_compartido is not None:
+            self.estado_compartido.publicar(
+                self.CLAVE_PUBLICACION, self.propietario, self.exportar(), ttl=self.ttl_publicacion
+            )
+
+    def workers(self):
+        """Procesos cuyo tráfico entra en las consultas (este más los que han publicado)."""
+        return 1 + len(self._remotos())
+
+    def consumo(self, nombre, ventana=None):
+        """Tasa de consumo del presupuesto de error en la ventana (0 sin eventos)."""
+        eventos, malos, _ = self._resumen(nombre, ventana or self.ventanas[0], remotos=self._remotos())
+        if not eventos:
+            return 0.0
+        return (malos / eventos) / self.objetivos[nombre].presupuesto
+
+    def en_riesgo(self, nombre, umbral=1.0):
+        """True si el consumo supera umbral en todas las ventanas, cada una con eventos suficientes."""
+        remotos = self._remotos()
+        for segundos in self.ventanas:
+            eventos, malos, _ = self._resumen(nombre, segundos, remotos=remotos)
+            if eventos < self.min_eventos:
+                return False
+            if (malos / eventos) / self.objetivos[nombre].presupuesto <= umbral:
+                return False
+        return True
+
+    def estado(self):
+        remotos = self._remotos()
+        resultado = {}
+        for nombre, objetivo in self.objetivos.items():
+            ventanas = {}
+            for segundos in self.ventanas:
+                eventos, malos, histograma = self._resumen(nombre, segundos, con_histograma=True, remotos=remotos)
+                resumen = {
+                    'Eventos': eventos,
+                    'Malos': malos,
+                    'TasaError': round(malos / eventos, 4) if eventos else None,
+                    'Consumo': round((malos / eventos) / objetivo.presupuesto, 3) if eventos else 0.0
+                }
+                if histograma is not None:
+                    percentil = histograma.percentil(objetivo.objetivo)
+                    resumen['PercentilMs'] = round(percentil * 1000, 1) if percentil is not None else None
+                ventanas[f"{segundos:g}s"] = resumen
+            resultado[nombre] = {
+                'Descripcion': objetivo.descripcion,
+                'Objetivo': objetivo.objetivo,
+                'UmbralMs': round(objetivo.umbral * 1000, 1) if objetivo.umbral is not None else None,
+                'Ventanas': ventanas,
+                'Cumple': all(v['Consumo'] <= 1 for v in ventanas.values())
+            }
+        return resultado
+
+    # ── Publicación periódica ───────────────────────────────────────────────
+
+    def iniciar(self, intervalo=5.0):
+        if self.estado_compartido is None or (self._hilo and self._hilo.is_alive()):
+            return
+        self._detener.clear()
+
+        def bucle():
+            while not self._detener.wait(intervalo):
+                try:
+                    self.publicar()
+                except Exception:
+                    pass
+
+        self._hilo = threading.Thread(target=bucle, daemon=True, name='slo-publicacion')
+        self._hilo.start()
+
+    def detener(self):
+        self._detener.set()
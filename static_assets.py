@@ -0,0 +1,173 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+import time
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional: sin él solo se sirven variantes gzip
+    brotli = None
+
+
+class _Asset:
+    __slots__ = ('nombre', 'mtime_ns', 'tamano', 'hash', 'mimetype', 'variantes')
+
+    def __init__(self, nombre, mtime_ns, tamano, contenido, mimetype, comprimir_min_bytes):
+        self.nombre = nombre
+        self.mtime_ns = mtime_ns
+        self.tamano = tamano
+        self.hash = hashlib.sha256(contenido).hexdigest()[:16]
+        self.mimetype = mimetype
+        self.variantes = {'identity': contenido}
+        if len(contenido) >= comprimir_min_bytes:
+            self.variantes['gzip'] = gzip.compress(contenido, compresslevel=9, mtime=0)
+            if brotli is not None:
+                self.variantes['br'] = brotli.compress(contenido, quality=11)
+
+
+class StaticAssetCache:
+    """
+    Caché en memoria de los ficheros estáticos del frontend.
+
+    Cada fichero se guarda con sus variantes precomprimidas (gzip y, si está
+    instalado, brotli) y un ETag fuerte por variante. Los recursos referenciados
+    desde index.html se reescriben a URLs con el hash del contenido
+    (script.<hash>.js), que se sirven con Cache-Control inmutable; index.html se
+    sirve con revalidación. Si cambia el mtime o el tamaño de un fichero se
+    vuelve a cargar (se comprueba como mucho cada intervalo_comprobacion segundos).
+    """
+
+    def __init__(
+        self,
+        directorio,
+        archivos=('index.html', 'script.js', 'styles.css'),
+        pagina='index.html',
+        cache_control='no-cache',
+        cache_control_versionado='public, max-age=31536000, immutable',
+        comprimir_min_bytes=256,
+        intervalo_comprobacion=1.0
+    ):
+        self.directorio = directorio
+        self.archivos = tuple(archivos)
+        self.pagina = pagina
+        self.cache_control = cache_control
+        self.cache_control_versionado = cache_control_versionado
+        self.comprimir_min_bytes = comprimir_min_bytes
+        self.intervalo_comprobacion = intervalo_comprobacion
+
+        self._lock = threading.Lock()
+        self._assets = {}
+        self._comprobado = {}
+        self._hashes_pagina = None
+
+    def cargar(self):
+        """Carga (o recarga) todos los ficheros; se invoca al arrancar."""
+        for nombre in self.archivos:
+            self._asset(nombre, forzar=True)
+
+    def _asset(self, nombre, forzar=False):
+        ahora = time.monotonic()
+        actual = self._assets.get(nombre)
+        if actual is not None and not forzar and ahora - self._comprobado.get(nombre, 0) < self.intervalo_comprobacion:
+            return actual
+
+        ruta = os.path.join(self.directorio, nombre)
+        try:
+            estado = os.stat(ruta)
+        except OSError:
+            with self._lock:
+                self._assets.pop(nombre, None)
+            return None
+
+        self._comprobado[nombre] = ahora
+        if actual is not None and (actual.mtime_ns, actual.tamano) == (estado.st_mtime_ns, estado.st_size):
+            if nombre != self.pagina or self._hashes_pagina == self._hashes_dependencias():
+                return actual
+
+        with open(ruta, 'rb') as fichero:
+            contenido = fichero.read()
+        if nombre == self.pagina:
+            contenido = self._reescribir_pagina(contenido)
+
+        mimetype = mimetypes.guess_type(nombre)[0] or 'application/octet-stream'
+        if mimetype.startswith('text/') or mimetype == 'application/javascript':
+            mimetype += '; charset=utf-8'
+        asset = _Asset(nombre, estado.st_mtime_ns, estado.st_size, contenido, mimetype, self.comprimir_min_bytes)
+        with self._lock:
+            self._assets[nombre] = asset
+        return asset
+
+    def _hashes_dependencias(self):
+        return tuple(
+            getattr(self._asset(nombre), 'hash', None) for nombre in self.archivos if nombre != self.pagina
+        )
+
+    def _reescribir_pagina(self, contenido):
+        """Sustituye en la página las referencias a los recursos por sus URLs versionadas."""
+        texto = contenido.decode('utf-8')
+        for nombre in self.archivos:
+            if nombre == self.pagina:
+                continue
+            asset = self._asset(nombre)
+            if asset is not None:
+                patron = r'((?:src|href)=["\'])/?' + re.escape(nombre) + r'(["\'])'
+                texto = re.sub(patron, lambda m: m.group(1) + self.url(nombre) + m.group(2), texto)
+        self._hashes_pagina = self._hashes_dependencias()
+        return texto.encode('utf-8')
+
+    def url(self, nombre):
+        """URL versionada por contenido: /script.<hash>.js."""
+        asset = self._asset(nombre)
+        if asset is None:
+            return f"/{nombre}"
+        base, extension = os.path.splitext(nombre)
+        return f"/{base}.{asset.hash}{extension}"
+
+    def resolver(self, ruta):
+        """
+        Traduce la ruta pedida a (nombre del fichero, versionada) o (None, False)
+        si no es un recurso de la caché.
+        """
+        ruta = ruta.lstrip('/')
+        if ruta in self.archivos:
+            return ruta, False
+        coincidencia = re.match(r'^(.+)\.([0-9a-f]{16})(\.[^./]+)$', ruta)
+        if coincidencia and coincidencia.group(1) + coincidencia.group(3) in self.archivos:
+            nombre = coincidencia.group(1) + coincidencia.group(3)
+            asset = self._asset(nombre)
+            # Un hash antiguo sirve el contenido actual, pero sin cachearlo como inmutable
+            return nombre, asset is not None and asset.hash == coincidencia.group(2)
+        return None, False
+
+    def respuesta(self, nombre, if_none_match=None, accept_encoding='', versionada=False):
+        """
+        Devuelve (estado, cuerpo, cabeceras) para servir el recurso, o None si no existe.
+
+        Negocia la codificación (br > gzip > identity) y responde 304 si el ETag
+        de la variante coincide con If-None-Match.
+        """
+        asset = self._asset(nombre)
+        if asset is None:
+            return None
+
+        aceptadas = {parte.split(';')[0].strip() for parte in (accept_encoding or '').split(',')}
+        codificacion = next((c for c in ('br', 'gzip') if c in aceptadas and c in asset.variantes), 'identity')
+        etag = f'"{asset.hash}-{codificacion}"'
+
+        cabeceras = {
+            'ETag': etag,
+            'Cache-Control': self.cache_control_versionado if versionada else self.cache_control,
+            'Vary': 'Accept-Encoding'
+        }
+        if if_none_match and (if_none_match.strip() == '*' or etag in [e.strip() for e in if_none_match.split(',')]):
+            return 304, b'', cabeceras
+
+        cuerpo = asset.variantes[codificacion]
+        cabeceras['Content-Type'] = asset.mimetype
+        cabeceras['Content-Length'] = str(len(cuerpo))
+        if codificacion != 'identity':
+            cabeceras['Content-Encoding'] = codificacion
+        return 200, cuerpo, cabeceras
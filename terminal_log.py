@@ -0,0 +1,246 @@
+import glob
+import mmap
+import os
+import queue
+import struct
+import sys
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin flock; en desarrollo hay un único proceso
+    fcntl = None
+
+NIVELES = ('info', 'success', 'warning', 'error', 'debug')
+_CODIGO_NIVEL = {nivel: codigo for codigo, nivel in enumerate(NIVELES)}
+
+
+class LogRecord:
+    """
+    Línea del terminal: instante (epoch, float), nivel y mensaje.
+
+    El timestamp solo se formatea al enviarlo a un cliente (to_dict).
+    """
+
+    __slots__ = ('ts', 'nivel', 'mensaje')
+
+    def __init__(self, ts, nivel, mensaje):
+        self.ts = ts
+        self.nivel = nivel
+        self.mensaje = mensaje
+
+    def to_dict(self):
+        return {
+            'timestamp': time.strftime('%H:%M:%S', time.localtime(self.ts)),
+            'level': self.nivel,
+            'message': self.mensaje
+        }
+
+
+class BatchWriter:
+    """
+    Escritura en segundo plano: los hilos de petición solo encolan el elemento y
+    un hilo dedicado entrega lo acumulado a escribir_lote(lote) de una vez.
+    """
+
+    _FIN = object()
+
+    def __init__(self, escribir_lote=None, max_lote=1000, nombre='terminal-lotes'):
+        self.escribir_lote = escribir_lote
+        self.max_lote = max_lote
+        self.nombre = nombre
+        self._cola = queue.SimpleQueue()
+        self._hilo = None
+        self._lock = threading.Lock()
+
+    def escribir(self, elemento):
+        if self._hilo is None:
+            self._arrancar()
+        self._cola.put(elemento)
+
+    def _arrancar(self):
+        with self._lock:
+            if self._hilo is None:
+                self._hilo = threading.Thread(target=self._bucle, daemon=True, name=self.nombre)
+                self._hilo.start()
+
+    def _bucle(self):
+        while True:
+            lote = [self._cola.get()]
+            while len(lote) < self.max_lote:
+                try:
+                    lote.append(self._cola.get_nowait())
+                except queue.Empty:
+                    break
+
+            terminar = any(elemento is self._FIN for elemento in lote)
+            elementos = [elemento for elemento in lote if elemento is not self._FIN]
+            if elementos:
+                try:
+                    self.escribir_lote(elementos)
+                except Exception:
+                    pass
+            if terminar:
+                return
+
+    def detener(self, timeout=2):
+        """Escribe lo pendiente y detiene el hilo."""
+        with self._lock:
+            hilo, self._hilo = self._hilo, None
+        if hilo is not None:
+            self._cola.put(self._FIN)
+            hilo.join(timeout)
+
+
+class StdoutWriter(BatchWriter):
+    """Escritor de stdout en segundo plano, con un único flush por lote de líneas."""
+
+    def __init__(self, stream=None, max_lote=1000):
+        super().__init__(self._escribir_lineas, max_lote, nombre='terminal-stdout')
+        self.stream = stream
+
+    def _escribir_lineas(self, lineas):
+        stream = self.stream or sys.stdout
+        stream.write("\n".join(lineas) + "\n")
+        stream.flush()
+
+
+class LogSpill:
+    """
+    Historial largo del terminal en un fichero de segmento mapeado en memoria.
+
+    El fichero es un anillo de `capacidad` ranuras de tamaño fijo (los mensajes
+    más largos se truncan), de modo que su tamaño y la memoria que ocupa son
+    constantes. Como las líneas se añaden en orden temporal, buscar un rango de
+    tiempo es una búsqueda binaria sobre el anillo.
+
+    Formato: cabecera de 64 bytes (magic, tamaño de ranura, capacidad, total
+    escritas) y ranuras con ts (f64), nivel (u8), longitud (u16) y mensaje UTF-8.
+    """
+
+    MAGIC = b'SUMALOG1'
+    _CABECERA = struct.Struct('<8sIIQ')
+    _RANURA = struct.Struct('<dBH')
+    TAM_CABECERA = 64
+
+    def __init__(self, ruta, capacidad=100000, tam_ranura=256, solo_lectura=False):
+        self.ruta = ruta
+        self._lock = threading.Lock()
+        # Fichero .lock que reserva la ranura del segmento (abrir_segmento_de_worker)
+        self.bloqueo = None
+        tam_fichero = self.TAM_CABECERA + capacidad * tam_ranura
+
+        if solo_lectura:
+            with open(ruta, 'rb') as fichero:
+                self._mmap = mmap.mmap(fichero.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            existe = os.path.exists(ruta) and os.path.getsize(ruta) == tam_fichero
+            with open(ruta, 'r+b' if existe else 'w+b') as fichero:
+                if not existe:
+                    fichero.truncate(tam_fichero)
+                self._mmap = mmap.mmap(fichero.fileno(), tam_fichero)
+
+        magic, self.tam_ranura, self.capacidad, _ = self._CABECERA.unpack_from(self._mmap, 0)
+        if magic != self.MAGIC:
+            if solo_lectura:
+                raise ValueError(f"{ruta} no es un segmento de log")
+            self.tam_ranura, self.capacidad = tam_ranura, capacidad
+            self._CABECERA.pack_into(self._mmap, 0, self.MAGIC, tam_ranura, capacidad, 0)
+
+        self._max_mensaje = self.tam_ranura - self._RANURA.size
+
+    @property
+    def total(self):
+        return self._CABECERA.unpack_from(self._mmap, 0)[3]
+
+    def agregar(self, registro):
+        mensaje = registro.mensaje.encode('utf-8')[:self._max_mensaje]
+        with self._lock:
+            total = self.total
+            desplazamiento = self.TAM_CABECERA + (total % self.capacidad) * self.tam_ranura
+            self._RANURA.pack_into(
+                self._mmap, desplazamiento, registro.ts, _CODIGO_NIVEL.get(registro.nivel, 0), len(mensaje)
+            )
+            self._mmap[desplazamiento + self._RANURA.size:desplazamiento + self._RANURA.size + len(mensaje)] = mensaje
+            # El total se publica después de la ranura para que un lector no vea una ranura a medias
+            self._CABECERA.pack_into(self._mmap, 0, self.MAGIC, self.tam_ranura, self.capacidad, total + 1)
+
+    def _leer(self, indice):
+        desplazamiento = self.TAM_CABECERA + (indice % self.capacidad) * self.tam_ranura
+        ts, codigo, longitud = self._RANURA.unpack_from(self._mmap, desplazamiento)
+        inicio = desplazamiento + self._RANURA.size
+        mensaje = self._mmap[inicio:inicio + longitud].decode('utf-8', errors='replace')
+        return LogRecord(ts, NIVELES[codigo] if codigo < len(NIVELES) else 'info', mensaje)
+
+    def _ts(self, indice):
+        return self._RANURA.unpack_from(self._mmap, self.TAM_CABECERA + (indice % self.capacidad) * self.tam_ranura)[0]
+
+    def buscar(self, desde=None, hasta=None, limite=1000):
+        """Registros con desde <= ts <= hasta (extremos opcionales), en orden temporal."""
+        total = self.total
+        primero = max(total - self.capacidad, 0)
+
+        bajo, alto = primero, total
+        if desde is not None:
+            while bajo < alto:
+                medio = (bajo + alto) // 2
+                if self._ts(medio) < desde:
+                    bajo = medio + 1
+                else:
+                    alto = medio
+
+        registros = []
+        for indice in range(bajo, total):
+            registro = self._leer(indice)
+            if hasta is not None and registro.ts > hasta:
+                break
+            registros.append(registro)
+            if len(registros) >= limite:
+                break
+        return registros
+
+    def cerrar(self):
+        self._mmap.close()
+        if self.bloqueo is not None:
+            self.bloqueo.close()
+
+
+def abrir_segmento_de_worker(directorio, capacidad=100000, max_ranuras=64):
+    """
+    LogSpill terminal-<ranura>.log en la primera ranura libre del directorio.
+
+    Cada worker retiene un flock sobre terminal-<ranura>.lock mientras vive: un
+    worker que sustituye a otro ya terminado reutiliza su segmento (es un anillo
+    de tamaño fijo), así que el directorio nunca tiene más segmentos que workers
+    simultáneos. Sin flock (Windows) se usa el pid del proceso.
+    """
+    if fcntl is not None:
+        for ranura in range(max_ranuras):
+            bloqueo = open(os.path.join(directorio, f'terminal-{ranura}.lock'), 'a')
+            try:
+                fcntl.flock(bloqueo, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                bloqueo.close()
+                continue
+            segmento = LogSpill(os.path.join(directorio, f'terminal-{ranura}.log'), capacidad=capacidad)
+            # El flock se libera al cerrar el segmento o al terminar el proceso
+            segmento.bloqueo = bloqueo
+            return segmento
+    return LogSpill(os.path.join(directorio, f'terminal-{os.getpid()}.log'), capacidad=capacidad)
+
+
+def buscar_en_directorio(directorio, desde=None, hasta=None, limite=1000):
+    """Busca en todos los segmentos terminal-*.log del directorio (uno por worker) y mezcla por tiempo."""
+    registros = []
+    for ruta in glob.glob(os.path.join(directorio, 'terminal-*.log')):
+        try:
+            segmento = LogSpill(ruta, solo_lectura=True)
+        except (OSError, ValueError):
+            continue
+        try:
+            registros.extend(segmento.buscar(desde, hasta, limite))
+        finally:
+            segmento.cerrar()
+    registros.sort(key=lambda registro: registro.ts)
+    return registros[:limite]
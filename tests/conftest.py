@@ -24,6 +24,11 @@ mock_orchestrator_instance.esperar_endpoints_servicio.return_value = True
 mock_orchestrator_instance.establecer_port_forward.return_value = True
 mock_orchestrator_instance.service_url.return_value = ("http://localhost:31000", 31000)
 mock_orchestrator_instance.escalar_a_cero.return_value = None
+mock_orchestrator_instance.es_arranque_en_frio.return_value = True
+mock_orchestrator_instance.replicas_actuales.return_value = 0
+mock_orchestrator_instance.fases_arranque.return_value = {}
+mock_orchestrator_instance.compartir_preparacion.side_effect = lambda digito, funcion: funcion()
+mock_orchestrator_instance.sincronizar_estado.return_value = {}
 
 _orch_patcher = patch("k8s_orchestrator.K8sOrchestrator", return_value=mock_orchestrator_instance)
 _orch_patcher.start()
@@ -32,14 +37,54 @@ _orch_patcher.start()
 import proxy as proxy_module  # noqa: E402
 
 
+# ---------------------------------------------------------------------------
+# El terminal escribe en stdout desde un hilo propio: sin vaciarlo, sus líneas
+# salen cuando pytest ya no captura (entre fases o al terminar la sesión). Se
+# vacía y se detiene al final de cada fase, aún dentro de la captura; vuelve a
+# arrancar con la siguiente línea.
+# ---------------------------------------------------------------------------
+def _vaciar_stdout():
+    proxy_module.stdout_writer.detener()
+
+
+@pytest.hookimpl(hookwrapper=True, trylast=True)
+def pytest_runtest_setup(item):
+    yield
+    _vaciar_stdout()
+
+
+@pytest.hookimpl(hookwrapper=True, trylast=True)
+def pytest_runtest_call(item):
+    yield
+    _vaciar_stdout()
+
+
+@pytest.hookimpl(hookwrapper=True, trylast=True)
+def pytest_runtest_teardown(item, nextitem):
+    yield
+    _vaciar_stdout()
+
+
 @pytest.fixture(scope="session")
 def app():
     """Flask app configurada para tests (sin reloader, sin debug)."""
     proxy_module.app.config["TESTING"] = True
-    proxy_module.AUTO_SCALE_DOWN = False   # evitar threads de background en tests
+    proxy_module.runtime_config.aplicar({"AUTO_SCALE_DOWN": False}, origen="tests")  # sin threads de background
+    proxy_module.HEDGING_ENABLED = False   # evitar peticiones duplicadas no deterministas
+    proxy_module.TOPOLOGY_ADAPTIVE = False # un pod por dígito salvo en los tests de topología
+    proxy_module.SLO_SCALE_DOWN_GUARD = False  # los mocks arrancan en frío en cada operación
     yield proxy_module.app
 
 
+@pytest.fixture()
+def ajustar_config(app):
+    """Aplica ajustes en caliente al proxy y restaura los valores anteriores al terminar el test."""
+    config = proxy_module.runtime_config
+    anteriores = dict(config.actual().valores)
+    yield lambda **cambios: config.aplicar(cambios, origen="tests")
+    config.aplicar(anteriores, origen="tests")
+
+
 @pytest.fixture()
 def client(app):
     """Flask test client."""
@@ -55,6 +100,11 @@ def mock_orch():
     mock_orchestrator_instance.esperar_pod_ready.return_value = True
     mock_orchestrator_instance.esperar_endpoints_servicio.return_value = True
     mock_orchestrator_instance.establecer_port_forward.return_value = True
+    mock_orchestrator_instance.es_arranque_en_frio.return_value = True
+    mock_orchestrator_instance.replicas_actuales.return_value = 0
+    mock_orchestrator_instance.fases_arranque.return_value = {}
+    mock_orchestrator_instance.compartir_preparacion.side_effect = lambda digito, funcion: funcion()
+    mock_orchestrator_instance.sincronizar_estado.return_value = {}
     # Limpiar side_effect para que return_value sea efectivo en todos los tests
     mock_orchestrator_instance.service_url.side_effect = None
     mock_orchestrator_instance.service_url.return_value = ("http://localhost:31000", 31000)
@@ -0,0 +1,147 @@
+"""
+Tests unitarios para api_budget.py.
+
+Cobertura:
+    - sin límite            : ejecución inmediata, observador y recuento
+    - token bucket          : ráfaga inmediata y espera hasta el siguiente token
+    - prioridades           : ALTA adelanta a BAJA en la cola
+    - fusión                : operaciones con la misma clave aún en cola aplican la última
+    - deadline              : la espera en cola y la de una operación fusionada respetan el plazo
+"""
+import threading
+import time
+
+import pytest
+
+from api_budget import ALTA, BAJA, ApiBudget, _Operacion
+from deadlines import Deadline, DeadlineExceeded, con_deadline
+
+
+def _esperar(condicion, timeout=2):
+    limite = time.monotonic() + timeout
+    while not condicion():
+        assert time.monotonic() < limite, "la condición no se cumplió a tiempo"
+        time.sleep(0.005)
+
+
+def _en_hilo(funcion, *args, **kwargs):
+    resultado = {}
+
+    def ejecutar():
+        try:
+            resultado['valor'] = funcion(*args, **kwargs)
+        except Exception as error:
+            resultado['error'] = error
+
+    hilo = threading.Thread(target=ejecutar)
+    hilo.start()
+    return hilo, resultado
+
+
+class TestSinLimite:
+    def test_ejecuta_inmediatamente(self):
+        observaciones = []
+        presupuesto = ApiBudget(tasa=0, observador=lambda *o: observaciones.append(o))
+
+        assert presupuesto.ejecutar(lambda: 42, BAJA) == 42
+        assert observaciones == [(BAJA, 0.0, 0)]
+        assert presupuesto.estado()['Activo'] is False
+        assert presupuesto.estado()['Ejecutadas']['baja'] == 1
+
+
+class TestTokenBucket:
+    def test_rafaga_y_espera(self):
+        esperas = []
+        presupuesto = ApiBudget(tasa=10, rafaga=2, observador=lambda p, espera, f: esperas.append(espera))
+
+        for _ in range(3):
+            presupuesto.ejecutar(lambda: None)
+
+        assert esperas[0] < 0.01 and esperas[1] < 0.01
+        assert 0.05 < esperas[2] < 0.5
+
+    def test_errores_se_propagan(self):
+        def fallar():
+            raise RuntimeError("kubectl falló")
+
+        with pytest.raises(RuntimeError):
+            ApiBudget(tasa=10).ejecutar(fallar)
+
+
+class TestPrioridades:
+    def test_alta_adelanta_a_baja(self):
+        presupuesto = ApiBudget(tasa=5, rafaga=1)
+        presupuesto.ejecutar(lambda: None)
+        orden = []
+
+        baja, _ = _en_hilo(presupuesto.ejecutar, lambda: orden.append('scale-down'), BAJA)
+        _esperar(lambda: presupuesto.en_cola(BAJA) == 1)
+        alta, _ = _en_hilo(presupuesto.ejecutar, lambda: orden.append('scale-up'), ALTA)
+        baja.join(timeout=3)
+        alta.join(timeout=3)
+
+        assert orden == ['scale-up', 'scale-down']
+
+
+class TestFusion:
+    def test_ultima_operacion_encolada_gana(self):
+        fusionadas = []
+        presupuesto = ApiBudget(tasa=5, rafaga=1, observador=lambda p, e, f: fusionadas.append(f))
+        presupuesto.ejecutar(lambda: None)
+        ejecutadas = []
+
+        def escalar(replicas):
+            def kubectl():
+                ejecutadas.append(replicas)
+                return replicas
+            return kubectl
+
+        a, resultado_a = _en_hilo(presupuesto.ejecutar, escalar(3), ALTA, clave="suma-digito-0")
+        _esperar(lambda: presupuesto.en_cola() == 1)
+        b, resultado_b = _en_hilo(presupuesto.ejecutar, escalar(1), ALTA, clave="suma-digito-0")
+        a.join(timeout=3)
+        b.join(timeout=3)
+
+        assert ejecutadas == [1]
+        assert resultado_a['valor'] == resultado_b['valor'] == 1
+        assert presupuesto.fusionadas == 1
+        assert fusionadas[-1] == 1
+
+    def test_claves_distintas_no_se_fusionan(self):
+        presupuesto = ApiBudget(tasa=50, rafaga=1)
+        ejecutadas = []
+        hilos = [
+            _en_hilo(presupuesto.ejecutar, lambda d=d: ejecutadas.append(d), clave=f"suma-digito-{d}")[0]
+            for d in range(3)
+        ]
+        for hilo in hilos:
+            hilo.join(timeout=3)
+
+        assert sorted(ejecutadas) == [0, 1, 2]
+
+
+class TestDeadline:
+    def test_espera_en_cola_dentro_del_plazo(self):
+        presupuesto = ApiBudget(tasa=0.5, rafaga=1)
+        presupuesto.ejecutar(lambda: None)
+
+        inicio = time.monotonic()
+        with con_deadline(Deadline(0.1)):
+            with pytest.raises(DeadlineExceeded):
+                presupuesto.ejecutar(lambda: None, clave="suma-digito-0")
+
+        assert time.monotonic() - inicio < 1
+        assert presupuesto.en_cola() == 0
+
+    def test_espera_de_una_operacion_fusionada_dentro_del_plazo(self):
+        presupuesto = ApiBudget(tasa=1, rafaga=1)
+        # Operación fusionada que ejecuta otro hilo y no termina
+        operacion = _Operacion(lambda: None, ALTA, 0, "suma-digito-0")
+        operacion.estado = 'en_curso'
+
+        inicio = time.monotonic()
+        with con_deadline(Deadline(0.1)):
+            with pytest.raises(DeadlineExceeded):
+                presupuesto._esperar_resultado(operacion)
+
+        assert time.monotonic() - inicio < 1
@@ -0,0 +1,169 @@
+"""
+Tests unitarios para autoscaling.py.
+
+Cobertura:
+    - inicio_llamada() / fin_llamada() : llamadas en curso, tasa y latencia
+    - replicas_deseadas()              : ley de Little acotada a [min, max]
+    - replicas_para_operacion()        : nunca reduce un deployment ya escalado
+    - evaluar_digito()                 : subida inmediata, bajada con histéresis
+    - varios workers                   : carga sumada de todos y un único worker decide
+"""
+import pytest
+from unittest.mock import MagicMock, patch
+
+from autoscaling import DigitAutoscaler
+from shared_state import MemoryStateBackend
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# FIXTURES
+# ─────────────────────────────────────────────────────────────────────────────
+
+@pytest.fixture()
+def orch():
+    replicas = {}
+    orch = MagicMock()
+
+    def escalar_pod(digito, n):
+        replicas[digito] = n
+        return True
+
+    orch.escalar_pod.side_effect = escalar_pod
+    orch.replicas_actuales.side_effect = lambda digito: replicas.get(digito, 0)
+    return orch
+
+
+@pytest.fixture()
+def autoscaler(orch):
+    return DigitAutoscaler(
+        orchestrator=orch,
+        logger=MagicMock(),
+        min_replicas=1,
+        max_replicas=3,
+        objetivo_por_replica=2,
+        ventana_segundos=10,
+        estabilizacion_bajada=30,
+    )
+
+
+def _registrar(autoscaler, digito, llamadas, duracion, ahora):
+    """Simula llamadas completadas de la duración indicada que terminan en 'ahora'."""
+    with patch("autoscaling.time.time", return_value=ahora):
+        for _ in range(llamadas):
+            autoscaler.fin_llamada(digito, ahora - duracion)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Registro de llamadas
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestRegistroLlamadas:
+    def test_en_curso_sube_y_baja(self, autoscaler):
+        inicio = autoscaler.inicio_llamada(0)
+        assert autoscaler.en_curso(0) == 1
+        autoscaler.fin_llamada(0, inicio)
+        assert autoscaler.en_curso(0) == 0
+
+    def test_estadisticas_de_ventana(self, autoscaler):
+        _registrar(autoscaler, 0, llamadas=20, duracion=0.5, ahora=1000)
+        stats = autoscaler.estadisticas(0, ahora=1000)
+        assert stats["tasa"] == pytest.approx(2.0)
+        assert stats["latencia_media"] == pytest.approx(0.5)
+
+    def test_ventana_descarta_llamadas_antiguas(self, autoscaler):
+        _registrar(autoscaler, 0, llamadas=5, duracion=0.1, ahora=1000)
+        assert autoscaler.estadisticas(0, ahora=1020)["tasa"] == 0
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Decisión de réplicas
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestReplicasDeseadas:
+    def test_sin_carga_usa_minimo(self, autoscaler):
+        assert autoscaler.replicas_deseadas(0, ahora=1000) == 1
+
+    def test_ley_de_little(self, autoscaler):
+        # 50 llamadas / 10 s × 1 s = 5 en concurrencia → ceil(5 / 2) = 3
+        _registrar(autoscaler, 0, llamadas=50, duracion=1.0, ahora=1000)
+        assert autoscaler.replicas_deseadas(0, ahora=1000) == 3
+
+    def test_acotado_a_maximo(self, autoscaler):
+        _registrar(autoscaler, 0, llamadas=500, duracion=1.0, ahora=1000)
+        assert autoscaler.replicas_deseadas(0, ahora=1000) == 3
+
+    def test_operacion_no_reduce_deployment_escalado(self, autoscaler, orch):
+        assert autoscaler.replicas_para_operacion(0) == 1
+        orch.escalar_pod(0, 3)
+        assert autoscaler.replicas_para_operacion(0) == 3
+
+
+class TestEvaluarDigito:
+    def test_no_actua_sobre_pods_en_cero(self, autoscaler, orch):
+        _registrar(autoscaler, 0, llamadas=50, duracion=1.0, ahora=1000)
+        assert autoscaler.evaluar_digito(0, ahora=1000) == 0
+        orch.escalar_pod.assert_not_called()
+
+    def test_subida_inmediata(self, autoscaler, orch):
+        orch.escalar_pod(0, 1)
+        _registrar(autoscaler, 0, llamadas=50, duracion=1.0, ahora=1000)
+        assert autoscaler.evaluar_digito(0, ahora=1000) == 3
+
+    def test_bajada_espera_estabilizacion(self, autoscaler, orch):
+        orch.escalar_pod(0, 3)
+        assert autoscaler.evaluar_digito(0, ahora=1000) == 3
+        assert autoscaler.evaluar_digito(0, ahora=1020) == 3
+        assert autoscaler.evaluar_digito(0, ahora=1031) == 2
+
+    def test_carga_intermitente_reinicia_histeresis(self, autoscaler, orch):
+        orch.escalar_pod(0, 2)
+        assert autoscaler.evaluar_digito(0, ahora=1000) == 2
+        # Pico de carga que justifica 2 réplicas: cancela la bajada pendiente
+        _registrar(autoscaler, 0, llamadas=30, duracion=1.0, ahora=1020)
+        assert autoscaler.evaluar_digito(0, ahora=1020) == 2
+        assert autoscaler.evaluar_digito(0, ahora=1035) == 2
+
+
+class TestVariosWorkers:
+    def _worker(self, orch, estado, propietario):
+        return DigitAutoscaler(
+            orchestrator=orch, logger=MagicMock(), max_replicas=3, objetivo_por_replica=2,
+            ventana_segundos=10, estado_compartido=estado, propietario=propietario
+        )
+
+    def test_decide_con_la_carga_de_todos(self, orch):
+        estado = MemoryStateBackend()
+        a, b = self._worker(orch, estado, "a"), self._worker(orch, estado, "b")
+        orch.escalar_pod(0, 1)
+        ahora = 1000
+        # Cada worker ve 25 llamadas de 1 s (2.5 en concurrencia → 2 réplicas); juntos, 5 → 3
+        _registrar(a, 0, llamadas=25, duracion=1.0, ahora=ahora)
+        _registrar(b, 0, llamadas=25, duracion=1.0, ahora=ahora)
+        b.inicio_llamada(0)
+
+        with patch("autoscaling.time.time", return_value=ahora):
+            b.publicar(num_digitos=1)
+            a.evaluar(num_digitos=1)
+            stats = a.estadisticas(0, ahora=ahora, remotos=a._remotos())
+
+        assert orch.replicas_actuales(0) == 3
+        assert stats["tasa"] == pytest.approx(5.0)
+        assert stats["en_curso"] == 1
+
+    def test_solo_el_lider_escala(self, orch):
+        estado = MemoryStateBackend()
+        a, b = self._worker(orch, estado, "a"), self._worker(orch, estado, "b")
+        orch.escalar_pod(0, 1)
+        _registrar(b, 0, llamadas=50, duracion=1.0, ahora=1000)
+
+        with patch("autoscaling.time.time", return_value=1000):
+            a.ciclo(num_digitos=1)
+            b.ciclo(num_digitos=1)
+        # b no decide: publica su carga y la aplica a, el líder, en su siguiente ciclo
+        assert orch.escalar_pod.call_count == 1
+        with patch("autoscaling.time.time", return_value=1000):
+            a.ciclo(num_digitos=1)
+        assert orch.replicas_actuales(0) == 3
+
+        a.detener()
+        assert b.es_lider()
@@ -0,0 +1,110 @@
+"""
+Tests unitarios para deadlines.py.
+
+Cobertura:
+    - Deadline              : tiempo restante, limitar(), plazo agotado, cancelación y sonda
+    - dormir()              : acotado al plazo, despierta ante una cancelación
+    - funciones de módulo   : sin deadline activo no cambian el comportamiento
+    - sonda_desconexion()   : socket abierto, con datos pendientes y cerrado por el cliente
+"""
+import socket
+import threading
+import time
+
+import pytest
+from unittest.mock import MagicMock
+
+import deadlines
+from deadlines import Deadline, DeadlineExceeded, RequestCancelled, con_deadline, sonda_desconexion
+
+
+class TestDeadline:
+    def test_limitar_acota_al_restante(self):
+        deadline = Deadline(5)
+        assert 4.5 < deadline.restante() <= 5
+        assert deadline.limitar(60) <= 5
+        assert deadline.limitar(1) == 1
+
+    def test_sin_plazo(self):
+        deadline = Deadline()
+        assert deadline.restante() == float('inf')
+        assert deadline.limitar(10) == 10
+
+    def test_plazo_agotado(self):
+        deadline = Deadline(0.01)
+        time.sleep(0.02)
+        with pytest.raises(DeadlineExceeded, match="esperar pod"):
+            deadline.limitar(10, "esperar pod")
+
+    def test_cancelacion(self):
+        deadline = Deadline(60)
+        deadline.cancelar("cliente desconectado")
+        with pytest.raises(RequestCancelled, match="cliente desconectado"):
+            deadline.comprobar("escalar")
+
+    def test_sonda_limitada_por_intervalo(self):
+        sonda = MagicMock(return_value=False)
+        deadline = Deadline(60, sonda, intervalo_sondeo=10)
+        for _ in range(5):
+            assert deadline.cancelado is False
+        assert sonda.call_count == 1
+
+    def test_sonda_cancela(self):
+        deadline = Deadline(60, lambda: True)
+        with pytest.raises(RequestCancelled):
+            deadline.comprobar()
+
+
+class TestDormir:
+    def test_acotado_al_plazo(self):
+        deadline = Deadline(0.05, intervalo_sondeo=0.01)
+        inicio = time.monotonic()
+        with pytest.raises(DeadlineExceeded):
+            deadline.dormir(5)
+        assert time.monotonic() - inicio < 1
+
+    def test_despierta_al_cancelar(self):
+        deadline = Deadline(60)
+        threading.Timer(0.05, deadline.cancelar).start()
+        inicio = time.monotonic()
+        with pytest.raises(RequestCancelled):
+            deadline.dormir(5)
+        assert time.monotonic() - inicio < 1
+
+
+class TestFuncionesDeModulo:
+    def test_sin_deadline_activo(self):
+        assert deadlines.deadline_actual() is None
+        assert deadlines.limitar(10) == 10
+        deadlines.comprobar()
+
+    def test_con_deadline(self):
+        deadline = Deadline(2)
+        with con_deadline(deadline):
+            assert deadlines.deadline_actual() is deadline
+            assert deadlines.limitar(10) <= 2
+            deadline.cancelar()
+            with pytest.raises(RequestCancelled):
+                deadlines.dormir(1)
+        assert deadlines.deadline_actual() is None
+
+
+class TestSondaDesconexion:
+    def test_sin_socket(self):
+        assert sonda_desconexion({}) is None
+
+    def test_cliente_conectado_y_desconectado(self):
+        servidor, cliente = socket.socketpair()
+        try:
+            desconectado = sonda_desconexion({'werkzeug.socket': servidor})
+            assert desconectado() is False
+
+            # Datos de una petición siguiente (keep-alive): ni es desconexión ni se consumen
+            cliente.sendall(b"G")
+            assert desconectado() is False
+            assert servidor.recv(1) == b"G"
+
+            cliente.close()
+            assert desconectado() is True
+        finally:
+            servidor.close()
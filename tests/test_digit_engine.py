@@ -0,0 +1,84 @@
+"""
+Tests unitarios para digit_engine.py.
+
+Cobertura (motor NumPy y Python puro):
+    - descomponer()          : matriz de dígitos, relleno, validaciones
+    - sumar_columnas()       : resultado y acarreo por posición
+    - recomponer() / sumar() : lotes, operandos largos, acarreo final
+    - verificar_detalles()   : discrepancias frente a los Details del proxy
+"""
+import random
+
+import pytest
+
+import digit_engine
+
+
+@pytest.fixture(params=["numpy", "python"])
+def motor(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(digit_engine, "np", None)
+    return request.param
+
+
+def _lista(matriz):
+    return [list(map(int, fila)) for fila in matriz]
+
+
+class TestDescomponer:
+    def test_columna_cero_son_unidades(self, motor):
+        assert _lista(digit_engine.descomponer([1234, 56], 4)) == [[4, 3, 2, 1], [6, 5, 0, 0]]
+
+    def test_longitud_por_defecto(self, motor):
+        assert _lista(digit_engine.descomponer([7, 12345])) == [[7, 0, 0, 0, 0], [5, 4, 3, 2, 1]]
+
+    def test_rechaza_negativos_y_desbordes(self, motor):
+        with pytest.raises(ValueError):
+            digit_engine.descomponer([-1])
+        with pytest.raises(ValueError):
+            digit_engine.descomponer([123], 2)
+
+
+class TestSuma:
+    def test_acarreos_por_posicion(self, motor):
+        a = digit_engine.descomponer([1234], 4)
+        b = digit_engine.descomponer([5678], 4)
+        resultado, acarreos = digit_engine.sumar_columnas(a, b)
+        assert _lista(resultado) == [[2, 1, 9, 6]]
+        assert _lista(acarreos) == [[1, 1, 0, 0]]
+
+    def test_lote_aleatorio(self, motor):
+        rng = random.Random(7)
+        a = [rng.randrange(10 ** 4) for _ in range(500)]
+        b = [rng.randrange(10 ** 4) for _ in range(500)]
+        assert digit_engine.sumar(a, b) == [x + y for x, y in zip(a, b)]
+
+    def test_operandos_largos_y_acarreo_final(self, motor):
+        a = [10 ** 40 - 1, 3 * 10 ** 25]
+        b = [1, 7]
+        assert digit_engine.sumar(a, b) == [10 ** 40, 3 * 10 ** 25 + 7]
+
+    def test_lote_vacio(self, motor):
+        assert digit_engine.sumar([], []) == []
+
+    def test_longitudes_distintas(self, motor):
+        with pytest.raises(ValueError):
+            digit_engine.sumar([1, 2], [3])
+
+
+class TestVerificarDetalles:
+    def _detalles(self, resultados):
+        return [{"Posicion": i, "Result": r, "CarryOut": c} for i, (r, c) in enumerate(resultados)]
+
+    def test_resultados_correctos(self):
+        assert digit_engine.verificar_detalles(1234, 5678, self._detalles([(2, 1), (1, 1), (9, 0), (6, 0)])) == []
+
+    def test_discrepancia(self):
+        discrepancias = digit_engine.verificar_detalles(13, 38, self._detalles([(1, 1), (4, 0)]))
+        assert discrepancias == [{
+            "Posicion": 1,
+            "Esperado": {"Result": 5, "CarryOut": 0},
+            "Recibido": {"Result": 4, "CarryOut": 0},
+        }]
@@ -0,0 +1,109 @@
+"""
+Tests unitarios para digit_transport.py.
+
+Cobertura (contra el servidor de referencia DigitBinaryServer):
+    - llamar()          : suma de un dígito con acarreo
+    - validar_transporte(): binario solo en el clúster, con puerto propio y enrutado directo a pods
+    - conexiones        : reutilización, descarte tras error, puerto alternativo
+    - errores           : estado de error del servicio, destino inalcanzable, rango inválido
+"""
+import socket
+
+import pytest
+
+from digit_transport import BinaryDigitTransport, BinaryTransportError, DigitBinaryServer, validar_transporte
+
+
+@pytest.fixture
+def servidor():
+    servidor = DigitBinaryServer().iniciar()
+    yield servidor
+    servidor.detener()
+
+
+@pytest.fixture
+def transporte():
+    transporte = BinaryDigitTransport()
+    yield transporte
+    transporte.cerrar()
+
+
+def _url(servidor):
+    return f"http://127.0.0.1:{servidor.puerto}"
+
+
+class TestLlamadas:
+    def test_suma_con_acarreo(self, servidor, transporte):
+        assert transporte.llamar(_url(servidor), {"NumberA": 7, "NumberB": 8, "CarryIn": 1}, 2) == {
+            "Result": 6, "CarryOut": 1
+        }
+
+    def test_llamadas_consecutivas_por_la_misma_conexion(self, servidor, transporte):
+        respuestas = [
+            transporte.llamar(_url(servidor), {"NumberA": a, "NumberB": 9 - a, "CarryIn": a % 2}, 2)
+            for a in range(10)
+        ]
+        assert [r["Result"] for r in respuestas] == [(9 + a % 2) % 10 for a in range(10)]
+        assert [r["CarryOut"] for r in respuestas] == [a % 2 for a in range(10)]
+
+    def test_reutiliza_la_conexion(self, servidor, transporte, monkeypatch):
+        conexiones = []
+        original = socket.create_connection
+
+        def contar(*args, **kwargs):
+            conexiones.append(args)
+            return original(*args, **kwargs)
+
+        monkeypatch.setattr("digit_transport.socket.create_connection", contar)
+        for _ in range(3):
+            transporte.llamar(_url(servidor), {"NumberA": 1, "NumberB": 1, "CarryIn": 0}, 2)
+        assert len(conexiones) == 1
+
+    def test_puerto_binario_sustituye_al_de_la_url(self, servidor):
+        transporte = BinaryDigitTransport(puerto=servidor.puerto)
+        try:
+            assert transporte.llamar("http://127.0.0.1:8000", {"NumberA": 2, "NumberB": 3, "CarryIn": 0}, 2)["Result"] == 5
+        finally:
+            transporte.cerrar()
+
+
+class TestErrores:
+    def test_estado_de_error_del_servicio(self, transporte):
+        def fallar(a, b, carry):
+            raise RuntimeError("backend roto")
+
+        servidor = DigitBinaryServer(sumar=fallar).iniciar()
+        try:
+            with pytest.raises(BinaryTransportError):
+                transporte.llamar(_url(servidor), {"NumberA": 1, "NumberB": 1, "CarryIn": 0}, 2)
+        finally:
+            servidor.detener()
+
+    def test_destino_inalcanzable(self, transporte):
+        with socket.socket() as libre:
+            libre.bind(("127.0.0.1", 0))
+            puerto = libre.getsockname()[1]
+        with pytest.raises(BinaryTransportError):
+            transporte.llamar(f"http://127.0.0.1:{puerto}", {"NumberA": 1, "NumberB": 1, "CarryIn": 0}, 1)
+
+    def test_rango_invalido(self, transporte):
+        with pytest.raises(ValueError):
+            transporte.llamar("http://127.0.0.1:1", {"NumberA": 12, "NumberB": 1, "CarryIn": 0}, 1)
+
+
+class TestValidarTransporte:
+    def test_http_siempre_valido(self):
+        validar_transporte('http', en_cluster=False, puerto_binario=0, directo_a_pods=False)
+
+    def test_binario_en_el_cluster_con_enrutado_directo(self):
+        validar_transporte('binary', en_cluster=True, puerto_binario=9000, directo_a_pods=True)
+
+    @pytest.mark.parametrize("transporte,en_cluster,puerto,directo,mensaje", [
+        ('grpc', True, 9000, True, "desconocido"),
+        ('binary', False, 9000, True, "modo local"),
+        ('binary', True, 0, True, "DIGIT_BINARY_PORT"),
+        ('binary', True, 9000, False, "ORCHESTRATOR_DIRECT_POD_ROUTING"),
+    ])
+    def test_binario_inalcanzable(self, transporte, en_cluster, puerto, directo, mensaje):
+        with pytest.raises(ValueError, match=mensaje):
+            validar_transporte(transporte, en_cluster=en_cluster, puerto_binario=puerto, directo_a_pods=directo)
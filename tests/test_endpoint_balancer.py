@@ -0,0 +1,138 @@
+"""
+Tests unitarios para endpoint_balancer.py.
+
+Cobertura:
+    - refrescar()  : alta/baja de réplicas conservando su estado
+    - elegir()     : least-outstanding, power-of-two-choices, tabla vacía
+    - reportar()   : latencia EWMA, expulsión por fallos y backoff, límite de expulsados,
+                     liberación de una llamada que no llegó a enviarse
+"""
+import pytest
+from unittest.mock import MagicMock
+
+from endpoint_balancer import EndpointBalancer
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# FIXTURES
+# ─────────────────────────────────────────────────────────────────────────────
+
+@pytest.fixture()
+def direcciones():
+    return {0: [("10.0.0.1", 8000), ("10.0.0.2", 8000), ("10.0.0.3", 8000)]}
+
+
+@pytest.fixture()
+def balancer(direcciones):
+    b = EndpointBalancer(
+        obtener_endpoints=lambda digito: direcciones.get(digito, []),
+        logger=MagicMock(),
+        algoritmo="least",
+        fallos_para_expulsion=2,
+        expulsion_base_segundos=10,
+        max_expulsados_pct=0.5,
+    )
+    b.refrescar(0)
+    return b
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Tabla de endpoints
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestRefrescar:
+    def test_carga_endpoints(self, balancer):
+        assert [ep.url for ep in balancer.endpoints(0)] == [
+            "http://10.0.0.1:8000", "http://10.0.0.2:8000", "http://10.0.0.3:8000"
+        ]
+
+    def test_conserva_estado_de_replicas_existentes(self, balancer, direcciones):
+        ep = balancer.elegir(0)
+        direcciones[0] = direcciones[0][:2]
+        balancer.refrescar(0)
+        assert len(balancer.endpoints(0)) == 2
+        assert any(e is ep and e.en_curso == 1 for e in balancer.endpoints(0))
+
+    def test_error_al_refrescar_conserva_tabla(self, balancer):
+        balancer.obtener_endpoints = MagicMock(side_effect=RuntimeError("api caída"))
+        assert balancer.refrescar(0) is False
+        assert len(balancer.endpoints(0)) == 3
+
+    def test_algoritmo_desconocido(self):
+        with pytest.raises(ValueError):
+            EndpointBalancer(lambda d: [], MagicMock(), algoritmo="random")
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Selección
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestElegir:
+    def test_sin_endpoints_devuelve_none(self, balancer):
+        assert balancer.elegir(3) is None
+
+    def test_least_outstanding_reparte(self, balancer):
+        elegidos = {balancer.elegir(0).ip for _ in range(3)}
+        assert elegidos == {"10.0.0.1", "10.0.0.2", "10.0.0.3"}
+
+    def test_p2c_evita_replica_mas_cargada(self, direcciones):
+        b = EndpointBalancer(lambda d: direcciones[d], MagicMock(), algoritmo="p2c")
+        b.refrescar(0)
+        cargado = b.endpoints(0)[0]
+        cargado.en_curso = 100
+        for _ in range(50):
+            ep = b.elegir(0)
+            assert ep is not cargado
+            b.reportar(0, ep.url, True)
+
+    def test_reportar_libera_y_mide_latencia(self, balancer):
+        ep = balancer.elegir(0)
+        balancer.reportar(0, ep.url, True, latencia=0.2)
+        assert ep.en_curso == 0
+        assert ep.latencia_ewma == pytest.approx(0.2)
+
+    def test_reportar_sin_resultado_solo_libera(self, balancer):
+        ep = balancer.elegir(0)
+        ep.fallos_consecutivos = 2
+        balancer.reportar(0, ep.url, None)
+        assert ep.en_curso == 0
+        assert ep.fallos_consecutivos == 2
+        assert ep.latencia_ewma == 0.0
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Expulsión de réplicas anómalas
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestExpulsion:
+    def _fallar(self, balancer, url, veces, ahora):
+        for _ in range(veces):
+            balancer.reportar(0, url, False, ahora=ahora)
+
+    def test_expulsa_tras_fallos_consecutivos(self, balancer):
+        malo = balancer.endpoints(0)[0]
+        self._fallar(balancer, malo.url, 2, ahora=1000)
+        assert malo.expulsado_hasta == 1010
+        for _ in range(10):
+            assert balancer.elegir(0, ahora=1005) is not malo
+
+    def test_vuelve_tras_expulsion_con_backoff(self, balancer):
+        malo = balancer.endpoints(0)[0]
+        self._fallar(balancer, malo.url, 2, ahora=1000)
+        assert malo.disponible(1011)
+        self._fallar(balancer, malo.url, 2, ahora=1011)
+        assert malo.expulsado_hasta == 1031
+
+    def test_exito_reinicia_fallos(self, balancer):
+        ep = balancer.endpoints(0)[0]
+        balancer.reportar(0, ep.url, False, ahora=1000)
+        balancer.reportar(0, ep.url, True, ahora=1000)
+        balancer.reportar(0, ep.url, False, ahora=1000)
+        assert ep.disponible(1000)
+
+    def test_no_expulsa_mas_del_limite(self, balancer):
+        eps = balancer.endpoints(0)
+        self._fallar(balancer, eps[0].url, 2, ahora=1000)
+        self._fallar(balancer, eps[1].url, 2, ahora=1000)
+        assert not eps[0].disponible(1000)
+        assert eps[1].disponible(1000)
@@ -0,0 +1,50 @@
+"""
+Tests unitarios para json_codec.py.
+
+Cobertura:
+    - dumps_bytes() / dumps()  : salida compacta UTF-8, orden de claves, enteros grandes
+    - FastJSONProvider         : respuestas de jsonify() equivalentes a las de Flask
+"""
+import json
+
+import pytest
+from flask import Flask, jsonify
+
+import json_codec
+
+
+@pytest.fixture(params=["orjson", "json"])
+def motor(request, monkeypatch):
+    if request.param == "orjson":
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(json_codec, "orjson", None)
+    return request.param
+
+
+class TestDumps:
+    def test_compacto_y_utf8(self, motor):
+        assert json_codec.dumps({"message": "✓ listo", "n": 1}) == '{"message":"✓ listo","n":1}'
+
+    def test_ordenar_claves(self, motor):
+        assert json_codec.dumps_bytes({"b": 1, "a": 2}, ordenar=True) == b'{"a":2,"b":1}'
+
+    def test_enteros_de_mas_de_64_bits(self, motor):
+        assert json.loads(json_codec.dumps({"Results": [10 ** 30]})) == {"Results": [10 ** 30]}
+
+    def test_default_para_tipos_no_nativos(self, motor):
+        class Punto:
+            pass
+
+        assert json_codec.dumps_bytes({"p": Punto()}, default=lambda o: "punto") == b'{"p":"punto"}'
+
+
+class TestFastJSONProvider:
+    def test_respuesta_equivalente(self, motor):
+        app = Flask(__name__)
+        app.json = json_codec.FastJSONProvider(app)
+        datos = {"Result": 6912, "Details": [{"Pod": "suma-digito-0", "Estado": "✓"}]}
+        with app.test_request_context():
+            rv = jsonify(datos)
+        assert rv.mimetype == "application/json"
+        assert json.loads(rv.get_data()) == datos
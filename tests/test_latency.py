@@ -0,0 +1,81 @@
+"""
+Tests unitarios para latency.py.
+
+Cobertura:
+    - registrar() / ewma()  : media móvil exponencial por clave
+    - percentil()           : percentiles sobre la ventana de muestras
+    - timeout()             : valor por defecto, derivado y acotado
+    - umbral_hedge()        : solo con muestras suficientes
+"""
+import pytest
+
+from latency import LatencyEstimator
+
+
+@pytest.fixture()
+def estimador():
+    return LatencyEstimator(
+        alfa=0.5,
+        max_muestras=100,
+        min_muestras=10,
+        percentil_timeout=0.99,
+        multiplicador_timeout=2.0,
+        timeout_min=0.5,
+        timeout_max=8.0,
+        timeout_defecto=8.0,
+        percentil_hedge=0.9,
+    )
+
+
+class TestEwma:
+    def test_primera_muestra(self, estimador):
+        estimador.registrar(0, 0.4)
+        assert estimador.ewma(0) == pytest.approx(0.4)
+
+    def test_suaviza(self, estimador):
+        estimador.registrar(0, 0.4)
+        estimador.registrar(0, 0.8)
+        assert estimador.ewma(0) == pytest.approx(0.6)
+
+    def test_claves_independientes(self, estimador):
+        estimador.registrar(0, 1.0)
+        assert estimador.ewma(1) == 0.0
+
+
+class TestPercentiles:
+    def test_sin_muestras(self, estimador):
+        assert estimador.percentil(0, 0.5) is None
+
+    def test_percentiles(self, estimador):
+        for ms in range(1, 101):
+            estimador.registrar(0, ms / 1000)
+        assert estimador.percentil(0, 0.5) == pytest.approx(0.050)
+        assert estimador.percentil(0, 0.99) == pytest.approx(0.099)
+
+    def test_ventana_limitada(self, estimador):
+        for _ in range(100):
+            estimador.registrar(0, 5.0)
+        for _ in range(100):
+            estimador.registrar(0, 0.1)
+        assert estimador.percentil(0, 1.0) == pytest.approx(0.1)
+
+
+class TestTimeout:
+    def test_defecto_sin_muestras_suficientes(self, estimador):
+        for _ in range(9):
+            estimador.registrar(0, 0.1)
+        assert estimador.timeout(0) == 8.0
+        assert estimador.umbral_hedge(0) is None
+
+    def test_derivado_del_percentil(self, estimador):
+        for _ in range(10):
+            estimador.registrar(0, 1.0)
+        assert estimador.timeout(0) == pytest.approx(2.0)
+        assert estimador.umbral_hedge(0) == pytest.approx(1.0)
+
+    def test_acotado(self, estimador):
+        for _ in range(10):
+            estimador.registrar(0, 0.01)
+            estimador.registrar(1, 10.0)
+        assert estimador.timeout(0) == 0.5
+        assert estimador.timeout(1) == 8.0
@@ -0,0 +1,178 @@
+"""
+Tests unitarios para metrics_config.py.
+
+Cobertura:
+    - LabelLimiter                : valores conservados y cubo de desbordamiento
+    - parsear_grupos()            : grupos regex=grupo, errores de formato
+    - crear_agrupador()           : etiqueta path por regla de Flask, ruta real y grupos
+    - opciones_metricas()         : exclusiones, rutas ligeras y cardinalidad acotada
+    - LightweightRouteMetrics     : Summary por ruta caliente sin las métricas por defecto
+    - ComputedGauges              : publicación con set(), antes de cada scrape y con fuentes que fallan
+"""
+import pytest
+from flask import Flask, request
+from prometheus_client import CollectorRegistry, Gauge
+from prometheus_flask_exporter import PrometheusMetrics
+
+from metrics_config import (
+    DESBORDAMIENTO, SIN_RUTA, ComputedGauges, LabelLimiter, LightweightRouteMetrics,
+    crear_agrupador, opciones_metricas, parsear_grupos
+)
+
+
+def _app():
+    app = Flask(__name__)
+
+    @app.route('/suma-n-digitos', methods=['POST'])
+    def suma():
+        return "ok"
+
+    @app.route('/<path:path>')
+    def estatico(path):
+        return path
+
+    return app
+
+
+def _valores_path(registry, metrica):
+    return {
+        muestra.labels['path']
+        for familia in registry.collect()
+        for muestra in familia.samples
+        if muestra.name == metrica
+    }
+
+
+class TestLabelLimiter:
+    def test_conserva_hasta_el_maximo(self):
+        limitador = LabelLimiter(max_valores=2)
+        assert [limitador.valor(v) for v in ("a", "b", "a", "c", "d")] == ["a", "b", "a", DESBORDAMIENTO, DESBORDAMIENTO]
+        assert limitador.desbordados == 2
+        assert limitador.valores() == ["a", "b"]
+
+
+class TestParsearGrupos:
+    def test_grupos(self):
+        grupos = parsear_grupos(r"^/debug/=/debug; ^/script\..*\.js$=/assets")
+        assert [(p.pattern, g) for p, g in grupos] == [("^/debug/", "/debug"), (r"^/script\..*\.js$", "/assets")]
+
+    def test_formato_invalido(self):
+        with pytest.raises(ValueError):
+            parsear_grupos("sin-igual")
+
+
+class TestAgrupador:
+    def _etiqueta(self, agrupador, ruta, metodo="GET"):
+        with _app().test_request_context(ruta, method=metodo):
+            return agrupador(request)
+
+    def test_por_regla(self):
+        agrupador = crear_agrupador("rule")
+        assert agrupador.__name__ == "path"
+        assert self._etiqueta(agrupador, "/script.js") == "/<path:path>"
+
+    def test_por_ruta_con_limitador(self):
+        agrupador = crear_agrupador("path", limitador=LabelLimiter(1))
+        assert self._etiqueta(agrupador, "/a.js") == "/a.js"
+        assert self._etiqueta(agrupador, "/b.js") == DESBORDAMIENTO
+
+    def test_grupos_tienen_prioridad(self):
+        agrupador = crear_agrupador("rule", grupos=parsear_grupos("^/assets/=/assets"))
+        assert self._etiqueta(agrupador, "/assets/x.js") == "/assets"
+
+    def test_modo_desconocido(self):
+        with pytest.raises(ValueError):
+            crear_agrupador("endpoint")
+
+
+class TestOpcionesMetricas:
+    def test_cardinalidad_acotada_y_exclusiones(self):
+        app = _app()
+        registry = CollectorRegistry()
+        opciones, _ = opciones_metricas("rule", excluidas="^/terminal-stream$")
+        PrometheusMetrics(app, registry=registry, **opciones)
+        cliente = app.test_client()
+
+        for i in range(20):
+            cliente.get(f"/fichero-{i}.js")
+        cliente.get("/terminal-stream")
+        cliente.get("/metrics")
+
+        assert _valores_path(registry, "flask_http_request_duration_seconds_count") == {"/<path:path>"}
+
+    def test_sin_regla(self):
+        app = Flask(__name__)
+        registry = CollectorRegistry()
+        opciones, _ = opciones_metricas("rule")
+        PrometheusMetrics(app, registry=registry, **opciones)
+
+        app.test_client().get("/no-existe")
+
+        assert _valores_path(registry, "flask_http_request_duration_seconds_count") == {SIN_RUTA}
+
+    def test_rutas_ligeras_excluidas(self):
+        opciones, _ = opciones_metricas("rule", excluidas="^/debug/", rutas_ligeras=["/suma-n-digitos"])
+        assert opciones["excluded_paths"] == ["^/debug/", "^/suma\\-n\\-digitos$"]
+
+
+class TestLightweightRouteMetrics:
+    def test_mide_solo_rutas_calientes(self):
+        app = _app()
+        registry = CollectorRegistry()
+        opciones, _ = opciones_metricas("rule")
+        PrometheusMetrics(app, registry=registry, **opciones)
+        LightweightRouteMetrics(["/suma-n-digitos"], registry=registry).registrar(app)
+        cliente = app.test_client()
+
+        for _ in range(3):
+            cliente.post("/suma-n-digitos")
+        cliente.get("/index.html")
+
+        assert registry.get_sample_value(
+            "suma_http_ruta_caliente_duration_seconds_count",
+            {"method": "POST", "path": "/suma-n-digitos", "status": "200"}
+        ) == 3
+        assert _valores_path(registry, "flask_http_request_duration_seconds_count") == {"/<path:path>"}
+
+
+class TestComputedGauges:
+    def test_publica_con_set_y_antes_del_scrape(self):
+        registry = CollectorRegistry()
+        gauge = Gauge("suma_prueba", "Prueba", ["digito"], registry=registry)
+        valores = {"actual": 1.0}
+        gauges = ComputedGauges()
+        app = _app()
+
+        @app.route('/metrics')
+        def metricas():
+            return "ok"
+
+        gauges.registrar(gauge.labels(digito="0"), lambda: valores["actual"])
+        gauges.registrar_en(app)
+        assert registry.get_sample_value("suma_prueba", {"digito": "0"}) == 1.0
+
+        valores["actual"] = 3.0
+        app.test_client().get("/index.html")
+        assert registry.get_sample_value("suma_prueba", {"digito": "0"}) == 1.0
+        app.test_client().get("/metrics")
+        assert registry.get_sample_value("suma_prueba", {"digito": "0"}) == 3.0
+
+    def test_fuente_que_falla_conserva_el_valor(self):
+        registry = CollectorRegistry()
+        fallar = {"si": False}
+        a = Gauge("suma_a", "A", registry=registry)
+        b = Gauge("suma_b", "B", registry=registry)
+        gauges = ComputedGauges()
+
+        def fuente():
+            if fallar["si"]:
+                raise RuntimeError("sin datos")
+            return 5
+
+        gauges.registrar(a, fuente)
+        gauges.registrar(b, lambda: 7)
+        fallar["si"] = True
+        gauges.actualizar()
+
+        assert registry.get_sample_value("suma_a") == 5
+        assert registry.get_sample_value("suma_b") == 7
@@ -3,15 +3,33 @@ Tests unitarios para k8s_orchestrator.py.
 
 Cobertura:
     - service_url()                      : modo in-cluster vs local
-    - escalar_pod()                      : éxito, error de kubectl, timeout
-    - esperar_pod_ready()                : éxito, fallo, timeout
+    - escalar_pod()                      : éxito, error de kubectl, timeout, contexto del kubeconfig, plazo
+    - esperar_pod_ready()                : éxito, fallo, timeout, timeout acotado al plazo de la operación
     - obtener_puerto_local_disponible()  : puerto libre, puerto ocupado
     - detener_port_forward()             : proceso activo, proceso inexistente
+    - escalar_a_cero()                   : todos los pods, exclusión de pods calientes
+    - es_arranque_en_frio()              : estado de réplicas conocido, compartido entre workers
+    - listar_endpoints_listos()          : EndpointSlices y balanceo directo a pods
+    - escalar_deployments()              : escalado en bloque, paralelo, omisión y errores
+    - fases_arranque()                   : desglose del arranque en frío desde el estado del pod
+    - compartir_preparacion()            : una sola preparación por dígito para peticiones concurrentes,
+                                           espera dentro del plazo propio
+    - sincronizar_estado()               : adopción del estado del clúster y de port-forward existentes
+    - presupuesto del API server         : prioridad por tipo de llamada, kubectl() auxiliar, sin fusionar
+                                           scale-down con scale-up, timeout tras la espera en cola
 """
+import json
 import subprocess
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 import pytest
 from unittest.mock import MagicMock, patch, call
 
+from api_budget import ALTA, BAJA, ApiBudget
+from deadlines import Deadline, DeadlineExceeded, con_deadline
+from shared_state import SQLiteStateBackend
+
 
 # ─────────────────────────────────────────────────────────────────────────────
 # FIXTURES
@@ -126,6 +144,29 @@ class TestEscalarPod:
         assert "-n" in captured["cmd"]
         assert "calculadora-suma" in captured["cmd"]
 
+    def test_contexto_kubeconfig_en_comando(self, logger, RealOrchClass):
+        orch = RealOrchClass(logger=logger, namespace="shard-b", kube_context="cluster-b")
+        with patch("k8s_orchestrator.subprocess.run", return_value=self._make_result(0)) as run:
+            orch.escalar_pod(1, 1)
+
+        cmd = run.call_args[0][0]
+        assert cmd[:3] == ["kubectl", "--context", "cluster-b"]
+        assert "shard-b" in cmd
+
+    def test_timeout_acotado_al_plazo(self, orch):
+        with patch("k8s_orchestrator.subprocess.run", return_value=self._make_result(0)) as run:
+            with con_deadline(Deadline(3)):
+                orch.escalar_pod(0, 1)
+        assert run.call_args.kwargs["timeout"] <= 3
+
+    def test_timeout_con_plazo_agotado_no_es_fallo_del_pod(self, orch):
+        with patch("k8s_orchestrator.subprocess.run",
+                   side_effect=subprocess.TimeoutExpired(cmd="kubectl", timeout=0.01)):
+            with con_deadline(Deadline(0.01)):
+                time.sleep(0.02)
+                with pytest.raises(DeadlineExceeded):
+                    orch.escalar_pod(0, 1)
+
 
 # ─────────────────────────────────────────────────────────────────────────────
 # esperar_pod_ready
@@ -156,6 +197,14 @@ class TestEsperarPodReady:
                    side_effect=RuntimeError("unexpected")):
             assert orch.esperar_pod_ready(1) is False
 
+    def test_timeout_acotado_al_plazo(self, orch):
+        with patch("k8s_orchestrator.subprocess.run", return_value=self._make_result(0)) as run:
+            with con_deadline(Deadline(2.5)):
+                assert orch.esperar_pod_ready(0, timeout=60) is True
+
+        assert "--timeout=3s" in run.call_args[0][0]
+        assert run.call_args.kwargs["timeout"] <= 2.5
+
     def test_label_digito_en_comando(self, orch):
         captured = {}
 
@@ -270,3 +319,513 @@ class TestEscalarACero:
             with patch("k8s_orchestrator.time.sleep", side_effect=lambda s: sleep_calls.append(s)):
                 orch.escalar_a_cero(delay_seconds=2)
         assert 2 in sleep_calls
+
+    def test_excluir_mantiene_pods_calientes(self, orch):
+        with patch.object(orch, "escalar_pod", return_value=True) as mock_scale:
+            orch.escalar_a_cero(delay_seconds=0, excluir=lambda: {1, 2})
+        assert sorted(c.args for c in mock_scale.call_args_list) == [(0, 0), (3, 0)]
+
+
+class TestArranqueEnFrio:
+    def test_desconocido_es_frio(self, orch):
+        assert orch.es_arranque_en_frio(0) is True
+
+    def test_escalado_registra_replicas(self, orch):
+        r = MagicMock()
+        r.returncode = 0
+        with patch("k8s_orchestrator.subprocess.run", return_value=r):
+            orch.escalar_pod(1, 1)
+        assert orch.es_arranque_en_frio(1) is False
+        with patch("k8s_orchestrator.subprocess.run", return_value=r):
+            orch.escalar_pod(1, 0)
+        assert orch.es_arranque_en_frio(1) is True
+
+    def test_replicas_compartidas_entre_workers(self, logger, RealOrchClass, tmp_path):
+        estado = SQLiteStateBackend(str(tmp_path / "estado.db"))
+        worker_a = RealOrchClass(logger=logger, estado_compartido=estado)
+        worker_b = RealOrchClass(logger=logger, estado_compartido=SQLiteStateBackend(str(tmp_path / "estado.db")))
+        otro_namespace = RealOrchClass(logger=logger, namespace="shard-b", estado_compartido=estado)
+        with patch("k8s_orchestrator.subprocess.run", return_value=MagicMock(returncode=0)):
+            worker_a.escalar_pod(0, 2)
+            assert worker_b.replicas_actuales(0) == 2
+            assert otro_namespace.es_arranque_en_frio(0) is True
+
+            # El scale-to-0 de un worker no lo deshace otro con una caché antigua
+            worker_b.escalar_pod(0, 0)
+        assert worker_a.es_arranque_en_frio(0) is True
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Balanceo directo a IPs de pod (EndpointSlices)
+# ─────────────────────────────────────────────────────────────────────────────
+
+ENDPOINT_SLICES_JSON = """
+{"items": [{
+    "ports": [{"name": "http", "port": 8000}],
+    "endpoints": [
+        {"addresses": ["10.1.0.4"], "conditions": {"ready": true}},
+        {"addresses": ["10.1.0.5"], "conditions": {"ready": false}},
+        {"addresses": ["10.1.0.6"]}
+    ]
+}]}
+"""
+
+
+class TestBalanceoDirecto:
+    @pytest.fixture()
+    def orch_directo(self, logger, RealOrchClass):
+        return RealOrchClass(
+            logger=logger,
+            namespace="calculadora-suma",
+            in_cluster=True,
+            direct_pod_routing=True,
+        )
+
+    def _slices(self):
+        r = MagicMock()
+        r.returncode = 0
+        r.stdout = ENDPOINT_SLICES_JSON
+        return r
+
+    def test_sin_in_cluster_no_hay_balanceador(self, logger, RealOrchClass):
+        assert RealOrchClass(logger=logger, direct_pod_routing=True).balanceador is None
+
+    def test_listar_endpoints_solo_listos(self, orch_directo):
+        with patch("k8s_orchestrator.subprocess.run", return_value=self._slices()):
+            assert orch_directo.listar_endpoints_listos(0) == [("10.1.0.4", 8000), ("10.1.0.6", 8000)]
+
+    def test_service_url_usa_ip_de_pod(self, orch_directo):
+        with patch("k8s_orchestrator.subprocess.run", return_value=self._slices()):
+            orch_directo.balanceador.refrescar(1)
+        url, port = orch_directo.service_url(1)
+        assert url in ("http://10.1.0.4:8000", "http://10.1.0.6:8000")
+        assert port == 8000
+
+    def test_service_url_fallback_dns(self, orch_directo):
+        url, _ = orch_directo.service_url(2)
+        assert url == "http://suma-digito-2.calculadora-suma.svc.cluster.local:8000"
+
+    def test_escalar_a_cero_vacia_tabla(self, orch_directo):
+        with patch("k8s_orchestrator.subprocess.run", return_value=self._slices()):
+            orch_directo.balanceador.refrescar(0)
+            orch_directo.escalar_pod(0, 0)
+        assert orch_directo.balanceador.endpoints(0) == []
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# escalar_deployments — escalado en bloque y en paralelo
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestEscalarDeployments:
+    def test_omite_deployments_ya_en_cero(self, orch):
+        orch.replicas_conocidas.update({0: 0, 1: 1})
+        with patch.object(orch, "escalar_pod", return_value=True) as mock_scale:
+            resultado = orch.escalar_deployments({0: 0, 1: 0, 2: 0})
+        assert sorted(c.args for c in mock_scale.call_args_list) == [(1, 0), (2, 0)]
+        assert resultado["Omitidos"] == 1
+        assert resultado["Escalados"] == 2
+        assert [d["Estado"] for d in resultado["Deployments"]] == ["omitido", "escalado", "escalado"]
+
+    def test_escalar_a_cero_repetido_no_llama_kubectl(self, orch):
+        r = MagicMock()
+        r.returncode = 0
+        with patch("k8s_orchestrator.subprocess.run", return_value=r) as mock_run:
+            orch.escalar_a_cero(delay_seconds=0)
+            orch.escalar_a_cero(delay_seconds=0)
+        assert mock_run.call_count == 4
+
+    def test_ejecuta_en_paralelo(self, orch):
+        import threading
+        barrera = threading.Barrier(3, timeout=2)
+
+        def escalar_lento(digito, replicas):
+            barrera.wait()   # solo se libera si las tres llamadas están en curso a la vez
+            return True
+
+        with patch.object(orch, "escalar_pod", side_effect=escalar_lento):
+            resultado = orch.escalar_deployments({0: 0, 1: 0, 2: 0})
+        assert resultado["Ok"] is True
+
+    def test_reporta_errores_por_deployment(self, orch):
+        with patch.object(orch, "escalar_pod", side_effect=lambda d, r: d != 1):
+            resultado = orch.escalar_deployments({0: 0, 1: 0})
+        assert resultado["Ok"] is False
+        assert resultado["Errores"] == 1
+        assert resultado["Deployments"][1]["Deployment"] == "suma-digito-1"
+        assert resultado["Deployments"][1]["Estado"] == "error"
+
+    def test_detiene_port_forward_al_escalar_a_cero(self, orch):
+        with patch.object(orch, "escalar_pod", return_value=True), \
+                patch.object(orch, "detener_port_forward") as mock_stop:
+            orch.escalar_deployments({0: 0, 1: 1})
+        mock_stop.assert_called_once_with(0)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# fases_arranque: desglose del arranque en frío
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestFasesArranque:
+    def _pod(self, nombre, creado, programado, iniciado, listo):
+        return {
+            "metadata": {"name": nombre, "creationTimestamp": creado},
+            "status": {
+                "conditions": [
+                    {"type": "PodScheduled", "status": "True", "lastTransitionTime": programado},
+                    {"type": "Ready", "status": "True", "lastTransitionTime": listo},
+                ],
+                "containerStatuses": [{"state": {"running": {"startedAt": iniciado}}}],
+            },
+        }
+
+    def _fake_run(self, pods, eventos):
+        def fake_run(cmd, **kwargs):
+            r = MagicMock()
+            r.returncode = 0
+            r.stdout = json.dumps({"items": pods if "pods" in cmd else eventos})
+            return r
+        return fake_run
+
+    def test_desglose_por_fases(self, orch):
+        pod = self._pod("suma-digito-0-abc", "2026-01-01T10:00:00Z", "2026-01-01T10:00:01Z",
+                        "2026-01-01T10:00:09Z", "2026-01-01T10:00:14Z")
+        eventos = [
+            {"reason": "Pulling", "firstTimestamp": "2026-01-01T10:00:02Z"},
+            {"reason": "Pulled", "lastTimestamp": "2026-01-01T10:00:07Z",
+             "message": 'Successfully pulled image "suma:1" in 4.5s (4.5s including waiting)'},
+        ]
+        with patch("k8s_orchestrator.subprocess.run", side_effect=self._fake_run([pod], eventos)):
+            fases = orch.fases_arranque(0)
+        assert fases == pytest.approx({
+            "programacion": 1.0, "imagen": 4.5, "contenedor": 3.5, "sondas": 5.0, "total": 14.0
+        })
+
+    def test_imagen_por_timestamps_y_pod_mas_reciente(self, orch):
+        antiguo = self._pod("viejo", "2026-01-01T09:00:00Z", "2026-01-01T09:00:00Z",
+                            "2026-01-01T09:00:01Z", "2026-01-01T09:00:02Z")
+        nuevo = self._pod("nuevo", "2026-01-01T10:00:00Z", "2026-01-01T10:00:00Z",
+                          "2026-01-01T10:00:05Z", "2026-01-01T10:00:06Z")
+        eventos = [
+            {"reason": "Pulling", "eventTime": "2026-01-01T10:00:00.500000Z"},
+            {"reason": "Pulled", "eventTime": "2026-01-01T10:00:03.500000Z", "message": "pulled"},
+        ]
+        with patch("k8s_orchestrator.subprocess.run", side_effect=self._fake_run([antiguo, nuevo], eventos)):
+            fases = orch.fases_arranque(0)
+        assert fases["imagen"] == pytest.approx(3.0)
+        assert fases["total"] == pytest.approx(6.0)
+
+    def test_sin_pods_listos(self, orch):
+        pod = self._pod("p", "2026-01-01T10:00:00Z", None, None, None)
+        pod["status"]["conditions"][1]["status"] = "False"
+        with patch("k8s_orchestrator.subprocess.run", side_effect=self._fake_run([pod], [])):
+            assert orch.fases_arranque(0) == {}
+
+    def test_error_de_kubectl_devuelve_vacio(self, orch):
+        with patch("k8s_orchestrator.subprocess.run", side_effect=RuntimeError("kubectl")):
+            assert orch.fases_arranque(0) == {}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# compartir_preparacion
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestCompartirPreparacion:
+    def _concurrentes(self, orch, funcion, n=5, digito=0):
+        resultados, errores = [], []
+
+        def llamar():
+            try:
+                resultados.append(orch.compartir_preparacion(digito, funcion))
+            except Exception as error:
+                errores.append(error)
+
+        hilos = [threading.Thread(target=llamar) for _ in range(n)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join(timeout=5)
+        return resultados, errores
+
+    def test_una_sola_preparacion_para_peticiones_concurrentes(self, orch):
+        llamadas = []
+
+        def preparar():
+            llamadas.append(1)
+            time.sleep(0.2)
+            return {'total': 1.0}
+
+        resultados, errores = self._concurrentes(orch, preparar)
+
+        assert len(llamadas) == 1
+        assert errores == []
+        assert resultados == [{'total': 1.0}] * 5
+
+    def test_error_compartido(self, orch):
+        llamadas = []
+
+        def preparar():
+            llamadas.append(1)
+            time.sleep(0.2)
+            raise RuntimeError("pod no listo")
+
+        resultados, errores = self._concurrentes(orch, preparar, n=3)
+
+        assert len(llamadas) == 1
+        assert resultados == []
+        assert len(errores) == 3
+        assert all(str(e) == "pod no listo" for e in errores)
+
+    def test_compuerta_se_retira_al_terminar(self, orch):
+        llamadas = []
+        orch.compartir_preparacion(0, lambda: llamadas.append(1))
+        orch.compartir_preparacion(0, lambda: llamadas.append(1))
+
+        assert len(llamadas) == 2
+        assert orch.compuertas.en_espera(0) == 0
+
+    def test_digitos_independientes(self, orch):
+        en_curso = threading.Event()
+        liberar = threading.Event()
+
+        def bloquear():
+            en_curso.set()
+            liberar.wait(timeout=5)
+
+        hilo = threading.Thread(target=orch.compartir_preparacion, args=(0, bloquear))
+        hilo.start()
+        en_curso.wait(timeout=5)
+
+        assert orch.compartir_preparacion(1, lambda: 'listo') == 'listo'
+        liberar.set()
+        hilo.join(timeout=5)
+
+    def test_espera_dentro_del_plazo_propio(self, orch):
+        en_curso = threading.Event()
+        liberar = threading.Event()
+
+        def bloquear():
+            en_curso.set()
+            liberar.wait(timeout=5)
+
+        hilo = threading.Thread(target=orch.compartir_preparacion, args=(0, bloquear))
+        hilo.start()
+        en_curso.wait(timeout=5)
+
+        inicio = time.monotonic()
+        with con_deadline(Deadline(0.1)):
+            with pytest.raises(DeadlineExceeded):
+                orch.compartir_preparacion(0, lambda: 'nunca')
+        assert time.monotonic() - inicio < 2
+        liberar.set()
+        hilo.join(timeout=5)
+
+    def test_repite_preparacion_abandonada_por_el_plazo_del_lider(self, orch):
+        en_curso = threading.Event()
+        errores = []
+
+        def preparar_lider():
+            en_curso.set()
+            time.sleep(0.1)
+            raise DeadlineExceeded("plazo de la petición líder agotado")
+
+        def lider():
+            try:
+                orch.compartir_preparacion(0, preparar_lider)
+            except DeadlineExceeded as error:
+                errores.append(error)
+
+        hilo = threading.Thread(target=lider)
+        hilo.start()
+        en_curso.wait(timeout=5)
+
+        assert orch.compartir_preparacion(0, lambda: 'listo') == 'listo'
+        hilo.join(timeout=5)
+        assert len(errores) == 1
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# sincronizar_estado
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _deployment(digito, replicas, listas):
+    return {
+        "metadata": {"name": f"suma-digito-{digito}", "labels": {"app": "suma-backend", "digito": str(digito)}},
+        "spec": {"replicas": replicas},
+        "status": {"readyReplicas": listas} if listas else {}
+    }
+
+
+class _ServicioDigito(BaseHTTPRequestHandler):
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        cuerpo = b'{"Result": 0, "CarryOut": 0}'
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def servicio_local():
+    """Servicio de dígito HTTP en localhost, como el que expone un port-forward huérfano."""
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), _ServicioDigito)
+    hilo = threading.Thread(target=servidor.serve_forever, daemon=True)
+    hilo.start()
+    yield servidor
+    servidor.shutdown()
+    servidor.server_close()
+
+
+class TestSincronizarEstado:
+    def _kubectl_get(self, *deployments):
+        r = MagicMock()
+        r.returncode = 0
+        r.stdout = json.dumps({"items": list(deployments)})
+        return r
+
+    def test_adopta_replicas_y_prepara_digitos_calientes(self, orch):
+        salida = self._kubectl_get(_deployment(0, 2, 2), _deployment(1, 1, 0), _deployment(2, 0, 0))
+
+        def port_forward(digito):
+            orch.port_forward_ports[digito] = 31000 + digito
+            return True
+
+        with patch("k8s_orchestrator.subprocess.run", return_value=salida) as run, \
+             patch.object(orch, "establecer_port_forward", side_effect=port_forward) as pf:
+            estado = orch.sincronizar_estado()
+
+        assert "app=suma-backend" in run.call_args[0][0]
+        assert estado[0] == {"Replicas": 2, "Listas": 2, "Endpoints": 0, "Puerto": 31000}
+        assert estado[1]["Puerto"] is None
+        pf.assert_called_once_with(0)
+        assert orch.es_arranque_en_frio(0) is False
+        assert orch.replicas_actuales(1) == 1
+        assert orch.es_arranque_en_frio(2) is True
+
+    def test_ignora_deployments_fuera_de_rango(self, orch):
+        with patch("k8s_orchestrator.subprocess.run", return_value=self._kubectl_get(_deployment(7, 1, 0))):
+            assert orch.sincronizar_estado() == {}
+
+    def test_in_cluster_cuenta_endpoints(self, orch_in_cluster):
+        with patch("k8s_orchestrator.subprocess.run", return_value=self._kubectl_get(_deployment(0, 2, 2))), \
+             patch.object(orch_in_cluster, "listar_endpoints_listos", return_value=[("10.0.0.1", 8000), ("10.0.0.2", 8000)]):
+            estado = orch_in_cluster.sincronizar_estado()
+
+        assert estado[0]["Endpoints"] == 2
+
+    def test_error_de_kubectl_devuelve_none(self, orch):
+        r = MagicMock()
+        r.returncode = 1
+        r.stderr = "forbidden"
+        with patch("k8s_orchestrator.subprocess.run", return_value=r):
+            assert orch.sincronizar_estado() is None
+        assert orch.es_arranque_en_frio(0) is True
+
+    def test_adopta_port_forward_existente(self, orch, servicio_local):
+        puerto = servicio_local.server_address[1]
+        orch.base_port = puerto - 1
+
+        with patch("k8s_orchestrator.subprocess.Popen") as popen:
+            assert orch.establecer_port_forward(1) is True
+
+        popen.assert_not_called()
+        assert orch.service_url(1) == (f"http://localhost:{puerto}", puerto)
+        assert orch.port_forward_processes[1].poll() is None
+
+        servicio_local.shutdown()
+        servicio_local.server_close()
+        assert orch.port_forward_processes[1].poll() == 1
+
+    def test_no_adopta_puerto_ocupado_por_otro_servicio(self, orch):
+        import socket
+        with socket.socket() as ocupado:
+            ocupado.bind(("127.0.0.1", 0))
+            ocupado.listen()
+            orch.base_port = ocupado.getsockname()[1]
+            assert orch._adoptar_port_forward(0) is False
+        assert 0 not in orch.port_forward_processes
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Presupuesto del API server
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestPresupuestoApi:
+    @pytest.fixture()
+    def prioridades(self, orch):
+        registradas = []
+
+        def ejecutar(funcion, prioridad=ALTA, clave=None):
+            registradas.append((prioridad, clave))
+            return funcion()
+
+        orch.presupuesto = MagicMock()
+        orch.presupuesto.ejecutar.side_effect = ejecutar
+        return registradas
+
+    def test_escalado_hacia_arriba_tiene_prioridad(self, orch, prioridades):
+        resultado = MagicMock(returncode=0)
+        with patch("k8s_orchestrator.subprocess.run", return_value=resultado):
+            orch.escalar_pod(0, 1)
+            orch.escalar_pod(0, 0)
+            orch.esperar_pod_ready(0)
+
+        assert [p for p, _ in prioridades] == [ALTA, BAJA, ALTA]
+        # Solo se fusionan escalados del mismo deployment en el mismo sentido
+        assert prioridades[0][1] != prioridades[1][1]
+        orch.escalar_pod(0, 3)
+        assert prioridades[0][1] == prioridades[3][1]
+
+    def test_escalado_fusionado_registra_las_replicas_aplicadas(self, orch, logger):
+        orch.presupuesto = MagicMock()
+        orch.presupuesto.ejecutar.return_value = (1, MagicMock(returncode=0))
+
+        assert orch.escalar_pod(0, 3) is True
+        assert orch.replicas_actuales(0) == 1
+        assert "fusionado" in logger.call_args[0][0]
+
+    def test_scale_down_no_sustituye_a_un_scale_up_pendiente(self, orch):
+        orch.presupuesto = ApiBudget(tasa=5, rafaga=1)
+        orch.presupuesto.ejecutar(lambda: None)
+        aplicadas = []
+
+        def fake_run(cmd, **kwargs):
+            aplicadas.append(next(a for a in cmd if a.startswith("--replicas=")))
+            return MagicMock(returncode=0)
+
+        resultados = {}
+        with patch("k8s_orchestrator.subprocess.run", side_effect=fake_run):
+            arriba = threading.Thread(target=lambda: resultados.update(arriba=orch.escalar_pod(0, 1)))
+            arriba.start()
+            while orch.presupuesto.en_cola() < 1:
+                time.sleep(0.005)
+            abajo = threading.Thread(target=lambda: resultados.update(abajo=orch.escalar_pod(0, 0)))
+            abajo.start()
+            arriba.join(timeout=3)
+            abajo.join(timeout=3)
+
+        assert aplicadas == ["--replicas=1", "--replicas=0"]
+        assert resultados == {"arriba": True, "abajo": True}
+
+    def test_timeout_de_escalado_tras_la_espera_en_cola(self, orch):
+        orch.presupuesto = ApiBudget(tasa=4, rafaga=1)
+        orch.presupuesto.ejecutar(lambda: None)
+
+        with patch("k8s_orchestrator.subprocess.run", return_value=MagicMock(returncode=0)) as run:
+            with con_deadline(Deadline(1)):
+                orch.escalar_pod(0, 1)
+
+        # La espera de ~0.25 s por el siguiente token ya no cuenta en el timeout de kubectl
+        assert run.call_args.kwargs["timeout"] < 0.9
+
+    def test_kubectl_auxiliar(self, orch, prioridades):
+        resultado = MagicMock(returncode=0, stdout="10.0.0.5")
+        with patch("k8s_orchestrator.subprocess.run", return_value=resultado) as run:
+            assert orch.kubectl("get", "svc", "suma-docs", timeout=5) is resultado
+
+        assert run.call_args[0][0] == ["kubectl", "get", "svc", "suma-docs"]
+        assert run.call_args.kwargs["timeout"] == 5
+        assert prioridades == [(BAJA, None)]
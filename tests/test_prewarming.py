@@ -0,0 +1,154 @@
+"""
+Tests unitarios para prewarming.py.
+
+Cobertura:
+    - tasa_por_minuto() / longitud_objetivo() : modelo de demanda por ventana
+    - digitos_a_mantener()                    : reservas explícitas, demanda prevista, pods en uso
+    - precalentar()                           : escala solo los pods fríos
+    - evaluar()                               : libera pods precalentados sin demanda ni uso en otro worker
+    - pod-segundos extra                      : contabilidad del coste del precalentamiento
+"""
+import pytest
+from unittest.mock import MagicMock
+
+from prewarming import Prewarmer
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# FIXTURES
+# ─────────────────────────────────────────────────────────────────────────────
+
+@pytest.fixture()
+def orch():
+    """Orquestador simulado que recuerda qué dígitos están calientes."""
+    calientes = set()
+    orch = MagicMock()
+
+    def escalar_pod(digito, replicas):
+        if replicas > 0:
+            calientes.add(digito)
+        else:
+            calientes.discard(digito)
+        return True
+
+    orch.escalar_pod.side_effect = escalar_pod
+    orch.es_arranque_en_frio.side_effect = lambda digito: digito not in calientes
+    return orch
+
+
+@pytest.fixture()
+def acumulado():
+    return []
+
+
+@pytest.fixture()
+def prewarmer(orch, acumulado):
+    return Prewarmer(
+        orchestrator=orch,
+        logger=MagicMock(),
+        max_digitos=4,
+        ventana_segundos=60,
+        umbral_tasa_por_minuto=3,
+        percentil_longitud=0.9,
+        ttl_explicito_segundos=30,
+        al_acumular_pod_segundos=acumulado.append,
+    )
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Modelo de demanda
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestModeloDemanda:
+    def test_tasa_cuenta_llegadas_en_ventana(self, prewarmer):
+        for t in (0, 10, 20):
+            prewarmer.inicio_operacion(2, ahora=1000 + t)
+        assert prewarmer.tasa_por_minuto(ahora=1030) == pytest.approx(3.0)
+
+    def test_tasa_purga_llegadas_antiguas(self, prewarmer):
+        prewarmer.inicio_operacion(2, ahora=1000)
+        assert prewarmer.tasa_por_minuto(ahora=1100) == 0
+
+    def test_longitud_objetivo_usa_percentil(self, prewarmer):
+        for num in (1, 1, 1, 1, 1, 1, 1, 1, 1, 3):
+            prewarmer.inicio_operacion(num, ahora=1000)
+        # percentil 0.9 de 10 muestras → 9ª muestra ordenada
+        assert prewarmer.longitud_objetivo(ahora=1000) == 1
+        prewarmer.inicio_operacion(4, ahora=1000)
+        assert prewarmer.longitud_objetivo(ahora=1000) == 3
+
+    def test_longitud_objetivo_sin_trafico(self, prewarmer):
+        assert prewarmer.longitud_objetivo(ahora=1000) == 0
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# digitos_a_mantener
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestDigitosAMantener:
+    def test_sin_demanda_no_mantiene_nada(self, prewarmer):
+        prewarmer.inicio_operacion(2, ahora=1000)
+        prewarmer.fin_operacion(2)
+        assert prewarmer.digitos_a_mantener(ahora=1001) == set()
+
+    def test_demanda_prevista_mantiene_longitud_objetivo(self, prewarmer):
+        for t in range(3):
+            prewarmer.inicio_operacion(2, ahora=1000 + t)
+            prewarmer.fin_operacion(2)
+        assert prewarmer.digitos_a_mantener(ahora=1005) == {0, 1}
+
+    def test_pods_en_uso_se_mantienen(self, prewarmer):
+        prewarmer.inicio_operacion(3, ahora=1000)
+        assert prewarmer.digitos_a_mantener(ahora=1001) == {0, 1, 2}
+
+    def test_reserva_explicita_caduca(self, prewarmer):
+        prewarmer.precalentar(2, ahora=1000)
+        assert prewarmer.digitos_a_mantener(ahora=1010) == {0, 1}
+        assert prewarmer.digitos_a_mantener(ahora=1031) == set()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# precalentar / evaluar
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestPrecalentar:
+    def test_escala_solo_pods_frios(self, prewarmer, orch):
+        orch.escalar_pod(0, 1)
+        orch.escalar_pod.reset_mock()
+        assert prewarmer.precalentar(2, ahora=1000) == [0, 1]
+        orch.escalar_pod.assert_called_once_with(1, 1)
+
+    def test_limita_a_max_digitos(self, prewarmer):
+        assert prewarmer.precalentar(9, ahora=1000) == [0, 1, 2, 3]
+
+    def test_sin_argumento_usa_distribucion(self, prewarmer):
+        prewarmer.inicio_operacion(3, ahora=1000)
+        prewarmer.fin_operacion(3)
+        assert prewarmer.precalentar(ahora=1001) == [0, 1, 2]
+
+    def test_evaluar_libera_pods_sin_demanda(self, prewarmer, orch, acumulado):
+        prewarmer.precalentar(1, ahora=1000)
+        prewarmer.evaluar(ahora=1040)
+        orch.escalar_pod.assert_called_with(0, 0)
+        assert acumulado == [pytest.approx(40)]
+
+    def test_evaluar_no_libera_pods_en_uso_en_otro_worker(self, prewarmer, orch):
+        prewarmer.en_uso_compartido = lambda: {0}
+        prewarmer.precalentar(2, ahora=1000)
+        prewarmer.evaluar(ahora=1040)
+        orch.escalar_pod.assert_called_with(1, 0)
+        assert orch.es_arranque_en_frio(0) is False
+
+
+class TestPodSegundosExtra:
+    def test_pod_usado_cierra_inactividad(self, prewarmer, acumulado):
+        prewarmer.precalentar(1, ahora=1000)
+        prewarmer.inicio_operacion(1, ahora=1004)
+        assert acumulado == [pytest.approx(4)]
+        assert prewarmer.pod_segundos_extra == pytest.approx(4)
+
+    def test_contabiliza_arranques(self, prewarmer):
+        prewarmer.inicio_operacion(3, ahora=1000)
+        prewarmer.fin_operacion(3, arranques_en_frio=2)
+        assert prewarmer.arranques_frio == 2
+        assert prewarmer.arranques_caliente == 1
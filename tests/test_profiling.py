@@ -0,0 +1,81 @@
+"""
+Tests unitarios para profiling.py.
+
+Cobertura:
+    - SamplingProfiler.perfilar()  : muestreo de otros hilos, exclusión de perfiles simultáneos
+    - formato_colapsado()          : una pila por línea con su número de muestras
+    - MemoryProfiler               : inicio/parada de tracemalloc, top y diff entre instantáneas
+"""
+import threading
+import tracemalloc
+
+import pytest
+
+from profiling import MemoryProfiler, SamplingProfiler, formato_colapsado
+
+
+def _funcion_ocupada(parar):
+    while not parar.is_set():
+        sum(range(1000))
+
+
+class TestSamplingProfiler:
+    def test_muestrea_otros_hilos(self):
+        parar = threading.Event()
+        hilo = threading.Thread(target=_funcion_ocupada, args=(parar,), name="trabajador")
+        hilo.start()
+        try:
+            pilas, muestras = SamplingProfiler(intervalo=0.001).perfilar(0.1)
+        finally:
+            parar.set()
+            hilo.join()
+
+        assert muestras > 0
+        del_trabajador = [pila for pila in pilas if pila.startswith("trabajador;")]
+        assert any("test_profiling.py:_funcion_ocupada" in pila for pila in del_trabajador)
+        assert not any("profiling.py:perfilar" in pila for pila in pilas)
+
+    def test_un_solo_perfil_a_la_vez(self):
+        profiler = SamplingProfiler()
+        profiler._lock.acquire()
+        try:
+            assert profiler.en_curso
+            with pytest.raises(RuntimeError):
+                profiler.perfilar(0.01)
+        finally:
+            profiler._lock.release()
+        assert not profiler.en_curso
+
+    def test_formato_colapsado(self):
+        from collections import Counter
+        texto = formato_colapsado(Counter({"main;a.py:f": 2, "main;a.py:g": 5}))
+        assert texto == "main;a.py:g 5\nmain;a.py:f 2\n"
+
+
+class TestMemoryProfiler:
+    @pytest.fixture
+    def profiler(self):
+        profiler = MemoryProfiler()
+        yield profiler
+        profiler.detener()
+
+    def test_inactivo_por_defecto(self, profiler):
+        assert not profiler.activo
+        with pytest.raises(RuntimeError):
+            profiler.instantanea()
+
+    def test_diff_entre_instantaneas(self, profiler):
+        profiler.iniciar(frames=1)
+        primera = profiler.instantanea()
+        assert primera["Diff"] is None
+
+        retenido = [bytearray(1024) for _ in range(200)]  # noqa: F841
+        segunda = profiler.instantanea(limite=5)
+        assert len(segunda["Top"]) <= 5
+        assert segunda["Diff"][0]["DiffBytes"] >= 200 * 1024
+        assert "test_profiling.py" in segunda["Diff"][0]["Ubicacion"]
+
+    def test_detener_apaga_tracemalloc(self, profiler):
+        profiler.iniciar()
+        profiler.detener()
+        assert not tracemalloc.is_tracing()
@@ -5,19 +5,42 @@ Cobertura:
     - get_digitos()           : descomposición de número en dígitos
     - normalizar_digitos()    : padding de listas de dígitos
     - get_nombre_posicion()   : mapeo posición → nombre
-    - POST /suma-n-digitos    : validaciones, happy-path, opciones CORS
+    - POST /suma-n-digitos    : validaciones, happy-path, opciones CORS, fields / verbose
     - GET  /terminal-stream   : cabeceras SSE
     - POST /terminal-clear    : limpia buffer
+    - GET  /terminal-history  : historial largo en el segmento en disco
     - GET  /docs-url          : respuestas ok / pending / error
     - GET  /grafana-url       : respuestas ok / pending / error
     - GET  /                  : sirve index.html
+    - GET  /<estático>        : caché de estáticos con ETag, 304, compresión y URLs versionadas
+    - POST /prewarm           : precalentamiento explícito de pods
+    - POST /suma-lote         : cálculo local por lotes y verificación cruzada de resultados
+    - POST /suma-multiple     : K operandos en árbol de reducción con los pods preparados una vez
+    - DIGIT_TRANSPORT=binary  : llamadas a los dígitos por el transporte binario
+    - GET  /shards            : estado de los shards del orquestador
+    - topología adaptativa    : todas las posiciones en un pod con poca carga, GET /topologia
+    - GET/POST /config        : ajustes en caliente validados, auditoría y huella en las métricas
+    - GET  /slo               : SLO de latencia en caliente y arranques en frío, guarda del scale-down
+    - preparación compartida  : peticiones concurrentes reutilizan la preparación de un pod en curso
+    - plazo de la operación   : X-Request-Timeout, 504 por plazo agotado, 499 por desconexión
+    - TRAFFIC_CAPTURE_DIR     : captura de cada operación para reproducirla
+    - GET  /readyz            : readiness tras la sincronización inicial con el clúster
+    - GET  /metrics           : etiqueta path agrupada por regla de Flask, gauges calculados en modo multiproceso
+    - GET  /debug/traces      : trazas por operación, propagación de traceparent
+    - /debug/profile/*        : perfil de CPU por muestreo y snapshots de tracemalloc
 """
 import json
+import os
+import subprocess
+import sys
+import time
 import pytest
 from unittest.mock import patch, MagicMock
 
 import proxy as proxy_module
 from proxy import get_digitos, normalizar_digitos, get_nombre_posicion
+from slo import SLOEngine
+from topology import TopologyController
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -206,6 +229,36 @@ class TestSumaNDigitosHappyPath:
         assert rv.status_code == 500
 
 
+# ─────────────────────────────────────────────────────────────────────────────
+# Estáticos del frontend
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestEstaticos:
+    def test_index_con_urls_versionadas(self, client):
+        rv = client.get("/")
+        assert rv.status_code == 200
+        assert rv.headers["Cache-Control"] == "no-cache"
+        assert proxy_module.static_assets.url("script.js") in rv.get_data(as_text=True)
+
+    def test_recurso_versionado_comprimido_y_304(self, client):
+        url = proxy_module.static_assets.url("script.js")
+        rv = client.get(url, headers={"Accept-Encoding": "gzip"})
+        assert rv.status_code == 200
+        assert rv.headers["Content-Encoding"] == "gzip"
+        assert "immutable" in rv.headers["Cache-Control"]
+
+        rv = client.get(url, headers={"Accept-Encoding": "gzip", "If-None-Match": rv.headers["ETag"]})
+        assert rv.status_code == 304
+
+    def test_ruta_sin_version_sigue_funcionando(self, client):
+        rv = client.get("/styles.css")
+        assert rv.status_code == 200
+        assert rv.headers["Cache-Control"] == "no-cache"
+
+    def test_fichero_inexistente_404(self, client):
+        assert client.get("/no-existe.txt").status_code == 404
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # ENDPOINT: GET /terminal-stream
 # ─────────────────────────────────────────────────────────────────────────────
@@ -234,31 +287,47 @@ class TestTerminalClear:
             assert len(proxy_module.terminal_log_buffer) == 0
 
 
+class TestTerminalHistory:
+    def test_deshabilitado_sin_directorio(self, client):
+        assert client.get("/terminal-history").status_code == 404
+
+    def test_busca_en_segmentos(self, client, tmp_path):
+        from terminal_log import LogSpill
+        spill = LogSpill(str(tmp_path / "terminal-1.log"), capacidad=10)
+        with patch.object(proxy_module, "TERMINAL_SPILL_DIR", str(tmp_path)), \
+                patch.object(proxy_module, "terminal_spill", spill):
+            proxy_module.registrar_terminal("primera\nsegunda", "warning")
+            rv = client.get("/terminal-history?desde=0")
+        lineas = rv.get_json()["Lineas"]
+        assert [l["message"] for l in lineas] == ["primera", "segunda"]
+        assert lineas[0]["level"] == "warning"
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # ENDPOINT: GET /docs-url
 # ─────────────────────────────────────────────────────────────────────────────
 
 class TestDocsUrl:
-    def test_devuelve_ip_cuando_disponible(self, client):
+    def test_devuelve_ip_cuando_disponible(self, client, mock_orch):
         mock_result = MagicMock()
         mock_result.stdout = "10.0.0.5"
-        with patch("proxy.subprocess.run", return_value=mock_result):
+        with patch.object(mock_orch, "kubectl", return_value=mock_result):
             rv = client.get("/docs-url")
         data = rv.get_json()
         assert data["status"] == "ok"
         assert data["url"] == "http://10.0.0.5"
 
-    def test_devuelve_pending_cuando_sin_ip(self, client):
+    def test_devuelve_pending_cuando_sin_ip(self, client, mock_orch):
         mock_result = MagicMock()
         mock_result.stdout = ""
-        with patch("proxy.subprocess.run", return_value=mock_result):
+        with patch.object(mock_orch, "kubectl", return_value=mock_result):
             rv = client.get("/docs-url")
         data = rv.get_json()
         assert data["status"] == "pending"
         assert data["url"] is None
 
-    def test_devuelve_error_si_subprocess_falla(self, client):
-        with patch("proxy.subprocess.run", side_effect=Exception("kubectl not found")):
+    def test_devuelve_error_si_kubectl_falla(self, client, mock_orch):
+        with patch.object(mock_orch, "kubectl", side_effect=Exception("kubectl not found")):
             rv = client.get("/docs-url")
         data = rv.get_json()
         assert data["status"] == "error"
@@ -270,25 +339,25 @@ class TestDocsUrl:
 # ─────────────────────────────────────────────────────────────────────────────
 
 class TestGrafanaUrl:
-    def test_devuelve_ip_cuando_disponible(self, client):
+    def test_devuelve_ip_cuando_disponible(self, client, mock_orch):
         mock_result = MagicMock()
         mock_result.stdout = "20.30.40.50"
-        with patch("proxy.subprocess.run", return_value=mock_result):
+        with patch.object(mock_orch, "kubectl", return_value=mock_result):
             rv = client.get("/grafana-url")
         data = rv.get_json()
         assert data["status"] == "ok"
         assert data["url"] == "http://20.30.40.50"
 
-    def test_devuelve_pending_cuando_sin_ip(self, client):
+    def test_devuelve_pending_cuando_sin_ip(self, client, mock_orch):
         mock_result = MagicMock()
         mock_result.stdout = "  "  # solo espacios
-        with patch("proxy.subprocess.run", return_value=mock_result):
+        with patch.object(mock_orch, "kubectl", return_value=mock_result):
             rv = client.get("/grafana-url")
         data = rv.get_json()
         assert data["status"] == "pending"
 
-    def test_devuelve_error_si_exception(self, client):
-        with patch("proxy.subprocess.run", side_effect=TimeoutError()):
+    def test_devuelve_error_si_exception(self, client, mock_orch):
+        with patch.object(mock_orch, "kubectl", side_effect=TimeoutError()):
             rv = client.get("/grafana-url")
         assert rv.get_json()["status"] == "error"
 
@@ -336,6 +405,43 @@ class TestLlamarServicioConReintento:
         assert result["Result"] == 7
         assert call_count["n"] == 2
 
+    def test_reintento_elige_otra_replica_y_reporta(self):
+        mock_resp = MagicMock()
+        mock_resp.ok = True
+        mock_resp.json.return_value = {"Result": 7, "CarryOut": 0}
+        urls = []
+
+        def fake_post(url, **kwargs):
+            urls.append(url)
+            if len(urls) == 1:
+                raise ConnectionError("pod caído")
+            return mock_resp
+
+        reportes = []
+        with patch("proxy.requests.post", side_effect=fake_post):
+            with patch("proxy.time.sleep"):
+                proxy_module.llamar_servicio_con_reintento(
+                    "http://10.0.0.1:8000", {}, 0, intentos=3,
+                    obtener_url=lambda: "http://10.0.0.2:8000",
+                    reportar=lambda url, exito, latencia: reportes.append((url, exito)),
+                )
+        assert urls == ["http://10.0.0.1:8000/suma", "http://10.0.0.2:8000/suma"]
+        assert reportes == [("http://10.0.0.1:8000", False), ("http://10.0.0.2:8000", True)]
+
+    def test_plazo_agotado_libera_la_replica_elegida(self):
+        from deadlines import Deadline, DeadlineExceeded, con_deadline
+        reportes = []
+        obtener_url = MagicMock(return_value="http://10.0.0.2:8000")
+        with con_deadline(Deadline(0)), patch("proxy.requests.post") as post:
+            with pytest.raises(DeadlineExceeded):
+                proxy_module.llamar_servicio_con_reintento(
+                    "http://10.0.0.1:8000", {}, 0, intentos=3, obtener_url=obtener_url,
+                    reportar=lambda url, exito, latencia: reportes.append((url, exito)),
+                )
+        post.assert_not_called()
+        obtener_url.assert_not_called()
+        assert reportes == [("http://10.0.0.1:8000", None)]
+
     def test_respuesta_http_error_lanza_excepcion(self):
         mock_resp = MagicMock()
         mock_resp.ok = False
@@ -347,3 +453,925 @@ class TestLlamarServicioConReintento:
                     proxy_module.llamar_servicio_con_reintento(
                         "http://localhost:31000", {}, 0, intentos=1
                     )
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# ENDPOINT: POST /prewarm
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestPrewarm:
+    def test_acepta_peticion_y_lanza_precalentamiento(self, client):
+        with patch("proxy.threading.Thread") as mock_thread:
+            rv = client.post("/prewarm", json={"Digitos": 3})
+        assert rv.status_code == 202
+        assert rv.get_json() == {"ok": True, "Digitos": 3}
+        mock_thread.assert_called_once_with(
+            target=proxy_module.prewarmer.precalentar, args=(3,), daemon=True
+        )
+        mock_thread.return_value.start.assert_called_once()
+
+    def test_digitos_invalidos_devuelve_400(self, client):
+        rv = client.post("/prewarm", json={"Digitos": "muchos"})
+        assert rv.status_code == 400
+
+    def test_deshabilitado(self, client):
+        with patch.object(proxy_module, "PREWARM_ENABLED", False):
+            rv = client.post("/prewarm", json={})
+        assert rv.get_json()["ok"] is False
+
+    def test_operacion_cuenta_arranque_en_frio(self, client, mock_orch):
+        mock_orch.service_url.return_value = ("http://localhost:31000", 31000)
+        resp = MagicMock()
+        resp.ok = True
+        resp.json.return_value = {"Result": 5, "CarryOut": 0}
+        with patch("proxy.requests.post", return_value=resp):
+            rv = client.post("/suma-n-digitos", json={"NumberA": 2, "NumberB": 3})
+        evento = rv.get_json()["EventosEscalado"][0]
+        assert evento["Arranque"] == "frio"
+
+    def test_fases_de_arranque_en_eventos_y_metricas(self, client, mock_orch):
+        mock_orch.fases_arranque.return_value = {"programacion": 1.0, "imagen": 4.25, "total": 9.0}
+        resp = MagicMock()
+        resp.ok = True
+        resp.json.return_value = {"Result": 5, "CarryOut": 0}
+        with patch("proxy.requests.post", return_value=resp):
+            rv = client.post("/suma-n-digitos", json={"NumberA": 2, "NumberB": 3})
+        listo = next(e for e in rv.get_json()["EventosEscalado"] if e["Tipo"] == "listo")
+        assert listo["Fases"] == {"programacion": 1.0, "imagen": 4.25, "total": 9.0}
+        metricas = client.get("/metrics").get_data(as_text=True)
+        assert 'suma_arranque_frio_fase_duracion_seconds_count{digito="0",fase="imagen"}' in metricas
+
+    def test_pod_caliente_no_consulta_fases(self, client, mock_orch):
+        mock_orch.es_arranque_en_frio.return_value = False
+        resp = MagicMock()
+        resp.ok = True
+        resp.json.return_value = {"Result": 5, "CarryOut": 0}
+        with patch("proxy.requests.post", return_value=resp):
+            rv = client.post("/suma-n-digitos", json={"NumberA": 2, "NumberB": 3})
+        mock_orch.fases_arranque.assert_not_called()
+        assert all("Fases" not in e for e in rv.get_json()["EventosEscalado"])
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Autoescalado horizontal por dígito
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestAutoescalado:
+    def test_operacion_no_reduce_replicas_autoescaladas(self, client, mock_orch):
+        mock_orch.replicas_actuales.return_value = 3
+        resp = MagicMock()
+        resp.ok = True
+        resp.json.return_value = {"Result": 5, "CarryOut": 0}
+        with patch("proxy.requests.post", return_value=resp):
+            rv = client.post("/suma-n-digitos", json={"NumberA": 2, "NumberB": 3})
+        assert rv.status_code == 200
+        mock_orch.escalar_pod.assert_called_once_with(0, 3)
+
+    def test_llamada_queda_registrada(self, client, mock_orch):
+        resp = MagicMock()
+        resp.ok = True
+        resp.json.return_value = {"Result": 5, "CarryOut": 0}
+        with patch("proxy.requests.post", return_value=resp):
+            client.post("/suma-n-digitos", json={"NumberA": 2, "NumberB": 3})
+        assert proxy_module.autoscaler.estadisticas(0)["tasa"] > 0
+        assert proxy_module.autoscaler.en_curso(0) == 0
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Timeouts adaptativos y peticiones de cobertura (hedging)
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestHedging:
+    @pytest.fixture()
+    def estimador(self):
+        from latency import LatencyEstimator
+        est = LatencyEstimator(min_muestras=5, timeout_min=0.5, timeout_max=8.0)
+        for _ in range(5):
+            est.registrar(0, 0.05)
+        with patch.object(proxy_module, "latency_estimator", est), \
+                patch.object(proxy_module, "HEDGING_ENABLED", True):
+            yield est
+
+    def _respuesta(self, result):
+        resp = MagicMock()
+        resp.ok = True
+        resp.json.return_value = {"Result": result, "CarryOut": 0}
+        return resp
+
+    def test_timeout_adaptativo(self, estimador):
+        timeouts = []
+
+        def fake_post(url, json, headers, timeout):
+            timeouts.append(timeout)
+            return self._respuesta(1)
+
+        with patch("proxy.requests.post", side_effect=fake_post):
+            proxy_module.llamar_servicio_con_reintento("http://a", {}, 0, intentos=1)
+        assert timeouts == [0.5]
+
+    def test_cobertura_gana_a_llamada_lenta(self, estimador):
+        import threading as _threading
+        liberar = _threading.Event()
+
+        def fake_post(url, json, headers, timeout):
+            if url.startswith("http://lento"):
+                liberar.wait(2)
+                return self._respuesta(0)
+            return self._respuesta(9)
+
+        hedges = proxy_module.digit_hedges.labels(digito="0")
+        wins = proxy_module.digit_hedge_wins.labels(digito="0")
+        antes = (hedges._value.get(), wins._value.get())
+        try:
+            with patch("proxy.requests.post", side_effect=fake_post):
+                data = proxy_module.llamar_servicio_con_reintento(
+                    "http://lento", {}, 0, intentos=1, obtener_url=lambda: "http://rapido"
+                )
+        finally:
+            liberar.set()
+        assert data["Result"] == 9
+        assert (hedges._value.get(), wins._value.get()) == (antes[0] + 1, antes[1] + 1)
+
+    def test_sin_cobertura_si_responde_a_tiempo(self, estimador):
+        llamadas = []
+
+        def fake_post(url, json, headers, timeout):
+            llamadas.append(url)
+            return self._respuesta(4)
+
+        with patch("proxy.requests.post", side_effect=fake_post):
+            data = proxy_module.llamar_servicio_con_reintento("http://a", {}, 0, intentos=1)
+        assert data["Result"] == 4
+        assert llamadas == ["http://a/suma"]
+
+    def test_espera_en_el_pool_no_provoca_cobertura(self, estimador):
+        import threading as _threading
+        from concurrent.futures import ThreadPoolExecutor
+        llamadas = []
+
+        def fake_post(url, json, headers, timeout):
+            llamadas.append(url)
+            return self._respuesta(4)
+
+        # Pool saturado más allá del umbral de cobertura: la llamada espera turno pero responde a tiempo
+        pool = ThreadPoolExecutor(max_workers=1)
+        ocupado = _threading.Event()
+        pool.submit(ocupado.wait, 0.3)
+        hedges = proxy_module.digit_hedges.labels(digito="0")
+        antes = hedges._value.get()
+        try:
+            with patch.object(proxy_module, "_hedge_executor", pool), \
+                    patch("proxy.requests.post", side_effect=fake_post):
+                data = proxy_module.llamar_servicio_con_reintento(
+                    "http://a", {}, 0, intentos=1, obtener_url=lambda: "http://b"
+                )
+        finally:
+            pool.shutdown(wait=False)
+        assert data["Result"] == 4
+        assert llamadas == ["http://a/suma"]
+        assert hedges._value.get() == antes
+
+    def test_cobertura_sin_pool_libera_su_replica(self, estimador):
+        import threading as _threading
+        liberar = _threading.Event()
+        reportes = []
+        pool = MagicMock()
+
+        # La principal entra en el pool; el duplicado no (pool cerrado al apagar)
+        def submit(*args):
+            if pool.submit.call_count > 1:
+                raise RuntimeError("cannot schedule new futures after shutdown")
+            return proxy_module._reduccion_executor.submit(*args)
+
+        pool.submit.side_effect = submit
+
+        def fake_post(url, json, headers, timeout):
+            liberar.wait(0.3)
+            return self._respuesta(6)
+
+        with patch.object(proxy_module, "_hedge_executor", pool), \
+                patch("proxy.requests.post", side_effect=fake_post):
+            data = proxy_module.llamar_servicio_con_reintento(
+                "http://10.0.0.1:8000", {}, 0, intentos=1, obtener_url=lambda: "http://10.0.0.2:8000",
+                reportar=lambda url, exito, latencia: reportes.append((url, exito)),
+            )
+        assert data["Result"] == 6
+        assert reportes == [("http://10.0.0.2:8000", None), ("http://10.0.0.1:8000", True)]
+
+    def test_pool_dimensionado_para_todos_los_hilos(self):
+        assert proxy_module._hedge_executor._max_workers == proxy_module.HEDGE_POOL_SIZE
+        assert proxy_module.HEDGE_POOL_SIZE >= 2 * proxy_module.MULTI_SUM_PARALLELISM
+
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Scale-down coordinado mediante el estado compartido
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestScaleDownCoordinado:
+    def test_no_apaga_pods_en_uso(self, mock_orch, ajustar_config):
+        ajustar_config(AUTO_SCALE_DOWN=True)
+        token = proxy_module.estado_compartido.adquirir_digitos([0, 1])
+        try:
+            proxy_module.escalar_a_cero_en_background(2)
+        finally:
+            proxy_module.estado_compartido.liberar_digitos(token)
+        excluir = mock_orch.escalar_a_cero.call_args.kwargs["excluir"]
+        assert {0, 1} <= excluir()
+
+    def test_omite_si_otro_scale_down_en_curso(self, mock_orch, ajustar_config):
+        ajustar_config(AUTO_SCALE_DOWN=True)
+        proxy_module.estado_compartido.intentar_bloqueo("scale-down", "otro-worker")
+        try:
+            proxy_module.escalar_a_cero_en_background(2)
+        finally:
+            proxy_module.estado_compartido.liberar_bloqueo("scale-down", "otro-worker")
+        mock_orch.escalar_a_cero.assert_not_called()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Tracing de operaciones y endpoint de depuración
+# ─────────────────────────────────────────────────────────────────────────────
+
+DEBUG = {"X-Debug-Token": "secreto"}
+ADMIN = {"X-Admin-Token": "admin"}
+
+
+@pytest.fixture()
+def token_depuracion(monkeypatch):
+    monkeypatch.setattr(proxy_module, "DEBUG_TOKEN", "secreto")
+
+
+@pytest.mark.usefixtures("token_depuracion")
+class TestTracing:
+    def _sumar(self, client, cabeceras_recibidas, headers=None):
+        def fake_post(url, json, headers, timeout):
+            cabeceras_recibidas.append(headers)
+            resp = MagicMock()
+            resp.ok = True
+            resp.json.return_value = {"Result": 3, "CarryOut": 0}
+            return resp
+
+        with patch("proxy.requests.post", side_effect=fake_post):
+            return client.post("/suma-n-digitos", json={"NumberA": 1, "NumberB": 2}, headers=headers)
+
+    def test_traza_con_spans_por_etapa(self, client, mock_orch):
+        rv = self._sumar(client, [])
+        trace_id = rv.headers["X-Trace-Id"]
+
+        traza = client.get(f"/debug/traces/{trace_id}", headers=DEBUG).get_json()
+        nombres = [s["Nombre"] for s in traza["Spans"]]
+        assert nombres[0] == "operacion"
+        for etapa in ("escalar", "esperar_ready", "esperar_endpoints", "port_forward", "llamada_digito", "peticion_http"):
+            assert etapa in nombres
+        assert traza["RutaCritica"][0]["Nombre"] == "operacion"
+
+    def test_propaga_traceparent_al_backend(self, client, mock_orch):
+        cabeceras = []
+        rv = self._sumar(client, cabeceras)
+        assert cabeceras[0]["traceparent"].split("-")[1] == rv.headers["X-Trace-Id"]
+
+    def test_continua_traza_del_cliente(self, client, mock_orch):
+        traceparent = "00-" + "c" * 32 + "-" + "d" * 16 + "-01"
+        rv = self._sumar(client, [], headers={"traceparent": traceparent})
+        assert rv.headers["X-Trace-Id"] == "c" * 32
+
+    def test_error_marca_la_traza(self, client, mock_orch):
+        mock_orch.escalar_pod.return_value = False
+        rv = client.post("/suma-n-digitos", json={"NumberA": 1, "NumberB": 2})
+        resumen = next(t for t in client.get("/debug/traces", headers=DEBUG).get_json()["Trazas"]
+                       if t["TraceId"] == rv.headers["X-Trace-Id"])
+        assert resumen["Estado"] == "error"
+
+    def test_traza_inexistente_404(self, client):
+        assert client.get("/debug/traces/" + "0" * 32, headers=DEBUG).status_code == 404
+
+    def test_token_de_depuracion(self, client):
+        assert client.get("/debug/traces").status_code == 403
+        assert client.get("/debug/traces", headers={"X-Debug-Token": "otro"}).status_code == 403
+        assert client.get("/debug/traces", headers=DEBUG).status_code == 200
+
+    def test_sin_token_configurado_no_existen(self, client, monkeypatch):
+        monkeypatch.setattr(proxy_module, "DEBUG_TOKEN", "")
+        assert client.get("/debug/traces").status_code == 404
+        assert client.get("/debug/traces", headers={"X-Debug-Token": ""}).status_code == 404
+        assert client.get("/debug/profile/cpu?seconds=0.01").status_code == 404
+        assert client.post("/debug/profile/memory/start").status_code == 404
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Perfilado bajo demanda
+# ─────────────────────────────────────────────────────────────────────────────
+
+@pytest.mark.usefixtures("token_depuracion")
+class TestProfiling:
+    def test_perfil_cpu_en_pilas_colapsadas(self, client):
+        rv = client.get("/debug/profile/cpu?seconds=0.05&interval_ms=1", headers=DEBUG)
+        assert rv.status_code == 200
+        assert rv.mimetype == "text/plain"
+        assert int(rv.headers["X-Profile-Samples"]) > 0
+        linea = rv.get_data(as_text=True).splitlines()[0]
+        assert linea.rsplit(" ", 1)[1].isdigit()
+
+    def test_perfil_cpu_valida_duracion(self, client):
+        assert client.get("/debug/profile/cpu?seconds=0", headers=DEBUG).status_code == 400
+        assert client.get("/debug/profile/cpu?seconds=abc", headers=DEBUG).status_code == 400
+        assert client.get("/debug/profile/cpu?seconds=9999", headers=DEBUG).status_code == 400
+
+    def test_perfil_cpu_en_curso_409(self, client):
+        with patch.object(proxy_module.cpu_profiler, "perfilar", side_effect=RuntimeError("en curso")):
+            assert client.get("/debug/profile/cpu?seconds=1", headers=DEBUG).status_code == 409
+
+    def test_ciclo_de_memoria(self, client):
+        assert client.post("/debug/profile/memory/snapshot", headers=DEBUG).status_code == 409
+        try:
+            assert client.post("/debug/profile/memory/start", json={"Frames": 1}, headers=DEBUG).status_code == 200
+            data = client.post("/debug/profile/memory/snapshot", json={"Limite": 3}, headers=DEBUG).get_json()
+            assert len(data["Top"]) <= 3
+            assert data["Diff"] is None
+        finally:
+            client.post("/debug/profile/memory/stop", headers=DEBUG)
+        assert not proxy_module.memory_profiler.activo
+
+    @pytest.mark.parametrize("cuerpo", [{"Frames": "abc"}, {"Frames": None}, {"Limite": [1]}, {"Limite": True}])
+    def test_memoria_valida_parametros(self, client, cuerpo):
+        assert client.post("/debug/profile/memory/start", json=cuerpo, headers=DEBUG).status_code == 400
+        assert not proxy_module.memory_profiler.activo
+
+    def test_memoria_acota_parametros(self, client):
+        try:
+            with patch.object(proxy_module.memory_profiler, "iniciar") as iniciar:
+                client.post("/debug/profile/memory/start", json={"Frames": 10 ** 6}, headers=DEBUG)
+            iniciar.assert_called_once_with(frames=proxy_module.PROFILING_MAX_FRAMES)
+        finally:
+            client.post("/debug/profile/memory/stop", headers=DEBUG)
+
+    def test_requiere_token(self, client):
+        assert client.get("/debug/profile/cpu?seconds=0.01").status_code == 403
+        assert client.post("/debug/profile/memory/start").status_code == 403
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Cálculo local por lotes y verificación cruzada
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestSumaLote:
+    def test_suma_lote(self, client, mock_orch):
+        rv = client.post("/suma-lote", json={"NumbersA": [1, 9999, 10 ** 20], "NumbersB": [2, 1, 10 ** 20]})
+        assert rv.status_code == 200
+        data = rv.get_json()
+        assert data["Results"] == [3, 10000, 2 * 10 ** 20]
+        assert data["NumOperaciones"] == 3
+        mock_orch.escalar_pod.assert_not_called()
+
+    def test_lote_invalido(self, client):
+        assert client.post("/suma-lote", json={"NumbersA": [1], "NumbersB": []}).status_code == 400
+        assert client.post("/suma-lote", json={"NumbersA": ["x"], "NumbersB": [1]}).status_code == 400
+        assert client.post("/suma-lote", json={"NumbersA": [-1], "NumbersB": [1]}).status_code == 400
+
+    def test_lote_demasiado_grande(self, client):
+        with patch.object(proxy_module, "LOCAL_BATCH_MAX", 2):
+            rv = client.post("/suma-lote", json={"NumbersA": [1, 2, 3], "NumbersB": [1, 2, 3]})
+        assert rv.status_code == 400
+
+    def test_discrepancia_del_backend_se_cuenta(self, client, mock_orch):
+        resp = MagicMock()
+        resp.ok = True
+        resp.json.return_value = {"Result": 7, "CarryOut": 0}   # 2 + 3 no es 7
+        antes = proxy_module.verification_mismatches._value.get()
+        with patch("proxy.requests.post", return_value=resp):
+            rv = client.post("/suma-n-digitos", json={"NumberA": 2, "NumberB": 3})
+        assert rv.status_code == 200
+        assert proxy_module.verification_mismatches._value.get() == antes + 1
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Transporte binario hacia los servicios de dígito
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestTransporteBinario:
+    def test_suma_por_transporte_binario(self, client, mock_orch):
+        from digit_transport import DigitBinaryServer
+        servidor = DigitBinaryServer().iniciar()
+        try:
+            mock_orch.service_url.return_value = (f"http://127.0.0.1:{servidor.puerto}", servidor.puerto)
+            with patch.object(proxy_module, "DIGIT_TRANSPORT", "binary"), \
+                    patch("proxy.requests.post") as mock_post:
+                rv = client.post("/suma-n-digitos", json={"NumberA": 1234, "NumberB": 5678})
+        finally:
+            servidor.detener()
+        assert rv.status_code == 200
+        assert rv.get_json()["Result"] == 6912
+        mock_post.assert_not_called()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Selección de secciones de la respuesta (fields / verbose)
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestSeleccionCampos:
+    def _sumar(self, client, url="/suma-n-digitos", **extra):
+        resp = MagicMock()
+        resp.ok = True
+        resp.json.return_value = {"Result": 5, "CarryOut": 0}
+        with patch("proxy.requests.post", return_value=resp):
+            return client.post(url, json={"NumberA": 2, "NumberB": 3, **extra})
+
+    def test_respuesta_completa_por_defecto(self, client, mock_orch):
+        assert set(self._sumar(client).get_json()) == set(proxy_module.CAMPOS_RESPUESTA)
+
+    def test_fields_en_query(self, client, mock_orch):
+        assert self._sumar(client, "/suma-n-digitos?fields=Result").get_json() == {"Result": 5}
+
+    def test_fields_en_cuerpo(self, client, mock_orch):
+        data = self._sumar(client, Fields=["Result", "CarryOut"]).get_json()
+        assert data == {"Result": 5, "CarryOut": 0}
+
+    def test_verbose_false(self, client, mock_orch):
+        data = self._sumar(client, "/suma-n-digitos?verbose=false").get_json()
+        assert "Details" not in data and "EventosEscalado" not in data
+        assert data["Result"] == 5
+
+    def test_campo_desconocido_400(self, client, mock_orch):
+        rv = self._sumar(client, "/suma-n-digitos?fields=Result,Secreto")
+        assert rv.status_code == 400
+        mock_orch.escalar_pod.assert_not_called()
+
+    def test_serializacion_como_etapa(self, client, mock_orch):
+        self._sumar(client, "/suma-n-digitos?fields=Result")
+        metricas = client.get("/metrics").get_data(as_text=True)
+        assert 'suma_etapa_duracion_seconds_count{etapa="serializacion"}' in metricas
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# GET /shards
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestShards:
+    def test_sin_sharding(self, client):
+        assert client.get("/shards").get_json() == {"Sharding": False, "Shards": []}
+
+    def test_estado_por_shard(self, client, monkeypatch):
+        from sharding import ShardedOrchestrator
+
+        shard_a, shard_b = MagicMock(balanceador=None), MagicMock(balanceador=None)
+        for shard in (shard_a, shard_b):
+            shard.escalar_pod.return_value = True
+            shard.replicas_actuales.return_value = 0
+        sharded = ShardedOrchestrator([("ns-a", shard_a), ("ns-b", shard_b)], logger=MagicMock())
+        sharded.escalar_pod(0, 1)
+        monkeypatch.setattr(proxy_module, "orchestrator", sharded)
+
+        data = client.get("/shards").get_json()
+
+        assert data["Sharding"] is True
+        assert [s["Shard"] for s in data["Shards"]] == ["ns-a", "ns-b"]
+        assert data["Shards"][0]["Digitos"] == [0]
+
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Preparación compartida de pods
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestPreparacionCompartida:
+    def test_reutiliza_preparacion_en_curso(self, client, mock_orch):
+        # Otra petición ya está preparando el pod: esta solo recibe el resultado compartido
+        mock_orch.compartir_preparacion.side_effect = lambda digito, funcion: {}
+        resp = MagicMock()
+        resp.ok = True
+        resp.json.return_value = {"Result": 5, "CarryOut": 0}
+
+        with patch("proxy.requests.post", return_value=resp):
+            rv = client.post("/suma-n-digitos", json={"NumberA": 2, "NumberB": 3})
+
+        assert rv.status_code == 200
+        assert rv.get_json()["Result"] == 5
+        mock_orch.escalar_pod.assert_not_called()
+        mock_orch.esperar_pod_ready.assert_not_called()
+        metricas = client.get("/metrics").get_data(as_text=True)
+        assert 'suma_preparacion_compartida_total{digito="0"}' in metricas
+
+    def test_error_compartido_devuelve_500(self, client, mock_orch):
+        def fallo(digito, funcion):
+            raise Exception("El pod suma-digito-0 no está listo después de 60 segundos")
+
+        mock_orch.compartir_preparacion.side_effect = fallo
+        rv = client.post("/suma-n-digitos", json={"NumberA": 2, "NumberB": 3})
+
+        assert rv.status_code == 500
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# POST /suma-multiple
+# ─────────────────────────────────────────────────────────────────────────────
+
+def _pod_sumador(url, json=None, **kwargs):
+    """Respuesta de un pod de dígito real: suma de una cifra con acarreo."""
+    suma = json["NumberA"] + json["NumberB"] + json["CarryIn"]
+    resp = MagicMock()
+    resp.ok = True
+    resp.json.return_value = {"Result": suma % 10, "CarryOut": suma // 10}
+    return resp
+
+
+class TestSumaMultiple:
+    def test_reduccion_en_arbol(self, client, mock_orch):
+        with patch("proxy.requests.post", side_effect=_pod_sumador):
+            rv = client.post("/suma-multiple", json={"Numbers": [1, 2, 3, 4, 5]})
+
+        assert rv.status_code == 200
+        data = rv.get_json()
+        assert data["Result"] == 15
+        assert data["NumOperandos"] == 5
+        assert [(n["Nivel"], n["Sumas"]) for n in data["Niveles"]] == [(1, 2), (2, 1), (3, 1)]
+        assert data["ContenedoresUsados"] == 2
+        # Pods preparados una sola vez para toda la reducción
+        assert sorted(c.args[0] for c in mock_orch.escalar_pod.call_args_list) == [0, 1]
+        assert "X-Trace-Id" in rv.headers
+
+    def test_sumas_parciales_mas_largas_que_los_pods(self, client, mock_orch):
+        with patch("proxy.requests.post", side_effect=_pod_sumador):
+            rv = client.post("/suma-multiple", json={"Numbers": [9999] * 5})
+
+        assert rv.status_code == 200
+        assert rv.get_json()["Result"] == 49995
+        assert sorted(c.args[0] for c in mock_orch.escalar_pod.call_args_list) == [0, 1, 2, 3]
+
+    @pytest.mark.parametrize("cuerpo", [
+        {},
+        {"Numbers": []},
+        {"Numbers": [1, 10000]},
+        {"Numbers": [1, "x"]},
+        {"Numbers": [1] * 1000},
+    ])
+    def test_validaciones(self, client, mock_orch, cuerpo):
+        rv = client.post("/suma-multiple", json=cuerpo)
+        assert rv.status_code == 400
+        mock_orch.escalar_pod.assert_not_called()
+
+    def test_error_de_un_pod_devuelve_500(self, client, mock_orch):
+        mock_orch.establecer_port_forward.return_value = False
+        rv = client.post("/suma-multiple", json={"Numbers": [1, 2]})
+        assert rv.status_code == 500
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Topología adaptativa
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestTopologia:
+    @pytest.fixture(autouse=True)
+    def _adaptativa(self, monkeypatch):
+        monkeypatch.setattr(proxy_module, "TOPOLOGY_ADAPTIVE", True)
+        monkeypatch.setattr(proxy_module, "topology", TopologyController())
+
+    def test_poca_carga_un_solo_pod(self, client, mock_orch):
+        with patch("proxy.requests.post", side_effect=_pod_sumador):
+            rv = client.post("/suma-n-digitos", json={"NumberA": 1234, "NumberB": 8766})
+
+        assert rv.status_code == 200
+        data = rv.get_json()
+        assert data["Result"] == 10000
+        assert data["NumDigitos"] == 4
+        assert data["ContenedoresUsados"] == 1
+        assert data["Topologia"] == "concentrada"
+        assert {d["Pod"] for d in data["Details"]} == {"suma-digito-0"}
+        assert [c.args[0] for c in mock_orch.escalar_pod.call_args_list] == [0]
+        assert proxy_module.topology.operaciones["concentrada"] == 1
+
+    def test_distribuida_un_pod_por_digito(self, client, mock_orch):
+        proxy_module.topology.actual = "distribuida"
+        proxy_module.topology.permanencia_segundos = 60
+        with patch("proxy.requests.post", side_effect=_pod_sumador):
+            data = client.post("/suma-n-digitos", json={"NumberA": 12, "NumberB": 34}).get_json()
+
+        assert data["Result"] == 46
+        assert data["Topologia"] == "distribuida"
+        assert sorted(c.args[0] for c in mock_orch.escalar_pod.call_args_list) == [0, 1]
+
+    def test_endpoint_y_metrica(self, client, mock_orch):
+        with patch("proxy.requests.post", side_effect=_pod_sumador):
+            client.post("/suma-n-digitos", json={"NumberA": 12, "NumberB": 34})
+
+        estado = client.get("/topologia").get_json()
+        assert estado["Adaptativa"] is True
+        assert estado["Topologia"] == "concentrada"
+        assert estado["Operaciones"]["concentrada"] == 1
+        assert estado["EnCurso"] == 0
+
+        metricas = client.get("/metrics").get_data(as_text=True)
+        assert 'suma_operaciones_topologia_total{topologia="concentrada"}' in metricas
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Configuración en caliente (/config)
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestConfiguracion:
+    @pytest.fixture(autouse=True)
+    def _restaurar(self, ajustar_config, monkeypatch):
+        monkeypatch.setattr(proxy_module, "CONFIG_ADMIN_TOKEN", "admin")
+        yield
+
+    def test_get_describe_ajustes(self, client):
+        data = client.get("/config").get_json()
+        assert data["Valores"]["AUTO_SCALE_DOWN"] is False
+        assert data["Ajustes"]["DIGIT_RETRIES"]["Maximo"] == 20
+        assert data["Version"] == proxy_module.runtime_config.actual().version
+
+    def test_post_aplica_en_la_siguiente_operacion(self, client, mock_orch):
+        rv = client.post("/config", json={"MAX_DIGITOS": 2, "POD_READY_TIMEOUT_SECONDS": 5},
+                         headers={**ADMIN, "X-Config-Author": "ops"})
+        assert rv.status_code == 200
+        assert rv.get_json()["Cambios"]["MAX_DIGITOS"] == {"Antes": 4, "Despues": 2}
+
+        assert client.post("/suma-n-digitos", json={"NumberA": 123, "NumberB": 1}).status_code == 400
+        with patch("proxy.requests.post", side_effect=_pod_sumador):
+            assert client.post("/suma-n-digitos", json={"NumberA": 12, "NumberB": 3}).status_code == 200
+        mock_orch.esperar_pod_ready.assert_any_call(0, timeout=5)
+
+        auditoria = client.get("/config/auditoria?limit=1").get_json()["Auditoria"]
+        assert auditoria[0]["Autor"] == "ops" and auditoria[0]["Origen"] == "api"
+
+    def test_reintentos_y_timeout_en_caliente(self, client, mock_orch):
+        client.post("/config", json={"DIGIT_RETRIES": 2, "DIGIT_TIMEOUT_SECONDS": 3}, headers=ADMIN)
+        assert proxy_module.latency_estimator.timeout_max == 3
+
+        with patch("proxy.requests.post", side_effect=Exception("caído")) as post, \
+                patch("proxy.deadlines.dormir"):
+            rv = client.post("/suma-n-digitos", json={"NumberA": 1, "NumberB": 2})
+        assert rv.status_code == 500
+        assert post.call_count == 2
+
+    def test_valor_invalido_400(self, client):
+        version = proxy_module.runtime_config.actual().version
+        rv = client.post("/config", json={"MAX_DIGITOS": 9, "AUTO_SCALE_DOWN": True}, headers=ADMIN)
+        assert rv.status_code == 400
+        assert set(rv.get_json()["Errores"]) == {"MAX_DIGITOS"}
+        assert proxy_module.runtime_config.actual().version == version
+        assert proxy_module.runtime_config["AUTO_SCALE_DOWN"] is False
+
+    def test_if_match_conflicto_409(self, client):
+        version = proxy_module.runtime_config.actual().version
+        assert client.post("/config", json={"DIGIT_RETRIES": 3},
+                           headers={**ADMIN, "If-Match": str(version)}).status_code == 200
+        assert client.post("/config", json={"DIGIT_RETRIES": 4},
+                           headers={**ADMIN, "If-Match": str(version)}).status_code == 409
+
+    def test_token_de_administracion(self, client):
+        assert client.post("/config", json={"DIGIT_RETRIES": 3}).status_code == 403
+        assert client.post("/config", json={"DIGIT_RETRIES": 3},
+                           headers={"X-Admin-Token": "otro"}).status_code == 403
+        assert client.post("/config", json={"DIGIT_RETRIES": 3}, headers=ADMIN).status_code == 200
+
+    def test_sin_token_configurado_solo_lectura(self, client, monkeypatch):
+        monkeypatch.setattr(proxy_module, "CONFIG_ADMIN_TOKEN", "")
+        monkeypatch.setattr(proxy_module, "DEBUG_TOKEN", "admin")
+        assert client.post("/config", json={"DIGIT_RETRIES": 3}, headers=ADMIN).status_code == 403
+        assert client.post("/config", json={"DIGIT_RETRIES": 3},
+                           headers={"X-Admin-Token": ""}).status_code == 403
+        assert client.get("/config").status_code == 200
+        assert proxy_module.runtime_config["DIGIT_RETRIES"] != 3
+
+    def test_persiste_para_los_demas_workers(self, client, monkeypatch, tmp_path):
+        ruta = tmp_path / "config.json"
+        monkeypatch.setattr(proxy_module, "CONFIG_FILE", str(ruta))
+        rv = client.post("/config", json={"SCALE_DOWN_DELAY_SECONDS": 30}, headers=ADMIN)
+        assert rv.get_json()["Persistido"] is True
+        assert json.loads(ruta.read_text())["SCALE_DOWN_DELAY_SECONDS"] == 30
+
+    def test_if_match_con_la_version_persistida_por_otro_worker(self, client, monkeypatch, tmp_path):
+        ruta = tmp_path / "config.json"
+        monkeypatch.setattr(proxy_module, "CONFIG_FILE", str(ruta))
+        version = client.post("/config", json={"DIGIT_RETRIES": 3}, headers=ADMIN).get_json()["Version"]
+
+        # Otro worker aplica y persiste un cambio que este proceso aún no ha recargado
+        persistido = json.loads(ruta.read_text())
+        ruta.write_text(json.dumps({**persistido, "DIGIT_RETRIES": 4, "_version": version + 1}))
+
+        rv = client.post("/config", json={"DIGIT_RETRIES": 5}, headers={**ADMIN, "If-Match": str(version)})
+        assert rv.status_code == 409
+        assert proxy_module.runtime_config.actual().version == version + 1
+        assert proxy_module.runtime_config["DIGIT_RETRIES"] == 4
+
+        rv = client.post("/config", json={"DIGIT_RETRIES": 5}, headers={**ADMIN, "If-Match": str(version + 1)})
+        assert rv.get_json()["Version"] == version + 2
+        assert json.loads(ruta.read_text())["_version"] == version + 2
+
+    def test_duracion_etiquetada_con_la_huella(self, client, mock_orch):
+        client.post("/config", json={"DIGIT_RETRIES": 5}, headers=ADMIN)
+        huella = proxy_module.runtime_config.actual().huella
+        with patch("proxy.requests.post", side_effect=_pod_sumador):
+            client.post("/suma-n-digitos", json={"NumberA": 2, "NumberB": 3})
+
+        metricas = client.get("/metrics").get_data(as_text=True)
+        assert f'suma_operacion_duracion_seconds_count{{config="{huella}",topologia="distribuida"}} 1.0' in metricas
+        assert 'suma_config_cambios_total{origen="api",resultado="aplicado"}' in metricas
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# SLO en el proceso (/slo)
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestSlo:
+    @pytest.fixture(autouse=True)
+    def _motor_limpio(self, monkeypatch):
+        motor = SLOEngine(list(proxy_module.slo.objetivos.values()), ventanas=proxy_module.slo.ventanas, min_eventos=3)
+        monkeypatch.setattr(proxy_module, "slo", motor)
+        return motor
+
+    def _sumar(self, client):
+        with patch("proxy.requests.post", side_effect=_pod_sumador):
+            return client.post("/suma-n-digitos", json={"NumberA": 2, "NumberB": 3})
+
+    def test_registra_arranques_y_latencia_en_caliente(self, client, mock_orch):
+        self._sumar(client)
+        mock_orch.es_arranque_en_frio.return_value = False
+        self._sumar(client)
+
+        objetivos = client.get("/slo").get_json()["Objetivos"]
+        frio = objetivos["arranques_frio"]["Ventanas"]["300s"]
+        assert (frio["Eventos"], frio["Malos"]) == (2, 1)
+        assert objetivos["latencia_caliente"]["Ventanas"]["300s"]["Eventos"] == 1
+        assert objetivos["latencia_caliente"]["Cumple"] is True
+        assert client.get("/slo").get_json()["Workers"] == 1
+
+        metricas = client.get("/metrics").get_data(as_text=True)
+        assert 'suma_slo_consumo{objetivo="arranques_frio",ventana="300s"} 2.5' in metricas
+
+    def test_scale_down_mantiene_pods_con_slo_en_riesgo(self, client, mock_orch, monkeypatch, ajustar_config):
+        for _ in range(3):
+            self._sumar(client)
+        assert "arranques_frio" in client.get("/slo").get_json()["EnRiesgo"]
+
+        ajustar_config(AUTO_SCALE_DOWN=True)
+        monkeypatch.setattr(proxy_module, "SLO_SCALE_DOWN_GUARD", True)
+        proxy_module.escalar_a_cero_en_background(2)
+
+        excluir = mock_orch.escalar_a_cero.call_args.kwargs["excluir"]
+        assert {0, 1} <= excluir()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Plazo de la operación y cancelación
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestPlazoOperacion:
+    def test_cabecera_invalida_devuelve_400(self, client, mock_orch):
+        rv = client.post("/suma-n-digitos", json={"NumberA": 2, "NumberB": 3},
+                         headers={"X-Request-Timeout": "pronto"})
+        assert rv.status_code == 400
+        mock_orch.compartir_preparacion.assert_not_called()
+
+    def test_cabecera_acotada_al_maximo(self, app):
+        with app.test_request_context(headers={"X-Request-Timeout": "9999"}):
+            assert proxy_module.plazo_solicitado() == proxy_module.REQUEST_DEADLINE_MAX_SECONDS
+        with app.test_request_context():
+            assert proxy_module.plazo_solicitado() == proxy_module.REQUEST_DEADLINE_SECONDS
+
+    def test_reintentos_acotados_al_plazo(self, client, mock_orch):
+        import requests as req_lib
+
+        with patch("proxy.requests.post", side_effect=req_lib.exceptions.ConnectionError("refused")) as post:
+            rv = client.post("/suma-n-digitos", json={"NumberA": 2, "NumberB": 3},
+                             headers={"X-Request-Timeout": "0.3"})
+
+        # Sin plazo serían 8 intentos separados por 1 s
+        assert rv.status_code == 504
+        assert post.call_count == 1
+        metricas = client.get("/metrics").get_data(as_text=True)
+        assert 'suma_operaciones_abandonadas_total{motivo="plazo"}' in metricas
+
+    def test_desconexion_devuelve_499_y_libera_pods(self, client, mock_orch, monkeypatch, ajustar_config):
+        from deadlines import RequestCancelled
+
+        def cancelada(digito, funcion):
+            raise RequestCancelled("Operación cancelada en escalar: cliente desconectado")
+
+        mock_orch.compartir_preparacion.side_effect = cancelada
+        ajustar_config(AUTO_SCALE_DOWN=True)
+        escalar = MagicMock()
+        monkeypatch.setattr(proxy_module, "escalar_a_cero_en_background", escalar)
+
+        rv = client.post("/suma-n-digitos", json={"NumberA": 2, "NumberB": 3})
+
+        assert rv.status_code == 499
+        for _ in range(50):
+            if escalar.called:
+                break
+            time.sleep(0.01)
+        escalar.assert_called_once_with(1)
+
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Captura de tráfico
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestCapturaTrafico:
+    def test_registra_operaciones_validas(self, client, mock_orch, tmp_path, monkeypatch):
+        from traffic_capture import TrafficRecorder, leer_captura
+
+        ruta = str(tmp_path / "traffic.cap")
+        recorder = TrafficRecorder(ruta)
+        monkeypatch.setattr(proxy_module, "traffic_recorder", recorder)
+        resp = MagicMock()
+        resp.ok = True
+        resp.json.return_value = {"Result": 5, "CarryOut": 0}
+
+        with patch("proxy.requests.post", return_value=resp):
+            client.post("/suma-n-digitos", json={"NumberA": 2, "NumberB": 3})
+        client.post("/suma-n-digitos", json={"NumberA": 99999, "NumberB": 1})
+        recorder.cerrar()
+
+        registros = leer_captura(ruta)
+        assert len(registros) == 1
+        assert registros[0]["NumberA"] == 2 and registros[0]["NumberB"] == 3
+        assert registros[0]["ArranquesFrio"] == 1
+        assert registros[0]["Estado"] == 200
+        assert registros[0]["LatenciaMs"] > 0
+
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# GET /readyz
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestReadyz:
+    @pytest.fixture(autouse=True)
+    def _restaurar(self):
+        completada = proxy_module._sincronizacion_completada.is_set()
+        estado = dict(proxy_module.estado_sincronizacion)
+        proxy_module._sincronizacion_completada.clear()
+        yield
+        proxy_module.estado_sincronizacion.update(estado)
+        if completada:
+            proxy_module._sincronizacion_completada.set()
+
+    def test_no_listo_antes_de_sincronizar(self, client):
+        rv = client.get("/readyz")
+        assert rv.status_code == 503
+        assert rv.get_json()["Sincronizado"] is False
+
+    def test_listo_tras_sincronizar(self, client, mock_orch):
+        mock_orch.sincronizar_estado.return_value = {
+            0: {"Replicas": 1, "Listas": 1, "Endpoints": 1, "Puerto": None},
+            1: {"Replicas": 0, "Listas": 0, "Endpoints": 0, "Puerto": None}
+        }
+        proxy_module.sincronizar_estado_cluster()
+
+        rv = client.get("/readyz")
+        assert rv.status_code == 200
+        assert rv.get_json()["DigitosCalientes"] == [0]
+
+    def test_fallo_de_sincronizacion_no_bloquea(self, client, mock_orch):
+        mock_orch.sincronizar_estado.return_value = None
+        proxy_module.sincronizar_estado_cluster()
+
+        data = client.get("/readyz").get_json()
+        assert data["Listo"] is True
+        assert "arranque en frío" in data["Error"]
+
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Cardinalidad de las métricas HTTP
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestMetricasCardinalidad:
+    def test_rutas_arbitrarias_agrupadas_por_regla(self, client):
+        for i in range(5):
+            client.get(f"/no-existe-{i}.js")
+
+        metricas = client.get("/metrics").get_data(as_text=True)
+
+        assert 'path="/<path:path>"' in metricas
+        assert "no-existe-" not in metricas
+
+
+class TestMetricasMultiproceso:
+    """Con PROMETHEUS_MULTIPROC_DIR (varios workers) los gauges calculados deben exportar su valor."""
+
+    def test_gauges_calculados_con_varios_workers(self, tmp_path):
+        directorio = tmp_path / "multiproc"
+        directorio.mkdir()
+        codigo = (
+            "import proxy\n"
+            "proxy.runtime_config.aplicar({'DIGIT_TIMEOUT_SECONDS': 6}, origen='tests')\n"
+            "print(proxy.app.test_client().get('/metrics').get_data(as_text=True))\n"
+        )
+        entorno = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(directorio), "TOPOLOGY_ADAPTIVE": "false"}
+        salida = subprocess.run(
+            [sys.executable, "-c", codigo], cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            env=entorno, capture_output=True, text=True, timeout=60
+        )
+        assert salida.returncode == 0, salida.stderr
+        metricas = salida.stdout
+
+        # set_function() exportaba 0 en todos ellos en modo multiproceso
+        assert 'suma_digito_timeout_seconds{digito="0"} 6.0' in metricas
+        assert 'suma_topologia_activa{topologia="distribuida"} 1.0' in metricas
+        assert "suma_config_version 2.0" in metricas
+        assert 'suma_slo_cumple{objetivo="arranques_frio"} 1.0' in metricas
+        assert 'suma_api_tokens_disponibles{pid="' in metricas
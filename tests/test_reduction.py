@@ -0,0 +1,73 @@
+"""
+Tests unitarios para reduction.py.
+
+Cobertura:
+    - niveles_necesarios()  : ceil(log2 K)
+    - reducir_en_arbol()    : total, niveles y sumas por nivel, operando impar, concurrencia por nivel
+    - errores               : sin operandos, fallo de una suma con cancelación del resto
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from reduction import niveles_necesarios, reducir_en_arbol
+
+
+def _sumar(a, b):
+    return a + b
+
+
+class TestNivelesNecesarios:
+    @pytest.mark.parametrize("operandos, niveles", [(1, 0), (2, 1), (3, 2), (8, 3), (9, 4)])
+    def test_log2(self, operandos, niveles):
+        assert niveles_necesarios(operandos) == niveles
+
+
+class TestReducirEnArbol:
+    def test_un_operando(self):
+        assert reducir_en_arbol([7], _sumar) == (7, [])
+
+    def test_niveles_con_operando_impar(self):
+        total, niveles = reducir_en_arbol(range(1, 6), _sumar)
+
+        assert total == 15
+        assert [(n['Nivel'], n['Sumas']) for n in niveles] == [(1, 2), (2, 1), (3, 1)]
+        assert all(n['DuracionMs'] >= 0 for n in niveles)
+
+    def test_sumas_de_un_nivel_en_paralelo(self):
+        # Las 4 sumas del primer nivel solo terminan si están en curso a la vez
+        barrera = threading.Barrier(4, timeout=2)
+        primer_nivel = {(0, 1), (2, 3), (4, 5), (6, 7)}
+
+        def sumar(a, b):
+            if (a, b) in primer_nivel:
+                barrera.wait()
+            return a + b
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            inicio = time.monotonic()
+            total, niveles = reducir_en_arbol(range(8), sumar, executor=executor)
+
+        assert total == 28
+        assert len(niveles) == 3
+        assert time.monotonic() - inicio < 2
+
+    def test_sin_operandos(self):
+        with pytest.raises(ValueError):
+            reducir_en_arbol([], _sumar)
+
+    def test_fallo_cancela_y_propaga(self):
+        cancelaciones = []
+
+        def sumar(a, b):
+            if a == 0:
+                raise RuntimeError("digito-0 no responde")
+            return a + b
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            with pytest.raises(RuntimeError, match="digito-0"):
+                reducir_en_arbol(range(4), sumar, executor=executor, al_fallar=cancelaciones.append)
+
+        assert len(cancelaciones) == 1
@@ -0,0 +1,215 @@
+"""
+Tests unitarios para runtime_config.py.
+
+Cobertura:
+    - Ajuste           : conversión de tipos (también desde texto) y rangos
+    - aplicar()        : instantáneas inmutables, versión, huella y cambios sin efecto
+    - validación       : un valor inválido rechaza el cambio entero y queda auditado
+    - If-Match         : conflicto de versión
+    - ficheros         : JSON y directorio tipo ConfigMap, solo se aplica lo que cambia
+    - persistir()      : reemplazo atómico que no se vuelve a aplicar en el propio proceso
+    - versión compartida: la versión viaja en el fichero persistido y If-Match la respeta entre workers
+"""
+import json
+
+import pytest
+
+from runtime_config import Ajuste, ConfigError, RuntimeConfig, VersionConflict, leer_fuente
+
+
+def _config(**kwargs):
+    return RuntimeConfig([
+        Ajuste('MAX_DIGITOS', int, 4, 'Dígitos', minimo=1, maximo=4),
+        Ajuste('AUTO_SCALE_DOWN', bool, True, 'Scale-down'),
+        Ajuste('DIGIT_TIMEOUT_SECONDS', float, 8, 'Timeout', minimo=0.5, maximo=120),
+    ], **kwargs)
+
+
+class TestAjuste:
+    @pytest.mark.parametrize("valor,esperado", [(True, True), ("false", False), ("SI", True), (" 0 ", False)])
+    def test_booleanos(self, valor, esperado):
+        assert Ajuste('A', bool, True, '').convertir(valor) is esperado
+
+    @pytest.mark.parametrize("valor", [1, "quizá", None])
+    def test_booleanos_invalidos(self, valor):
+        with pytest.raises(ValueError):
+            Ajuste('A', bool, True, '').convertir(valor)
+
+    def test_enteros_y_rangos(self):
+        ajuste = Ajuste('N', int, 3, '', minimo=1, maximo=4)
+        assert ajuste.convertir("2") == 2
+        assert ajuste.convertir(4.0) == 4
+        for invalido in (2.5, 0, 5, True, "dos"):
+            with pytest.raises(ValueError):
+                ajuste.convertir(invalido)
+
+    def test_defecto_fuera_de_rango(self):
+        with pytest.raises(ValueError):
+            Ajuste('N', int, 10, '', maximo=4)
+
+
+class TestAplicar:
+    def test_cambio_atomico_y_version(self):
+        config = _config()
+        anterior = config.actual()
+
+        entrada = config.aplicar({'MAX_DIGITOS': "2", 'AUTO_SCALE_DOWN': False}, origen='api', autor='ops')
+
+        actual = config.actual()
+        assert actual.version == anterior.version + 1
+        assert actual['MAX_DIGITOS'] == 2 and actual['AUTO_SCALE_DOWN'] is False
+        # La instantánea anterior no cambia: quien la leyó sigue viendo una versión completa
+        assert anterior['MAX_DIGITOS'] == 4 and anterior['AUTO_SCALE_DOWN'] is True
+        assert actual.huella != anterior.huella
+        assert entrada['Cambios'] == {
+            'MAX_DIGITOS': {'Antes': 4, 'Despues': 2},
+            'AUTO_SCALE_DOWN': {'Antes': True, 'Despues': False}
+        }
+        assert entrada['Autor'] == 'ops' and entrada['Resultado'] == 'aplicado'
+        with pytest.raises(TypeError):
+            actual.valores['MAX_DIGITOS'] = 3
+
+    def test_sin_cambios_no_crea_version(self):
+        config = _config()
+        assert config.aplicar({'MAX_DIGITOS': 4}, origen='api') is None
+        assert config.actual().version == 1
+        assert config.auditoria() == []
+
+    def test_huella_depende_solo_de_los_valores(self):
+        a, b = _config(), _config()
+        a.aplicar({'MAX_DIGITOS': 3}, origen='api')
+        a.aplicar({'MAX_DIGITOS': 4}, origen='api')
+        assert a.actual().version == 3
+        assert a.actual().huella == b.actual().huella
+
+    def test_valor_invalido_rechaza_todo(self):
+        observados = []
+        config = _config(observador=lambda entrada, vigente: observados.append(entrada))
+
+        with pytest.raises(ConfigError) as error:
+            config.aplicar({'MAX_DIGITOS': 2, 'DIGIT_TIMEOUT_SECONDS': 0, 'OTRO': 1}, origen='api')
+
+        assert set(error.value.errores) == {'DIGIT_TIMEOUT_SECONDS', 'OTRO'}
+        assert config.actual()['MAX_DIGITOS'] == 4
+        assert observados[0]['Resultado'] == 'rechazado'
+        assert config.auditoria()[0]['Errores'] == error.value.errores
+
+    def test_conflicto_de_version(self):
+        config = _config()
+        config.aplicar({'MAX_DIGITOS': 3}, origen='api')
+        with pytest.raises(VersionConflict):
+            config.aplicar({'MAX_DIGITOS': 2}, origen='api', version_esperada=1)
+        config.aplicar({'MAX_DIGITOS': 2}, origen='api', version_esperada=2)
+        assert config.actual()['MAX_DIGITOS'] == 2
+
+    def test_auditoria_de_mas_reciente_a_mas_antigua(self):
+        config = _config()
+        for valor in (3, 2, 1):
+            config.aplicar({'MAX_DIGITOS': valor}, origen='api')
+        assert [e['Version'] for e in config.auditoria()] == [4, 3, 2]
+        assert len(config.auditoria(limite=1)) == 1
+
+
+class TestFicheros:
+    def test_directorio_configmap(self, tmp_path):
+        (tmp_path / "AUTO_SCALE_DOWN").write_text("false\n")
+        (tmp_path / "..data").mkdir()
+        assert leer_fuente(str(tmp_path)) == {'AUTO_SCALE_DOWN': 'false'}
+
+        config = _config()
+        config.recargar(str(tmp_path))
+        assert config.actual()['AUTO_SCALE_DOWN'] is False
+        assert config.auditoria()[0]['Origen'] == 'fichero'
+
+    def test_solo_aplica_cambios_del_fichero(self, tmp_path):
+        ruta = tmp_path / "config.json"
+        ruta.write_text(json.dumps({'MAX_DIGITOS': 3}))
+        config = _config()
+        config.recargar(str(ruta))
+
+        # Un cambio posterior por API se mantiene mientras el fichero no cambie
+        config.aplicar({'MAX_DIGITOS': 2}, origen='api')
+        assert config.recargar(str(ruta)) is None
+        assert config.actual()['MAX_DIGITOS'] == 2
+
+        ruta.write_text(json.dumps({'MAX_DIGITOS': 1}))
+        config.recargar(str(ruta))
+        assert config.actual()['MAX_DIGITOS'] == 1
+
+    def test_fichero_invalido_mantiene_la_configuracion(self, tmp_path):
+        mensajes = []
+        ruta = tmp_path / "config.json"
+        ruta.write_text("{no es json")
+        config = _config(logger=lambda mensaje, nivel: mensajes.append(nivel))
+
+        assert config.recargar(str(ruta)) is None
+        assert config.recargar(str(ruta)) is None
+        assert config.actual().version == 1
+        assert mensajes == ['error']
+
+        assert config.recargar(str(tmp_path / "no-existe.json")) is None
+
+    def test_persistir(self, tmp_path):
+        ruta = str(tmp_path / "config.json")
+        config = _config()
+        config.aplicar({'MAX_DIGITOS': 2}, origen='api')
+        config.persistir(ruta)
+
+        assert json.loads(open(ruta).read())['MAX_DIGITOS'] == 2
+        assert config.recargar(ruta) is None
+
+        # Otro worker con la configuración inicial recoge el cambio
+        otro = _config()
+        otro.recargar(ruta)
+        assert otro.actual().huella == config.actual().huella
+
+
+class TestVersionCompartida:
+    def test_otro_worker_adopta_la_version_persistida(self, tmp_path):
+        ruta = str(tmp_path / "config.json")
+        config = _config()
+        for valor in (3, 2):
+            config.aplicar({'MAX_DIGITOS': valor}, origen='api')
+        config.persistir(ruta)
+        assert json.loads(open(ruta).read())['_version'] == 3
+        assert leer_fuente(ruta) == {'MAX_DIGITOS': 2, 'DIGIT_TIMEOUT_SECONDS': 8, 'AUTO_SCALE_DOWN': True}
+
+        otro = _config()
+        otro.recargar(ruta)
+        assert otro.actual().version == 3
+        assert otro.auditoria()[0]['Version'] == 3
+
+    def test_misma_configuracion_adopta_solo_la_version(self, tmp_path):
+        ruta = tmp_path / "config.json"
+        ruta.write_text(json.dumps({'MAX_DIGITOS': 4, '_version': 7}))
+        config = _config()
+        assert config.recargar(str(ruta)) is None
+        assert config.actual().version == 7
+
+    def test_if_match_contra_la_version_de_otro_worker(self, tmp_path):
+        ruta = str(tmp_path / "config.json")
+        a, b = _config(), _config()
+
+        with a.exclusivo(ruta):
+            a.recargar(ruta)
+            a.aplicar({'MAX_DIGITOS': 3}, origen='api', version_esperada=1)
+            a.persistir(ruta)
+
+        # b no ha recargado todavía: bajo el bloqueo ve la versión 2 y rechaza If-Match: 1
+        with b.exclusivo(ruta):
+            b.recargar(ruta)
+            with pytest.raises(VersionConflict):
+                b.aplicar({'MAX_DIGITOS': 2}, origen='api', version_esperada=1)
+            b.aplicar({'MAX_DIGITOS': 2}, origen='api', version_esperada=2)
+            b.persistir(ruta)
+
+        a.recargar(ruta)
+        assert a.actual().version == b.actual().version == 3
+        assert a.actual()['MAX_DIGITOS'] == 2
+
+    def test_version_invalida_en_el_fichero(self, tmp_path):
+        ruta = tmp_path / "config.json"
+        ruta.write_text(json.dumps({'MAX_DIGITOS': 3, '_version': "siete"}))
+        config = _config()
+        assert config.recargar(str(ruta)) is None
+        assert config.actual()['MAX_DIGITOS'] == 4
@@ -0,0 +1,366 @@
+"""
+Tests unitarios para sharding.py.
+
+Cobertura:
+    - parsear_shards()            : namespace y contexto opcional
+    - ubicación de dígitos        : shard menos cargado, ubicación estable, liberación al escalar a 0
+    - degradación de shards       : fallos consecutivos, reubicación en otro shard, enfriamiento
+    - delegación                  : service_url, esperas y port-forward en el shard del dígito, kubectl auxiliar
+    - escalar_deployments()       : reparto por shard y resultado combinado
+    - escalar_a_cero()            : solo el shard de cada dígito y los que le conocen réplicas,
+                                    exclusión evaluada una vez
+    - sincronizar_estado()        : ubicación de los dígitos que ya estaban calientes
+    - estado()                    : resumen por shard
+"""
+import time
+
+import pytest
+from unittest.mock import MagicMock
+
+from sharding import ShardedOrchestrator, parsear_shards
+
+
+class FakeOrchestrator:
+    """Backend simulado con la interfaz de K8sOrchestrator."""
+
+    def __init__(self, nombre, max_digitos=4):
+        self.nombre = nombre
+        self.max_digitos = max_digitos
+        self.replicas = {}
+        self.falla = False
+        self.port_forward_processes = {}
+        self.balanceador = None
+        self.llamadas = []
+
+    def escalar_pod(self, digito, replicas):
+        self.llamadas.append(('escalar_pod', digito, replicas))
+        if self.falla:
+            return False
+        self.replicas[digito] = replicas
+        return True
+
+    def replicas_actuales(self, digito):
+        return self.replicas.get(digito, 0)
+
+    def es_arranque_en_frio(self, digito):
+        return self.replicas.get(digito, 0) == 0
+
+    def esperar_pod_ready(self, digito, timeout=60):
+        return not self.falla
+
+    def esperar_endpoints_servicio(self, digito, timeout=30):
+        return not self.falla
+
+    def establecer_port_forward(self, digito):
+        self.port_forward_processes[digito] = MagicMock()
+        return True
+
+    def detener_port_forward(self, digito):
+        self.port_forward_processes.pop(digito, None)
+
+    def service_url(self, digito):
+        return f"http://{self.nombre}/suma-digito-{digito}"
+
+    def kubectl(self, *argumentos, **opciones):
+        return self.nombre, argumentos
+
+    def reportar_llamada(self, digito, url, exito, latencia=None):
+        self.llamadas.append(('reportar_llamada', digito, url, exito))
+
+    def fases_arranque(self, digito):
+        return {'total': 1.0}
+
+    def listar_endpoints_listos(self, digito):
+        return []
+
+    def escalar_deployments(self, objetivos, omitir_sin_cambios=True):
+        self.llamadas.append(('escalar_deployments', dict(objetivos)))
+        if self.falla:
+            raise RuntimeError("API no disponible")
+        deployments = []
+        for digito, replicas in sorted(objetivos.items()):
+            omitido = omitir_sin_cambios and self.replicas.get(digito, 0) == replicas
+            self.replicas[digito] = replicas
+            deployments.append({
+                'Deployment': f"suma-digito-{digito}",
+                'Digito': digito,
+                'Replicas': replicas,
+                'Estado': 'omitido' if omitido else 'escalado',
+                'DuracionSegundos': 0.0
+            })
+        return {'Ok': True, 'Deployments': deployments}
+
+    def sincronizar_estado(self):
+        if self.falla:
+            return None
+        return {
+            d: {'Replicas': r, 'Listas': r, 'Endpoints': 0, 'Puerto': None} for d, r in self.replicas.items()
+        }
+
+    def escalar_a_cero(self, delay_seconds=2, excluir=None):
+        objetivos = {d: 0 for d in range(self.max_digitos) if d not in (excluir or ())}
+        return self.escalar_deployments(objetivos)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# FIXTURES
+# ─────────────────────────────────────────────────────────────────────────────
+
+@pytest.fixture()
+def logger():
+    return MagicMock()
+
+
+@pytest.fixture()
+def backends():
+    return {'a': FakeOrchestrator('a'), 'b': FakeOrchestrator('b')}
+
+
+@pytest.fixture()
+def sharded(backends, logger):
+    return ShardedOrchestrator(
+        list(backends.items()), logger=logger, max_digitos=4, fallos_para_degradar=2, enfriamiento_segundos=30
+    )
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# parsear_shards
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestParsearShards:
+    def test_namespaces_y_contextos(self):
+        assert parsear_shards("ns-a, ns-b@cluster-2,") == [
+            ('ns-a', 'ns-a', None),
+            ('cluster-2/ns-b', 'ns-b', 'cluster-2'),
+        ]
+
+    def test_vacio(self):
+        assert parsear_shards("") == []
+
+    def test_sin_shards_es_error(self, logger):
+        with pytest.raises(ValueError):
+            ShardedOrchestrator([], logger=logger)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Ubicación de dígitos
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestUbicacion:
+    def test_reparte_por_carga(self, sharded, backends):
+        assert sharded.escalar_pod(0, 1) is True
+        assert sharded.escalar_pod(1, 1) is True
+
+        assert backends['a'].replicas == {0: 1}
+        assert backends['b'].replicas == {1: 1}
+        assert sharded.shard_de(0) == 'a'
+        assert sharded.shard_de(1) == 'b'
+
+    def test_ubicacion_estable_al_reescalar(self, sharded, backends):
+        sharded.escalar_pod(0, 1)
+        sharded.escalar_pod(1, 1)
+        sharded.escalar_pod(0, 3)
+
+        assert backends['a'].replicas == {0: 3}
+        assert sharded.replicas_actuales(0) == 3
+
+    def test_escalar_a_cero_libera_ubicacion(self, sharded, backends):
+        sharded.escalar_pod(0, 1)
+        assert sharded.es_arranque_en_frio(0) is False
+
+        assert sharded.escalar_pod(0, 0) is True
+        assert backends['a'].replicas == {0: 0}
+        assert sharded.es_arranque_en_frio(0) is True
+        assert sharded.replicas_actuales(0) == 0
+
+    def test_delegacion_al_shard_del_digito(self, sharded, backends):
+        sharded.escalar_pod(0, 1)
+        sharded.escalar_pod(1, 1)
+
+        assert sharded.service_url(1) == "http://b/suma-digito-1"
+        assert sharded.establecer_port_forward(1) is True
+        assert set(sharded.port_forward_processes) == {1}
+
+        sharded.reportar_llamada(1, "http://b/suma-digito-1", True, 0.01)
+        assert ('reportar_llamada', 1, "http://b/suma-digito-1", True) in backends['b'].llamadas
+
+        sharded.detener_port_forward(1)
+        assert sharded.port_forward_processes == {}
+
+    def test_kubectl_auxiliar_en_el_primer_shard(self, sharded):
+        assert sharded.kubectl("get", "svc", "suma-docs") == ('a', ("get", "svc", "suma-docs"))
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Degradación de shards
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestDegradacion:
+    def test_escalar_pod_prueba_otro_shard(self, sharded, backends):
+        backends['a'].falla = True
+
+        assert sharded.escalar_pod(0, 1) is True
+        assert sharded.shard_de(0) == 'b'
+        assert ('escalar_pod', 0, 1) in backends['a'].llamadas
+
+    def test_fallos_consecutivos_degradan_el_shard(self, sharded, backends, logger):
+        backends['a'].falla = True
+        sharded.escalar_pod(0, 1)
+        sharded.escalar_pod(1, 1)
+
+        assert sharded.sano('a') is False
+        assert sharded.sano('b') is True
+        assert any("degradado" in c.args[0] for c in logger.call_args_list)
+
+        # Un shard degradado no recibe nuevos dígitos mientras dura el enfriamiento
+        backends['a'].llamadas.clear()
+        sharded.escalar_pod(2, 1)
+        assert backends['a'].llamadas == []
+
+    def test_reubica_digito_de_shard_degradado(self, sharded, backends):
+        sharded.escalar_pod(0, 1)
+        assert sharded.shard_de(0) == 'a'
+
+        backends['a'].falla = True
+        assert sharded.esperar_pod_ready(0) is False
+        assert sharded.esperar_pod_ready(0) is False
+        assert sharded.sano('a') is False
+        assert sharded.es_arranque_en_frio(0) is True
+
+        assert sharded.escalar_pod(0, 1) is True
+        assert sharded.shard_de(0) == 'b'
+
+    def test_recupera_tras_enfriamiento(self, sharded, backends):
+        sharded.enfriamiento_segundos = 0.05
+        backends['a'].falla = True
+        sharded.escalar_pod(0, 1)
+        sharded.escalar_pod(1, 1)
+        assert sharded.sano('a') is False
+
+        time.sleep(0.1)
+        assert sharded.sano('a') is True
+
+    def test_sin_shards_sanos_intenta_todos(self, sharded, backends):
+        backends['a'].falla = True
+        backends['b'].falla = True
+        for _ in range(2):
+            assert sharded.escalar_pod(0, 1) is False
+
+        backends['b'].falla = False
+        assert sharded.escalar_pod(0, 1) is True
+        assert sharded.shard_de(0) == 'b'
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Escalado en bloque
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestEscaladoEnBloque:
+    def test_reparte_objetivos_por_shard(self, sharded, backends):
+        sharded.escalar_pod(0, 1)
+        sharded.escalar_pod(1, 1)
+
+        resultado = sharded.escalar_deployments({0: 2, 1: 2})
+
+        assert resultado['Ok'] is True
+        assert backends['a'].replicas[0] == 2
+        assert backends['b'].replicas[1] == 2
+        assert {(d['Digito'], d['Shard']) for d in resultado['Deployments']} == {(0, 'a'), (1, 'b')}
+
+    def test_error_de_un_shard_no_bloquea_el_resto(self, sharded, backends, logger):
+        sharded.escalar_pod(0, 1)
+        sharded.escalar_pod(1, 1)
+        backends['a'].falla = True
+
+        resultado = sharded.escalar_deployments({0: 0, 1: 0})
+
+        assert resultado['Ok'] is False
+        assert resultado['Errores'] == 1
+        assert backends['b'].replicas[1] == 0
+
+    def test_escalar_a_cero_en_todos_los_shards(self, sharded, backends):
+        sharded.escalar_pod(0, 1)
+        sharded.escalar_pod(1, 1)
+        excluir = MagicMock(return_value={1})
+
+        resultado = sharded.escalar_a_cero(delay_seconds=0, excluir=excluir)
+
+        excluir.assert_called_once()
+        assert resultado['Ok'] is True
+        assert backends['a'].replicas[0] == 0
+        assert backends['b'].replicas[1] == 1
+        assert sharded.shard_de(1) == 'b'
+        assert sharded.es_arranque_en_frio(0) is True
+
+    def test_escalar_a_cero_solo_donde_hay_replicas(self, sharded, backends):
+        sharded.escalar_pod(0, 1)
+        sharded.escalar_pod(1, 1)
+        # Réplicas de un dígito que quedaron en otro shard tras reubicarlo
+        backends['a'].replicas[1] = 2
+
+        resultado = sharded.escalar_a_cero(delay_seconds=0)
+
+        assert ('escalar_deployments', {0: 0, 1: 0}) in backends['a'].llamadas
+        assert ('escalar_deployments', {1: 0}) in backends['b'].llamadas
+        assert resultado['Escalados'] == 3
+        assert backends['a'].replicas == {0: 0, 1: 0}
+        assert backends['b'].replicas == {1: 0}
+
+    def test_escalar_a_cero_sin_digitos_calientes(self, sharded, backends):
+        resultado = sharded.escalar_a_cero(delay_seconds=0)
+        assert resultado['Ok'] is True
+        assert resultado['Deployments'] == []
+        assert backends['a'].llamadas == backends['b'].llamadas == []
+
+
+class TestSincronizarEstado:
+    def test_ubica_digitos_calientes(self, sharded, backends):
+        backends['a'].replicas = {0: 0, 1: 1}
+        backends['b'].replicas = {0: 2}
+
+        estado = sharded.sincronizar_estado()
+
+        assert estado[0]['Shard'] == 'b' and estado[0]['Listas'] == 2
+        assert sharded.shard_de(0) == 'b'
+        assert sharded.shard_de(1) == 'a'
+        assert sharded.es_arranque_en_frio(0) is False
+
+    def test_shard_caido(self, sharded, backends):
+        backends['a'].falla = True
+        backends['b'].replicas = {1: 1}
+        assert sharded.sincronizar_estado()[1]['Shard'] == 'b'
+
+        backends['b'].falla = True
+        assert sharded.sincronizar_estado() is None
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# estado
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestEstado:
+    def test_resumen_por_shard(self, sharded, backends):
+        sharded.escalar_pod(0, 2)
+
+        estado = {s['Shard']: s for s in sharded.estado()}
+
+        assert estado['a']['Sano'] is True
+        assert estado['a']['Digitos'] == [0]
+        assert estado['a']['Carga'] == 3
+        assert estado['b']['Digitos'] == []
+        assert estado['b']['Carga'] == 0
+
+    def test_balanceadores_compuestos(self, logger):
+        a, b = FakeOrchestrator('a'), FakeOrchestrator('b')
+        a.balanceador = MagicMock()
+        b.balanceador = MagicMock()
+        sharded = ShardedOrchestrator([('a', a), ('b', b)], logger=logger)
+
+        sharded.balanceador.iniciar()
+        sharded.balanceador.detener()
+
+        a.balanceador.iniciar.assert_called_once()
+        b.balanceador.detener.assert_called_once()
+
+    def test_sin_balanceadores(self, sharded):
+        assert sharded.balanceador is None
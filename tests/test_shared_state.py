@@ -0,0 +1,208 @@
+"""
+Tests unitarios para shared_state.py.
+
+Cobertura (ambos backends: memoria y SQLite):
+    - agregar_log() / logs_desde()       : cursor absoluto, rotación del buffer, limpieza, lotes
+    - adquirir_digitos() / liberar...()  : pods en uso y caducidad de reservas
+    - intentar_bloqueo()                 : exclusión mutua y caducidad
+    - registrar_replicas() / replicas()  : réplicas conocidas de cada deployment
+    - publicar() / publicaciones()       : último valor de cada worker, con caducidad
+    - crear_estado_compartido()          : selección de backend
+"""
+import sqlite3
+import threading
+
+import pytest
+from unittest.mock import patch
+
+from terminal_log import LogRecord
+from shared_state import MemoryStateBackend, SQLiteStateBackend, crear_estado_compartido
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# FIXTURES
+# ─────────────────────────────────────────────────────────────────────────────
+
+@pytest.fixture(params=["memory", "sqlite"])
+def estado(request, tmp_path):
+    if request.param == "memory":
+        return MemoryStateBackend(max_logs=5)
+    return SQLiteStateBackend(str(tmp_path / "estado.db"), max_logs=5)
+
+
+def _entry(n):
+    return LogRecord(1700000000.0 + n, "info", f"linea {n}")
+
+
+def _mensajes(entradas):
+    return [e.mensaje for e in entradas]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Historial del terminal
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestLogs:
+    def test_lectura_incremental(self, estado):
+        estado.agregar_log(_entry(1))
+        entradas, cursor = estado.logs_desde(0)
+        assert _mensajes(entradas) == ["linea 1"]
+
+        estado.agregar_log(_entry(2))
+        entradas, cursor = estado.logs_desde(cursor)
+        assert _mensajes(entradas) == ["linea 2"]
+
+        entradas, _ = estado.logs_desde(cursor)
+        assert entradas == []
+
+    def test_primera_lectura_limitada_a_max_logs(self, estado):
+        for n in range(8):
+            estado.agregar_log(_entry(n))
+        entradas, _ = estado.logs_desde(0)
+        assert _mensajes(entradas) == [f"linea {n}" for n in range(3, 8)]
+
+    def test_limite_por_lectura(self, estado):
+        for n in range(4):
+            estado.agregar_log(_entry(n))
+        entradas, cursor = estado.logs_desde(0, limite=2)
+        assert _mensajes(entradas) == ["linea 0", "linea 1"]
+        entradas, _ = estado.logs_desde(cursor, limite=2)
+        assert _mensajes(entradas) == ["linea 2", "linea 3"]
+
+    def test_limpiar_no_reenvia_lineas(self, estado):
+        estado.agregar_log(_entry(1))
+        _, cursor = estado.logs_desde(0)
+        estado.limpiar_logs()
+        estado.agregar_log(_entry(2))
+        entradas, _ = estado.logs_desde(cursor)
+        assert _mensajes(entradas) == ["linea 2"]
+
+    def test_conserva_instante_numerico(self, estado):
+        estado.agregar_log(_entry(1))
+        entradas, _ = estado.logs_desde(0)
+        assert entradas[0].ts == 1700000001.0
+        assert entradas[0].nivel == "info"
+
+    def test_agregar_por_lotes(self, estado):
+        estado.agregar_logs([_entry(n) for n in range(3)])
+        estado.agregar_log(_entry(3))
+        entradas, _ = estado.logs_desde(0)
+        assert _mensajes(entradas) == [f"linea {n}" for n in range(4)]
+
+    def test_memoria_comparte_buffer_inyectado(self):
+        from collections import deque
+        buffer = deque(maxlen=10)
+        estado = crear_estado_compartido("memory", logs=buffer)
+        estado.agregar_log(_entry(1))
+        assert len(buffer) == 1
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Pods en uso
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestReservas:
+    def test_digitos_en_uso(self, estado):
+        t1 = estado.adquirir_digitos(range(2))
+        t2 = estado.adquirir_digitos(range(3))
+        assert estado.digitos_en_uso() == {0, 1, 2}
+        estado.liberar_digitos(t2)
+        assert estado.digitos_en_uso() == {0, 1}
+        estado.liberar_digitos(t1)
+        assert estado.digitos_en_uso() == set()
+
+    def test_reserva_caducada_no_bloquea(self, estado):
+        estado.adquirir_digitos([0], ttl=10)
+        with patch("shared_state.time.time", return_value=10 ** 10):
+            assert estado.digitos_en_uso() == set()
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Réplicas conocidas
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestReplicas:
+    def test_registrar_y_leer(self, estado):
+        assert estado.replicas("ns/suma-digito-0") is None
+        estado.registrar_replicas("ns/suma-digito-0", 2)
+        estado.registrar_replicas("ns/suma-digito-0", 0)
+        assert estado.replicas("ns/suma-digito-0") == 0
+        assert estado.replicas("otro/suma-digito-0") is None
+
+
+class TestPublicaciones:
+    def test_ultima_publicacion_por_propietario(self, estado):
+        estado.publicar("slo", "a", {"Eventos": 1})
+        estado.publicar("slo", "a", {"Eventos": 2})
+        estado.publicar("slo", "b", {"Eventos": 5})
+        estado.publicar("otra", "c", {"Eventos": 9})
+
+        assert estado.publicaciones("slo") == {"a": {"Eventos": 2}, "b": {"Eventos": 5}}
+        assert estado.publicaciones("slo", excluir="a") == {"b": {"Eventos": 5}}
+
+    def test_publicacion_caducada(self, estado):
+        with patch("shared_state.time.time", return_value=1000):
+            estado.publicar("slo", "a", {"Eventos": 1}, ttl=5)
+        with patch("shared_state.time.time", return_value=1006):
+            assert estado.publicaciones("slo") == {}
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Bloqueos
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestBloqueos:
+    def test_exclusion_mutua(self, estado):
+        assert estado.intentar_bloqueo("scale-down", "a") is True
+        assert estado.intentar_bloqueo("scale-down", "b") is False
+        estado.liberar_bloqueo("scale-down", "a")
+        assert estado.intentar_bloqueo("scale-down", "b") is True
+
+    def test_solo_el_propietario_libera(self, estado):
+        estado.intentar_bloqueo("scale-down", "a")
+        estado.liberar_bloqueo("scale-down", "b")
+        assert estado.intentar_bloqueo("scale-down", "b") is False
+
+    def test_bloqueo_caducado(self, estado):
+        with patch("shared_state.time.time", return_value=1000):
+            estado.intentar_bloqueo("scale-down", "a", ttl=5)
+        with patch("shared_state.time.time", return_value=1006):
+            assert estado.intentar_bloqueo("scale-down", "b") is True
+
+
+class TestSQLiteEntreProcesos:
+    def test_recorte_con_lotes_y_varios_hilos(self, tmp_path):
+        ruta = str(tmp_path / "estado.db")
+        estado = SQLiteStateBackend(ruta, max_logs=5)
+        hilos = [
+            threading.Thread(target=estado.agregar_logs, args=([_entry(n) for n in range(30)],))
+            for _ in range(5)
+        ]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        assert estado._inserciones == 150
+        # Cruzar la marca de 100 inserciones con un lote también recorta el historial
+        filas = sqlite3.connect(ruta).execute("SELECT COUNT(*) FROM logs").fetchone()[0]
+        assert filas < 150
+
+
+    def test_dos_instancias_comparten_fichero(self, tmp_path):
+        ruta = str(tmp_path / "compartido.db")
+        worker_a = SQLiteStateBackend(ruta)
+        worker_b = SQLiteStateBackend(ruta)
+        worker_a.agregar_log(_entry(1))
+        token = worker_a.adquirir_digitos([3])
+        assert _mensajes(worker_b.logs_desde(0)[0]) == ["linea 1"]
+        assert worker_b.digitos_en_uso() == {3}
+        worker_b.liberar_digitos(token)
+        assert worker_a.digitos_en_uso() == set()
+        worker_a.registrar_replicas("ns/suma-digito-1", 3)
+        assert worker_b.replicas("ns/suma-digito-1") == 3
+
+
+def test_backend_desconocido():
+    with pytest.raises(ValueError):
+        crear_estado_compartido("redis")
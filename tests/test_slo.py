@@ -0,0 +1,180 @@
+"""
+Tests unitarios para slo.py.
+
+Cobertura:
+    - HistogramaLog      : percentiles con error relativo acotado, combinación, memoria fija
+    - VentanaDeslizante  : los eventos salen de la ventana al avanzar el tiempo
+    - SLOEngine          : eventos malos por umbral, tasa de consumo, en_riesgo() multiventana, estado()
+    - varios workers     : los resúmenes publicados en el estado compartido se suman a los propios
+"""
+import random
+
+import pytest
+
+from shared_state import SQLiteStateBackend
+from slo import HistogramaLog, Objetivo, SLOEngine, VentanaDeslizante
+
+
+class Reloj:
+    def __init__(self):
+        self.ahora = 10_000.0
+
+    def __call__(self):
+        return self.ahora
+
+
+class TestHistogramaLog:
+    def test_percentiles_con_error_acotado(self):
+        histograma = HistogramaLog(precision=0.02)
+        generador = random.Random(7)
+        muestras = [generador.uniform(0.005, 2.0) for _ in range(5000)]
+        for valor in muestras:
+            histograma.registrar(valor)
+
+        muestras.sort()
+        for p in (0.5, 0.95, 0.99):
+            real = muestras[int(p * len(muestras)) - 1]
+            assert real <= histograma.percentil(p) <= real * 1.021
+
+    def test_memoria_fija_y_extremos(self):
+        histograma = HistogramaLog(minimo=0.001, maximo=10)
+        cubetas = len(histograma.cubetas)
+        for valor in (0.0, 1e-6, 5.0, 1e6):
+            histograma.registrar(valor)
+        assert len(histograma.cubetas) == cubetas
+        assert histograma.percentil(0.25) == 0.001
+        assert histograma.percentil(1.0) == 10
+
+    def test_combinar_y_vacio(self):
+        a, b = HistogramaLog(), HistogramaLog()
+        assert a.percentil(0.5) is None
+        a.registrar(0.1)
+        b.registrar(1.0)
+        a.combinar(b)
+        assert a.total == 2
+        assert a.percentil(1.0) == pytest.approx(1.0, rel=0.021)
+
+
+class TestVentanaDeslizante:
+    def test_eventos_caducan(self):
+        ventana = VentanaDeslizante(60, ranuras=6)
+        ventana.registrar(0, malo=True)
+        ventana.registrar(30, malo=False)
+
+        assert ventana.resumen(59)[:2] == (2, 1)
+        assert ventana.resumen(65)[:2] == (1, 0)
+        assert ventana.resumen(200)[:2] == (0, 0)
+
+    def test_ranura_reutilizada_se_limpia(self):
+        ventana = VentanaDeslizante(60, ranuras=6, histograma=HistogramaLog)
+        ventana.registrar(5, malo=False, valor=5.0)
+        ventana.registrar(65, malo=False, valor=0.1)
+
+        eventos, _, histograma = ventana.resumen(65, con_histograma=True)
+        assert eventos == 1
+        assert histograma.percentil(1.0) < 0.2
+
+
+class TestSLOEngine:
+    @pytest.fixture()
+    def reloj(self):
+        return Reloj()
+
+    def _motor(self, reloj):
+        return SLOEngine([
+            Objetivo('latencia', 0.9, umbral=0.5),
+            Objetivo('frio', 0.8),
+        ], ventanas=(60, 600), min_eventos=5, reloj=reloj)
+
+    def test_consumo_por_umbral(self, reloj):
+        motor = self._motor(reloj)
+        for valor in [0.1] * 8 + [0.9] * 2:
+            motor.registrar('latencia', valor)
+
+        # 20 % de eventos malos con un presupuesto del 10 %: se consume al doble del ritmo
+        assert motor.consumo('latencia') == pytest.approx(2.0)
+        assert motor.consumo('frio') == 0.0
+
+    def test_en_riesgo_exige_todas_las_ventanas(self, reloj):
+        motor = self._motor(reloj)
+        for _ in range(20):
+            motor.registrar('frio', malo=False)
+        reloj.ahora += 120
+        for _ in range(6):
+            motor.registrar('frio', malo=True)
+
+        # Ventana corta: 100 % malos; larga: 6/26 = 23 % (consumo 1.15)
+        assert motor.consumo('frio', 60) == pytest.approx(5.0)
+        assert motor.en_riesgo('frio', umbral=1.0)
+        assert not motor.en_riesgo('frio', umbral=2.0)
+
+    def test_sin_eventos_suficientes_no_hay_riesgo(self, reloj):
+        motor = self._motor(reloj)
+        for _ in range(4):
+            motor.registrar('frio', malo=True)
+        assert motor.consumo('frio') == pytest.approx(5.0)
+        assert not motor.en_riesgo('frio')
+
+    def test_estado(self, reloj):
+        motor = self._motor(reloj)
+        for valor in (0.1, 0.2, 0.3):
+            motor.registrar('latencia', valor)
+
+        estado = motor.estado()
+
+        latencia = estado['latencia']
+        assert latencia['UmbralMs'] == 500
+        assert latencia['Cumple'] is True
+        assert latencia['Ventanas']['60s']['Eventos'] == 3
+        assert latencia['Ventanas']['60s']['PercentilMs'] == pytest.approx(300, rel=0.021)
+        assert 'PercentilMs' not in estado['frio']['Ventanas']['60s']
+        assert estado['frio']['Ventanas']['600s']['TasaError'] is None
+
+    def test_objetivo_invalido(self):
+        with pytest.raises(ValueError):
+            Objetivo('x', 1.0)
+
+
+class TestVariosWorkers:
+    def _motor(self, reloj, estado, propietario):
+        return SLOEngine([
+            Objetivo('latencia', 0.9, umbral=0.5),
+            Objetivo('frio', 0.8),
+        ], ventanas=(60, 600), min_eventos=5, reloj=reloj, estado_compartido=estado, propietario=propietario)
+
+    def test_consultas_suman_los_demas_workers(self, tmp_path):
+        reloj = Reloj()
+        ruta = str(tmp_path / "estado.db")
+        a = self._motor(reloj, SQLiteStateBackend(ruta), "a")
+        b = self._motor(reloj, SQLiteStateBackend(ruta), "b")
+        for _ in range(3):
+            a.registrar('frio', malo=True)
+            a.registrar('latencia', 2.0)
+        for _ in range(3):
+            b.registrar('frio', malo=False)
+            b.registrar('latencia', 0.1)
+
+        # Cada worker por separado no llega a min_eventos
+        assert not b.en_riesgo('frio')
+        a.publicar()
+
+        assert b.workers() == 2
+        assert b.consumo('frio') == pytest.approx((3 / 6) / 0.2)
+        assert b.en_riesgo('frio')
+        latencia = b.estado()['latencia']['Ventanas']['60s']
+        assert latencia['Eventos'] == 6
+        assert latencia['PercentilMs'] == pytest.approx(2000, rel=0.021)
+        # El propio resumen publicado no se cuenta dos veces
+        assert a.consumo('frio') == pytest.approx((3 / 3) / 0.2)
+
+    def test_publicacion_caducada_no_cuenta(self, tmp_path):
+        reloj = Reloj()
+        ruta = str(tmp_path / "estado.db")
+        a = self._motor(reloj, SQLiteStateBackend(ruta), "a")
+        b = self._motor(reloj, SQLiteStateBackend(ruta), "b")
+        a.ttl_publicacion = -1
+        a.registrar('frio', malo=True)
+        a.publicar()
+
+        assert b.workers() == 1
+        assert b.consumo('frio') == 0.0
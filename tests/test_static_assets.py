@@ -0,0 +1,115 @@
+"""
+Tests unitarios para static_assets.py.
+
+Cobertura:
+    - respuesta()        : negociación gzip/brotli, ETag fuerte por variante, 304 con If-None-Match
+    - URLs versionadas   : reescritura de index.html, resolver() y Cache-Control inmutable
+    - invalidación       : recarga al cambiar el fichero, también de la página que lo referencia
+"""
+import gzip
+import os
+
+import pytest
+
+import static_assets
+from static_assets import StaticAssetCache
+
+PAGINA = '<link rel="stylesheet" href="styles.css">\n<script src="script.js"></script>\n'
+
+
+@pytest.fixture
+def directorio(tmp_path):
+    (tmp_path / "index.html").write_text(PAGINA)
+    (tmp_path / "script.js").write_text("console.log('hola');\n" * 50)
+    (tmp_path / "styles.css").write_text("body { color: red; }\n")
+    return tmp_path
+
+
+@pytest.fixture
+def cache(directorio):
+    cache = StaticAssetCache(str(directorio), intervalo_comprobacion=0)
+    cache.cargar()
+    return cache
+
+
+def _reescribir(directorio, nombre, contenido):
+    ruta = directorio / nombre
+    mtime = os.stat(ruta).st_mtime_ns
+    ruta.write_text(contenido)
+    os.utime(ruta, ns=(mtime + 10 ** 9, mtime + 10 ** 9))
+
+
+class TestRespuesta:
+    def test_gzip_negociado(self, cache):
+        estado, cuerpo, cabeceras = cache.respuesta("script.js", accept_encoding="gzip, deflate")
+        assert estado == 200
+        assert cabeceras["Content-Encoding"] == "gzip"
+        assert gzip.decompress(cuerpo) == b"console.log('hola');\n" * 50
+        assert cabeceras["Vary"] == "Accept-Encoding"
+        assert cabeceras["Content-Type"].startswith("text/javascript")
+
+    def test_brotli_preferido(self, cache):
+        pytest.importorskip("brotli")
+        _, _, cabeceras = cache.respuesta("script.js", accept_encoding="gzip, br")
+        assert cabeceras["Content-Encoding"] == "br"
+
+    def test_sin_brotli_instalado(self, directorio, monkeypatch):
+        monkeypatch.setattr(static_assets, "brotli", None)
+        cache = StaticAssetCache(str(directorio))
+        _, _, cabeceras = cache.respuesta("script.js", accept_encoding="br, gzip")
+        assert cabeceras["Content-Encoding"] == "gzip"
+
+    def test_ficheros_pequenos_sin_comprimir(self, cache):
+        _, cuerpo, cabeceras = cache.respuesta("styles.css", accept_encoding="gzip")
+        assert "Content-Encoding" not in cabeceras
+        assert cuerpo == b"body { color: red; }\n"
+
+    def test_etag_distinto_por_variante_y_304(self, cache):
+        _, _, identidad = cache.respuesta("script.js")
+        _, _, comprimida = cache.respuesta("script.js", accept_encoding="gzip")
+        assert identidad["ETag"] != comprimida["ETag"]
+
+        estado, cuerpo, _ = cache.respuesta("script.js", if_none_match=comprimida["ETag"], accept_encoding="gzip")
+        assert (estado, cuerpo) == (304, b"")
+        assert cache.respuesta("script.js", if_none_match=comprimida["ETag"])[0] == 200
+
+    def test_fichero_inexistente(self, cache):
+        assert cache.respuesta("otro.js") is None
+
+
+class TestVersionado:
+    def test_pagina_referencia_urls_versionadas(self, cache):
+        _, cuerpo, cabeceras = cache.respuesta("index.html")
+        assert cache.url("script.js").encode() in cuerpo
+        assert cache.url("styles.css").encode() in cuerpo
+        assert cabeceras["Cache-Control"] == "no-cache"
+
+    def test_resolver(self, cache):
+        url = cache.url("script.js").lstrip("/")
+        assert cache.resolver(url) == ("script.js", True)
+        assert cache.resolver("script.js") == ("script.js", False)
+        assert cache.resolver("script.0000000000000000.js") == ("script.js", False)
+        assert cache.resolver("proxy.py") == (None, False)
+
+    def test_cache_control_inmutable(self, cache):
+        _, _, cabeceras = cache.respuesta("script.js", versionada=True)
+        assert "immutable" in cabeceras["Cache-Control"]
+
+
+class TestInvalidacion:
+    def test_recarga_al_cambiar_el_fichero(self, cache, directorio):
+        url_antigua = cache.url("script.js")
+        _reescribir(directorio, "script.js", "console.log('adiós');\n")
+        assert cache.url("script.js") != url_antigua
+        assert cache.respuesta("script.js")[1] == "console.log('adiós');\n".encode()
+
+    def test_pagina_se_regenera_si_cambia_un_recurso(self, cache, directorio):
+        _reescribir(directorio, "styles.css", "body { color: blue; }\n")
+        _, cuerpo, _ = cache.respuesta("index.html")
+        assert cache.url("styles.css").encode() in cuerpo
+
+    def test_no_relee_dentro_del_intervalo(self, directorio):
+        cache = StaticAssetCache(str(directorio), intervalo_comprobacion=3600)
+        cache.cargar()
+        _reescribir(directorio, "styles.css", "body { color: blue; }\n")
+        assert cache.respuesta("styles.css")[1] == b"body { color: red; }\n"
@@ -0,0 +1,141 @@
+"""
+Tests unitarios para terminal_log.py.
+
+Cobertura:
+    - LogRecord.to_dict()     : formato del timestamp solo al serializar
+    - BatchWriter             : entrega por lotes en segundo plano, un error no detiene el hilo
+    - StdoutWriter            : escritura en segundo plano por lotes, vaciado al detener
+    - LogSpill                : anillo en disco, truncado, reapertura y búsqueda por rango de tiempo
+    - abrir_segmento_de_worker() : una ranura por worker vivo, reutilizada al terminar
+    - buscar_en_directorio()  : mezcla de los segmentos de varios workers
+"""
+import io
+import os
+import time
+
+import pytest
+
+from terminal_log import (
+    BatchWriter, LogRecord, LogSpill, StdoutWriter, abrir_segmento_de_worker, buscar_en_directorio
+)
+
+
+def _registro(ts, mensaje=None, nivel="info"):
+    return LogRecord(ts, nivel, mensaje if mensaje is not None else f"linea {ts}")
+
+
+class TestLogRecord:
+    def test_to_dict(self):
+        ts = time.mktime((2026, 1, 1, 12, 34, 56, 0, 0, -1))
+        assert _registro(ts, "hola", "error").to_dict() == {
+            "timestamp": "12:34:56", "level": "error", "message": "hola"
+        }
+
+    def test_sin_dict_por_instancia(self):
+        with pytest.raises(AttributeError):
+            _registro(1.0).otro = 1
+
+
+class TestBatchWriter:
+    def test_entrega_por_lotes(self):
+        lotes = []
+        writer = BatchWriter(lotes.append, max_lote=10)
+        for n in range(25):
+            writer.escribir(n)
+        writer.detener()
+        assert [n for lote in lotes for n in lote] == list(range(25))
+        assert all(len(lote) <= 10 for lote in lotes)
+
+    def test_error_no_detiene_el_hilo(self):
+        escritos = []
+
+        def escribir_lote(lote):
+            if "falla" in lote:
+                raise OSError("disco lleno")
+            escritos.extend(lote)
+
+        writer = BatchWriter(escribir_lote)
+        writer.escribir("falla")
+        writer.detener()
+        writer.escribir("ok")
+        writer.detener()
+        assert escritos == ["ok"]
+
+
+class TestStdoutWriter:
+    def test_escribe_en_segundo_plano_y_vacia_al_detener(self):
+        salida = io.StringIO()
+        writer = StdoutWriter(stream=salida)
+        for n in range(50):
+            writer.escribir(f"linea {n}")
+        writer.detener()
+        assert salida.getvalue().splitlines() == [f"linea {n}" for n in range(50)]
+
+    def test_se_reinicia_tras_detener(self):
+        salida = io.StringIO()
+        writer = StdoutWriter(stream=salida)
+        writer.escribir("a")
+        writer.detener()
+        writer.escribir("b")
+        writer.detener()
+        assert salida.getvalue() == "a\nb\n"
+
+
+class TestLogSpill:
+    @pytest.fixture
+    def ruta(self, tmp_path):
+        return str(tmp_path / "terminal-1.log")
+
+    def test_tamano_fijo_y_anillo(self, ruta):
+        spill = LogSpill(ruta, capacidad=4, tam_ranura=64)
+        for n in range(10):
+            spill.agregar(_registro(float(n)))
+        assert os.path.getsize(ruta) == LogSpill.TAM_CABECERA + 4 * 64
+        assert [r.ts for r in spill.buscar()] == [6.0, 7.0, 8.0, 9.0]
+
+    def test_busqueda_por_rango(self, ruta):
+        spill = LogSpill(ruta, capacidad=100)
+        for n in range(50):
+            spill.agregar(_registro(float(n), nivel="warning"))
+        registros = spill.buscar(desde=10.5, hasta=14.0)
+        assert [r.ts for r in registros] == [11.0, 12.0, 13.0, 14.0]
+        assert registros[0].nivel == "warning"
+        assert len(spill.buscar(desde=0, limite=5)) == 5
+
+    def test_trunca_mensajes_largos(self, ruta):
+        spill = LogSpill(ruta, capacidad=2, tam_ranura=32)
+        spill.agregar(_registro(1.0, "x" * 100))
+        assert spill.buscar()[0].mensaje == "x" * (32 - 11)
+
+    def test_reapertura_conserva_historial(self, ruta):
+        spill = LogSpill(ruta, capacidad=10)
+        spill.agregar(_registro(1.0, "antes"))
+        spill.cerrar()
+        reabierto = LogSpill(ruta, capacidad=10)
+        reabierto.agregar(_registro(2.0, "después"))
+        assert [r.mensaje for r in reabierto.buscar()] == ["antes", "después"]
+
+    def test_buscar_en_directorio_mezcla_workers(self, tmp_path):
+        a = LogSpill(str(tmp_path / "terminal-1.log"), capacidad=10)
+        b = LogSpill(str(tmp_path / "terminal-2.log"), capacidad=10)
+        for ts in (1.0, 3.0, 5.0):
+            a.agregar(_registro(ts))
+        for ts in (2.0, 4.0):
+            b.agregar(_registro(ts))
+        (tmp_path / "terminal-3.log").write_bytes(b"")
+        assert [r.ts for r in buscar_en_directorio(str(tmp_path), desde=2.0, hasta=4.5)] == [2.0, 3.0, 4.0]
+
+    def test_segmento_por_ranura_de_worker(self, tmp_path):
+        directorio = str(tmp_path)
+        a = abrir_segmento_de_worker(directorio, capacidad=10)
+        b = abrir_segmento_de_worker(directorio, capacidad=10)
+        assert os.path.basename(a.ruta) == "terminal-0.log"
+        assert os.path.basename(b.ruta) == "terminal-1.log"
+
+        # Un worker nuevo reutiliza la ranura del que terminó, con su historial
+        a.agregar(_registro(1.0, "anterior"))
+        a.cerrar()
+        c = abrir_segmento_de_worker(directorio, capacidad=10)
+        assert c.ruta == a.ruta
+        assert [r.mensaje for r in c.buscar()] == ["anterior"]
+        assert sorted(f for f in os.listdir(directorio) if f.endswith(".log")) == ["terminal-0.log", "terminal-1.log"]
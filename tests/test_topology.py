@@ -0,0 +1,139 @@
+"""
+Tests unitarios para topology.py.
+
+Cobertura:
+    - elegir()     : concentrada en reposo y con un solo dígito
+    - carga        : concurrencia y throughput × latencia pasan a la distribuida
+    - latencia     : la concentrada más lenta que la distribuida pasa a la distribuida
+    - histéresis   : vuelta a la concentrada solo con la carga baja y tras la permanencia mínima
+    - estado()     : medidas y operaciones por topología
+"""
+import pytest
+
+from topology import CONCENTRADA, DISTRIBUIDA, TopologyController
+
+
+class Reloj:
+    def __init__(self):
+        self.ahora = 1000.0
+
+    def __call__(self):
+        return self.ahora
+
+
+@pytest.fixture()
+def reloj():
+    return Reloj()
+
+
+def _controlador(reloj, **kwargs):
+    opciones = dict(capacidad_concentrada=2, histeresis=0.5, ventana_segundos=10,
+                    permanencia_segundos=5, min_muestras=2, reloj=reloj)
+    opciones.update(kwargs)
+    return TopologyController(**opciones)
+
+
+def _operaciones(controlador, reloj, topologia, latencia, cuantas):
+    for _ in range(cuantas):
+        inicio = controlador.inicio()
+        reloj.ahora += latencia
+        controlador.fin(topologia, inicio)
+
+
+class TestElegir:
+    def test_en_reposo_concentrada(self, reloj):
+        controlador = _controlador(reloj)
+        reloj.ahora += 60
+        assert controlador.elegir(4) == CONCENTRADA
+
+    def test_un_digito_siempre_concentrada(self, reloj):
+        controlador = _controlador(reloj)
+        controlador.actual = DISTRIBUIDA
+        assert controlador.elegir(1) == CONCENTRADA
+
+    def test_concurrencia_pasa_a_distribuida(self, reloj):
+        mensajes = []
+        controlador = _controlador(reloj, logger=lambda mensaje, nivel: mensajes.append(mensaje))
+        reloj.ahora += 60
+        for _ in range(3):
+            controlador.inicio()
+
+        assert controlador.elegir(4) == DISTRIBUIDA
+        assert controlador.cambios == 1
+        assert "distribuida" in mensajes[0]
+
+    def test_carga_estimada_supera_capacidad(self, reloj):
+        controlador = _controlador(reloj)
+        reloj.ahora += 60
+        # 30 operaciones concentradas de 1 s terminadas en el mismo instante: 3/s × 1 s = 3
+        for _ in range(30):
+            controlador.inicio()
+            controlador.fin(CONCENTRADA, reloj.ahora - 1.0)
+
+        assert controlador.elegir(4) == DISTRIBUIDA
+
+    def test_latencia_concentrada_peor_pasa_a_distribuida(self, reloj):
+        controlador = _controlador(reloj, capacidad_concentrada=100)
+        reloj.ahora += 5
+        _operaciones(controlador, reloj, CONCENTRADA, 0.5, 3)
+        _operaciones(controlador, reloj, DISTRIBUIDA, 0.2, 3)
+        reloj.ahora += 1
+
+        assert controlador.elegir(4) == DISTRIBUIDA
+
+    def test_fallos_no_cuentan_en_latencia(self, reloj):
+        controlador = _controlador(reloj, capacidad_concentrada=100)
+        for _ in range(3):
+            inicio = controlador.inicio()
+            reloj.ahora += 5
+            controlador.fin(CONCENTRADA, inicio, exito=False)
+        _operaciones(controlador, reloj, DISTRIBUIDA, 0.2, 3)
+
+        assert controlador.elegir(4) == CONCENTRADA
+        assert controlador.operaciones[CONCENTRADA] == 3
+
+
+class TestHisteresis:
+    def _en_distribuida(self, reloj):
+        controlador = _controlador(reloj)
+        reloj.ahora += 60
+        inicios = [controlador.inicio() for _ in range(3)]
+        assert controlador.elegir(4) == DISTRIBUIDA
+        return controlador, inicios
+
+    def test_permanencia_minima(self, reloj):
+        controlador, inicios = self._en_distribuida(reloj)
+        for inicio in inicios:
+            controlador.fin(DISTRIBUIDA, inicio)
+
+        reloj.ahora += 1
+        assert controlador.elegir(4) == DISTRIBUIDA
+        reloj.ahora += 5
+        assert controlador.elegir(4) == CONCENTRADA
+        assert controlador.cambios == 2
+
+    def test_carga_intermedia_mantiene_distribuida(self, reloj):
+        controlador, inicios = self._en_distribuida(reloj)
+        # 2 en curso: no supera la capacidad (2) pero tampoco baja del umbral de vuelta (1)
+        controlador.fin(DISTRIBUIDA, inicios[0])
+        controlador.fin(DISTRIBUIDA, inicios[1])
+        controlador.inicio()
+
+        reloj.ahora += 6
+        assert controlador.elegir(4) == DISTRIBUIDA
+
+
+class TestEstado:
+    def test_resumen(self, reloj):
+        controlador = _controlador(reloj)
+        _operaciones(controlador, reloj, CONCENTRADA, 0.1, 2)
+        controlador.inicio()
+
+        estado = controlador.estado()
+
+        assert estado["Topologia"] == CONCENTRADA
+        assert estado["EnCurso"] == 1
+        assert estado["Operaciones"] == {CONCENTRADA: 2, DISTRIBUIDA: 0}
+        assert estado["LatenciaMs"][CONCENTRADA] == pytest.approx(100)
+        assert estado["LatenciaMs"][DISTRIBUIDA] is None
+        assert estado["ThroughputPorSegundo"] == pytest.approx(0.2)
@@ -0,0 +1,137 @@
+"""
+Tests unitarios para tracing.py.
+
+Cobertura:
+    - Tracer.span()            : jerarquía padre/hijo, errores, continuación de traceparent
+    - cabeceras_propagacion()  : formato W3C del span actual
+    - InMemoryRingExporter     : capacidad acotada, resúmenes y detalle de trazas
+    - ruta_critica()           : sigue al hijo que termina más tarde
+"""
+import contextvars
+import threading
+
+import pytest
+from unittest.mock import patch
+
+from tracing import CallbackExporter, InMemoryRingExporter, Span, Tracer, cabeceras_propagacion, ruta_critica
+
+
+@pytest.fixture
+def exportador():
+    return InMemoryRingExporter(max_trazas=3)
+
+
+@pytest.fixture
+def tracer(exportador):
+    return Tracer([exportador])
+
+
+def _span(nombre, inicio, fin, trace_id="t" * 32, parent=None):
+    with patch("tracing.time.time", return_value=inicio):
+        span = Span(nombre, trace_id, parent.span_id if parent else None)
+    span.fin = fin
+    return span
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Spans y contexto
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestTracer:
+    def test_hijo_hereda_traza_del_padre(self, tracer):
+        with tracer.span("operacion") as raiz:
+            with tracer.span("escalar", digito=0) as hijo:
+                pass
+        assert hijo.trace_id == raiz.trace_id
+        assert hijo.parent_id == raiz.span_id
+        assert raiz.parent_id is None
+        assert hijo.atributos == {"digito": 0}
+
+    def test_error_marca_el_span_y_se_propaga(self, tracer, exportador):
+        with pytest.raises(RuntimeError):
+            with tracer.span("operacion") as span:
+                raise RuntimeError("fallo")
+        assert span.estado == "error"
+        assert span.error == "fallo"
+        assert exportador.traza(span.trace_id)["Spans"][0]["Estado"] == "error"
+
+    def test_continua_traceparent_remoto(self, tracer):
+        cabecera = "00-" + "a" * 32 + "-" + "b" * 16 + "-01"
+        with tracer.span("operacion", traceparent=cabecera) as span:
+            pass
+        assert span.trace_id == "a" * 32
+        assert span.parent_id == "b" * 16
+
+    def test_traceparent_invalido_inicia_traza_nueva(self, tracer):
+        with tracer.span("operacion", traceparent="basura") as span:
+            pass
+        assert len(span.trace_id) == 32
+        assert span.parent_id is None
+
+    def test_cabeceras_propagacion(self, tracer):
+        assert cabeceras_propagacion() == {}
+        with tracer.span("peticion_http") as span:
+            assert cabeceras_propagacion() == {"traceparent": f"00-{span.trace_id}-{span.span_id}-01"}
+
+    def test_contexto_copiado_a_otro_hilo(self, tracer):
+        resultado = {}
+
+        def en_hilo():
+            with tracer.span("peticion_http") as span:
+                resultado["span"] = span
+
+        with tracer.span("llamada_digito") as padre:
+            hilo = threading.Thread(target=contextvars.copy_context().run, args=(en_hilo,))
+            hilo.start()
+            hilo.join()
+        assert resultado["span"].parent_id == padre.span_id
+
+    def test_exportador_que_falla_no_rompe_la_operacion(self, exportador):
+        def explotar(span):
+            raise RuntimeError("exportador caído")
+
+        tracer = Tracer([CallbackExporter(explotar), exportador])
+        with tracer.span("operacion") as span:
+            pass
+        assert exportador.traza(span.trace_id) is not None
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Exportador en memoria
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestInMemoryRingExporter:
+    def test_descarta_las_trazas_mas_antiguas(self, tracer, exportador):
+        ids = []
+        for _ in range(5):
+            with tracer.span("operacion") as span:
+                pass
+            ids.append(span.trace_id)
+        assert [t["TraceId"] for t in exportador.trazas()] == list(reversed(ids[-3:]))
+        assert exportador.traza(ids[0]) is None
+
+    def test_resumen_de_traza(self, tracer, exportador):
+        with tracer.span("operacion"):
+            with tracer.span("escalar"):
+                pass
+        resumen = exportador.trazas()[0]
+        assert resumen["Raiz"] == "operacion"
+        assert resumen["Spans"] == 2
+        assert resumen["Estado"] == "ok"
+
+
+class TestRutaCritica:
+    def test_sigue_al_hijo_que_termina_mas_tarde(self):
+        raiz = _span("operacion", 0.0, 10.0)
+        escalar = _span("escalar", 0.0, 6.0, parent=raiz)
+        llamada = _span("llamada_digito", 6.0, 9.5, parent=raiz)
+        original = _span("peticion_http", 6.0, 9.5, parent=llamada)
+        cobertura = _span("peticion_http", 7.0, 8.0, parent=llamada)
+
+        ruta = ruta_critica([raiz, escalar, llamada, original, cobertura])
+        assert [paso["Nombre"] for paso in ruta] == ["operacion", "llamada_digito", "peticion_http"]
+        assert ruta[-1]["SpanId"] == original.span_id
+        assert ruta[1]["DuracionMs"] == pytest.approx(3500)
+
+    def test_sin_spans(self):
+        assert ruta_critica([]) == []
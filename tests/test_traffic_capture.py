@@ -0,0 +1,193 @@
+"""
+Tests unitarios para traffic_capture.py.
+
+Cobertura:
+    - TrafficRecorder / leer_captura  : formato binario, registros truncados, reapertura
+    - leer_capturas()                 : mezcla por llegada de las capturas de varios workers
+    - reproducir()                    : intervalos entre llegadas a 1x, escalados y sin esperas
+    - resumen() / comparar()          : percentiles de latencia, errores y arranques en frío
+    - CLI                             : summary, replay y compare
+"""
+import json
+import time
+
+import pytest
+from unittest.mock import MagicMock
+
+import traffic_capture
+from traffic_capture import TrafficRecorder, comparar, leer_captura, leer_capturas, reproducir, resumen
+
+
+def _captura(ruta, registros):
+    recorder = TrafficRecorder(str(ruta))
+    for registro in registros:
+        recorder.registrar(*registro)
+    recorder.cerrar()
+    return str(ruta)
+
+
+def _registro(llegada, latencia_ms=10.0, estado=200, frio=0):
+    return {'Llegada': llegada, 'NumberA': 1, 'NumberB': 2, 'LatenciaMs': latencia_ms, 'ArranquesFrio': frio, 'Estado': estado}
+
+
+class FakeSesion:
+    """Sesión HTTP simulada que anota los instantes de envío."""
+
+    def __init__(self, estado=200, arranque='caliente'):
+        self.envios = []
+        self.estado = estado
+        self.arranque = arranque
+
+    def post(self, url, json, timeout):
+        self.envios.append((time.time(), url, json))
+        respuesta = MagicMock()
+        respuesta.status_code = self.estado
+        respuesta.ok = self.estado == 200
+        respuesta.json.return_value = {
+            'Result': json['NumberA'] + json['NumberB'],
+            'EventosEscalado': [{'Tipo': 'escalado', 'Arranque': self.arranque}, {'Tipo': 'listo'}]
+        }
+        return respuesta
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Captura
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestCaptura:
+    def test_ida_y_vuelta(self, tmp_path):
+        ruta = _captura(tmp_path / "t.cap", [(1000.5, 12, 9999, 0.25, 2, 200), (1001.0, 0, 0, 0.001, 0, 400)])
+
+        registros = leer_captura(ruta)
+
+        assert registros[0] == {
+            'Llegada': 1000.5, 'NumberA': 12, 'NumberB': 9999,
+            'LatenciaMs': pytest.approx(250.0), 'ArranquesFrio': 2, 'Estado': 200
+        }
+        assert registros[1]['Estado'] == 400
+
+    def test_registro_compacto(self, tmp_path):
+        ruta = _captura(tmp_path / "t.cap", [(1.0, 1, 2, 0.1, 0, 200)] * 10)
+        assert (tmp_path / "t.cap").stat().st_size == len(traffic_capture.MAGIC) + 10 * 31
+        assert len(leer_captura(ruta)) == 10
+
+    def test_reapertura_agrega(self, tmp_path):
+        ruta = tmp_path / "t.cap"
+        _captura(ruta, [(1.0, 1, 2, 0.1, 0, 200)])
+        _captura(ruta, [(2.0, 3, 4, 0.1, 0, 200)])
+        assert [r['NumberA'] for r in leer_captura(str(ruta))] == [1, 3]
+
+    def test_registro_truncado_se_ignora(self, tmp_path):
+        ruta = tmp_path / "t.cap"
+        _captura(ruta, [(1.0, 1, 2, 0.1, 0, 200), (2.0, 3, 4, 0.1, 0, 200)])
+        contenido = ruta.read_bytes()
+        ruta.write_bytes(contenido[:-5])
+        assert len(leer_captura(str(ruta))) == 1
+
+    def test_fichero_ajeno(self, tmp_path):
+        ruta = tmp_path / "otro.cap"
+        ruta.write_bytes(b"no es una captura")
+        with pytest.raises(ValueError):
+            leer_captura(str(ruta))
+
+    def test_registrar_tras_cerrar_no_falla(self, tmp_path):
+        recorder = TrafficRecorder(str(tmp_path / "t.cap"))
+        recorder.cerrar()
+        recorder.registrar(1.0, 1, 2, 0.1)
+
+    def test_mezcla_varios_workers(self, tmp_path):
+        a = _captura(tmp_path / "a.cap", [(1.0, 1, 0, 0.1, 0, 200), (3.0, 3, 0, 0.1, 0, 200)])
+        b = _captura(tmp_path / "b.cap", [(2.0, 2, 0, 0.1, 0, 200)])
+        assert [r['NumberA'] for r in leer_capturas([a, b])] == [1, 2, 3]
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Reproducción
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestReproducir:
+    def test_respeta_intervalos(self):
+        sesion = FakeSesion()
+        reproducir([_registro(100.0), _registro(100.3)], "http://proxy/", sesion=sesion)
+
+        (t0, url, cuerpo), (t1, _, _) = sesion.envios
+        assert url == "http://proxy/suma-n-digitos"
+        assert cuerpo == {'NumberA': 1, 'NumberB': 2}
+        assert t1 - t0 == pytest.approx(0.3, abs=0.1)
+
+    def test_velocidad_escalada(self):
+        sesion = FakeSesion()
+        reproducir([_registro(100.0), _registro(100.6)], "http://proxy", velocidad=3, sesion=sesion)
+        assert sesion.envios[1][0] - sesion.envios[0][0] == pytest.approx(0.2, abs=0.1)
+
+    def test_lo_mas_rapido_posible(self):
+        sesion = FakeSesion()
+        inicio = time.time()
+        resultado = reproducir([_registro(100.0), _registro(200.0)], "http://proxy", velocidad=0, sesion=sesion)
+        assert time.time() - inicio < 1
+        assert len(resultado) == 2
+
+    def test_resultado_con_arranques_y_errores(self):
+        resultado = reproducir([_registro(1.0)], "http://proxy", sesion=FakeSesion(arranque='frio'))
+        assert resultado[0]['ArranquesFrio'] == 1
+        assert resultado[0]['Estado'] == 200
+        assert resultado[0]['RetrasoMs'] >= 0
+
+        sesion = MagicMock()
+        sesion.post.side_effect = ConnectionError("rechazada")
+        assert reproducir([_registro(1.0)], "http://proxy", sesion=sesion)[0]['Estado'] == 0
+
+    def test_sin_registros(self):
+        assert reproducir([], "http://proxy", sesion=FakeSesion()) == []
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# Informe
+# ─────────────────────────────────────────────────────────────────────────────
+
+class TestInforme:
+    def test_resumen(self):
+        registros = [_registro(float(i), latencia_ms=i + 1) for i in range(100)]
+        registros[0]['Estado'] = 500
+        registros[1]['ArranquesFrio'] = 3
+
+        datos = resumen(registros)
+
+        assert datos['Operaciones'] == 100
+        assert datos['Errores'] == 1
+        assert datos['ArranquesFrio'] == 3
+        assert datos['P50Ms'] == 51
+        assert datos['P99Ms'] == 100
+        assert datos['MaxMs'] == 100
+        assert datos['DuracionSegundos'] == 99
+
+    def test_comparar(self):
+        base = resumen([_registro(0.0, 10.0), _registro(1.0, 20.0)])
+        nueva = resumen([_registro(0.0, 5.0), _registro(1.0, 10.0)])
+
+        comparacion = comparar(base, nueva)
+
+        assert comparacion['MaxMs'] == {'Base': 20.0, 'Nueva': 10.0, 'CambioPorcentaje': -50.0}
+        assert comparacion['Errores']['CambioPorcentaje'] is None
+
+    def test_cli_summary_y_compare(self, tmp_path, capsys):
+        captura = _captura(tmp_path / "t.cap", [(1.0, 1, 2, 0.01, 0, 200), (2.0, 1, 2, 0.03, 1, 200)])
+        traffic_capture.main(["summary", captura])
+        assert json.loads(capsys.readouterr().out)['ArranquesFrio'] == 1
+
+        nueva = tmp_path / "nueva.json"
+        nueva.write_text(json.dumps([_registro(1.0, 5.0), _registro(2.0, 5.0)]))
+        traffic_capture.main(["compare", captura, str(nueva)])
+        assert "MaxMs" in capsys.readouterr().out
+
+    def test_cli_replay(self, tmp_path, capsys, monkeypatch):
+        captura = _captura(tmp_path / "t.cap", [(1.0, 1, 2, 0.01, 0, 200), (1.1, 3, 4, 0.01, 0, 200)])
+        sesion = FakeSesion()
+        monkeypatch.setattr("requests.Session", lambda: sesion)
+        salida = tmp_path / "run.json"
+
+        traffic_capture.main(["replay", captura, "--url", "http://proxy", "--speed", "0", "--output", str(salida)])
+
+        assert len(sesion.envios) == 2
+        assert [r['NumberA'] for r in json.loads(salida.read_text())] == [1, 3]
+        assert "Reproducidas 2 operaciones" in capsys.readouterr().out
@@ -0,0 +1,150 @@
+"""
+Topología adaptativa de /suma-n-digitos: un pod caliente o un pod por dígito.
+
+Con poca carga, la ruta distribuida es la peor en latencia: necesita hasta
+MAX_DIGITOS pods (y sus arranques en frío) para una sola suma. En topología
+concentrada todas las posiciones de la operación se envían, en cascada, al
+mismo pod de dígito (los pods son sumadores de una cifra intercambiables), que
+casi siempre está caliente. Cuando la carga sube, ese pod se convierte en
+cuello de botella y conviene repartir las posiciones entre sus pods.
+
+El controlador decide con lo medido en la ventana reciente:
+
+    carga = max(operaciones en curso, throughput × latencia concentrada)
+
+(ley de Little: operaciones que ocuparían a la vez el pod único). Se pasa a la
+topología distribuida si la carga supera capacidad_concentrada o si la latencia
+reciente de la concentrada supera a la de la distribuida en más de
+margen_latencia; se vuelve a la concentrada cuando la carga baja de
+capacidad_concentrada × histeresis. Cada topología se mantiene al menos
+permanencia_segundos para no oscilar.
+"""
+import threading
+import time
+from collections import deque
+
+CONCENTRADA = 'concentrada'
+DISTRIBUIDA = 'distribuida'
+TOPOLOGIAS = (CONCENTRADA, DISTRIBUIDA)
+
+
+class TopologyController:
+    def __init__(
+        self,
+        logger=None,
+        capacidad_concentrada=2.0,
+        histeresis=0.5,
+        margen_latencia=0.2,
+        ventana_segundos=30,
+        permanencia_segundos=10,
+        min_muestras=5,
+        reloj=time.monotonic
+    ):
+        self.logger = logger
+        self.capacidad_concentrada = capacidad_concentrada
+        self.histeresis = histeresis
+        self.margen_latencia = margen_latencia
+        self.ventana_segundos = ventana_segundos
+        self.permanencia_segundos = permanencia_segundos
+        self.min_muestras = min_muestras
+        self._reloj = reloj
+
+        self._lock = threading.Lock()
+        self.actual = CONCENTRADA
+        self._desde = reloj()
+        self._en_curso = 0
+        # (instante de fin, latencia) de las operaciones recientes por topología
+        self._muestras = {topologia: deque() for topologia in TOPOLOGIAS}
+        self.operaciones = {topologia: 0 for topologia in TOPOLOGIAS}
+        self.cambios = 0
+
+    # ── Medidas ─────────────────────────────────────────────────────────────
+
+    def _purgar(self, ahora):
+        limite = ahora - self.ventana_segundos
+        for muestras in self._muestras.values():
+            while muestras and muestras[0][0] < limite:
+                muestras.popleft()
+
+    def _latencia(self, topologia):
+        muestras = self._muestras[topologia]
+        if len(muestras) < self.min_muestras:
+            return None
+        return sum(latencia for _, latencia in muestras) / len(muestras)
+
+    def _throughput(self):
+        return sum(len(m) for m in self._muestras.values()) / self.ventana_segundos
+
+    def _carga(self):
+        latencia = self._latencia(CONCENTRADA)
+        estimada = self._throughput() * latencia if latencia is not None else 0.0
+        return max(float(self._en_curso), estimada)
+
+    # ── Decisión ────────────────────────────────────────────────────────────
+
+    def elegir(self, num_digitos):
+        """Topología para una operación de num_digitos (con un dígito ambas usan un solo pod)."""
+        if num_digitos <= 1:
+            return CONCENTRADA
+
+        with self._lock:
+            ahora = self._reloj()
+            self._purgar(ahora)
+            if ahora - self._desde < self.permanencia_segundos:
+                return self.actual
+
+            carga = self._carga()
+            motivo = None
+            if self.actual == CONCENTRADA:
+                concentrada, distribuida = self._latencia(CONCENTRADA), self._latencia(DISTRIBUIDA)
+                if carga > self.capacidad_concentrada:
+                    motivo = f"carga {carga:.2f} > {self.capacidad_concentrada:g}"
+                elif concentrada is not None and distribuida is not None \
+                        and concentrada > distribuida * (1 + self.margen_latencia):
+                    motivo = f"latencia {concentrada * 1000:.0f} ms frente a {distribuida * 1000:.0f} ms distribuida"
+                nueva = DISTRIBUIDA if motivo else CONCENTRADA
+            else:
+                umbral = self.capacidad_concentrada * self.histeresis
+                if carga < umbral:
+                    motivo = f"carga {carga:.2f} < {umbral:g}"
+                nueva = CONCENTRADA if motivo else DISTRIBUIDA
+
+            if nueva != self.actual:
+                self.actual = nueva
+                self._desde = ahora
+                self.cambios += 1
+                if self.logger:
+                    self.logger(f"↪ Topología {nueva} ({motivo})", "info")
+            return self.actual
+
+    def inicio(self):
+        with self._lock:
+            self._en_curso += 1
+        return self._reloj()
+
+    def fin(self, topologia, inicio, exito=True):
+        """Registra el final de una operación; solo las correctas alimentan la latencia."""
+        ahora = self._reloj()
+        with self._lock:
+            self._en_curso -= 1
+            self.operaciones[topologia] += 1
+            if exito:
+                self._muestras[topologia].append((ahora, ahora - inicio))
+        return ahora - inicio
+
+    def estado(self):
+        with self._lock:
+            ahora = self._reloj()
+            self._purgar(ahora)
+            latencias = {t: self._latencia(t) for t in TOPOLOGIAS}
+            return {
+                'Topologia': self.actual,
+                'DesdeSegundos': round(ahora - self._desde, 3),
+                'EnCurso': self._en_curso,
+                'Carga': round(self._carga(), 3),
+                'ThroughputPorSegundo': round(self._throughput(), 3),
+                'CapacidadConcentrada': self.capacidad_concentrada,
+                'LatenciaMs': {t: round(l * 1000, 3) if l is not None else None for t, l in latencias.items()},
+                'Operaciones': dict(self.operaciones),
+                'Cambios': self.cambios
+            }
@@ -0,0 +1,203 @@
+import contextvars
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+_span_actual = contextvars.ContextVar("span_actual", default=None)
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+
+class Span:
+    """Tramo de una operación: nombre, inicio/fin, atributos y padre dentro de la traza."""
+
+    __slots__ = ('trace_id', 'span_id', 'parent_id', 'nombre', 'inicio', 'fin', 'atributos', 'estado', 'error')
+
+    def __init__(self, nombre, trace_id, parent_id=None, atributos=None):
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.nombre = nombre
+        self.inicio = time.time()
+        self.fin = None
+        self.atributos = dict(atributos or {})
+        self.estado = 'ok'
+        self.error = None
+
+    @property
+    def duracion(self):
+        return (self.fin or time.time()) - self.inicio
+
+    def atributo(self, clave, valor):
+        self.atributos[clave] = valor
+
+    def traceparent(self):
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_dict(self):
+        return {
+            'TraceId': self.trace_id,
+            'SpanId': self.span_id,
+            'ParentId': self.parent_id,
+            'Nombre': self.nombre,
+            'Inicio': self.inicio,
+            'DuracionMs': round(self.duracion * 1000, 3),
+            'Atributos': self.atributos,
+            'Estado': self.estado,
+            'Error': self.error
+        }
+
+
+class InMemoryRingExporter:
+    """
+    Exportador que guarda las últimas max_trazas trazas completas en memoria.
+
+    Permite inspeccionar trazas y su ruta crítica sin un colector externo.
+    """
+
+    def __init__(self, max_trazas=200, max_spans_por_traza=500):
+        self.max_trazas = max_trazas
+        self.max_spans_por_traza = max_spans_por_traza
+        self._lock = threading.Lock()
+        self._trazas = OrderedDict()
+
+    def exportar(self, span):
+        with self._lock:
+            spans = self._trazas.get(span.trace_id)
+            if spans is None:
+                spans = self._trazas[span.trace_id] = []
+                while len(self._trazas) > self.max_trazas:
+                    self._trazas.popitem(last=False)
+            if len(spans) < self.max_spans_por_traza:
+                spans.append(span)
+
+    def trazas(self):
+        """Resumen de las trazas guardadas, de la más reciente a la más antigua."""
+        with self._lock:
+            snapshot = [(trace_id, list(spans)) for trace_id, spans in self._trazas.items()]
+
+        resumenes = []
+        for trace_id, spans in reversed(snapshot):
+            raiz = next((s for s in spans if s.parent_id is None or s.parent_id not in {x.span_id for x in spans}), spans[0])
+            resumenes.append({
+                'TraceId': trace_id,
+                'Raiz': raiz.nombre,
+                'Inicio': raiz.inicio,
+                'DuracionMs': round(raiz.duracion * 1000, 3),
+                'Spans': len(spans),
+                'Estado': 'error' if any(s.estado == 'error' for s in spans) else 'ok'
+            })
+        return resumenes
+
+    def traza(self, trace_id):
+        with self._lock:
+            spans = list(self._trazas.get(trace_id, ()))
+        if not spans:
+            return None
+        return {
+            'TraceId': trace_id,
+            'Spans': [s.to_dict() for s in sorted(spans, key=lambda s: s.inicio)],
+            'RutaCritica': ruta_critica(spans)
+        }
+
+    def limpiar(self):
+        with self._lock:
+            self._trazas.clear()
+
+
+def ruta_critica(spans):
+    """
+    Ruta crítica de una traza: desde la raíz, en cada nivel se sigue el hijo que
+    termina más tarde (el que retiene al padre). Devuelve [{Nombre, DuracionMs, ...}].
+    """
+    ids = {s.span_id for s in spans}
+    hijos = {}
+    for span in spans:
+        hijos.setdefault(span.parent_id if span.parent_id in ids else None, []).append(span)
+
+    raices = hijos.get(None, [])
+    if not raices:
+        return []
+
+    ruta = []
+    actual = max(raices, key=lambda s: s.duracion)
+    while actual is not None:
+        ruta.append({
+            'Nombre': actual.nombre,
+            'SpanId': actual.span_id,
+            'DuracionMs': round(actual.duracion * 1000, 3),
+            'Atributos': actual.atributos
+        })
+        descendientes = hijos.get(actual.span_id)
+        actual = max(descendientes, key=lambda s: s.fin or s.inicio) if descendientes else None
+    return ruta
+
+
+class Tracer:
+    """
+    Instrumentación de spans con contexto implícito (contextvars).
+
+    Los exportadores son objetos con un método exportar(span); se invocan al
+    cerrar cada span. El contexto se propaga a los backends con la cabecera
+    W3C traceparent.
+    """
+
+    def __init__(self, exportadores=None):
+        self.exportadores = list(exportadores or [])
+
+    def agregar_exportador(self, exportador):
+        self.exportadores.append(exportador)
+
+    @contextmanager
+    def span(self, nombre, traceparent=None, **atributos):
+        """
+        Abre un span hijo del actual (o raíz si no hay ninguno).
+
+        traceparent permite continuar una traza recibida en una petición entrante.
+        """
+        padre = _span_actual.get()
+        if padre is not None:
+            trace_id, parent_id = padre.trace_id, padre.span_id
+        else:
+            remoto = _TRACEPARENT.match(traceparent or "")
+            trace_id, parent_id = (remoto.group(1), remoto.group(2)) if remoto else (os.urandom(16).hex(), None)
+
+        span = Span(nombre, trace_id, parent_id, atributos)
+        token = _span_actual.set(span)
+        try:
+            yield span
+        except BaseException as error:
+            span.estado = 'error'
+            span.error = str(error) or type(error).__name__
+            raise
+        finally:
+            span.fin = time.time()
+            _span_actual.reset(token)
+            for exportador in self.exportadores:
+                try:
+                    exportador.exportar(span)
+                except Exception:
+                    pass
+
+
+def span_actual():
+    return _span_actual.get()
+
+
+def cabeceras_propagacion():
+    """Cabeceras HTTP para propagar el span actual a un servicio remoto."""
+    span = _span_actual.get()
+    return {'traceparent': span.traceparent()} if span is not None else {}
+
+
+class CallbackExporter:
+    """Exportador que invoca funcion(span) por cada span cerrado (p. ej. para alimentar métricas)."""
+
+    def __init__(self, funcion):
+        self.funcion = funcion
+
+    def exportar(self, span):
+        self.funcion(span)
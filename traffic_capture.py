@@ -0,0 +1,227 @@
+"""
+Captura de tráfico real de /suma-n-digitos y reproducción con la misma forma temporal.
+
+El proxy (TRAFFIC_CAPTURE_DIR) añade cada operación a un fichero binario de
+registros fijos: instante de llegada, operandos, latencia, arranques en frío y
+código de estado. La herramienta de línea de comandos reproduce esas capturas
+contra un proxy respetando los intervalos entre llegadas (a 1x, escalados o
+lo más rápido posible) y compara las distribuciones de latencia entre ejecuciones:
+
+    python traffic_capture.py summary /tmp/trafico/*.cap
+    python traffic_capture.py replay /tmp/trafico/*.cap --url http://localhost:8080 --speed 2 --output nueva.json
+    python traffic_capture.py compare base.json nueva.json
+"""
+import argparse
+import glob
+import heapq
+import json
+import os
+import struct
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Cabecera del fichero y registro fijo de 31 bytes:
+#   llegada (f64 epoch), NumberA (u64), NumberB (u64), latencia ms (f32), arranques en frío (u8), estado HTTP (u16)
+MAGIC = b"SUMACAP1"
+_REGISTRO = struct.Struct('<dQQfBH')
+
+PERCENTILES = (0.5, 0.9, 0.95, 0.99)
+
+
+class TrafficRecorder:
+    """
+    Escritor append-only de la captura de un proceso.
+
+    Cada registro se escribe con una única llamada write() sobre un descriptor
+    abierto con O_APPEND, así que no hay buffer que perder si el worker termina
+    de forma abrupta y los registros nunca quedan intercalados.
+    """
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._lock = threading.Lock()
+        self._fd = os.open(ruta, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        if os.fstat(self._fd).st_size == 0:
+            os.write(self._fd, MAGIC)
+
+    def registrar(self, llegada, numero_a, numero_b, latencia, arranques_en_frio=0, estado=200):
+        registro = _REGISTRO.pack(
+            llegada, numero_a, numero_b, latencia * 1000, min(arranques_en_frio, 255), estado
+        )
+        with self._lock:
+            if self._fd is not None:
+                os.write(self._fd, registro)
+
+    def cerrar(self):
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+
+def leer_captura(ruta):
+    """Registros de un fichero de captura como dicts (un registro final incompleto se ignora)."""
+    with open(ruta, 'rb') as fichero:
+        contenido = fichero.read()
+    if not contenido.startswith(MAGIC):
+        raise ValueError(f"{ruta} no es una captura de tráfico")
+    datos = memoryview(contenido)[len(MAGIC):]
+    completos = len(datos) - len(datos) % _REGISTRO.size
+    return [
+        {'Llegada': llegada, 'NumberA': a, 'NumberB': b, 'LatenciaMs': latencia, 'ArranquesFrio': frio, 'Estado': estado}
+        for llegada, a, b, latencia, frio, estado in _REGISTRO.iter_unpack(datos[:completos])
+    ]
+
+
+def leer_capturas(rutas):
+    """Mezcla por instante de llegada las capturas de varios workers."""
+    return list(heapq.merge(*(leer_captura(ruta) for ruta in rutas), key=lambda r: r['Llegada']))
+
+
+def reproducir(registros, url_base, velocidad=1.0, max_concurrencia=64, timeout=120, sesion=None):
+    """
+    Reenvía las operaciones capturadas a url_base respetando los intervalos entre
+    llegadas divididos por velocidad (velocidad <= 0: lo más rápido posible,
+    limitado por max_concurrencia). Devuelve los registros de la reproducción con
+    el mismo formato que la captura más RetrasoMs (desfase respecto al instante programado).
+    """
+    if sesion is None:
+        import requests
+        sesion = requests.Session()
+    url = url_base.rstrip('/') + '/suma-n-digitos'
+
+    def enviar(registro, programado):
+        llegada = time.time()
+        inicio = time.perf_counter()
+        frio = 0
+        try:
+            respuesta = sesion.post(url, json={'NumberA': registro['NumberA'], 'NumberB': registro['NumberB']}, timeout=timeout)
+            estado = respuesta.status_code
+            if respuesta.ok:
+                frio = sum(
+                    1 for evento in respuesta.json().get('EventosEscalado', [])
+                    if evento.get('Tipo') == 'escalado' and evento.get('Arranque') == 'frio'
+                )
+        except Exception:
+            estado = 0
+        return {
+            'Llegada': llegada,
+            'NumberA': registro['NumberA'],
+            'NumberB': registro['NumberB'],
+            'LatenciaMs': (time.perf_counter() - inicio) * 1000,
+            'ArranquesFrio': frio,
+            'Estado': estado,
+            'RetrasoMs': max(0.0, (llegada - programado) * 1000)
+        }
+
+    if not registros:
+        return []
+    origen = registros[0]['Llegada']
+    comienzo = time.time()
+    with ThreadPoolExecutor(max_workers=max_concurrencia) as executor:
+        futuros = []
+        for registro in registros:
+            programado = comienzo + ((registro['Llegada'] - origen) / velocidad if velocidad > 0 else 0)
+            espera = programado - time.time()
+            if espera > 0:
+                time.sleep(espera)
+            futuros.append(executor.submit(enviar, registro, programado))
+        return [futuro.result() for futuro in futuros]
+
+
+def _percentil(ordenados, q):
+    if not ordenados:
+        return None
+    return ordenados[min(len(ordenados) - 1, int(q * len(ordenados)))]
+
+
+def resumen(registros):
+    """Distribución de latencias (ms), errores, arranques en frío y tasa de llegada de una ejecución."""
+    latencias = sorted(r['LatenciaMs'] for r in registros)
+    duracion = registros[-1]['Llegada'] - registros[0]['Llegada'] if len(registros) > 1 else 0.0
+    datos = {
+        'Operaciones': len(registros),
+        'Errores': sum(1 for r in registros if not 200 <= r['Estado'] < 300),
+        'ArranquesFrio': sum(r['ArranquesFrio'] for r in registros),
+        'DuracionSegundos': round(duracion, 3),
+        'MediaMs': round(sum(latencias) / len(latencias), 3) if latencias else None,
+        'MaxMs': round(latencias[-1], 3) if latencias else None
+    }
+    for q in PERCENTILES:
+        valor = _percentil(latencias, q)
+        datos[f"P{int(q * 100)}Ms"] = round(valor, 3) if valor is not None else None
+    return datos
+
+
+def comparar(base, nueva):
+    """Compara dos resúmenes: valor base, valor nuevo y diferencia relativa de cada métrica."""
+    comparacion = {}
+    for clave, valor_base in base.items():
+        valor_nuevo = nueva.get(clave)
+        cambio = None
+        if valor_base and valor_nuevo is not None:
+            cambio = round((valor_nuevo - valor_base) / valor_base * 100, 1)
+        comparacion[clave] = {'Base': valor_base, 'Nueva': valor_nuevo, 'CambioPorcentaje': cambio}
+    return comparacion
+
+
+def _cargar(rutas):
+    """Una captura binaria (o varias) o la salida JSON de una reproducción anterior."""
+    rutas = [r for patron in rutas for r in sorted(glob.glob(patron)) or [patron]]
+    if len(rutas) == 1 and rutas[0].endswith('.json'):
+        with open(rutas[0], encoding='utf-8') as fichero:
+            return json.load(fichero)
+    return leer_capturas(rutas)
+
+
+def _imprimir_comparacion(comparacion, salida=None):
+    salida = salida or sys.stdout
+    print(f"{'métrica':>18} {'base':>12} {'nueva':>12} {'cambio':>9}", file=salida)
+    for clave, fila in comparacion.items():
+        cambio = f"{fila['CambioPorcentaje']:+.1f}%" if fila['CambioPorcentaje'] is not None else "-"
+        print(f"{clave:>18} {str(fila['Base']):>12} {str(fila['Nueva']):>12} {cambio:>9}", file=salida)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    p_resumen = subparsers.add_parser('summary', help="Resumen de una captura o reproducción")
+    p_resumen.add_argument('rutas', nargs='+')
+
+    p_replay = subparsers.add_parser('replay', help="Reproduce una captura contra un proxy")
+    p_replay.add_argument('rutas', nargs='+')
+    p_replay.add_argument('--url', default='http://localhost:8080')
+    p_replay.add_argument('--speed', type=float, default=1.0, help="Factor de velocidad (0 = lo más rápido posible)")
+    p_replay.add_argument('--concurrency', type=int, default=64)
+    p_replay.add_argument('--limit', type=int, default=0, help="Reproducir solo las primeras N operaciones")
+    p_replay.add_argument('--output', help="Guardar los registros de la reproducción en JSON")
+
+    p_comparar = subparsers.add_parser('compare', help="Compara las latencias de dos ejecuciones")
+    p_comparar.add_argument('base')
+    p_comparar.add_argument('nueva')
+
+    args = parser.parse_args(argv)
+
+    if args.comando == 'summary':
+        print(json.dumps(resumen(_cargar(args.rutas)), indent=2))
+    elif args.comando == 'replay':
+        registros = _cargar(args.rutas)
+        if args.limit:
+            registros = registros[:args.limit]
+        resultado = reproducir(registros, args.url, velocidad=args.speed, max_concurrencia=args.concurrency)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as fichero:
+                json.dump(resultado, fichero)
+        retrasos = sorted(r['RetrasoMs'] for r in resultado)
+        print(f"Reproducidas {len(resultado)} operaciones a {args.speed}x "
+              f"(retraso de envío p99: {_percentil(retrasos, 0.99) or 0:.1f} ms)")
+        _imprimir_comparacion(comparar(resumen(registros), resumen(resultado)))
+    else:
+        _imprimir_comparacion(comparar(resumen(_cargar([args.base])), resumen(_cargar([args.nueva]))))
+
+
+if __name__ == '__main__':
+    main()